@@ -0,0 +1,37 @@
+"""add game_events table
+
+Revision ID: 3b7c9d2e4f10
+Revises: ef7e03c9b67b
+Create Date: 2026-10-19 09:12:31.402118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7c9d2e4f10'
+down_revision = 'ef7e03c9b67b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('game_events',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('client_id', sa.String(length=36), nullable=False),
+    sa.Column('seq', sa.Integer(), nullable=False),
+    sa.Column('event_type', sa.String(length=20), nullable=False),
+    sa.Column('challenge_id', sa.Integer(), nullable=True),
+    sa.Column('payload', sa.Text(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'client_id', 'seq', name='uq_event_client_seq')
+    )
+
+
+def downgrade():
+    op.drop_table('game_events')
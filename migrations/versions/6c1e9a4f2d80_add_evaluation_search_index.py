@@ -0,0 +1,43 @@
+"""add evaluation_search (full-text index over evaluations.q5/q6)
+
+Revision ID: 6c1e9a4f2d80
+Revises: d3a8f6b2e517
+Create Date: 2026-10-19 19:52:14.408317
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6c1e9a4f2d80'
+down_revision = 'd3a8f6b2e517'
+branch_labels = None
+depends_on = None
+
+# As avaliações que já existem entram no índice depois do deploy:
+#     python -m my_app.backfills run --pending
+SCHEDULED = ('evaluation_search',)
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("CREATE TABLE evaluation_search ("
+                   "evaluation_id INTEGER PRIMARY KEY REFERENCES evaluations (id), "
+                   "language VARCHAR(5) NOT NULL, "
+                   "document TSVECTOR NOT NULL)")
+        op.execute("CREATE INDEX ix_evaluation_search_document ON evaluation_search USING gin (document)")
+    else:
+        # Texto já reduzido ao radical pelo app (my_app/feedback_search.py); rowid = evaluations.id
+        op.execute("CREATE VIRTUAL TABLE evaluation_search USING fts5("
+                   "q5, q6, language, tokenize = 'unicode61 remove_diacritics 2')")
+    data_migrations = sa.table('data_migrations', sa.column('name', sa.String), sa.column('status', sa.String),
+                               sa.column('last_key', sa.Integer), sa.column('rows_done', sa.Integer))
+    op.bulk_insert(data_migrations, [
+        {'name': name, 'status': 'pending', 'last_key': 0, 'rows_done': 0} for name in SCHEDULED
+    ])
+
+
+def downgrade():
+    op.execute(sa.text("DELETE FROM data_migrations WHERE name = 'evaluation_search'"))
+    op.execute("DROP TABLE evaluation_search")
@@ -0,0 +1,67 @@
+"""add cohort tables
+
+Revision ID: 8d41f0a6c2b3
+Revises: 3b7c9d2e4f10
+Create Date: 2026-10-19 10:02:47.551930
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d41f0a6c2b3'
+down_revision = '3b7c9d2e4f10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('cohorts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('join_code', sa.String(length=12), nullable=False),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('cohorts', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_cohorts_join_code'), ['join_code'], unique=True)
+
+    op.create_table('cohort_memberships',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('cohort_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('role', sa.String(length=20), nullable=False),
+    sa.Column('joined_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['cohort_id'], ['cohorts.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('cohort_id', 'user_id', name='uq_cohort_member')
+    )
+    with op.batch_alter_table('cohort_memberships', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_cohort_memberships_user_id'), ['user_id'], unique=False)
+
+    # Consultas por turma filtram estas tabelas por user_id
+    with op.batch_alter_table('challenge_attempts', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_challenge_attempts_user_id'), ['user_id'], unique=False)
+    with op.batch_alter_table('evaluations', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_evaluations_user_id'), ['user_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('evaluations', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_evaluations_user_id'))
+    with op.batch_alter_table('challenge_attempts', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_challenge_attempts_user_id'))
+
+    with op.batch_alter_table('cohort_memberships', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_cohort_memberships_user_id'))
+
+    op.drop_table('cohort_memberships')
+    with op.batch_alter_table('cohorts', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_cohorts_join_code'))
+
+    op.drop_table('cohorts')
@@ -0,0 +1,28 @@
+"""add replica heartbeat table
+
+Revision ID: 9e4d2b6a1c38
+Revises: f1b3d5a7c902
+Create Date: 2026-10-19 17:02:11.504381
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e4d2b6a1c38'
+down_revision = 'f1b3d5a7c902'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('replica_heartbeat',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('beat_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('replica_heartbeat')
@@ -0,0 +1,52 @@
+"""add challenge_id to dwell_stats (dwell per station)
+
+Revision ID: a4c8e2f6b913
+Revises: 6c1e9a4f2d80
+Create Date: 2026-10-19 21:04:37.118520
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4c8e2f6b913'
+down_revision = '6c1e9a4f2d80'
+branch_labels = None
+depends_on = None
+
+COPIED = 'day, endpoint, language, views, dwell_count, dwell_seconds, dwell_histogram'
+
+
+def _create(name, per_station):
+    columns = [sa.Column('day', sa.Date(), nullable=False),
+               sa.Column('endpoint', sa.String(length=100), nullable=False)]
+    if per_station:
+        columns.append(sa.Column('challenge_id', sa.Integer(), nullable=False, server_default='0'))
+    op.create_table(name, *columns,
+    sa.Column('language', sa.String(length=5), nullable=False),
+    sa.Column('views', sa.Integer(), nullable=False),
+    sa.Column('dwell_count', sa.Integer(), nullable=False),
+    sa.Column('dwell_seconds', sa.Float(), nullable=False),
+    sa.Column('dwell_histogram', sa.Text(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'endpoint', *(['challenge_id'] if per_station else []), 'language')
+    )
+
+
+def _replace(per_station, select):
+    # A chave primária muda: tabela nova, cópia e troca (igual no SQLite e no PostgreSQL)
+    _create('dwell_stats_new', per_station)
+    op.execute(f"INSERT INTO dwell_stats_new ({COPIED}) {select}")
+    op.drop_table('dwell_stats')
+    op.rename_table('dwell_stats_new', 'dwell_stats')
+
+
+def upgrade():
+    # O que já foi agregado fica sem estação (challenge_id 0)
+    _replace(True, f"SELECT {COPIED} FROM dwell_stats")
+
+
+def downgrade():
+    # Soma as estações; os histogramas (JSON) não somam em SQL e voltam vazios
+    _replace(False, "SELECT day, endpoint, language, SUM(views), SUM(dwell_count), SUM(dwell_seconds), "
+                    "'[]' FROM dwell_stats GROUP BY day, endpoint, language")
@@ -0,0 +1,43 @@
+"""add data_migrations table (checkpoints of chunked backfills)
+
+Revision ID: b7e5c1f3a942
+Revises: 9e4d2b6a1c38
+Create Date: 2026-10-19 17:48:30.227915
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e5c1f3a942'
+down_revision = '9e4d2b6a1c38'
+branch_labels = None
+depends_on = None
+
+# Backfills agendadas por esta revisão; rodam depois do deploy, com o tráfego no ar:
+#     python -m my_app.backfills run --pending
+SCHEDULED = ('user_progress_earned_keys', 'site_access_daily')
+
+
+def upgrade():
+    data_migrations = op.create_table('data_migrations',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('last_key', sa.Integer(), nullable=False),
+    sa.Column('rows_done', sa.Integer(), nullable=False),
+    sa.Column('total_rows', sa.Integer(), nullable=True),
+    sa.Column('locked_by', sa.String(length=64), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.bulk_insert(data_migrations, [
+        {'name': name, 'status': 'pending', 'last_key': 0, 'rows_done': 0} for name in SCHEDULED
+    ])
+
+
+def downgrade():
+    op.drop_table('data_migrations')
@@ -0,0 +1,25 @@
+"""index page_views.accessed_at
+
+Revision ID: c4f2a9e1b7d6
+Revises: 5a1e7c3d9b20
+Create Date: 2026-10-19 15:02:41.503917
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4f2a9e1b7d6'
+down_revision = '5a1e7c3d9b20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('page_views', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_page_views_accessed_at'), ['accessed_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('page_views', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_page_views_accessed_at'))
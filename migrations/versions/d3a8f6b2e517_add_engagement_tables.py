@@ -0,0 +1,53 @@
+"""add session_stats, dwell_stats and sessionization_state tables
+
+Revision ID: d3a8f6b2e517
+Revises: b7e5c1f3a942
+Create Date: 2026-10-19 18:36:52.661094
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3a8f6b2e517'
+down_revision = 'b7e5c1f3a942'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('session_stats',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('language', sa.String(length=5), nullable=False),
+    sa.Column('sessions', sa.Integer(), nullable=False),
+    sa.Column('bounces', sa.Integer(), nullable=False),
+    sa.Column('page_views', sa.Integer(), nullable=False),
+    sa.Column('duration_seconds', sa.Float(), nullable=False),
+    sa.Column('duration_histogram', sa.Text(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'language')
+    )
+    op.create_table('dwell_stats',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('endpoint', sa.String(length=100), nullable=False),
+    sa.Column('language', sa.String(length=5), nullable=False),
+    sa.Column('views', sa.Integer(), nullable=False),
+    sa.Column('dwell_count', sa.Integer(), nullable=False),
+    sa.Column('dwell_seconds', sa.Float(), nullable=False),
+    sa.Column('dwell_histogram', sa.Text(), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'endpoint', 'language')
+    )
+    op.create_table('sessionization_state',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('watermark_at', sa.DateTime(), nullable=True),
+    sa.Column('watermark_id', sa.Integer(), nullable=False),
+    sa.Column('open_sessions', sa.Text(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('sessionization_state')
+    op.drop_table('dwell_stats')
+    op.drop_table('session_stats')
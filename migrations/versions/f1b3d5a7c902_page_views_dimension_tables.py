@@ -0,0 +1,91 @@
+"""page_views dimension tables (url, endpoint, user agent)
+
+Revision ID: f1b3d5a7c902
+Revises: c4f2a9e1b7d6
+Create Date: 2026-10-19 16:21:37.840112
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1b3d5a7c902'
+down_revision = 'c4f2a9e1b7d6'
+branch_labels = None
+depends_on = None
+
+# (tabela da dimensão, coluna do valor, tamanho, coluna antiga em page_views, nova coluna de id)
+DIMENSIONS = (
+    ('page_urls', 'url', 200, 'page_url', 'url_id'),
+    ('page_endpoints', 'name', 100, 'page_title', 'endpoint_id'),
+    ('user_agents', 'value', 500, 'user_agent', 'user_agent_id'),
+)
+
+
+def upgrade():
+    op.create_table('page_urls',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('url', sa.String(length=200), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('url')
+    )
+    op.create_table('page_endpoints',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.create_table('user_agents',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('value', sa.String(length=500), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('value')
+    )
+    with op.batch_alter_table('page_views', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('url_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('endpoint_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('user_agent_id', sa.Integer(), nullable=True))
+
+    # Dados existentes: cada valor distinto vira uma linha da dimensão e page_views aponta para ela
+    for table, value, length, old, new in DIMENSIONS:
+        # user-agent vazio vira NULL; URL e endpoint são obrigatórios e entram como estão
+        skip_empty = f" AND {old} <> ''" if new == 'user_agent_id' else ''
+        op.execute(f"INSERT INTO {table} ({value}) SELECT DISTINCT SUBSTR({old}, 1, {length}) "
+                   f"FROM page_views WHERE {old} IS NOT NULL{skip_empty}")
+        op.execute(f"UPDATE page_views SET {new} = (SELECT d.id FROM {table} d "
+                   f"WHERE d.{value} = SUBSTR(page_views.{old}, 1, {length}))")
+
+    with op.batch_alter_table('page_views', schema=None) as batch_op:
+        batch_op.alter_column('url_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.alter_column('endpoint_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_foreign_key('fk_page_views_url_id', 'page_urls', ['url_id'], ['id'])
+        batch_op.create_foreign_key('fk_page_views_endpoint_id', 'page_endpoints', ['endpoint_id'], ['id'])
+        batch_op.create_foreign_key('fk_page_views_user_agent_id', 'user_agents', ['user_agent_id'], ['id'])
+        batch_op.drop_column('page_url')
+        batch_op.drop_column('page_title')
+        batch_op.drop_column('user_agent')
+
+
+def downgrade():
+    with op.batch_alter_table('page_views', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('page_url', sa.String(length=200), nullable=True))
+        batch_op.add_column(sa.Column('page_title', sa.String(length=100), nullable=True))
+        batch_op.add_column(sa.Column('user_agent', sa.Text(), nullable=True))
+
+    for table, value, _, old, new in DIMENSIONS:
+        op.execute(f"UPDATE page_views SET {old} = (SELECT d.{value} FROM {table} d WHERE d.id = page_views.{new})")
+
+    with op.batch_alter_table('page_views', schema=None) as batch_op:
+        batch_op.alter_column('page_url', existing_type=sa.String(length=200), nullable=False)
+        batch_op.alter_column('page_title', existing_type=sa.String(length=100), nullable=False)
+        batch_op.drop_constraint('fk_page_views_user_agent_id', type_='foreignkey')
+        batch_op.drop_constraint('fk_page_views_endpoint_id', type_='foreignkey')
+        batch_op.drop_constraint('fk_page_views_url_id', type_='foreignkey')
+        batch_op.drop_column('user_agent_id')
+        batch_op.drop_column('endpoint_id')
+        batch_op.drop_column('url_id')
+
+    op.drop_table('user_agents')
+    op.drop_table('page_endpoints')
+    op.drop_table('page_urls')
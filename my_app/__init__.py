@@ -1,113 +1,121 @@
 # /__init__.py
 
-import os
 import json
 import uuid
-import hashlib
-from datetime import datetime, date, timedelta
-from flask import Flask, render_template, redirect, url_for, request, session, jsonify
-from flask_migrate import Migrate
-from flask_sqlalchemy import SQLAlchemy
+from flask import (Flask, Response, g, render_template, redirect, url_for, request, session, jsonify,
+                   send_from_directory)
+from werkzeug.middleware.proxy_fix import ProxyFix
 from .config import config
-from .models import *
+from .models import db, User
+from .dimensions import new_page_view, tracked_url
+from .feedback_search import index_evaluations
+from .http_cache import http_cache
+from .metrics import metrics
+from .rate_limit import client_ip_hash, rate_limiter
+from .replica import init_replica, replica_reads
+from .options import PROFESSIONS, COUNTRIES
+from .catalog import DEFAULT_LANGUAGE, catalog
+from .game_engine import current_engine
+from .startup import Translations
 
-# Importa os dados dos desafios para serem usados nas rotas
-from .challenges_data import challenges
 
-# Inicializa as extensões sem uma aplicação específica ainda
-migrate = Migrate()  # ← inicializa sem app ainda
+def _autogenerate_includes(obj, name, type_, reflected, compare_to):
+    """O índice de busca (FTS5 / tsvector) é DDL escrito à mão, fora dos modelos: o autogenerate o ignora."""
+    return not (type_ == 'table' and name.startswith('evaluation_search'))
 
 
-def create_app(config_name='development'):
+def init_migrations(app):
+    """Registra o Flask-Migrate; importado aqui porque puxa o alembic inteiro."""
+    from flask_migrate import Migrate
+    Migrate(app, db, include_object=_autogenerate_includes)
+
+
+def create_app(config_name='development', **overrides):
     """
     Função Fábrica de Aplicação (Application Factory).
+    `overrides` substitui chaves de configuração (ex.: SQLALCHEMY_DATABASE_URI em scripts e testes).
     """
     app = Flask(__name__)
     app.config.from_object(config[config_name])
+    app.config.update(overrides)
+    if app.config['PROXY_FIX_X_FOR']:
+        # IP real do cliente (limites por IP, hash em page_views) atrás do proxy do Render
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_X_FOR'])
 
     # Inicializa as extensões com a aplicação criada
     db.init_app(app)
-    migrate.init_app(app, db)
+    # Antes de tudo: o tempo medido inclui os outros before_request (cache, limite, track_access)
+    metrics.init_app(app)
+    if app.config['INIT_MIGRATIONS']:
+        init_migrations(app)
+    http_cache.init_app(app)
+    # Depois do http_cache (payloads pré-calculados são baratos) e antes de track_access,
+    # para que uma requisição recusada não grave nada no banco
+    rate_limiter.init_app(app)
+    # Heartbeat e "ler o que escreveu" da réplica; só registra algo se o bind 'replica' existir
+    init_replica(app)
+    # Amostragem sob demanda; não faz nada em requisições sem token ou endpoint ligado.
+    # Importado aqui para que python -m my_app.profiler não carregue o módulo duas vezes
+    from .profiler import profiler
+    profiler.init_app(app)
 
     # --- Registro dos Blueprints ---
     from .game_api import game_bp
     app.register_blueprint(game_bp, url_prefix='/api/game')
+    from .instructor_api import instructor_bp
+    app.register_blueprint(instructor_bp, url_prefix='/instructor')
+    from .cohort_api import cohort_bp
+    app.register_blueprint(cohort_bp, url_prefix='/api/cohorts')
+    from .jobs_api import jobs_bp
+    app.register_blueprint(jobs_bp, url_prefix='/api/jobs')
+    from .cohorts import stats_cache, cohort_ids_for, invalidate_after_commit
+    stats_cache.ttl = app.config['COHORT_STATS_TTL']
 
     # --- Lógica de Negócio e Configurações ---
-    def load_translations():
-        translations = {}
-        translations_dir = os.path.join(os.path.dirname(__file__), 'translations')
-        if not os.path.exists(translations_dir): return {}
-        for lang_file in ['pt.json', 'en.json', 'es.json']:
-            lang_code = lang_file.split('.')[0]
-            file_path = os.path.join(translations_dir, lang_file)
-            try:
-                if os.path.exists(file_path):
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        translations[lang_code] = json.load(f)
-            except Exception as e:
-                print(f"Error loading translation {lang_file}: {e}")
-                translations[lang_code] = {}
-        return translations
+    translations = app.extensions['translations'] = Translations(app.config['TRANSLATIONS_DIR'])
+
+    # --- Payloads imutáveis (pré-comprimidos, servidos com ETag) ---
+    def challenge_guard(challenge_id):
+        def guard():
+            if "user_id" not in session: return jsonify({"error": "Não autenticado"}), 401
+            if not current_engine().can_access(challenge_id): return jsonify({"error": "Desafio bloqueado"}), 403
+            return None
+        return guard
+
+    def publish_catalog(snapshot):
+        """Registra os pacotes por idioma do snapshot e descarta os de desafios que saíram dele."""
+        paths = set()
+        for challenge_id in snapshot.ids:
+            path = f"/api/challenge/{challenge_id}"
+            http_cache.register_json_localized(
+                app, path, {lang: bundle[challenge_id] for lang, bundle in snapshot.bundles.items()},
+                DEFAULT_LANGUAGE, policy='challenge_payload', guard=challenge_guard(challenge_id))
+            paths.add(path)
+        registry = app.extensions['http_cache']
+        for path in list(registry):
+            if path.startswith('/api/challenge/') and path not in paths:
+                registry.pop(path, None)
+        if snapshot.storytelling_bundles:
+            http_cache.register_localized(app, "/static/data/storytelling.json", snapshot.storytelling_bundles,
+                                          DEFAULT_LANGUAGE, policy='storytelling')
+        app.extensions['catalog_tag'] = snapshot.tag
+
+    publish_catalog(catalog.current)
+
+    # Troca de catálogo a quente: antes de tudo (inclusive do http_cache), confere se os
+    # arquivos mudaram e fixa o snapshot da requisição
+    def check_catalog():
+        snapshot = catalog.refresh(app.config['CATALOG_RELOAD_INTERVAL'], app.logger)
+        if snapshot.tag != app.extensions['catalog_tag']:
+            publish_catalog(snapshot)
+        g.catalog_snapshot = snapshot
+
+    if app.config['CATALOG_RELOAD_INTERVAL']:
+        app.before_request_funcs.setdefault(None, []).insert(0, check_catalog)
 
-    translations = load_translations()
-    
-    professions = {
-        'pt': [
-            "Enfermeiro", "Médico", "Farmacêutico", "Técnico de Enfermagem", "Estudante",
-            "Fisioterapeuta", "Nutricionista", "Psicólogo", "Dentista", "Terapeuta Ocupacional",
-            "Fonoaudiólogo", "Biomédico", "Assistente Social", "Paramédico", "Radiologista",
-            "Sanitarista", "Obstetra", "Ginecologista", "Pediatra", "Outro"
-        ],
-        'en': [
-            "Nurse", "Doctor", "Pharmacist", "Nursing Technician", "Student",
-            "Physiotherapist", "Nutritionist", "Psychologist", "Dentist", "Occupational Therapist",
-            "Speech Therapist", "Biomedical Scientist", "Social Worker", "Paramedic", "Radiologist",
-            "Public Health Specialist", "Obstetrician", "Gynecologist", "Pediatrician", "Other"
-        ],
-        'es': [
-            "Enfermero", "Médico", "Farmacéutico", "Técnico de Enfermería", "Estudiante",
-            "Fisioterapeuta", "Nutricionista", "Psicólogo", "Dentista", "Terapeuta Ocupacional",
-            "Fonoaudiólogo", "Biomédico", "Trabajador Social", "Paramédico", "Radiólogo",
-            "Sanitarista", "Obstetra", "Ginecólogo", "Pediatra", "Otro"
-        ]
-    }
-
-    countries = {
-        'pt': [
-            # Américas
-            "Brasil", "Argentina", "Chile", "Uruguai", "Paraguai", "Bolívia", "Peru", "Equador",
-            "Colômbia", "Venezuela", "Guiana", "Suriname", "México", "Canadá", "Estados Unidos",
-            "Costa Rica", "Panamá", "Cuba", "República Dominicana", "Honduras", "Guatemala",
-            "El Salvador", "Nicarágua", "Haiti", "Jamaica",
-            # Europa
-            "Portugal", "Espanha", "Europa",
-            # Outros continentes
-            "Ásia", "África", "Oceania", "Outro"
-        ],
-        'en': [
-            # Americas
-            "Brazil", "Argentina", "Chile", "Uruguay", "Paraguay", "Bolivia", "Peru", "Ecuador",
-            "Colombia", "Venezuela", "Guyana", "Suriname", "Mexico", "Canada", "United States",
-            "Costa Rica", "Panama", "Cuba", "Dominican Republic", "Honduras", "Guatemala",
-            "El Salvador", "Nicaragua", "Haiti", "Jamaica",
-            # Europe
-            "Portugal", "Spain", "Europe",
-            # Other continents
-            "Asia", "Africa", "Oceania", "Other"
-        ],
-        'es': [
-            # Américas
-            "Brasil", "Argentina", "Chile", "Uruguay", "Paraguay", "Bolivia", "Perú", "Ecuador",
-            "Colombia", "Venezuela", "Guyana", "Surinam", "México", "Canadá", "Estados Unidos",
-            "Costa Rica", "Panamá", "Cuba", "República Dominicana", "Honduras", "Guatemala",
-            "El Salvador", "Nicaragua", "Haití", "Jamaica",
-            # Europa
-            "Portugal", "España", "Europa",
-            # Otros continentes
-            "Asia", "África", "Oceanía", "Otro"
-        ]
-    }
+    @app.context_processor
+    def inject_catalog_version():
+        return dict(catalog_version=catalog.tag)
 
     @app.context_processor
     def inject_user():
@@ -122,15 +130,18 @@ def create_app(config_name='development'):
     def track_access():
         if 'visitor_id' not in session: session['visitor_id'] = str(uuid.uuid4())
         session.permanent = True
-        if request.endpoint and request.endpoint != 'static':
+        if request.endpoint and request.endpoint not in ('static', 'metrics', 'puzzle_tile'):
             try:
-                ip_hash = hashlib.sha256(request.remote_addr.encode()).hexdigest()[:45] if request.remote_addr else None
+                ip_hash = client_ip_hash()
+                # Caminho das páginas, regra da rota nas APIs: sem query string nem ids sem limite
+                url = tracked_url(request.url_rule.rule, request.path, request.view_args)
                 visitor_id = session.get('visitor_id')
-                page_view = PageViews(user_id=session.get('user_id'), visitor_id=visitor_id, page_url=request.url, page_title=request.endpoint or 'unknown', language=session.get('lang', 'pt'), ip_address=ip_hash, user_agent=request.user_agent.string[:500] if request.user_agent else None)
+                page_view = new_page_view(url, request.endpoint or 'unknown', request.user_agent.string or None, user_id=session.get('user_id'), visitor_id=visitor_id, language=session.get('lang', 'pt'), ip_address=ip_hash)
                 db.session.add(page_view)
                 db.session.commit()
             except Exception as e:
                 app.logger.error(f"Error tracking access: {e}")
+                metrics.count_error('track_access')
                 db.session.rollback()
 
     # --- ROTAS ---
@@ -185,7 +196,7 @@ def create_app(config_name='development'):
             except Exception as e:
                 db.session.rollback()
                 app.logger.error(f"Registration error: {e}")
-        return render_template("register.html", text=text, professions=professions.get(lang, professions['pt']), countries=countries.get(lang, countries['pt']))
+        return render_template("register.html", text=text, professions=PROFESSIONS.get(lang, PROFESSIONS['pt']), countries=COUNTRIES.get(lang, COUNTRIES['pt']))
 
     @app.route("/login", methods=["GET", "POST"])
     def login():
@@ -201,11 +212,14 @@ def create_app(config_name='development'):
                 return render_template("login.html", text=text, error=text.get("error_credentials", "Credenciais inválidas"))
         return render_template("login.html", text=text)
 
-    @app.route("/logout")
+    @app.route("/logout", methods=["GET", "POST"])
     def logout():
         session.clear()
         lang = session.get('lang', 'pt')
-        return redirect(url_for(f"home_{lang}"))
+        response = redirect(url_for(f"home_{lang}"))
+        # Computadores compartilhados: a fila offline de eventos (localStorage) não fica para o próximo aluno
+        response.headers['Clear-Site-Data'] = '"storage"'
+        return response
 
     @app.route("/technical_specifications")
     def technical_specifications():
@@ -270,14 +284,18 @@ def create_app(config_name='development'):
         if "user_id" not in session:
             return redirect(url_for("login"))
         
-        challenge_info = challenges.get(challenge_id)
+        lang = session.get('lang', 'pt')
+        challenge_info = catalog.localized_challenge(challenge_id, lang)
 
         if not challenge_info:
             return redirect(url_for('station'))
 
-        lang = session.get('lang', 'pt')
         text = translations.get(lang, {}).copy()
-        
+
+        if not current_engine().can_access(challenge_id):
+            return render_template("station_locked.html", text=text, challenge_id=challenge_id,
+                                   required_station=catalog.required_station(challenge_id))
+
         return render_template(
             "play_challenge.html", 
             text=text, 
@@ -287,7 +305,7 @@ def create_app(config_name='development'):
     # Nova rota para testar desafios individualmente
     @app.route("/test_challenge/<int:challenge_id>")
     def test_challenge(challenge_id):
-        challenge_info = challenges.get(challenge_id)
+        challenge_info = catalog.localized_challenge(challenge_id, request.args.get('lang') or session.get('lang'))
 
         if not challenge_info:
             return "Desafio não encontrado!", 404
@@ -303,6 +321,21 @@ def create_app(config_name='development'):
     def test_complete():
         return "Teste do desafio concluído! Você pode fechar esta aba e continuar testando outros desafios."
 
+    # Só é executada para ids fora do catálogo: os válidos saem do http_cache
+    @app.route("/api/challenge/<int:challenge_id>")
+    def challenge_payload(challenge_id):
+        if "user_id" not in session: return jsonify({"error": "Não autenticado"}), 401
+        payload = http_cache.get(request.path)
+        if not payload: return jsonify({"error": "Desafio não encontrado"}), 404
+        return http_cache.serve(payload)
+
+    # Peças dos quebra-cabeças (my_app/puzzle_tiles.py): o nome é o hash do conteúdo, então nunca mudam
+    @app.route("/puzzle-tiles/<name>")
+    def puzzle_tile(name):
+        response = send_from_directory(catalog.tiles_dir, name, mimetype='image/webp')
+        response.headers['Cache-Control'] = app.config['HTTP_CACHE_POLICIES']['puzzle_tile']
+        return response
+
     @app.route("/api/user-data")
     def api_user_data():
         if "user_id" not in session: return jsonify({"error": "Não autenticado"}), 401
@@ -331,31 +364,14 @@ def create_app(config_name='development'):
         if not station_id or score is None or time_spent is None:
             return jsonify({"success": False, "error": "Dados incompletos"}), 400
 
-        from .models import StationResult  # importa aqui para evitar ciclo
-
-        result = StationResult.query.filter_by(
-            user_id=session["user_id"], station_id=station_id
-        ).first()
-
-        if result:
-            result.score = score
-            result.time_spent = time_spent
-            result.completed_at = datetime.utcnow()
-        else:
-            result = StationResult(
-                user_id=session["user_id"],
-                station_id=station_id,
-                score=score,
-                time_spent=time_spent
-            )
-            db.session.add(result)
-
+        current_engine().record_station_result(station_id, score, time_spent)
         db.session.commit()
         return jsonify({"success": True})
 
 
     # --- API: obter resultados do usuário ---
     @app.route("/api/get_station_results", methods=["GET"])
+    @replica_reads
     def get_station_results():
         if "user_id" not in session:
             return jsonify({"error": "Não autenticado"}), 401
@@ -399,240 +415,32 @@ def create_app(config_name='development'):
         )
 
         db.session.add(evaluation)
+        db.session.flush()
+        # Busca nas respostas abertas: indexada na mesma transação
+        index_evaluations([evaluation.id])
+        invalidate_after_commit(cohort_ids_for(session["user_id"]))
         db.session.commit()
 
         return jsonify({"success": True, "message": "Avaliação salva com sucesso!"})
 
 
     # --- API: gerar relatório em PDF ---
-
-    # --- API: gerar relatório em PDF ---
+    # Síncrono (mantido por compatibilidade); o dashboard usa a fila: POST /api/jobs/report
     @app.route("/api/generate_report", methods=["GET"])
+    @replica_reads
     def generate_report():
         if "user_id" not in session:
             return jsonify({"success": False, "error": "Não autenticado"}), 401
 
-        from reportlab.lib.pagesizes import A4
-        from reportlab.pdfgen import canvas
-        from reportlab.lib import colors
-        from reportlab.pdfbase import pdfmetrics
-        from reportlab.pdfbase.ttfonts import TTFont
-        from reportlab.pdfbase.pdfmetrics import stringWidth
-        from reportlab.lib.utils import simpleSplit, ImageReader
-        from .models import StationResult, Evaluation, User
-        import io, os, json as pyjson
-
-        # Registra fontes Unicode (DejaVu)
-        fonts_dir = os.path.join(os.path.dirname(__file__), "static", "fonts")
-        pdfmetrics.registerFont(TTFont("DejaVu",        os.path.join(fonts_dir, "DejaVuSans.ttf")))
-        pdfmetrics.registerFont(TTFont("DejaVu-Bold",   os.path.join(fonts_dir, "DejaVuSans-Bold.ttf")))
-        pdfmetrics.registerFont(TTFont("DejaVu-Italic", os.path.join(fonts_dir, "DejaVuSans-Oblique.ttf")))
-
-        # Helpers
-        def wrap_draw(p, text, x, y, max_width, font="DejaVu", size=10, lh=14):
-            line = ""
-            for word in (text or "").split():
-                test = (line + " " + word) if line else word
-                if stringWidth(test, font, size) <= max_width:
-                    line = test
-                else:
-                    p.setFont(font, size)
-                    p.drawString(x, y, line)
-                    y -= lh
-                    line = word
-            if line:
-                p.setFont(font, size)
-                p.drawString(x, y, line)
-                y -= lh
-            return y
-
-        def boxed_paragraph(p, title, body, x, y, w, font="DejaVu", size=10, lh=14, pad=6):
-            lines = simpleSplit(body or "", font, size, w - 2*pad)
-            box_h = pad + (len(lines) + 1) * lh + pad
-            p.setFillColor(colors.lightgrey)
-            p.rect(x, y - box_h + pad, w, box_h, fill=True, stroke=False)
-            p.setFillColor(colors.black)
-            p.setFont(font, size)
-            p.drawString(x + pad, y - lh, title)
-            yy = y - (2 * lh)
-            for line in lines:
-                p.drawString(x + pad, yy, line)
-                yy -= lh
-            return y - box_h - pad
-
-        user = db.session.get(User, session["user_id"])
-        if not user:
+        from .reports import stream_user_report
+        sink = stream_user_report(session["user_id"], request.args.get("lang") or session.get("lang"))
+        if sink is None:
             return jsonify({"success": False, "error": "Usuário não encontrado"}), 404
 
-        buffer = io.BytesIO()
-        p = canvas.Canvas(buffer, pagesize=A4)
-        width, height = A4
-
-        # --- Cabeçalho ---
-        try:
-            logo_path = os.path.join(os.path.dirname(__file__), "static", "img", "logotipo_wpsd_simweek.jpg")
-            logo = ImageReader(logo_path)
-            p.drawImage(logo, (width - 180) / 2, height - 100, width=180, height=60, mask="auto")
-        except Exception as e:
-            p.setFont("DejaVu", 8)
-            p.drawString(50, height - 80, f"[Erro ao carregar logotipo: {e}]")
-
-        p.setFont("DejaVu-Bold", 18)
-        p.setFillColor(colors.HexColor("#1F3C88"))
-        p.drawCentredString(width / 2, height - 120, "Escape Room da Segurança do Paciente")
-        p.setFont("DejaVu-Italic", 12)
-        p.setFillColor(colors.black)
-        p.drawCentredString(width / 2, height - 140, "Relatório de Desempenho do Usuário")
-
-        p.setFont("DejaVu", 10)
-        from datetime import datetime
-        p.drawCentredString(width / 2, height - 160, f"Data/Hora: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}")
-        p.setFont("DejaVu-Bold", 12)
-        p.drawCentredString(width / 2, height - 180, f"Usuário: {user.username}")
-
-        p.setStrokeColor(colors.grey)
-        p.line(40, height - 190, width - 40, height - 190)
-
-        y = height - 220
-
-        # --- Progresso do usuário ---
-        p.setFont("DejaVu-Bold", 12)
-        p.setFillColor(colors.HexColor("#1F3C88"))
-        p.drawString(50, y, "Progresso do Usuário")
-        y -= 25
-
-        results = StationResult.query.filter_by(user_id=session["user_id"]).all()
-        total_score = sum(r.score for r in results)
-        total_time = sum(r.time_spent for r in results)
-
-        MAX_POINTS = {1: 5, 2: 7, 3: 4, 4: 6, 5: 8, 6: 5, 7: 8, 8: 5, 9: 6, 10: 9, 11: 8, 12: 6, 13: 7, 14: 5, 15: 11}
-        total_max = sum(MAX_POINTS.get(r.station_id, 0) for r in results)
-        avg_pct = round((total_score / total_max) * 100, 2) if total_max else 0
-
-        if avg_pct >= 85:
-            achievement = "Ouro"
-        elif avg_pct >= 65:
-            achievement = "Prata"
-        elif avg_pct >= 40:
-            achievement = "Bronze"
-        else:
-            achievement = "—"
-
-        # >>> NOVO: Tabela com 6 colunas (Estação | Pontos | Tempo) em 2 blocos (1–8 e 9–15)
-        from reportlab.platypus import Table, TableStyle
-        data = [["Estação", "Pontos", "Tempo (s)", "Estação", "Pontos", "Tempo (s)"]]
-
-        left = [r for r in results if r.station_id <= 8]
-        right = [r for r in results if r.station_id > 8]
-
-        for i in range(8):
-            left_r = left[i] if i < len(left) else None
-            right_r = right[i] if i < len(right) else None
-            row = [
-                left_r.station_id if left_r else "",
-                left_r.score if left_r else "",
-                left_r.time_spent if left_r else "",
-                right_r.station_id if right_r else "",
-                right_r.score if right_r else "",
-                right_r.time_spent if right_r else "",
-            ]
-            data.append(row)
-
-        table = Table(data, colWidths=[50, 50, 60, 50, 50, 60])
-        table.setStyle(TableStyle([
-            ("GRID", (0,0), (-1,-1), 0.5, colors.grey),
-            ("BACKGROUND", (0,0), (-1,0), colors.lightgrey),
-            ("FONTNAME", (0,0), (-1,0), "DejaVu-Bold"),
-            ("ALIGN", (0,0), (-1,-1), "CENTER"),
-        ]))
-        table.wrapOn(p, width, height)
-        table.drawOn(p, 50, y - (15 * len(data)))
-        y -= (15 * (len(data) + 2))
-
-        p.setFont("DejaVu", 10)
-        p.drawString(50, y, f"Pontuação Total: {total_score}")
-        y -= 15
-        p.drawString(50, y, f"Tempo Total: {total_time//3600}h {(total_time%3600)//60}m")
-        y -= 15
-        p.drawString(50, y, f"Pontuação Média: {avg_pct}%")
-        y -= 15
-        p.drawString(50, y, f"Conquista: {achievement}")
-        y -= 40
-
-        # --- Avaliação da Plataforma ---
-        evaluation = Evaluation.query.filter_by(user_id=session["user_id"]).order_by(Evaluation.created_at.desc()).first()
-        if evaluation:
-            p.setFont("DejaVu-Bold", 12)
-            p.setFillColor(colors.HexColor("#1F3C88"))
-            p.drawString(50, y, "Avaliação da Plataforma")
-            y -= 25
-
-            p.setFont("DejaVu", 10)
-            p.setFillColor(colors.black)
-            p.drawString(50, y, f"Tipo de participante: {evaluation.participant_type}")
-            y -= 15
-            p.drawString(50, y, f"Tipo de participação: {evaluation.participation_type}")
-            y -= 15
-
-            # >>> NOVO: Equipe em linha única
-            team_list = []
-            try:
-                team_list = pyjson.loads(evaluation.team) if evaluation.team else []
-            except Exception:
-                team_list = [evaluation.team] if evaluation.team else []
-
-            if team_list:
-                equipe_formatada = ", ".join(team_list)
-                p.drawString(50, y, f"Equipe: {equipe_formatada}")
-                y -= 15
-            else:
-                p.drawString(50, y, "Equipe: —")
-                y -= 15
-
-            p.drawString(50, y, f"Q1 - Facilidade de uso: {evaluation.q1}")
-            y -= 15
-            p.drawString(50, y, f"Q2 - Aprendizado: {evaluation.q2}")
-            y -= 15
-            p.drawString(50, y, f"Q3 - Design/Interface: {evaluation.q3}")
-            y -= 15
-            p.drawString(50, y, f"Q4 - Recomendação: {evaluation.q4}")
-            y -= 20
-
-            if evaluation.q5:
-                y = boxed_paragraph(p, "Pontos fortes:", evaluation.q5, x=45, y=y, w=width - 90, font="DejaVu", size=10, lh=14, pad=8)
-                y -= 10
-
-            if evaluation.q6:
-                y = boxed_paragraph(p, "Melhorias sugeridas:", evaluation.q6, x=45, y=y, w=width - 90, font="DejaVu", size=10, lh=14, pad=8)
-                y -= 10
-
-        # --- Rodapé ---
-        p.setStrokeColor(colors.grey)
-        p.line(40, 50, width - 40, 50)
-
-        p.setFont("DejaVu", 9)
-        p.setFillColor(colors.HexColor("#1F3C88"))
-        p.drawCentredString(width / 2, 35, "Comentários e sugestões: Prof. Dr. Silvio Cesar da Conceição")
-        p.linkURL("mailto:silvioenfermeiro73@gmail.com", (width/2 - 100, 20, width/2 + 100, 40), relative=0)
-        p.setFillColor(colors.black)
-        p.drawCentredString(width / 2, 20, "E-mail: silvioenfermeiro73@gmail.com")
-
-        # Finaliza PDF
-        p.showPage()
-        p.save()
-        buffer.seek(0)
-
-        return (
-            buffer.getvalue(),
-            200,
-            {
-                "Content-Type": "application/pdf",
-                "Content-Disposition": "attachment; filename=relatorio.pdf"
-            },
-        )
-
-
-
-
+        # Enviado em pedaços direto do que o reportlab gravou, sem montar uma cópia inteira
+        response = Response(sink.chunks(), mimetype="application/pdf")
+        response.headers["Content-Disposition"] = "attachment; filename=relatorio.pdf"
+        response.headers["Content-Length"] = str(sink.size)
+        return response
 
     return app
\ No newline at end of file
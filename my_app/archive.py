@@ -0,0 +1,303 @@
+# /archive.py
+"""
+Arquivamento em camadas de page_views: linhas mais antigas que PAGE_VIEWS_ARCHIVE_DAYS
+saem da tabela quente para arquivos Parquet (zstd, colunas repetitivas com dicionário)
+particionados por dia em PAGE_VIEWS_ARCHIVE_DIR/date=AAAA-MM-DD/.
+
+- Lotes por chave (id crescente): cada lote é gravado (arquivo temporário + rename) e só
+  então apagado do banco, numa transação curta; pode rodar junto com o tráfego e ser
+  interrompido a qualquer momento. Um lote repetido após uma queda reescreve o mesmo
+  arquivo, e a leitura descarta ids duplicados.
+- No fim, as partes de cada dia tocado são compactadas num arquivo só (compact).
+- page_views_frame() junta quente e frio num DataFrame só, para as análises.
+
+Uso:
+    python -m my_app.archive --older-than-days 90
+    python -m my_app.archive --batch-size 20000 --throttle 0.2 --json archive.json
+"""
+
+import argparse
+import json
+import os
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, select
+
+from .models import db, PageEndpoint, PageUrl, PageViews, UserAgent
+
+COLUMNS = ('id', 'user_id', 'visitor_id', 'page_url', 'page_title', 'language',
+           'ip_address', 'user_agent', 'accessed_at')
+# Poucos valores distintos por coluna: gravadas como dicionário (o ganho maior de espaço)
+DICTIONARY_COLUMNS = ('page_url', 'page_title', 'language', 'user_agent')
+PARTITION_PREFIX = 'date='
+
+
+class ArchiveError(Exception):
+    """Arquivamento indisponível (ex.: pyarrow não instalado)."""
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ArchiveError("page_views archival needs pyarrow (pip install pyarrow)") from e
+    return pa, pq
+
+
+def _schema(pa):
+    text = pa.string()
+    dictionary = pa.dictionary(pa.int32(), text)
+    return pa.schema([
+        ('id', pa.int64()), ('user_id', pa.int64()), ('visitor_id', text),
+        ('page_url', dictionary), ('page_title', dictionary), ('language', dictionary),
+        ('ip_address', text), ('user_agent', dictionary), ('accessed_at', pa.timestamp('us')),
+    ])
+
+
+def page_view_select(names=COLUMNS):
+    """SELECT de page_views com as dimensões já resolvidas para texto (colunas de COLUMNS)."""
+    source = {
+        'id': PageViews.id, 'user_id': PageViews.user_id, 'visitor_id': PageViews.visitor_id,
+        'page_url': PageUrl.url, 'page_title': PageEndpoint.name, 'language': PageViews.language,
+        'ip_address': PageViews.ip_address, 'user_agent': UserAgent.value, 'accessed_at': PageViews.accessed_at,
+    }
+    return select(*[source[name].label(name) for name in names]).select_from(PageViews) \
+        .join(PageUrl, PageViews.url_id == PageUrl.id) \
+        .join(PageEndpoint, PageViews.endpoint_id == PageEndpoint.id) \
+        .outerjoin(UserAgent, PageViews.user_agent_id == UserAgent.id)
+
+
+def archive_root(required=True):
+    """PAGE_VIEWS_ARCHIVE_DIR; sem ele (padrão em produção) só a leitura segue, sem arquivos frios."""
+    root = current_app.config['PAGE_VIEWS_ARCHIVE_DIR']
+    if not root and required:
+        raise ArchiveError("PAGE_VIEWS_ARCHIVE_DIR is not set: point it at persistent storage "
+                           "before archiving (rows are deleted from the database)")
+    return root
+
+
+class ArchiveStats:
+    def __init__(self):
+        self.rows = self.batches = self.files = 0
+        self.raw_bytes = self.parquet_bytes = 0
+        self.started = time.perf_counter()
+
+    def as_dict(self):
+        seconds = time.perf_counter() - self.started
+        return {
+            "rows": self.rows, "batches": self.batches, "files": self.files,
+            "raw_bytes": self.raw_bytes, "parquet_bytes": self.parquet_bytes,
+            "compression_ratio": round(self.raw_bytes / self.parquet_bytes, 2) if self.parquet_bytes else None,
+            "seconds": round(seconds, 3),
+            "rows_per_second": int(self.rows / seconds) if seconds else 0,
+        }
+
+
+def _raw_size(rows):
+    """Tamanho aproximado das linhas como estavam na tabela (texto + 8 bytes por número/data)."""
+    return sum(24 + sum(len(value) for value in row[2:8] if value) for row in rows)
+
+
+def _write_partition(pa, pq, root, day, rows):
+    directory = os.path.join(root, f"{PARTITION_PREFIX}{day.isoformat()}")
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"part-{rows[0][0]:012d}-{rows[-1][0]:012d}.parquet")
+    columns = list(zip(*rows))
+    schema = _schema(pa)
+    arrays = []
+    for field, values in zip(schema, columns):
+        if pa.types.is_dictionary(field.type):
+            arrays.append(pa.array(values, type=pa.string()).dictionary_encode())
+        else:
+            arrays.append(pa.array(values, type=field.type))
+    table = pa.Table.from_arrays(arrays, schema=schema)
+
+    tmp_path = path + '.tmp'
+    pq.write_table(table, tmp_path, compression='zstd', use_dictionary=list(DICTIONARY_COLUMNS))
+    os.replace(tmp_path, path)
+    return os.path.getsize(path)
+
+
+def archive_page_views(older_than_days=None, batch_size=None, root=None, throttle=0.0,
+                       max_batches=None, now=None):
+    """Move para Parquet as page_views anteriores ao corte; devolve as estatísticas."""
+    pa, pq = _pyarrow()
+    config = current_app.config
+    older_than_days = config['PAGE_VIEWS_ARCHIVE_DAYS'] if older_than_days is None else older_than_days
+    batch_size = batch_size or config['PAGE_VIEWS_ARCHIVE_BATCH']
+    root = root or archive_root()
+    cutoff = (now or datetime.utcnow()) - timedelta(days=older_than_days)
+
+    stats = ArchiveStats()
+    touched = set()
+    last_id = 0
+    while max_batches is None or stats.batches < max_batches:
+        rows = db.session.execute(
+            page_view_select().where(PageViews.id > last_id, PageViews.accessed_at < cutoff)
+            .order_by(PageViews.id).limit(batch_size)).all()
+        if not rows:
+            break
+        first_id, last_id = rows[0][0], rows[-1][0]
+
+        by_day = defaultdict(list)
+        for row in rows:
+            by_day[row[-1].date()].append(tuple(row))
+        for day, day_rows in sorted(by_day.items()):
+            stats.parquet_bytes += _write_partition(pa, pq, root, day, day_rows)
+            stats.files += 1
+            touched.add(day)
+
+        # Mesmo intervalo e mesmo corte do SELECT: apaga exatamente as linhas gravadas
+        db.session.execute(delete(PageViews).where(
+            PageViews.id.between(first_id, last_id), PageViews.accessed_at < cutoff))
+        db.session.commit()
+
+        stats.rows += len(rows)
+        stats.batches += 1
+        stats.raw_bytes += _raw_size(rows)
+        if throttle:
+            time.sleep(throttle)
+    db.session.commit()
+
+    if touched:
+        stats.files, stats.parquet_bytes = compact(root, touched)
+    return stats.as_dict()
+
+
+def compact(root=None, days=None):
+    """
+    Junta as partes de cada partição num arquivo só (dicionários e compressão rendem mais
+    em arquivos grandes). Devolve (arquivos, bytes) das partições tocadas.
+    """
+    pa, pq = _pyarrow()
+    root = root or archive_root()
+    files_total = bytes_total = 0
+    for day, files in partitions(root):
+        if days is not None and day not in days:
+            continue
+        if len(files) > 1:
+            table = pa.concat_tables([pq.read_table(path) for path in files]).sort_by('id')
+            ids = table.column('id')
+            path = os.path.join(os.path.dirname(files[0]),
+                                f"part-{ids[0].as_py():012d}-{ids[-1].as_py():012d}.parquet")
+            tmp_path = path + '.tmp'
+            pq.write_table(table.combine_chunks().unify_dictionaries(), tmp_path, compression='zstd',
+                           use_dictionary=list(DICTIONARY_COLUMNS))
+            os.replace(tmp_path, path)
+            # Queda aqui deixa partes repetidas, que a leitura descarta pelo id
+            for old in files:
+                if old != path:
+                    os.remove(old)
+            files = [path]
+        files_total += len(files)
+        bytes_total += sum(os.path.getsize(path) for path in files)
+    return files_total, bytes_total
+
+
+# --- Leitura ---
+def partitions(root=None, start=None, end=None):
+    """(dia, [arquivos]) das partições que cruzam [start, end], em ordem."""
+    root = root or archive_root(required=False)
+    if not root or not os.path.isdir(root):
+        return []
+    found = []
+    for name in sorted(os.listdir(root)):
+        if not name.startswith(PARTITION_PREFIX):
+            continue
+        day = datetime.strptime(name[len(PARTITION_PREFIX):], '%Y-%m-%d').date()
+        if (start and day < start.date()) or (end and day > end.date()):
+            continue
+        directory = os.path.join(root, name)
+        files = sorted(os.path.join(directory, f) for f in os.listdir(directory) if f.endswith('.parquet'))
+        if files:
+            found.append((day, files))
+    return found
+
+
+def read_archive(start=None, end=None, columns=None, root=None):
+    """page_views arquivadas em [start, end) como DataFrame (vazio se não houver nada)."""
+    import pandas as pd
+    pa, pq = _pyarrow()
+    columns = list(columns or COLUMNS)
+    read = list(dict.fromkeys(['id', 'accessed_at', *columns]))
+    tables = [pq.read_table(path, columns=read) for _, files in partitions(root, start, end) for path in files]
+    if not tables:
+        return pd.DataFrame({name: pd.Series(dtype='object') for name in read})
+    frame = pa.concat_tables(tables, promote_options='permissive').to_pandas()
+    if start is not None:
+        frame = frame[frame['accessed_at'] >= start]
+    if end is not None:
+        frame = frame[frame['accessed_at'] < end]
+    return frame
+
+
+def read_hot(start=None, end=None, columns=None):
+    import pandas as pd
+    columns = list(dict.fromkeys(['id', 'accessed_at', *(columns or COLUMNS)]))
+    query = page_view_select(columns)
+    if start is not None:
+        query = query.where(PageViews.accessed_at >= start)
+    if end is not None:
+        query = query.where(PageViews.accessed_at < end)
+    return pd.read_sql(query, db.session.connection())
+
+
+def page_views_frame(start=None, end=None, columns=None, root=None):
+    """page_views quentes (banco) e frias (Parquet) no intervalo, como se fossem uma tabela só."""
+    import pandas as pd
+    hot = read_hot(start, end, columns)
+    try:
+        cold = read_archive(start, end, columns, root)
+    except ArchiveError:
+        if partitions(root, start, end):
+            raise
+        return hot.sort_values(['accessed_at', 'id'], ignore_index=True)
+    if len(cold):
+        # Lote regravado após uma queda (ainda no banco ou em dois arquivos): fica uma cópia
+        cold = cold[~cold['id'].isin(hot['id'])].drop_duplicates('id')
+        for name in DICTIONARY_COLUMNS:
+            if name in cold:
+                cold[name] = cold[name].astype(object)
+        hot = pd.concat([cold, hot], ignore_index=True)
+    return hot.sort_values(['accessed_at', 'id'], ignore_index=True)
+
+
+def print_report(stats):
+    ratio = stats['compression_ratio'] or '—'
+    print(f"{stats['rows']} linhas em {stats['batches']} lotes / {stats['files']} arquivos, {stats['seconds']}s "
+          f"({stats['rows_per_second']} linhas/s)")
+    print(f"bruto ~{stats['raw_bytes'] / 1024:.1f} KiB -> parquet {stats['parquet_bytes'] / 1024:.1f} KiB "
+          f"(compressão {ratio}x)")
+
+
+def main():
+    from . import create_app
+
+    parser = argparse.ArgumentParser(description="Move page_views antigas para arquivos Parquet.")
+    parser.add_argument('--older-than-days', type=int, default=None, help="padrão: PAGE_VIEWS_ARCHIVE_DAYS")
+    parser.add_argument('--batch-size', type=int, default=None, help="padrão: PAGE_VIEWS_ARCHIVE_BATCH")
+    parser.add_argument('--throttle', type=float, default=0.0, help="pausa (s) entre lotes")
+    parser.add_argument('--max-batches', type=int, default=None)
+    parser.add_argument('--config', default='production')
+    parser.add_argument('--json', dest='json_path', default=None, help="grava as estatísticas em JSON")
+    args = parser.parse_args()
+
+    app = create_app(args.config, INIT_MIGRATIONS=False)
+    with app.app_context():
+        try:
+            stats = archive_page_views(args.older_than_days, args.batch_size, throttle=args.throttle,
+                                       max_batches=args.max_batches)
+        except ArchiveError as e:
+            raise SystemExit(str(e))
+    print_report(stats)
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(stats, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+# /auth.py
+
+from flask import current_app, g, jsonify, session
+from functools import wraps
+from .models import db, User
+
+
+def current_user():
+    """Usuário logado (carregado uma vez por requisição) ou None."""
+    if 'user_id' not in session:
+        return None
+    if g.get('current_user_obj') is None or g.current_user_obj.id != session['user_id']:
+        g.current_user_obj = db.session.get(User, session['user_id'])
+    return g.current_user_obj
+
+
+def is_instructor(user):
+    return bool(user) and user.email.lower() in current_app.config['INSTRUCTOR_EMAILS']
+
+
+# --- Decorators de Autenticação ---
+def login_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if 'user_id' not in session:
+            return jsonify({"success": False, "error": "Authentication required"}), 401
+        return f(*args, **kwargs)
+    return decorated_function
+
+
+def instructor_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if 'user_id' not in session:
+            return jsonify({"success": False, "error": "Authentication required"}), 401
+        if not is_instructor(current_user()):
+            return jsonify({"success": False, "error": "Instructor access required"}), 403
+        return f(*args, **kwargs)
+    return decorated_function
@@ -0,0 +1,347 @@
+# /backfills.py
+"""
+Migrações de dados em lotes (backfills), para rodar com o tráfego no ar.
+
+As revisões do Alembic continuam só com DDL; a transformação dos dados é registrada aqui
+com @backfill e agendada pela revisão (linha 'pending' em data_migrations). Depois do
+deploy, `python -m my_app.backfills run --pending` executa:
+
+- Lotes por chave (keyset sobre uma chave inteira crescente): cada lote é processado e o
+  checkpoint (last_key, rows_done) gravado na MESMA transação curta, então uma queda no
+  meio nunca pula nem repete um lote já confirmado.
+- Retomada: rodar de novo continua do checkpoint; --restart recomeça do zero. Rodar uma
+  backfill já concluída só processa as linhas novas desde então.
+- Throttle: pausa fixa entre lotes (--throttle) e/ou teto de linhas por segundo.
+- Uma execução por vez: o checkpoint é reservado com UPDATE condicional (locked_by);
+  uma reserva sem atualização há BACKFILL_LOCK_TIMEOUT segundos pode ser retomada.
+- Progresso: linhas feitas / estimativa total, vazão e ETA a cada lote.
+
+Os handlers recebem a lista de chaves do lote e trabalham em db.session (sem commit);
+precisam ser idempotentes por lote e não sobrescrever escritas concorrentes do app.
+
+Uso:
+    python -m my_app.backfills status
+    python -m my_app.backfills run --pending
+    python -m my_app.backfills run site_access_daily --batch-size 5000 --throttle 0.1
+    python -m my_app.backfills run user_progress_earned_keys --restart --json backfill.json
+"""
+
+import argparse
+import json
+import os
+import socket
+import time
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import bindparam, distinct, func, or_, select, update
+
+from .models import db, DataMigration, Evaluation, PageViews, SiteAccess, UserProgress, encode_keys
+
+PENDING = 'pending'
+RUNNING = 'running'
+PAUSED = 'paused'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class BackfillError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+class Backfill:
+    __slots__ = ('name', 'key', 'process', 'where', 'description')
+
+    def __init__(self, name, key, process, where, description):
+        self.name = name
+        self.key = key
+        self.process = process
+        self.where = where
+        self.description = description
+
+
+BACKFILLS = {}
+
+
+def backfill(name, key, where=()):
+    """Registra uma backfill: fn(keys) processa as linhas cujas chaves estão no lote."""
+    def decorator(fn):
+        BACKFILLS[name] = Backfill(name, key, fn, tuple(where), (fn.__doc__ or '').strip())
+        return fn
+    return decorator
+
+
+class Progress:
+    def __init__(self, name, rows_done, remaining, last_key):
+        self.name = name
+        self.rows_done = self._initial = rows_done
+        self.total = rows_done + remaining
+        self.last_key = last_key
+        self.chunks = 0
+        self.started = time.perf_counter()
+
+    def advance(self, rows, last_key):
+        self.rows_done += rows
+        self.total = max(self.total, self.rows_done)  # linhas novas chegando durante a execução
+        self.last_key = last_key
+        self.chunks += 1
+
+    @property
+    def seconds(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def rows_per_second(self):
+        seconds = self.seconds
+        return (self.rows_done - self._initial) / seconds if seconds else 0.0
+
+    @property
+    def eta_seconds(self):
+        rate = self.rows_per_second
+        return (self.total - self.rows_done) / rate if rate else None
+
+    def as_dict(self):
+        eta = self.eta_seconds
+        return {
+            "name": self.name, "rows_done": self.rows_done, "total_rows": self.total,
+            "percent": round(100 * self.rows_done / self.total, 1) if self.total else 100.0,
+            "chunks": self.chunks, "last_key": self.last_key, "seconds": round(self.seconds, 3),
+            "rows_per_second": int(self.rows_per_second), "eta_seconds": round(eta, 1) if eta is not None else None,
+        }
+
+
+# --- Checkpoint ---
+def _worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"[:64]
+
+
+def _claim(name, worker, restart):
+    """Reserva o checkpoint para este processo (cria se não existir) e o devolve."""
+    now = datetime.utcnow()
+    if db.session.get(DataMigration, name) is None:
+        db.session.add(DataMigration(name=name, status=PENDING, last_key=0, rows_done=0))
+        db.session.flush()
+    stale = now - timedelta(seconds=current_app.config['BACKFILL_LOCK_TIMEOUT'])
+    values = {'status': RUNNING, 'locked_by': worker, 'updated_at': now, 'error': None, 'finished_at': None}
+    if restart:
+        values.update(last_key=0, rows_done=0, started_at=now)
+    claimed = db.session.execute(
+        update(DataMigration).where(DataMigration.name == name,
+                                    or_(DataMigration.status != RUNNING, DataMigration.updated_at < stale))
+        .values(**values).execution_options(synchronize_session=False)).rowcount
+    if not claimed:
+        db.session.rollback()
+        raise BackfillError(f"Backfill {name} is already running", 409)
+    state = db.session.get(DataMigration, name, populate_existing=True)
+    state.started_at = state.started_at or now
+    db.session.commit()
+    return state
+
+
+def _release(name, status, error=None):
+    state = db.session.get(DataMigration, name, populate_existing=True)
+    state.status, state.locked_by, state.error = status, None, error
+    state.updated_at = datetime.utcnow()
+    if status == DONE:
+        state.finished_at = state.updated_at
+    db.session.commit()
+
+
+# --- Execução ---
+def run_backfill(name, batch_size=None, throttle=0.0, max_rows_per_second=None, max_chunks=None,
+                 restart=False, on_progress=None):
+    """
+    Processa a backfill em lotes a partir do checkpoint; devolve o progresso (dict).
+    Para em max_chunks (status 'paused') ou quando não há mais linhas ('done').
+    """
+    spec = BACKFILLS.get(name)
+    if spec is None:
+        raise BackfillError(f"Unknown backfill: {name}", 404)
+    batch_size = batch_size or current_app.config['BACKFILL_BATCH']
+
+    state = _claim(name, _worker_id(), restart)
+    last_key = state.last_key
+    remaining = db.session.scalar(select(func.count(spec.key)).where(spec.key > last_key, *spec.where))
+    progress = Progress(name, state.rows_done, remaining, last_key)
+    finished = False
+    try:
+        while max_chunks is None or progress.chunks < max_chunks:
+            started = time.perf_counter()
+            keys = db.session.scalars(select(spec.key).where(spec.key > last_key, *spec.where)
+                                      .order_by(spec.key).limit(batch_size)).all()
+            if not keys:
+                finished = True
+                break
+            spec.process(keys)
+            last_key = keys[-1]
+            # Checkpoint na mesma transação dos dados do lote
+            db.session.execute(update(DataMigration).where(DataMigration.name == name).values(
+                last_key=last_key, rows_done=DataMigration.rows_done + len(keys),
+                total_rows=max(progress.total, progress.rows_done + len(keys)), updated_at=datetime.utcnow(),
+            ).execution_options(synchronize_session=False))
+            db.session.commit()
+            progress.advance(len(keys), last_key)
+            if on_progress:
+                on_progress(progress)
+
+            pause = throttle
+            if max_rows_per_second:
+                pause = max(pause, len(keys) / max_rows_per_second - (time.perf_counter() - started))
+            if pause > 0:
+                time.sleep(pause)
+    except KeyboardInterrupt:
+        db.session.rollback()
+        _release(name, PAUSED)
+        raise
+    except Exception as e:
+        db.session.rollback()
+        _release(name, FAILED, error=f"{type(e).__name__}: {e}"[:2000])
+        raise
+    _release(name, DONE if finished else PAUSED)
+    return progress.as_dict()
+
+
+def pending():
+    """Nomes agendados e ainda não concluídos (pending, paused ou failed), na ordem de registro."""
+    states = {s.name: s.status for s in DataMigration.query.all()}
+    return [name for name in BACKFILLS if states.get(name) in (PENDING, PAUSED, FAILED)]
+
+
+def status():
+    states = {s.name: s for s in DataMigration.query.all()}
+    report = []
+    for name, spec in BACKFILLS.items():
+        state = states.get(name)
+        report.append({
+            "name": name, "description": spec.description,
+            "status": state.status if state else None,
+            "last_key": state.last_key if state else 0,
+            "rows_done": state.rows_done if state else 0,
+            "total_rows": state.total_rows if state else None,
+            "error": state.error if state else None,
+            "updated_at": state.updated_at.isoformat() if state and state.updated_at else None,
+        })
+    return report
+
+
+# --- Backfills ---
+@backfill('user_progress_earned_keys', UserProgress.id)
+def reencode_earned_keys(keys):
+    """Regrava user_progress.earned_keys no formato de encode_keys (JSON compacto, sem repetições)."""
+    table = UserProgress.__table__
+    changed = []
+    for progress_id, raw in db.session.execute(
+            select(table.c.id, table.c.earned_keys).where(table.c.id.in_(keys))):
+        try:
+            earned = json.loads(raw or '[]')
+        except ValueError:
+            earned = []
+        encoded = encode_keys(earned if isinstance(earned, list) else [])
+        if encoded != raw:
+            changed.append({'progress_id': progress_id, 'old': raw, 'new': encoded})
+    if changed:
+        # Só grava se ninguém mexeu na linha desde a leitura; add_key já grava no formato novo
+        db.session.connection().execute(
+            update(table).where(table.c.id == bindparam('progress_id'), table.c.earned_keys == bindparam('old'))
+            .values(earned_keys=bindparam('new')), changed)
+
+
+@backfill('site_access_daily', PageViews.id)
+def site_access_daily(keys):
+    """Recalcula site_access (visitas e visitantes únicos por dia) a partir de page_views."""
+    last_id = keys[-1]
+    days = {accessed_at.date() for accessed_at in db.session.scalars(
+        select(PageViews.accessed_at).where(PageViews.id.in_(keys), PageViews.accessed_at.isnot(None)))}
+    for day in sorted(days):
+        start = datetime.combine(day, datetime.min.time())
+        # Tudo do dia até a chave atual: repetir ou continuar o lote recalcula o mesmo valor
+        views, visitors = db.session.execute(
+            select(func.count(), func.count(distinct(PageViews.visitor_id))).where(
+                PageViews.accessed_at >= start, PageViews.accessed_at < start + timedelta(days=1),
+                PageViews.id <= last_id)).one()
+        row = SiteAccess.query.filter_by(access_date=day).first()
+        if row is None:
+            db.session.add(SiteAccess(access_date=day, page_views=views, unique_visitors=visitors))
+        else:
+            row.page_views, row.unique_visitors = views, visitors
+
+
+@backfill('evaluation_search', Evaluation.id)
+def evaluation_search(keys):
+    """Indexa q5/q6 das avaliações na busca textual (evaluation_search); reindexar dá o mesmo resultado."""
+    from .feedback_search import index_evaluations
+    index_evaluations(keys)
+
+
+# --- CLI ---
+def _format_eta(seconds):
+    if seconds is None:
+        return '—'
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes}m{seconds:02d}s" if minutes else f"{seconds}s"
+
+
+def progress_printer(interval=1.0):
+    """on_progress que imprime uma linha no máximo a cada `interval` segundos."""
+    last = [float('-inf')]
+
+    def printer(progress):
+        now = time.monotonic()
+        if now - last[0] >= interval:
+            last[0] = now
+            data = progress.as_dict()
+            print(f"{data['name']}: {data['rows_done']}/{data['total_rows']} ({data['percent']}%), "
+                  f"{data['rows_per_second']} linhas/s, ETA {_format_eta(data['eta_seconds'])}", flush=True)
+    return printer
+
+
+def print_report(report):
+    for item in report:
+        total = item['total_rows'] if item['total_rows'] is not None else '?'
+        line = f"{item['name']:<28}{item['status'] or '—':<10}{item['rows_done']:>10}/{total:<10}"
+        print(line + (f"  {item['error']}" if item.get('error') else ''))
+
+
+def main():
+    from . import create_app
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--config', default='production')
+    common.add_argument('--json', dest='json_path', default=None, help="grava o estado final em JSON")
+    parser = argparse.ArgumentParser(description="Migrações de dados em lotes, retomáveis.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('status', parents=[common], help="estado de cada backfill")
+    run = sub.add_parser('run', parents=[common], help="executa (ou retoma) backfills")
+    run.add_argument('names', nargs='*')
+    run.add_argument('--pending', action='store_true', help="todas as agendadas e não concluídas")
+    run.add_argument('--batch-size', type=int, default=None, help="padrão: BACKFILL_BATCH")
+    run.add_argument('--throttle', type=float, default=0.0, help="pausa (s) entre lotes")
+    run.add_argument('--max-rows-per-second', type=float, default=None)
+    run.add_argument('--max-chunks', type=int, default=None)
+    run.add_argument('--restart', action='store_true', help="ignora o checkpoint e recomeça do zero")
+    args = parser.parse_args()
+
+    app = create_app(args.config, INIT_MIGRATIONS=False)
+    with app.app_context():
+        if args.command == 'run':
+            names = args.names + [n for n in (pending() if args.pending else []) if n not in args.names]
+            try:
+                for name in names:
+                    run_backfill(name, args.batch_size, args.throttle, args.max_rows_per_second,
+                                 args.max_chunks, args.restart, on_progress=progress_printer())
+            except BackfillError as e:
+                raise SystemExit(e.message)
+            except KeyboardInterrupt:
+                raise SystemExit("interrompido; rode de novo para continuar do checkpoint")
+        report = status()
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,333 @@
+# /catalog.py
+
+import copy
+import hashlib
+import json
+import os
+import threading
+import time
+from types import MappingProxyType
+
+from flask import g, has_app_context
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+CHALLENGES_FILE = os.path.join(DATA_DIR, 'challenges.json')
+STORYTELLING_FILE = os.path.join(os.path.dirname(__file__), 'static', 'data', 'storytelling.json')
+I18N_DIR = os.path.join(DATA_DIR, 'i18n')  # <idioma>.json: só os textos traduzidos
+# Peças dos quebra-cabeças (my_app/puzzle_tiles.py): geradas no build e publicadas com ele
+TILES_DIR = os.path.join(os.path.dirname(__file__), 'build', 'puzzle_tiles')
+
+DEFAULT_LANGUAGE = 'pt'
+LANGUAGES = ('pt', 'en', 'es')
+# Únicos campos que uma tradução pode substituir (respostas, ids e chaves nunca mudam)
+TRANSLATABLE_FIELDS = ('title', 'text', 'instructions', 'term', 'definition', 'words', 'intro_message')
+
+# Campos que revelam a resposta e nunca devem sair pela API
+ANSWER_FIELDS = ('correctAnswer', 'correctOrder')
+
+# Tipo de desafio -> bloco de dados obrigatório
+CHALLENGE_TYPES = {
+    'quiz': 'quizData',
+    'ordering': 'orderingData',
+    'memory': 'memoryData',
+    'matching': 'matchingData',
+    'puzzle': 'puzzleData',
+    'wordsearch': 'wordsearchData',
+}
+REQUIRED_FIELDS = {'id': int, 'title': str, 'type': str, 'timeLimit': int, 'points': int}
+
+
+class CatalogError(Exception):
+    """Arquivo de catálogo inválido (o snapshot em uso é mantido)."""
+
+
+def strip_answers(value):
+    """Remove recursivamente os campos de resposta de um desafio."""
+    if isinstance(value, dict):
+        return {k: strip_answers(v) for k, v in value.items() if k not in ANSWER_FIELDS}
+    if isinstance(value, list):
+        return [strip_answers(v) for v in value]
+    return value
+
+
+def public_challenge(challenge):
+    """Cópia do desafio pronta para o cliente (sem respostas)."""
+    return strip_answers(copy.deepcopy(challenge))
+
+
+def compile_catalog(source):
+    """Compila uma vez todas as versões públicas dos desafios, por id."""
+    return {challenge_id: public_challenge(data) for challenge_id, data in source.items()}
+
+
+def language(lang):
+    """Idioma suportado mais próximo (português se desconhecido)."""
+    return lang if lang in LANGUAGES else DEFAULT_LANGUAGE
+
+
+def _is_text(value):
+    return isinstance(value, str) or (isinstance(value, list) and all(isinstance(v, str) for v in value))
+
+
+def localize(base, overlay):
+    """
+    Aplica uma tradução parcial: troca só os TRANSLATABLE_FIELDS presentes em overlay,
+    casando listas de objetos pelo 'id' (ou pela posição). O que faltar fica em português.
+    """
+    if isinstance(base, dict):
+        if not isinstance(overlay, dict):
+            return base
+        result = {}
+        for key, value in base.items():
+            if key not in overlay:
+                result[key] = value
+            elif key in TRANSLATABLE_FIELDS and _is_text(value) and _is_text(overlay[key]):
+                result[key] = overlay[key]
+            else:
+                result[key] = localize(value, overlay[key])
+        return result
+    if isinstance(base, list):
+        if not isinstance(overlay, list):
+            return base
+        by_id = {item['id']: item for item in overlay if isinstance(item, dict) and 'id' in item}
+        result = []
+        for position, item in enumerate(base):
+            if isinstance(item, dict) and 'id' in item:
+                match = by_id.get(item['id'])
+            else:
+                match = overlay[position] if position < len(overlay) else None
+            result.append(item if match is None else localize(item, match))
+        return result
+    return base
+
+
+def validate(document):
+    """Confere o documento do catálogo e devolve {id: desafio}; levanta CatalogError."""
+    if not isinstance(document, dict) or not isinstance(document.get('version'), int):
+        raise CatalogError("catalog needs an integer 'version'")
+    items = document.get('challenges')
+    if not isinstance(items, list) or not items:
+        raise CatalogError("catalog needs a non-empty 'challenges' list")
+
+    challenges = {}
+    for position, challenge in enumerate(items):
+        where = f"challenges[{position}]"
+        if not isinstance(challenge, dict):
+            raise CatalogError(f"{where} must be an object")
+        for field, kind in REQUIRED_FIELDS.items():
+            if not isinstance(challenge.get(field), kind) or isinstance(challenge.get(field), bool):
+                raise CatalogError(f"{where}.{field} must be {kind.__name__}")
+        data_field = CHALLENGE_TYPES.get(challenge['type'])
+        if data_field is None:
+            raise CatalogError(f"{where}.type '{challenge['type']}' is unknown")
+        if not isinstance(challenge.get(data_field), (dict, list)):
+            raise CatalogError(f"{where} of type {challenge['type']} needs '{data_field}'")
+        for field in ('requiredKey', 'keyReward'):
+            if not isinstance(challenge.get(field), (str, type(None))):
+                raise CatalogError(f"{where}.{field} must be a string or null")
+        if challenge['id'] in challenges:
+            raise CatalogError(f"{where}.id {challenge['id']} is duplicated")
+        challenges[challenge['id']] = challenge
+
+    rewards = {c['keyReward'] for c in challenges.values() if c.get('keyReward')}
+    for challenge in challenges.values():
+        if challenge.get('requiredKey') and challenge['requiredKey'] not in rewards:
+            raise CatalogError(f"challenge {challenge['id']} requires unknown key '{challenge['requiredKey']}'")
+    return challenges
+
+
+def validate_translation(lang, document, challenge_ids):
+    """Uma tradução só pode apontar para estações existentes."""
+    stations = document.get('challenges', {}) if isinstance(document, dict) else None
+    if not isinstance(stations, dict):
+        raise CatalogError(f"i18n/{lang}.json needs a 'challenges' object")
+    for key, overlay in stations.items():
+        if not key.isdigit() or int(key) not in challenge_ids or not isinstance(overlay, dict):
+            raise CatalogError(f"i18n/{lang}.json: unknown station '{key}'")
+    return document
+
+
+class Catalog:
+    """
+    Snapshot imutável do catálogo: desafios completos, pacotes por idioma já compilados
+    (introdução mesclada, respostas removidas), o encadeamento de chaves e um hash do
+    conteúdo (chave de cache para templates e APIs).
+    """
+
+    def __init__(self, source, version=0, storytelling=None, translations=None, content_hash=None):
+        translations = translations or {}
+        intros = {s['id']: s for s in json.loads(storytelling)['stations']} if storytelling else {}
+
+        self.challenges = MappingProxyType(dict(source))
+        self.ids = tuple(sorted(source))
+        self.version = version
+        self.storytelling = storytelling
+
+        # Tudo por idioma é compilado aqui, uma vez: nada de mesclar dicionários por requisição
+        self.localized, self.bundles, self.storytelling_bundles = {}, {}, {}
+        for lang in LANGUAGES:
+            overlay = translations.get(lang, {})
+            stations = overlay.get('challenges', {})
+            localized = {}
+            for challenge_id, challenge in source.items():
+                station_overlay = stations.get(str(challenge_id), {})
+                intro = intros.get(challenge_id)
+                if intro:
+                    challenge = dict(challenge, intro_message=intro['intro_message'])
+                localized[challenge_id] = localize(challenge, station_overlay)
+            self.localized[lang] = MappingProxyType(localized)
+            self.bundles[lang] = MappingProxyType(compile_catalog(localized))
+            if intros:
+                self.storytelling_bundles[lang] = json.dumps({"stations": [
+                    localize(intros[sid], stations.get(str(sid), {})) for sid in sorted(intros)
+                ]}, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self.public = self.bundles[DEFAULT_LANGUAGE]
+
+        if content_hash is None:
+            content_hash = hashlib.sha256(json.dumps(
+                {str(k): v for k, v in source.items()}, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+        self.hash = content_hash[:12]
+        # chave -> id do desafio que a concede
+        self.key_owner = MappingProxyType(
+            {c['keyReward']: cid for cid, c in source.items() if c.get('keyReward')})
+
+    @classmethod
+    def from_files(cls, challenges_file=CHALLENGES_FILE, storytelling_file=STORYTELLING_FILE, i18n_dir=I18N_DIR,
+                   tiles_dir=TILES_DIR):
+        digest = hashlib.sha256()
+
+        def read_json(path):
+            with open(path, 'rb') as f:
+                raw = f.read()
+            digest.update(raw)
+            try:
+                return raw, json.loads(raw)
+            except ValueError as e:
+                raise CatalogError(f"{path}: {e}") from e
+
+        _, document = read_json(challenges_file)
+        storytelling = None
+        if storytelling_file and os.path.exists(storytelling_file):
+            storytelling, _ = read_json(storytelling_file)
+        challenges = validate(document)
+        if tiles_dir:
+            # Peças dos quebra-cabeças: no deploy já vêm cortadas do build (só se lê o manifesto);
+            # sem elas (desenvolvimento) são cortadas na primeira carga e ficam em cache.
+            # Importado aqui para que python -m my_app.puzzle_tiles não carregue o módulo duas vezes
+            from .puzzle_tiles import TileError, TileStore, attach_tiles
+            try:
+                challenges = attach_tiles(challenges, TileStore(tiles_dir), digest)
+            except (TileError, OSError) as e:
+                raise CatalogError(str(e)) from e
+        translations = {}
+        for lang in LANGUAGES:
+            path = os.path.join(i18n_dir, f'{lang}.json') if i18n_dir else None
+            if path and os.path.exists(path):
+                translations[lang] = validate_translation(lang, read_json(path)[1], challenges)
+        return cls(challenges, version=document['version'], storytelling=storytelling,
+                   translations=translations, content_hash=digest.hexdigest())
+
+    @property
+    def tag(self):
+        """Identificador curto da versão, ex.: 'v3-1a2b3c4d5e6f'."""
+        return f"v{self.version}-{self.hash}"
+
+    def get(self, challenge_id):
+        return self.challenges.get(challenge_id)
+
+    def localized_challenge(self, challenge_id, lang):
+        """Desafio completo no idioma pedido (campo a campo, com português como reserva)."""
+        return self.localized[language(lang)].get(challenge_id)
+
+    def __contains__(self, challenge_id):
+        return challenge_id in self.challenges
+
+    def required_station(self, challenge_id):
+        """Id da estação que libera a chave exigida por challenge_id (ou None)."""
+        challenge = self.get(challenge_id)
+        required_key = challenge.get('requiredKey') if challenge else None
+        return self.key_owner.get(required_key)
+
+
+class CatalogStore:
+    """
+    Guarda o snapshot em uso e troca-o atomicamente quando os arquivos mudam.
+    Cada requisição fica presa ao snapshot que viu primeiro (em flask.g), então uma troca
+    no meio do caminho não mistura versões. Atributos não definidos aqui vêm do snapshot.
+    """
+
+    def __init__(self, challenges_file=CHALLENGES_FILE, storytelling_file=STORYTELLING_FILE, i18n_dir=I18N_DIR,
+                 tiles_dir=TILES_DIR):
+        self.challenges_file = challenges_file
+        self.storytelling_file = storytelling_file
+        self.i18n_dir = i18n_dir
+        self.tiles_dir = tiles_dir
+        self._lock = threading.Lock()
+        self._current = None
+        self._mtimes = None
+        self._next_check = 0.0
+
+    def _stat(self):
+        paths = [self.challenges_file, self.storytelling_file]
+        if self.i18n_dir:
+            paths += [os.path.join(self.i18n_dir, f'{lang}.json') for lang in LANGUAGES]
+        return tuple(os.stat(path).st_mtime_ns if path and os.path.exists(path) else None for path in paths)
+
+    def load(self):
+        """(Re)lê os arquivos e publica o novo snapshot; levanta CatalogError se inválidos."""
+        with self._lock:
+            mtimes = self._stat()
+            snapshot = Catalog.from_files(self.challenges_file, self.storytelling_file, self.i18n_dir, self.tiles_dir)
+            self._current, self._mtimes = snapshot, mtimes
+        return snapshot
+
+    @property
+    def current(self):
+        if self._current is None:
+            self.load()
+        return self._current
+
+    def snapshot(self):
+        """Snapshot da requisição atual (ou o mais recente, fora de contexto)."""
+        if not has_app_context():
+            return self.current
+        pinned = g.get('catalog_snapshot')
+        if pinned is None:
+            pinned = g.catalog_snapshot = self.current
+        return pinned
+
+    def refresh(self, interval=0.0, logger=None):
+        """
+        Verifica (no máximo a cada `interval` segundos) se os arquivos mudaram e recarrega.
+        Um arquivo inválido é registrado no log e o snapshot anterior continua valendo.
+        """
+        now = time.monotonic()
+        if now < self._next_check:
+            return self.current
+        self._next_check = now + interval
+        if self._current is not None and self._stat() == self._mtimes:
+            return self._current
+        try:
+            return self.load()
+        except (CatalogError, OSError) as e:
+            if self._current is None:
+                raise
+            if logger:
+                logger.error(f"Catalog reload failed, keeping {self.current.tag}: {e}")
+            with self._lock:
+                self._mtimes = self._stat()
+            return self.current
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.snapshot(), name)
+
+    def get(self, challenge_id):
+        return self.snapshot().get(challenge_id)
+
+    def __contains__(self, challenge_id):
+        return challenge_id in self.snapshot()
+
+
+catalog = CatalogStore()
@@ -3,16 +3,16 @@ import sys
 import os
 
 # Garante que a pasta do projeto está no caminho do Python
-BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+BASE_DIR = os.path.abspath(os.path.dirname(os.path.dirname(__file__)))
 sys.path.insert(0, BASE_DIR)
 
-# Importa diretamente os módulos da raiz
-from __init__ import create_app, db
-from models import StationResult
+from my_app import create_app
+from my_app.models import StationResult
+from my_app.replica import read_replica
 
-# Cria app e contexto
-app = create_app()
-with app.app_context():
+# Cria app e contexto; a listagem completa lê da réplica, se houver uma em dia
+app = create_app(INIT_MIGRATIONS=False)
+with app.app_context(), read_replica():
     results = StationResult.query.all()
     if not results:
         print("Nenhum resultado salvo ainda.")
@@ -0,0 +1,116 @@
+# /cohort_api.py
+
+from flask import Blueprint, jsonify, request, session
+from .models import db, Cohort, CohortMembership
+from .auth import current_user, is_instructor, login_required
+from .replica import replica_reads
+from .roster import RosterError, import_roster as run_roster_import
+from .cohorts import (CohortError, can_manage, cohort_attempts, cohort_evaluations, cohort_results,
+                      cohort_stats, cohort_to_dict, create_cohort, evaluation_to_dict, join_cohort)
+
+cohort_bp = Blueprint('cohort_api', __name__)
+
+
+@cohort_bp.errorhandler(CohortError)
+@cohort_bp.errorhandler(RosterError)
+def handle_cohort_error(e):
+    db.session.rollback()
+    return jsonify({"success": False, "error": e.message}), e.status
+
+
+def managed_cohort(cohort_id):
+    """Turma que o usuário logado pode gerenciar, ou CohortError."""
+    cohort = db.session.get(Cohort, cohort_id)
+    if not cohort:
+        raise CohortError("Cohort not found", 404)
+    user = current_user()
+    if not can_manage(user, cohort_id, global_instructor=is_instructor(user)):
+        raise CohortError("Instructor access required", 403)
+    return cohort
+
+
+# --- Turmas do usuário ---
+@cohort_bp.route('', methods=['GET'])
+@login_required
+def my_cohorts():
+    rows = db.session.query(Cohort, CohortMembership.role).join(
+        CohortMembership, CohortMembership.cohort_id == Cohort.id
+    ).filter(CohortMembership.user_id == current_user().id).all()
+    return jsonify({"success": True, "cohorts": [cohort_to_dict(c, role) for c, role in rows]})
+
+
+@cohort_bp.route('', methods=['POST'])
+@login_required
+def new_cohort():
+    data = request.get_json(silent=True) or {}
+    cohort = create_cohort(current_user(), data.get('name'))
+    db.session.commit()
+    return jsonify({"success": True, "cohort": cohort_to_dict(cohort, 'instructor')}), 201
+
+
+@cohort_bp.route('/join', methods=['POST'])
+@login_required
+def join():
+    data = request.get_json(silent=True) or {}
+    cohort = join_cohort(current_user(), data.get('join_code'))
+    db.session.commit()
+    return jsonify({"success": True, "cohort": {"id": cohort.id, "name": cohort.name}})
+
+
+# --- Consultas restritas à turma (somente professores) ---
+@cohort_bp.route('/<int:cohort_id>/stats', methods=['GET'])
+@login_required
+@replica_reads
+def stats(cohort_id):
+    managed_cohort(cohort_id)
+    return jsonify({"success": True, "cohort_id": cohort_id, **cohort_stats(cohort_id)})
+
+
+@cohort_bp.route('/<int:cohort_id>/results', methods=['GET'])
+@login_required
+@replica_reads
+def results(cohort_id):
+    managed_cohort(cohort_id)
+    return jsonify({"success": True, "results": [
+        {"user_id": r.user_id, "station_id": r.station_id, "score": r.score, "time_spent": r.time_spent}
+        for r in cohort_results(cohort_id)
+    ]})
+
+
+@cohort_bp.route('/<int:cohort_id>/attempts', methods=['GET'])
+@login_required
+@replica_reads
+def attempts(cohort_id):
+    managed_cohort(cohort_id)
+    return jsonify({"success": True, "attempts": [
+        {"user_id": a.user_id, "challenge_id": a.challenge_id, "status": a.status, "score": a.score,
+         "time_spent_seconds": a.time_spent_seconds,
+         "started_at": a.started_at.isoformat() if a.started_at else None}
+        for a in cohort_attempts(cohort_id)
+    ]})
+
+
+@cohort_bp.route('/<int:cohort_id>/evaluations', methods=['GET'])
+@login_required
+@replica_reads
+def evaluations(cohort_id):
+    managed_cohort(cohort_id)
+    return jsonify({"success": True, "evaluations": [evaluation_to_dict(e) for e in cohort_evaluations(cohort_id)]})
+
+
+# --- Importação de alunos ---
+@cohort_bp.route('/<int:cohort_id>/roster', methods=['POST'])
+@login_required
+def import_roster(cohort_id):
+    """Lista de alunos (CSV/XLSX, campo 'file'); dry_run=1 só valida. Erros vêm por linha."""
+    # Criar contas em massa é só para professores: qualquer jogador pode criar uma turma e ser dono dela
+    if not is_instructor(current_user()):
+        raise CohortError("Instructor access required", 403)
+    managed_cohort(cohort_id)
+    upload = request.files.get('file')
+    if upload is None:
+        return jsonify({"success": False, "error": "Send the roster in the 'file' field"}), 400
+    result = run_roster_import(cohort_id, upload.filename, upload.read(),
+                               default_language=session.get('lang', 'pt'),
+                               dry_run=request.form.get('dry_run') in ('1', 'true'))
+    return jsonify({"success": True, **result}), 201 if result['created'] else 200
@@ -0,0 +1,195 @@
+# /cohorts.py
+
+import json
+import secrets
+import threading
+import time
+
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from .models import db, Cohort, CohortMembership, StationResult, ChallengeAttempt, Evaluation
+from .live import progress_summary
+
+# Sem caracteres ambíguos (0/O, 1/I/L) para facilitar ditar o código em sala
+JOIN_CODE_ALPHABET = 'ABCDEFGHJKMNPQRSTUVWXYZ23456789'
+JOIN_CODE_LENGTH = 8
+
+STUDENT = 'student'
+INSTRUCTOR = 'instructor'
+
+
+class CohortError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+# --- Turmas e participação ---
+def generate_join_code():
+    while True:
+        code = ''.join(secrets.choice(JOIN_CODE_ALPHABET) for _ in range(JOIN_CODE_LENGTH))
+        if not Cohort.query.filter_by(join_code=code).first():
+            return code
+
+
+def create_cohort(owner, name):
+    name = (name or '').strip()
+    if not name:
+        raise CohortError("Cohort name is required")
+    cohort = Cohort(name=name[:100], owner_id=owner.id, join_code=generate_join_code())
+    db.session.add(cohort)
+    db.session.flush()
+    db.session.add(CohortMembership(cohort_id=cohort.id, user_id=owner.id, role=INSTRUCTOR))
+    return cohort
+
+
+def join_cohort(user, join_code):
+    cohort = Cohort.query.filter_by(join_code=(join_code or '').strip().upper(), is_active=True).first()
+    if not cohort:
+        raise CohortError("Invalid join code", 404)
+    membership = CohortMembership.query.filter_by(cohort_id=cohort.id, user_id=user.id).first()
+    if not membership:
+        membership = CohortMembership(cohort_id=cohort.id, user_id=user.id, role=STUDENT)
+        db.session.add(membership)
+        invalidate_after_commit([cohort.id])
+    return cohort
+
+
+def cohort_ids_for(user_id):
+    return [cid for (cid,) in db.session.query(CohortMembership.cohort_id).filter_by(user_id=user_id)]
+
+
+def can_manage(user, cohort_id, global_instructor=False):
+    """Dono/professor da turma ou professor global (INSTRUCTOR_EMAILS)."""
+    if global_instructor:
+        return True
+    return db.session.query(CohortMembership.id).filter_by(
+        cohort_id=cohort_id, user_id=user.id, role=INSTRUCTOR
+    ).first() is not None
+
+
+# --- Consultas restritas à turma (varredura pelo índice de participação) ---
+def member_ids(cohort_id, role=STUDENT):
+    """Subconsulta com os ids dos membros, para usar em IN (...)."""
+    query = select(CohortMembership.user_id).where(CohortMembership.cohort_id == cohort_id)
+    if role:
+        query = query.where(CohortMembership.role == role)
+    return query
+
+
+def cohort_results(cohort_id):
+    return StationResult.query.filter(StationResult.user_id.in_(member_ids(cohort_id))) \
+        .order_by(StationResult.user_id, StationResult.station_id).all()
+
+
+def cohort_attempts(cohort_id):
+    return ChallengeAttempt.query.filter(ChallengeAttempt.user_id.in_(member_ids(cohort_id))) \
+        .order_by(ChallengeAttempt.started_at).all()
+
+
+def cohort_evaluations(cohort_id):
+    return Evaluation.query.filter(Evaluation.user_id.in_(member_ids(cohort_id))) \
+        .order_by(Evaluation.created_at).all()
+
+
+def _load_stats(cohort_id):
+    members = member_ids(cohort_id)
+    summary = progress_summary(members)
+    players = db.session.query(func.count()).select_from(members.subquery()).scalar()
+    averages = db.session.query(
+        func.count(Evaluation.id), func.avg(Evaluation.q1), func.avg(Evaluation.q2),
+        func.avg(Evaluation.q3), func.avg(Evaluation.q4)
+    ).filter(Evaluation.user_id.in_(members)).one()
+    count, *likert = averages
+    summary.pop('last_event_id', None)
+    summary.update({
+        "players": players,
+        "evaluations": {
+            "count": count,
+            **{f"q{i}": round(float(v), 2) if v is not None else None for i, v in enumerate(likert, start=1)}
+        }
+    })
+    return summary
+
+
+# --- Cache das agregações por turma ---
+class CohortStatsCache:
+    """Agregações por turma em memória; invalidadas após commits que as afetam ou pelo TTL."""
+
+    def __init__(self, ttl=60):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._data = {}  # cohort_id -> (expira_em, valor)
+
+    def get(self, cohort_id, loader):
+        now = time.monotonic()
+        with self._lock:
+            cached = self._data.get(cohort_id)
+        if cached and cached[0] > now:
+            return cached[1]
+        value = loader(cohort_id)
+        with self._lock:
+            self._data[cohort_id] = (now + self.ttl, value)
+        return value
+
+    def invalidate(self, cohort_ids):
+        with self._lock:
+            for cohort_id in cohort_ids:
+                self._data.pop(cohort_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+stats_cache = CohortStatsCache()
+
+
+def cohort_stats(cohort_id):
+    return stats_cache.get(cohort_id, _load_stats)
+
+
+def invalidate_after_commit(cohort_ids):
+    db.session.info.setdefault('cohort_invalidations', set()).update(cohort_ids)
+
+
+# Savepoints também disparam estes eventos: só a transação de fora invalida ou descarta
+# (invalidar a mais por um savepoint desfeito só custa recalcular)
+@event.listens_for(Session, 'after_commit')
+def _invalidate_stats(session):
+    if session.in_nested_transaction():
+        return
+    cohort_ids = session.info.pop('cohort_invalidations', None)
+    if cohort_ids:
+        stats_cache.invalidate(cohort_ids)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_invalidations(session):
+    if not session.in_nested_transaction():
+        session.info.pop('cohort_invalidations', None)
+
+
+# --- Serialização ---
+def cohort_to_dict(cohort, role=None):
+    data = {"id": cohort.id, "name": cohort.name, "join_code": cohort.join_code,
+            "is_active": cohort.is_active, "created_at": cohort.created_at.isoformat() if cohort.created_at else None}
+    if role:
+        data["role"] = role
+    return data
+
+
+def evaluation_to_dict(evaluation):
+    try:
+        team = json.loads(evaluation.team) if evaluation.team else []
+    except ValueError:
+        team = [evaluation.team]
+    return {
+        "user_id": evaluation.user_id, "participant_type": evaluation.participant_type,
+        "participation_type": evaluation.participation_type, "team": team,
+        "q1": evaluation.q1, "q2": evaluation.q2, "q3": evaluation.q3, "q4": evaluation.q4,
+        "q5": evaluation.q5, "q6": evaluation.q6,
+        "created_at": evaluation.created_at.isoformat() if evaluation.created_at else None
+    }
@@ -3,16 +3,23 @@ from datetime import timedelta
 
 basedir = os.path.abspath(os.path.dirname(__file__))
 
+def normalize_database_url(database_url):
+    # Render usa postgres://, mas o SQLAlchemy exige postgresql+psycopg2://
+    if database_url and database_url.startswith("postgres://"):
+        database_url = database_url.replace("postgres://", "postgresql+psycopg2://", 1)
+    return database_url
+
+
 def get_database_url():
     # Fallback: SQLite local
     default_sqlite_url = 'sqlite:///' + os.path.join(basedir, 'instance', 'app.db')
-    database_url = os.environ.get('DATABASE_URL', default_sqlite_url)
+    return normalize_database_url(os.environ.get('DATABASE_URL', default_sqlite_url))
 
-    # Render usa postgres://, mas o SQLAlchemy exige postgresql+psycopg2://
-    if database_url.startswith("postgres://"):
-        database_url = database_url.replace("postgres://", "postgresql+psycopg2://", 1)
 
-    return database_url
+def get_binds():
+    # Réplica de leitura opcional (my_app/replica.py); sem ela tudo vai ao primário
+    replica_url = normalize_database_url(os.environ.get('REPLICA_DATABASE_URL'))
+    return {'replica': replica_url} if replica_url else {}
 
 
 class Config:
@@ -20,14 +27,139 @@ class Config:
 
     # Banco de Dados
     SQLALCHEMY_DATABASE_URI = get_database_url()
+    SQLALCHEMY_BINDS = get_binds()
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Réplica de leitura: o primário grava um heartbeat a cada REPLICA_HEARTBEAT_SECONDS e a
+    # réplica só é usada se o heartbeat dela estiver até REPLICA_MAX_LAG_SECONDS atrasado
+    # (0 em REPLICA_HEARTBEAT_SECONDS: o heartbeat é gravado por outro processo, via replica.heartbeat())
+    REPLICA_HEARTBEAT_SECONDS = float(os.environ.get('REPLICA_HEARTBEAT_SECONDS', '2'))
+    REPLICA_MAX_LAG_SECONDS = float(os.environ.get('REPLICA_MAX_LAG_SECONDS', '10'))
+    REPLICA_LAG_CHECK_SECONDS = 1.0
+
     # Sessões
     PERMANENT_SESSION_LIFETIME = timedelta(days=7)
 
     # Uploads
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB
 
+    # Cache HTTP: Cache-Control por endpoint (ou nome de payload pré-calculado)
+    HTTP_CACHE_POLICIES = {
+        'challenge_payload': 'private, max-age=3600',
+        'storytelling': 'public, max-age=3600',
+        'puzzle_tile': 'public, max-age=31536000, immutable',
+        'get_station_results': 'private, no-cache',
+        'game_api.get_progress': 'private, no-cache',
+    }
+    # Professores com acesso ao console ao vivo (e-mails separados por vírgula)
+    INSTRUCTOR_EMAILS = {e.strip().lower() for e in os.environ.get('INSTRUCTOR_EMAILS', '').split(',') if e.strip()}
+
+    # Console ao vivo (SSE)
+    SSE_HEARTBEAT_SECONDS = 15
+    SSE_MAX_STREAM_SECONDS = 300  # o cliente reconecta com Last-Event-ID
+    # Cada stream ocupa uma das threads do worker (gunicorn --threads 32) enquanto está aberto:
+    # acima deste número de consoles simultâneos por processo o stream recebe 503 e o console
+    # tenta de novo após SSE_RETRY_SECONDS. Mais consoles pedem mais workers (ou --threads maior).
+    SSE_MAX_STREAMS = int(os.environ.get('SSE_MAX_STREAMS', '8'))
+    SSE_RETRY_SECONDS = 10
+
+    # Segundos que as agregações por turma ficam em cache
+    COHORT_STATS_TTL = 60
+
+    # Máximo de eventos aceitos por chamada a /api/game/events
+    MAX_EVENT_BATCH = 200
+
+    # JSON dinâmico só é comprimido acima deste tamanho (bytes)
+    COMPRESS_MIN_SIZE = 1024
+
+    # Partida a frio: o Flask-Migrate importa o alembic (~0,4s) e só é preciso para `flask db`;
+    # o web (INIT_MIGRATIONS=0) não o registra. WARMUP_ON_STARTUP=1 aquece caches no wsgi.py.
+    INIT_MIGRATIONS = os.environ.get('INIT_MIGRATIONS', '1') != '0'
+    WARMUP_ON_STARTUP = os.environ.get('WARMUP_ON_STARTUP', '0') == '1'
+    REPORT_WARMUP = os.environ.get('REPORT_WARMUP', '0') == '1'
+    TRANSLATIONS_DIR = os.path.join(basedir, 'translations')
+
+    # Segundos entre verificações de mudança em my_app/data/challenges.json (0 desliga a troca a quente)
+    CATALOG_RELOAD_INTERVAL = float(os.environ.get('CATALOG_RELOAD_INTERVAL', '5'))
+
+    # Fila de jobs (python -m my_app.worker)
+    JOB_CONCURRENCY = {'report': 2}  # jobs simultâneos por tipo, somando todos os workers
+    JOB_POLL_SECONDS = 1.0
+    JOB_LOCK_TIMEOUT = 300     # segundos até um job 'running' sem worker voltar à fila
+    JOB_RETRY_BACKOFF = 10     # segundos; dobra a cada tentativa
+    JOB_RESULT_TTL = 24 * 3600  # arquivos gerados ficam disponíveis por um dia
+
+    # Arquivamento de page_views (python -m my_app.archive): linhas mais antigas que
+    # PAGE_VIEWS_ARCHIVE_DAYS vão para Parquet particionado por dia
+    PAGE_VIEWS_ARCHIVE_DIR = os.environ.get('PAGE_VIEWS_ARCHIVE_DIR', os.path.join(basedir, 'instance', 'page_views_archive'))
+    PAGE_VIEWS_ARCHIVE_DAYS = int(os.environ.get('PAGE_VIEWS_ARCHIVE_DAYS', '90'))
+    PAGE_VIEWS_ARCHIVE_BATCH = 10_000
+
+    # Sessões e permanência (python -m my_app.engagement): intervalo de inatividade que fecha
+    # uma sessão, linhas por lote e margem para transações de page_views ainda abertas
+    SESSION_GAP_SECONDS = 30 * 60
+    SESSIONIZE_CHUNK = 200_000
+    SESSIONIZE_SETTLE_SECONDS = 60
+
+    # Migrações de dados em lotes (python -m my_app.backfills)
+    BACKFILL_BATCH = 1000
+    BACKFILL_LOCK_TIMEOUT = 300  # segundos sem checkpoint até outra execução poder assumir
+
+    # Métricas em /metrics (texto do Prometheus)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') != '0'
+    # Diretório compartilhado pelos processos (workers do gunicorn, worker de jobs); vazio = só este processo
+    METRICS_DIR = os.environ.get('METRICS_DIR') or None
+    METRICS_FLUSH_SECONDS = 5.0
+    METRICS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+    # /metrics exige "Authorization: Bearer <token>"; sem token responde 404
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    # Expõe /metrics sem token (só para uso local)
+    METRICS_PUBLIC = os.environ.get('METRICS_PUBLIC', '0') == '1'
+
+    # Profiler sob demanda (my_app/profiler.py): só requisições autenticadas, com token no
+    # cabeçalho ou endpoint ligado por um professor
+    PROFILE_ENABLED = os.environ.get('PROFILE_ENABLED', '1') != '0'
+    PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(basedir, 'instance', 'profiles'))
+    PROFILE_HEADER = 'X-Profile'
+    PROFILE_INTERVAL = 0.005        # segundos entre amostras
+    PROFILE_MAX_SECONDS = 30        # amostragem máxima por requisição
+    PROFILE_MAX_CONCURRENT = 2      # requisições perfiladas ao mesmo tempo, por processo
+    PROFILE_MAX_FILES = 200         # perfis guardados por endpoint
+    PROFILE_MAX_TOGGLE_MINUTES = 60
+
+    # Importação de alunos em lote (my_app/roster.py)
+    ROSTER_MAX_ROWS = 5000
+    ROSTER_CHUNK = 500              # linhas por INSERT
+    ROSTER_HASH_WORKERS = os.cpu_count() or 1
+    ROSTER_HASH_POOL_MIN = 32       # abaixo disso o pool de processos não compensa
+    # Senhas provisórias geradas pelo servidor já são aleatórias (~72 bits): hash barato basta
+    ROSTER_GENERATED_HASH_METHOD = 'pbkdf2:sha256:1000'
+
+    # Limite por cliente (token bucket): endpoint -> (requisições, janela em segundos)
+    RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', '1') != '0'
+    # 'memory' (por processo) ou 'sqlite:////caminho/ratelimit.db' (compartilhado entre workers)
+    RATE_LIMIT_STORAGE = os.environ.get('RATE_LIMIT_STORAGE', 'memory')
+    RATE_LIMITS = {
+        'default': (300, 60),
+        'login': (10, 60),
+        'register': (5, 300),
+        'generate_report': (5, 300),
+        'jobs_api.request_report': (10, 300),
+        'save_station_result': (60, 60),
+        'save_evaluation': (10, 60),
+        'cohort_api.import_roster': (5, 3600),  # até ROSTER_MAX_ROWS contas cada
+        'game_api.get_progress': (600, 60),
+        'jobs_api.job_status': (600, 60),
+    }
+    RATE_LIMIT_BY_IP = {'login', 'register'}
+    # Proxies confiáveis à frente do app que acrescentam X-Forwarded-For (o do Render conta 1).
+    # Sem isso o request.remote_addr é o do proxy e todos os clientes dividem o mesmo balde por IP;
+    # sem proxy o cabeçalho vem do próprio cliente e não é confiável (0 = ignora)
+    PROXY_FIX_X_FOR = int(os.environ.get('PROXY_FIX_X_FOR', '0'))
+    # Requisições simultâneas por processo nos endpoints pesados (o resto recebe 503)
+    # (a importação de alunos já ocupa todos os núcleos com o pool de hash de senhas)
+    RATE_LIMIT_MAX_INFLIGHT = {'generate_report': 2, 'cohort_api.import_roster': 1}
+
 
 class DevelopmentConfig(Config):
     DEBUG = True
@@ -35,10 +167,26 @@ class DevelopmentConfig(Config):
 
 class ProductionConfig(Config):
     DEBUG = False
+    # O disco dos serviços no Render é efêmero: arquivar em instance/ e apagar do banco perderia
+    # as linhas no próximo deploy. Em produção o arquivamento só roda com um diretório explícito
+    # (disco persistente ou volume montado)
+    PAGE_VIEWS_ARCHIVE_DIR = os.environ.get('PAGE_VIEWS_ARCHIVE_DIR')
+
+
+class TestingConfig(Config):
+    TESTING = True
+    DEBUG = False
+    SECRET_KEY = 'testing'
+    # A suíte (tests/conftest.py) injeta a conexão de cada teste via SQLALCHEMY_ENGINE_OPTIONS
+    SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL', 'sqlite://')
+    SQLALCHEMY_BINDS = {}
+    # O app é um só para a suíte inteira; os testes de limite ligam e zeram o estado
+    RATE_LIMIT_ENABLED = False
 
 
 config = {
     'development': DevelopmentConfig,
     'production': ProductionConfig,
+    'testing': TestingConfig,
     'default': DevelopmentConfig
 }
@@ -0,0 +1,115 @@
+# /dimensions.py
+"""
+Dimensões de page_views: URL, endpoint e user-agent se repetem em quase todas as linhas,
+então ficam uma vez só em page_urls / page_endpoints / user_agents e page_views guarda
+apenas os ids.
+
+Cada Interner mantém um LRU string -> id por processo: no caso comum track_access não faz
+consulta nenhuma às dimensões. Um valor novo é inserido com ON CONFLICT DO NOTHING (vários
+workers podem vê-lo ao mesmo tempo) e só entra no LRU depois de aparecer num SELECT, para
+nunca guardar o id de uma inserção que acabou desfeita por rollback.
+"""
+
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from .catalog import catalog
+from .models import db, PageEndpoint, PageUrl, PageViews, UserAgent
+
+# Trecho do caminho das rotas que não são páginas (blueprints de API e /api/... do app)
+API_PATH = '/api/'
+
+
+def _insert_ignore(dialect_name, table, column, values):
+    insert = postgresql.insert if dialect_name == 'postgresql' else sqlite.insert
+    return insert(table).values([{column: value} for value in values]).on_conflict_do_nothing(
+        index_elements=[column])
+
+
+class Interner:
+    def __init__(self, model, column, max_length, maxsize=4096):
+        self.model = model
+        self.column = getattr(model, column)
+        self.max_length = max_length
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._cache = OrderedDict()
+
+    def _remember(self, value, found):
+        with self._lock:
+            self._cache[value] = found
+            self._cache.move_to_end(value)
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+
+    def _select(self, session, value):
+        return session.execute(select(self.model.id).where(self.column == value)).scalar()
+
+    def id_for(self, value, session=None):
+        """Id do valor (truncado ao tamanho da coluna), criando a linha da dimensão se preciso."""
+        if value is None:
+            return None
+        value = value[:self.max_length]
+        with self._lock:
+            found = self._cache.get(value)
+            if found is not None:
+                self._cache.move_to_end(value)
+                return found
+
+        session = session or db.session
+        found = self._select(session, value)
+        if found is not None:
+            self._remember(value, found)
+            return found
+        session.execute(_insert_ignore(session.get_bind().dialect.name, self.model.__table__,
+                                       self.column.key, [value]))
+        return self._select(session, value)
+
+    def ids_for(self, connection, values):
+        """{valor: id} para muitos valores de uma vez (cargas em lote); a transação é do chamador."""
+        values = sorted({v[:self.max_length] for v in values if v is not None})
+        if values:
+            connection.execute(_insert_ignore(connection.dialect.name, self.model.__table__,
+                                              self.column.key, values))
+        rows = connection.execute(select(self.column, self.model.id).where(self.column.in_(values))).all()
+        return dict(rows)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+page_urls = Interner(PageUrl, 'url', 200)
+page_endpoints = Interner(PageEndpoint, 'name', 100)
+user_agents = Interner(UserAgent, 'value', 500)
+
+
+def clear_caches():
+    """Esquece os ids em cache (o banco foi trocado, ex.: nos testes)."""
+    for interner in (page_urls, page_endpoints, user_agents):
+        interner.clear()
+
+
+def tracked_url(rule, path, view_args=None):
+    """
+    URL gravada em page_views: o caminho das páginas HTML, sem query string (/station/3 diz qual
+    estação foi vista); nas APIs, a regra da rota (/api/jobs/<int:job_id>), porque ids de jobs,
+    turmas e sementes não têm limite. Página com outro parâmetro, ou com um challenge_id fora
+    do catálogo, também fica com a regra: page_urls guarda algumas dezenas de valores.
+    """
+    view_args = view_args or {}
+    if API_PATH in rule or set(view_args) - {'challenge_id'}:
+        return rule
+    if 'challenge_id' in view_args and view_args['challenge_id'] not in catalog:
+        return rule
+    return path
+
+
+def new_page_view(page_url, page_title, user_agent=None, session=None, **fields):
+    """PageViews a partir das strings (como vêm da requisição), já com os ids das dimensões."""
+    return PageViews(url_id=page_urls.id_for(page_url, session),
+                     endpoint_id=page_endpoints.id_for(page_title, session),
+                     user_agent_id=user_agents.id_for(user_agent, session), **fields)
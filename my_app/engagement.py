@@ -0,0 +1,465 @@
+# /engagement.py
+"""
+Sessões e tempo de permanência a partir de page_views (visitor_id + accessed_at + endpoint).
+
+- Sessão: visitas do mesmo visitante separadas por no máximo SESSION_GAP_SECONDS.
+  Bounce é a sessão de uma página só; a duração vai da primeira à última visita.
+- Permanência (dwell) de uma visita: tempo até a próxima visita da mesma sessão; a última
+  página da sessão não tem permanência conhecida e entra só na contagem de visitas.
+- Incremental: page_views é lida em lotes na ordem (accessed_at, id) a partir da marca
+  d'água em sessionization_state, só até agora - SESSIONIZE_SETTLE_SECONDS (linhas ainda
+  em transações abertas não ficam para trás). Sessões que podem continuar no próximo lote
+  são carregadas de um lote para o outro (e entre execuções, no próprio estado); as
+  fechadas são somadas em session_stats / dwell_stats. Cada lote grava agregados e marca
+  d'água na mesma transação, então uma queda não conta nada duas vezes.
+- Memória limitada: um lote (SESSIONIZE_CHUNK linhas) mais as sessões abertas, tudo em
+  numpy/pandas, ordenado e agrupado de forma vetorizada.
+- Distribuições guardadas como histogramas de faixas fixas (somáveis entre lotes); os
+  percentis do relatório são interpolados dentro da faixa.
+- Só páginas HTML contam: track_access registra também as chamadas de API da página (XHR,
+  polling de jobs, sincronização de eventos, SSE), que cortariam a permanência na primeira
+  chamada em segundo plano e fariam de toda visita de uma página só uma sessão de várias.
+  As rotas de API são as que têm /api/ no caminho (regra da rota ou URL antiga completa).
+- Permanência por estação: o challenge_id vem do caminho gravado (/station/3); as demais
+  páginas ficam com 0.
+page_views arquivadas (my_app/archive.py) já saíram da tabela: rode isto com mais frequência
+que o arquivamento.
+
+Uso:
+    python -m my_app.engagement run
+    python -m my_app.engagement run --chunk-size 500000 --rebuild
+    python -m my_app.engagement report --days 30 --json engagement.json
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from flask import current_app
+from sqlalchemy import and_, or_, update
+
+from .archive import page_view_select
+from .dimensions import API_PATH
+from .models import db, DwellStat, PageUrl, PageViews, SessionizationState, SessionStat
+
+COLUMNS = ('id', 'visitor_id', 'page_url', 'page_title', 'language', 'accessed_at')
+# Sessão aberta carregada entre lotes: última visita + início, idioma e páginas da sessão
+OPEN_COLUMNS = ('visitor_id', 'accessed_at', 'page_title', 'challenge_id', 'language', 'session_start',
+                'session_language', 'hits')
+# Estação de uma página de desafio (/station/3, ou a URL antiga completa)
+STATION_URL = r'/station/(\d+)(?:[?#]|$)'
+# Faixas dos histogramas, em segundos (a última vai até o infinito); mudar exige --rebuild.
+# Sessões começam com [0, 1): os bounces (duração 0) não puxam os percentis para o meio da faixa
+DWELL_BINS = (0, 5, 10, 20, 30, 60, 120, 300, 600, 1200, 1800)
+SESSION_BINS = (0, 1, 30, 60, 120, 300, 600, 1200, 1800, 3600, 7200)
+DAY_NS = 86_400 * 10 ** 9
+
+
+class EngagementError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+# --- Sessionização (vetorizada) ---
+def empty_open_sessions():
+    return pd.DataFrame({name: pd.Series(dtype=dtype) for name, dtype in (
+        ('visitor_id', object), ('accessed_at', 'datetime64[ns]'), ('page_title', object),
+        ('challenge_id', 'int64'), ('language', object), ('session_start', 'datetime64[ns]'), ('session_language', object), ('hits', 'int64'))})
+
+
+def sessionize(hits, open_sessions, gap_seconds, close_before):
+    """
+    Junta as visitas do lote às sessões abertas e separa as sessões.
+
+    hits: DataFrame(visitor_id, accessed_at, page_title, language[, challenge_id]), visitas novas.
+    open_sessions: DataFrame(OPEN_COLUMNS), no máximo uma linha por visitante.
+    close_before: sessões cuja última visita é anterior a isso não podem mais continuar.
+
+    Devolve (sessions, dwell, open_sessions):
+    - sessions: fechadas, com day/language/hits/duration;
+    - dwell: uma linha por visita com permanência conhecida (day, page_title, challenge_id, language, dwell);
+    - open_sessions: as que seguem abertas, para o próximo lote.
+    """
+    carried = open_sessions.assign(carried=True)
+    new = hits[['visitor_id', 'accessed_at', 'page_title', 'language']].assign(
+        challenge_id=hits['challenge_id'] if 'challenge_id' in hits else 0, carried=False, session_start=hits['accessed_at'], session_language=hits['language'], hits=1)
+    frame = pd.concat([carried, new], ignore_index=True) if len(carried) else new
+    if frame.empty:
+        return _empty_sessions(), _empty_dwell(), empty_open_sessions()
+
+    # Por visitante (códigos inteiros, não strings) e horário; no empate a sessão carregada vem antes
+    visitor = pd.factorize(frame['visitor_id'])[0]
+    at = frame['accessed_at'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+    is_carried = frame['carried'].to_numpy()
+    order = np.lexsort((~is_carried, at, visitor))
+    visitor, at = visitor[order], at[order]
+    step = np.diff(at) / 1e9
+
+    starts_session = np.ones(len(frame), dtype=bool)
+    starts_session[1:] = (visitor[1:] != visitor[:-1]) | (step > gap_seconds)
+    first = np.flatnonzero(starts_session)
+    last = np.append(first[1:] - 1, len(frame) - 1)
+
+    # Permanência: até a próxima visita, se ela for da mesma sessão
+    dwell = np.full(len(frame), np.nan)
+    continues = ~starts_session[1:]
+    dwell[:-1][continues] = step[continues]
+
+    # Sessões: a linha carregada traz início, idioma e páginas já contadas
+    column = lambda name, rows: frame[name].to_numpy()[order[rows]]
+    session_start = frame['session_start'].to_numpy(dtype='datetime64[ns]').view(np.int64)[order[first]]
+    hit_counts = frame['hits'].to_numpy(dtype=np.int64)[order]
+    closed = at[last] < np.datetime64(close_before, 'ns').astype(np.int64)
+
+    done = pd.DataFrame({
+        'day': _day(session_start[closed]), 'language': column('session_language', first[closed]),
+        'hits': np.add.reduceat(hit_counts, first)[closed],
+        'duration': (at[last][closed] - session_start[closed]) / 1e9,
+    })
+    measured = np.flatnonzero(~np.isnan(dwell))
+    dwell = pd.DataFrame({
+        'day': _day(at[measured]), 'page_title': column('page_title', measured),
+        'challenge_id': column('challenge_id', measured).astype(np.int64),
+        'language': column('language', measured), 'dwell': dwell[measured],
+    })
+    kept, kept_last = first[~closed], last[~closed]
+    still_open = pd.DataFrame({
+        'visitor_id': column('visitor_id', kept), 'accessed_at': at[kept_last].view('datetime64[ns]'),
+        'page_title': column('page_title', kept_last),
+        'challenge_id': column('challenge_id', kept_last).astype(np.int64), 'language': column('language', kept_last),
+        'session_start': session_start[~closed].view('datetime64[ns]'),
+        'session_language': column('session_language', kept),
+        'hits': np.add.reduceat(hit_counts, first)[~closed],
+    })
+    return done, dwell, still_open
+
+
+def _day(nanoseconds):
+    """Início do dia (datetime64) de cada instante; agrupar por isso evita criar um date por linha."""
+    return (nanoseconds - nanoseconds % DAY_NS).view('datetime64[ns]')
+
+
+def _empty_sessions():
+    return pd.DataFrame({'day': pd.Series(dtype='datetime64[ns]'), 'language': [], 'hits': pd.Series(dtype='int64'),
+                         'duration': pd.Series(dtype=float)})
+
+
+def _empty_dwell():
+    return pd.DataFrame({'day': pd.Series(dtype='datetime64[ns]'), 'page_title': [],
+                         'challenge_id': pd.Series(dtype='int64'), 'language': [], 'dwell': pd.Series(dtype=float)})
+
+
+def _histograms(frame, keys, column, edges):
+    """{chave: [contagem por faixa]} para os valores de `column`, agrupados por `keys`."""
+    if frame.empty:
+        return {}
+    bins = np.searchsorted(np.asarray(edges, dtype=float), frame[column].to_numpy(dtype=float), side='right') - 1
+    counts = frame[list(keys)].assign(bin=bins).groupby([*keys, 'bin']).size().unstack(fill_value=0)
+    counts = counts.reindex(columns=range(len(edges)), fill_value=0)
+    return {key: row.tolist() for key, row in zip(counts.index, counts.to_numpy())}
+
+
+def _add_lists(current, extra):
+    current = json.loads(current or '[]') or [0] * len(extra)
+    return json.dumps([a + b for a, b in zip(current, extra)])
+
+
+# --- Agregados ---
+def _merge_sessions(done):
+    if done.empty:
+        return
+    totals = done.assign(bounce=done['hits'] == 1).groupby(['day', 'language']).agg(
+        sessions=('hits', 'size'), bounces=('bounce', 'sum'), page_views=('hits', 'sum'),
+        duration=('duration', 'sum'))
+    histograms = _histograms(done, ('day', 'language'), 'duration', SESSION_BINS)
+    existing = {(s.day, s.language): s for s in SessionStat.query.filter(SessionStat.day.in_(
+        {day.date() for day, _ in totals.index}))}
+    for (day, language), row in totals.iterrows():
+        stat = existing.get((day.date(), language))
+        if stat is None:
+            stat = SessionStat(day=day.date(), language=language, sessions=0, bounces=0, page_views=0,
+                               duration_seconds=0.0, duration_histogram='[]')
+            db.session.add(stat)
+        stat.sessions += int(row['sessions'])
+        stat.bounces += int(row['bounces'])
+        stat.page_views += int(row['page_views'])
+        stat.duration_seconds += float(row['duration'])
+        stat.duration_histogram = _add_lists(stat.duration_histogram, histograms[(day, language)])
+
+
+DWELL_KEYS = ('day', 'page_title', 'challenge_id', 'language')
+
+
+def _merge_dwell(hits, dwell):
+    views = hits.assign(day=hits['accessed_at'].dt.normalize()).groupby(list(DWELL_KEYS)).size()
+    dwell_totals = dwell.groupby(list(DWELL_KEYS))['dwell'].agg(['size', 'sum'])
+    histograms = _histograms(dwell, DWELL_KEYS, 'dwell', DWELL_BINS)
+    keys = set(views.index) | set(dwell_totals.index)
+    if not keys:
+        return
+    existing = {(s.day, s.endpoint, s.challenge_id, s.language): s for s in DwellStat.query.filter(DwellStat.day.in_(
+        {day.date() for day, _, _, _ in keys}))}
+    for key in keys:
+        day, endpoint, challenge_id, language = key
+        stat = existing.get((day.date(), endpoint, challenge_id, language))
+        if stat is None:
+            stat = DwellStat(day=day.date(), endpoint=endpoint, challenge_id=int(challenge_id), language=language,
+                             views=0, dwell_count=0, dwell_seconds=0.0, dwell_histogram='[]')
+            db.session.add(stat)
+        stat.views += int(views.get(key, 0))
+        if key in histograms:
+            count, total = dwell_totals.loc[key]
+            stat.dwell_count += int(count)
+            stat.dwell_seconds += float(total)
+            stat.dwell_histogram = _add_lists(stat.dwell_histogram, histograms[key])
+
+
+# --- Estado ---
+def _open_sessions_frame(raw):
+    rows = json.loads(raw or '[]')
+    if not rows:
+        return empty_open_sessions()
+    # Estado gravado antes da permanência por estação: sem challenge_id
+    rows = [row[:3] + [0] + row[3:] if len(row) == len(OPEN_COLUMNS) - 1 else row for row in rows]
+    frame = pd.DataFrame(rows, columns=OPEN_COLUMNS)
+    for column in ('accessed_at', 'session_start'):
+        frame[column] = pd.to_datetime(frame[column])
+    frame[['challenge_id', 'hits']] = frame[['challenge_id', 'hits']].astype('int64')
+    return frame
+
+
+def _open_sessions_json(frame):
+    rows = frame.assign(accessed_at=frame['accessed_at'].dt.strftime('%Y-%m-%dT%H:%M:%S.%f'),
+                        session_start=frame['session_start'].dt.strftime('%Y-%m-%dT%H:%M:%S.%f'))
+    return json.dumps(rows[list(OPEN_COLUMNS)].values.tolist())
+
+
+def _load_state():
+    state = db.session.get(SessionizationState, 1)
+    if state is None:
+        state = SessionizationState(id=1, watermark_at=None, watermark_id=0, open_sessions='[]')
+        db.session.add(state)
+        db.session.commit()
+    return state
+
+
+def _save_state(state, watermark_at, watermark_id, open_sessions):
+    """Avança a marca d'água, desde que nenhuma outra execução tenha avançado antes."""
+    saved = db.session.execute(
+        update(SessionizationState)
+        .where(SessionizationState.id == 1, SessionizationState.watermark_id == state.watermark_id)
+        .values(watermark_at=watermark_at, watermark_id=watermark_id,
+                open_sessions=_open_sessions_json(open_sessions), updated_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)).rowcount
+    if not saved:
+        db.session.rollback()
+        raise EngagementError("Sessionization state moved: another run is in progress", 409)
+    state.watermark_at, state.watermark_id = watermark_at, watermark_id
+
+
+def _read_chunk(state, upper, limit):
+    query = page_view_select(COLUMNS).where(PageViews.accessed_at.isnot(None), PageViews.accessed_at < upper,
+                                            PageUrl.url.notlike(f'%{API_PATH}%'))
+    if state.watermark_at is not None:
+        query = query.where(or_(PageViews.accessed_at > state.watermark_at,
+                                and_(PageViews.accessed_at == state.watermark_at, PageViews.id > state.watermark_id)))
+    rows = db.session.execute(query.order_by(PageViews.accessed_at, PageViews.id).limit(limit)).all()
+    frame = pd.DataFrame.from_records(rows, columns=COLUMNS)
+    frame['accessed_at'] = pd.to_datetime(frame['accessed_at'])
+    station = frame.pop('page_url').astype(str).str.extract(STATION_URL, expand=False)
+    frame['challenge_id'] = pd.to_numeric(station).fillna(0).astype('int64')
+    return frame
+
+
+class SessionizeStats:
+    def __init__(self):
+        self.rows = self.chunks = self.sessions = 0
+        self.started = time.perf_counter()
+
+    def as_dict(self, open_sessions):
+        seconds = time.perf_counter() - self.started
+        return {"rows": self.rows, "chunks": self.chunks, "sessions_closed": self.sessions,
+                "open_sessions": open_sessions, "seconds": round(seconds, 3),
+                "rows_per_second": int(self.rows / seconds) if seconds else 0}
+
+
+def sessionize_page_views(chunk_size=None, now=None, max_chunks=None, rebuild=False):
+    """Processa page_views desde a marca d'água; devolve as estatísticas da execução."""
+    config = current_app.config
+    chunk_size = chunk_size or config['SESSIONIZE_CHUNK']
+    gap = config['SESSION_GAP_SECONDS']
+    upper = (now or datetime.utcnow()) - timedelta(seconds=config['SESSIONIZE_SETTLE_SECONDS'])
+    if rebuild:
+        for model in (SessionStat, DwellStat, SessionizationState):
+            db.session.query(model).delete()
+        db.session.commit()
+
+    state = _load_state()
+    open_sessions = _open_sessions_frame(state.open_sessions)
+    stats = SessionizeStats()
+    exhausted = False
+    while max_chunks is None or stats.chunks < max_chunks:
+        hits = _read_chunk(state, upper, chunk_size)
+        if hits.empty:
+            exhausted = True
+            break
+        last = hits.iloc[-1]
+        # Visitas futuras têm accessed_at >= a última lida: sessões paradas há mais que o intervalo fecharam
+        done, dwell, open_sessions = sessionize(hits, open_sessions, gap, last['accessed_at'] - timedelta(seconds=gap))
+        _merge_sessions(done)
+        _merge_dwell(hits, dwell)
+        _save_state(state, last['accessed_at'].to_pydatetime(), int(last['id']), open_sessions)
+        db.session.commit()
+        stats.rows += len(hits)
+        stats.chunks += 1
+        stats.sessions += len(done)
+
+    if exhausted:
+        # Tudo até `upper` foi lido: fecha as sessões paradas há mais que o intervalo
+        no_hits = empty_open_sessions()[['visitor_id', 'accessed_at', 'page_title', 'challenge_id', 'language']]
+        done, dwell, open_sessions = sessionize(no_hits, open_sessions, gap, upper - timedelta(seconds=gap))
+        _merge_sessions(done)
+        _merge_dwell(no_hits, dwell)
+        _save_state(state, state.watermark_at, state.watermark_id, open_sessions)
+        db.session.commit()
+        stats.sessions += len(done)
+    return stats.as_dict(len(open_sessions))
+
+
+# --- Relatório ---
+def percentile(histogram, edges, q):
+    """Percentil q (0-1) estimado do histograma, interpolando dentro da faixa."""
+    total = sum(histogram)
+    if not total:
+        return None
+    target = q * total
+    seen = 0
+    for i, count in enumerate(histogram):
+        if count and seen + count >= target:
+            if i + 1 >= len(edges):
+                return float(edges[i])
+            return edges[i] + (edges[i + 1] - edges[i]) * (target - seen) / count
+        seen += count
+    return float(edges[-1])
+
+
+def _summed_histograms(rows, attribute, size):
+    total = [0] * size
+    for row in rows:
+        for i, count in enumerate(json.loads(getattr(row, attribute) or '[]')):
+            total[i] += count
+    return total
+
+
+def engagement_report(start=None, end=None):
+    """Sessões por idioma e permanência por endpoint/estação/idioma entre `start` e `end` (datas, inclusive)."""
+    sessions = SessionStat.query
+    dwell = DwellStat.query
+    if start:
+        sessions, dwell = sessions.filter(SessionStat.day >= start), dwell.filter(DwellStat.day >= start)
+    if end:
+        sessions, dwell = sessions.filter(SessionStat.day <= end), dwell.filter(DwellStat.day <= end)
+
+    by_language = {}
+    for stat in sessions:
+        by_language.setdefault(stat.language, []).append(stat)
+    languages = []
+    for language, rows in sorted(by_language.items()):
+        count = sum(r.sessions for r in rows)
+        histogram = _summed_histograms(rows, 'duration_histogram', len(SESSION_BINS))
+        languages.append({
+            "language": language, "sessions": count,
+            "bounce_rate": round(sum(r.bounces for r in rows) / count, 3) if count else None,
+            "pages_per_session": round(sum(r.page_views for r in rows) / count, 2) if count else None,
+            "avg_duration_seconds": round(sum(r.duration_seconds for r in rows) / count, 1) if count else None,
+            "p50_duration_seconds": _rounded(percentile(histogram, SESSION_BINS, 0.5)),
+            "p90_duration_seconds": _rounded(percentile(histogram, SESSION_BINS, 0.9)),
+        })
+
+    by_endpoint = {}
+    for stat in dwell:
+        by_endpoint.setdefault((stat.endpoint, stat.challenge_id, stat.language), []).append(stat)
+    endpoints = []
+    for (endpoint, challenge_id, language), rows in sorted(by_endpoint.items()):
+        measured = sum(r.dwell_count for r in rows)
+        histogram = _summed_histograms(rows, 'dwell_histogram', len(DWELL_BINS))
+        endpoints.append({
+            "endpoint": endpoint, "station": challenge_id or None, "language": language,
+            "views": sum(r.views for r in rows),
+            "avg_dwell_seconds": round(sum(r.dwell_seconds for r in rows) / measured, 1) if measured else None,
+            "p50_dwell_seconds": _rounded(percentile(histogram, DWELL_BINS, 0.5)),
+            "p90_dwell_seconds": _rounded(percentile(histogram, DWELL_BINS, 0.9)),
+        })
+    state = db.session.get(SessionizationState, 1)
+    return {
+        "start": start.isoformat() if start else None, "end": end.isoformat() if end else None,
+        "processed_until": state.watermark_at.isoformat() if state and state.watermark_at else None,
+        "languages": languages, "endpoints": endpoints,
+    }
+
+
+def _rounded(value):
+    return round(value, 1) if value is not None else None
+
+
+# --- CLI ---
+def print_run(stats):
+    print(f"{stats['rows']} visitas em {stats['chunks']} lotes, {stats['seconds']}s ({stats['rows_per_second']} linhas/s); "
+          f"{stats['sessions_closed']} sessões fechadas, {stats['open_sessions']} abertas")
+
+
+def print_report(report):
+    print(f"\nsessões (até {report['processed_until']})")
+    header = f"{'idioma':<8}{'sessões':>10}{'bounce':>9}{'pág/sessão':>12}{'média s':>10}{'p50 s':>9}{'p90 s':>9}"
+    print(header)
+    print('-' * len(header))
+    for row in report['languages']:
+        print(f"{row['language']:<8}{row['sessions']:>10}{row['bounce_rate']:>9.1%}{row['pages_per_session']:>12}"
+              f"{row['avg_duration_seconds']:>10}{row['p50_duration_seconds']:>9}{row['p90_duration_seconds']:>9}")
+    print("\npermanência por endpoint (e estação)")
+    header = f"{'endpoint':<28}{'idioma':<8}{'visitas':>9}{'média s':>10}{'p50 s':>9}{'p90 s':>9}"
+    print(header)
+    print('-' * len(header))
+    for row in report['endpoints']:
+        page = f"{row['endpoint']} #{row['station']}" if row['station'] else row['endpoint']
+        print(f"{page[:27]:<28}{row['language']:<8}{row['views']:>9}{str(row['avg_dwell_seconds']):>10}"
+              f"{str(row['p50_dwell_seconds']):>9}{str(row['p90_dwell_seconds']):>9}")
+
+
+def main():
+    from . import create_app
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--config', default='production')
+    common.add_argument('--json', dest='json_path', default=None, help="grava o resultado em JSON")
+    parser = argparse.ArgumentParser(description="Sessões e tempo de permanência a partir de page_views.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    run = sub.add_parser('run', parents=[common], help="processa as visitas novas")
+    run.add_argument('--chunk-size', type=int, default=None, help="padrão: SESSIONIZE_CHUNK")
+    run.add_argument('--max-chunks', type=int, default=None)
+    run.add_argument('--rebuild', action='store_true', help="apaga os agregados e reprocessa tudo")
+    report = sub.add_parser('report', parents=[common], help="relatório dos agregados")
+    report.add_argument('--days', type=int, default=None, help="só os últimos N dias")
+    args = parser.parse_args()
+
+    app = create_app(args.config, INIT_MIGRATIONS=False)
+    with app.app_context():
+        if args.command == 'run':
+            result = sessionize_page_views(args.chunk_size, max_chunks=args.max_chunks, rebuild=args.rebuild)
+            print_run(result)
+        else:
+            start = datetime.utcnow().date() - timedelta(days=args.days) if args.days else None
+            result = engagement_report(start)
+            print_report(result)
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
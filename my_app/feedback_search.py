@@ -0,0 +1,193 @@
+# /feedback_search.py
+"""
+Busca textual nas respostas abertas da avaliação (q5: pontos fortes, q6: melhorias).
+
+Índice na tabela evaluation_search (criada pela migração 6c1e9a4f2d80):
+- SQLite: tabela virtual FTS5 (rowid = evaluations.id) com o texto já reduzido ao radical
+  em Python (stem), porque o FTS5 só traz o stemmer do inglês. O idioma também é coluna
+  indexada, para o filtro por idioma ficar dentro do MATCH. Ranking por bm25.
+- PostgreSQL: tsvector com a configuração de texto do idioma (portuguese/english/spanish)
+  e índice GIN. Ranking por ts_rank_cd.
+O idioma de cada avaliação é o User.language do autor no momento em que ela foi indexada;
+a consulta é reduzida com o stemmer de cada idioma e comparada só com as avaliações dele.
+
+Manutenção: save_evaluation indexa a avaliação nova na mesma transação; o que já existia
+entra pela backfill 'evaluation_search' (python -m my_app.backfills run --pending).
+"""
+
+import re
+import unicodedata
+
+from sqlalchemy import DateTime, bindparam, select, text
+
+from .catalog import LANGUAGES, language
+from .models import db, Evaluation, User
+
+SEARCH_TABLE = 'evaluation_search'
+PG_CONFIGS = {'pt': 'portuguese', 'en': 'english', 'es': 'spanish'}
+MAX_PER_PAGE = 100
+
+# --- Stemmers leves (sufixos), no lugar do Snowball que não é dependência do projeto ---
+# Plurais: (terminação, substituição), a primeira que servir; depois um sufixo e a vogal final,
+# sempre deixando um radical de 4+ letras
+PLURALS = {
+    'pt': (('ões', 'ão'), ('ães', 'ão'), ('ais', 'al'), ('éis', 'el'), ('óis', 'ol'), ('ns', 'm'),
+           ('res', 'r'), ('s', '')),
+    'es': (('ces', 'z'), ('iones', 'ión'), ('es', ''), ('s', '')),
+    'en': (('sses', 'ss'), ('ies', 'y'), ('ss', 'ss'), ('us', 'us'), ('is', 'is'), ('s', '')),
+}
+SUFFIXES = {
+    'pt': ('amento', 'imento', 'mente', 'ação', 'ição', 'ção', 'idade', 'ismo', 'ista', 'ável', 'ível',
+           'adora', 'ador', 'edor', 'ância', 'ência', 'ante', 'inho', 'inha', 'oso', 'osa', 'ivo', 'iva',
+           'ando', 'endo', 'indo', 'aram', 'eram', 'iram', 'avam', 'ava', 'ado', 'ada', 'ido', 'ida',
+           'ia', 'io', 'ou', 'ar', 'er', 'ir'),
+    'es': ('amiento', 'imiento', 'mente', 'ación', 'ición', 'ción', 'idad', 'ismo', 'ista', 'able', 'ible',
+           'adora', 'ador', 'ancia', 'encia', 'ante', 'ito', 'ita', 'oso', 'osa', 'ivo', 'iva',
+           'ando', 'iendo', 'aron', 'ieron', 'aba', 'ado', 'ada', 'ido', 'ida', 'ía', 'ia', 'io',
+           'ar', 'er', 'ir'),
+    'en': ('ational', 'ization', 'fulness', 'iveness', 'ation', 'ement', 'ment', 'ness', 'able', 'ible',
+           'ful', 'ous', 'ive', 'ing', 'est', 'ed', 'ly', 'er'),
+}
+FINAL_VOWELS = {'pt': 'aeo', 'es': 'aeo', 'en': 'e'}
+TOKEN = re.compile(r'\w+')
+
+
+def strip_accents(word):
+    return ''.join(c for c in unicodedata.normalize('NFD', word) if unicodedata.category(c) != 'Mn')
+
+
+def stem(word, lang):
+    """Radical (sem acentos) de uma palavra minúscula no idioma `lang`."""
+    if len(word) > 3 and not word.isdigit():
+        for ending, replacement in PLURALS[lang]:
+            if word.endswith(ending) and len(word) - len(ending) >= 3:
+                word = word[:-len(ending)] + replacement
+                break
+        for ending in SUFFIXES[lang]:
+            if word.endswith(ending) and len(word) - len(ending) >= 4:
+                word = word[:-len(ending)]
+                break
+        if len(word) > 4 and word[-1] in FINAL_VOWELS[lang]:
+            word = word[:-1]
+    return strip_accents(word)
+
+
+def stems(value, lang):
+    return [stem(token, lang) for token in TOKEN.findall((value or '').lower())]
+
+
+# --- Índice ---
+# O mesmo DDL da migração, para bancos criados com create_all (benchmark, teste de carga, dados sintéticos)
+SEARCH_DDL = {
+    'postgresql': (
+        f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} (evaluation_id INTEGER PRIMARY KEY REFERENCES evaluations (id), "
+        "language VARCHAR(5) NOT NULL, document TSVECTOR NOT NULL)",
+        f"CREATE INDEX IF NOT EXISTS ix_evaluation_search_document ON {SEARCH_TABLE} USING gin (document)",
+    ),
+    'sqlite': (
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+        "q5, q6, language, tokenize = 'unicode61 remove_diacritics 2')",
+    ),
+}
+
+
+def create_search_table(connection):
+    for statement in SEARCH_DDL[connection.dialect.name]:
+        connection.execute(text(statement))
+
+
+def _dialect():
+    return db.session.get_bind().dialect.name
+
+
+def index_evaluations(ids):
+    """(Re)indexa as avaliações `ids` em db.session (sem commit)."""
+    rows = db.session.execute(
+        select(Evaluation.id, Evaluation.q5, Evaluation.q6, User.language)
+        .outerjoin(User, User.id == Evaluation.user_id).where(Evaluation.id.in_(ids))).all()
+    if not rows:
+        return 0
+    if _dialect() == 'postgresql':
+        db.session.execute(text(
+            f"INSERT INTO {SEARCH_TABLE} (evaluation_id, language, document) VALUES (:id, :language, "
+            "setweight(to_tsvector(CAST(:config AS regconfig), :q5), 'A') || "
+            "setweight(to_tsvector(CAST(:config AS regconfig), :q6), 'B')) "
+            "ON CONFLICT (evaluation_id) DO UPDATE SET language = excluded.language, document = excluded.document"),
+            [{'id': id_, 'language': language(lang), 'config': PG_CONFIGS[language(lang)],
+              'q5': q5 or '', 'q6': q6 or ''} for id_, q5, q6, lang in rows])
+    else:
+        db.session.execute(text(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = :id"), [{'id': row[0]} for row in rows])
+        db.session.execute(text(f"INSERT INTO {SEARCH_TABLE} (rowid, q5, q6, language) VALUES (:id, :q5, :q6, :language)"), [
+            {'id': id_, 'language': language(lang),
+             'q5': ' '.join(stems(q5, language(lang))), 'q6': ' '.join(stems(q6, language(lang)))}
+            for id_, q5, q6, lang in rows])
+    return len(rows)
+
+
+# --- Busca ---
+def _match(query, languages, postgres):
+    """
+    (condição, expressão de relevância, parâmetros): a consulta reduzida com o stemmer de cada
+    idioma, comparada só com as avaliações daquele idioma. Condição None = nenhum termo.
+    """
+    conditions, ranks, params = [], [], {}
+    for lang in languages:
+        terms = [t for t in stems(query, lang) if t]
+        if not terms:
+            continue
+        if postgres:
+            params[f'lang_{lang}'], params[f'config_{lang}'] = lang, PG_CONFIGS[lang]
+            ts_query = f"plainto_tsquery(CAST(:config_{lang} AS regconfig), :query)"
+            conditions.append(f"({SEARCH_TABLE}.language = :lang_{lang} AND {SEARCH_TABLE}.document @@ {ts_query})")
+            ranks.append(f"WHEN :lang_{lang} THEN ts_rank_cd({SEARCH_TABLE}.document, {ts_query})")
+        else:
+            phrase = ' '.join(f'"{t}"' for t in terms)
+            conditions.append(f"(language: {lang} AND {{q5 q6}}: ({phrase}))")
+    if not conditions:
+        return None, None, {}
+    if postgres:
+        params['query'] = query
+        return (f"({' OR '.join(conditions)})", f"CASE {SEARCH_TABLE}.language {' '.join(ranks)} END", params)
+    # Um MATCH só (idioma é coluna indexada): o FTS5 filtra e ordena numa passada
+    params['match'] = ' OR '.join(conditions)
+    return f"{SEARCH_TABLE} MATCH :match", f"-bm25({SEARCH_TABLE}, 1.0, 1.0, 0.0)", params
+
+
+def search_feedback(query, participant_type=None, start=None, end=None, languages=None, page=1, per_page=20):
+    """
+    Avaliações cujas respostas abertas contêm todos os termos de `query`, das mais relevantes
+    para as menos: {'total', 'page', 'per_page', 'results': [...]}. Filtros opcionais por
+    participant_type, período de created_at ([start, end)) e idioma.
+    """
+    page, per_page = max(1, page), min(max(1, per_page), MAX_PER_PAGE)
+    postgres = _dialect() == 'postgresql'
+    condition, rank, params = _match(
+        query, list(dict.fromkeys(language(l) for l in languages)) if languages else LANGUAGES, postgres)
+    if condition is None:
+        return {'total': 0, 'page': page, 'per_page': per_page, 'results': []}
+    key = f"{SEARCH_TABLE}.evaluation_id" if postgres else f"{SEARCH_TABLE}.rowid"
+    filters = [condition]
+    for column, operator, name, value in (('participant_type', '=', 'participant_type', participant_type),
+                                          ('created_at', '>=', 'start', start), ('created_at', '<', 'end', end)):
+        if value:
+            filters.append(f"e.{column} {operator} :{name}")
+            params[name] = value
+    # Sem filtros da avaliação, contagem e ranking ficam só no índice
+    source = f"{SEARCH_TABLE} JOIN evaluations e ON e.id = {key}" if len(filters) > 1 else SEARCH_TABLE
+    where = ' AND '.join(filters)
+    dates = [bindparam(name, type_=DateTime) for name in ('start', 'end') if name in params]
+
+    total = db.session.execute(text(f"SELECT COUNT(*) FROM {source} WHERE {where}").bindparams(*dates), params).scalar()
+    rows = db.session.execute(text(
+        f"SELECT e.id, e.user_id, e.participant_type, e.created_at, e.q5, e.q6, r.score FROM ("
+        f"SELECT {key} AS id, {rank} AS score FROM {source} WHERE {where} "
+        f"ORDER BY score DESC, id DESC LIMIT :limit OFFSET :offset) r "
+        f"JOIN evaluations e ON e.id = r.id ORDER BY r.score DESC, r.id DESC")
+        .bindparams(*dates).columns(created_at=DateTime),
+        {**params, 'limit': per_page, 'offset': (page - 1) * per_page}).all()
+    return {
+        'total': total, 'page': page, 'per_page': per_page,
+        'results': [{'evaluation_id': row.id, 'user_id': row.user_id, 'participant_type': row.participant_type,
+                     'created_at': row.created_at.isoformat() if row.created_at else None, 'q5': row.q5, 'q6': row.q6,
+                     'score': round(float(row.score), 4)} for row in rows],
+    }
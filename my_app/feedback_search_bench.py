@@ -0,0 +1,174 @@
+# /feedback_search_bench.py
+"""
+Busca nas respostas abertas (q5/q6): LIKE '%termo%' (varredura da tabela) contra o índice
+de my_app/feedback_search.py, num corpus sintético de avaliações em pt/en/es.
+
+Mede a vazão da indexação (o caminho da backfill) e a latência de cada consulta (total de
+resultados + primeira página), mediana de --repeat execuções.
+
+Uso:
+    python -m my_app.feedback_search_bench
+    python -m my_app.feedback_search_bench --evaluations 500000 --json feedback_search_bench.json
+    python -m my_app.feedback_search_bench --database-url postgresql+psycopg2://localhost/bench
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import sqlalchemy as sa
+
+# Frases por idioma: partes combinadas ao acaso em cada resposta
+PHRASES = {
+    'pt': {
+        'q5': ['dinâmica envolvente', 'cenários realistas', 'conteúdo relevante para a prática',
+               'boa integração com a equipe', 'feedback imediato', 'interface intuitiva',
+               'desafios bem explicados', 'aprendizado sobre segurança do paciente'],
+        'q6': ['mais tempo por estação', 'mais estações', 'versão para celular', 'mais dicas',
+               'explicação após cada erro', 'melhorar o contraste das telas', 'instruções mais claras',
+               'ranking entre as equipes'],
+    },
+    'en': {
+        'q5': ['engaging dynamics', 'realistic scenarios', 'content relevant to practice', 'great teamwork',
+               'immediate feedback', 'intuitive interface', 'well explained challenges'],
+        'q6': ['more time per station', 'more stations', 'mobile version', 'more hints',
+               'explanation after each mistake', 'clearer instructions', 'team leaderboard'],
+    },
+    'es': {
+        'q5': ['dinámica atractiva', 'escenarios realistas', 'contenido relevante para la práctica',
+               'buena integración con el equipo', 'retroalimentación inmediata', 'interfaz intuitiva'],
+        'q6': ['más tiempo por estación', 'más estaciones', 'versión para móvil', 'más pistas',
+               'explicación después de cada error', 'instrucciones más claras'],
+    },
+}
+LANGUAGE_WEIGHTS = {'pt': 0.7, 'en': 0.15, 'es': 0.15}
+# (busca, termo do LIKE equivalente); o LIKE não acha flexões, a busca acha
+QUERIES = [('estações', 'estaç'), ('explicação erro', 'explica'), ('realistic scenarios', 'realistic'),
+           ('dicas', 'dica'), ('contraste telas', 'contraste'), ('tabuleiro', 'tabuleiro')]
+
+
+def corpus(count, users, seed=11):
+    """(idioma de cada usuário, avaliações); user_id de 1 a `users`."""
+    rng = random.Random(seed)
+    user_languages = rng.choices(list(LANGUAGE_WEIGHTS), weights=list(LANGUAGE_WEIGHTS.values()), k=users)
+    start = datetime(2026, 1, 1)
+    evaluations = []
+    for n in range(count):
+        user = rng.randrange(users)
+        phrases = PHRASES[user_languages[user]]
+        evaluations.append({
+            'user_id': user + 1, 'participant_type': rng.choice(('estudante', 'estudante', 'profissional', 'professor')),
+            'participation_type': 'sozinho', 'team': '[]', 'q1': 5, 'q2': 4, 'q3': 5, 'q4': 4,
+            'q5': ', '.join(rng.sample(phrases['q5'], rng.randint(1, 3))).capitalize(),
+            'q6': ', '.join(rng.sample(phrases['q6'], rng.randint(0, 2))).capitalize() or None,
+            'created_at': start + timedelta(minutes=n),
+        })
+    return user_languages, evaluations
+
+
+def _median_ms(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - started)
+    return round(statistics.median(timings) * 1000, 2), result
+
+
+def run(evaluations=200_000, repeat=5, batch_size=2000, database_url=None):
+    from . import create_app, db
+    from .feedback_search import create_search_table, index_evaluations, search_feedback
+    from .models import Evaluation, User
+
+    tmpdir = None
+    if database_url is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        database_url = 'sqlite:///' + os.path.join(tmpdir.name, 'feedback_search_bench.db')
+    app = create_app('production', SQLALCHEMY_DATABASE_URI=database_url, INIT_MIGRATIONS=False,
+                     RATE_LIMIT_ENABLED=False)
+
+    with app.app_context():
+        db.create_all()
+        if db.session.query(Evaluation.id).first() is not None:
+            raise SystemExit("evaluations is not empty: point --database-url at a scratch database")
+        try:
+            user_languages, rows = corpus(evaluations, max(1, evaluations // 2))
+            with db.engine.begin() as connection:
+                create_search_table(connection)
+                connection.execute(User.__table__.insert(), [
+                    {'id': i + 1, 'username': f'bench{i}', 'email': f'bench{i}@example.test', 'password_hash': '-',
+                     'profession': '-', 'country': '-', 'language': lang} for i, lang in enumerate(user_languages)])
+                connection.execute(Evaluation.__table__.insert(), rows)
+
+            started = time.perf_counter()
+            ids = db.session.scalars(sa.select(Evaluation.id).order_by(Evaluation.id)).all()
+            for i in range(0, len(ids), batch_size):
+                index_evaluations(ids[i:i + batch_size])
+                db.session.commit()
+            index_seconds = time.perf_counter() - started
+
+            queries = []
+            for query, term in QUERIES:
+                pattern = f'%{term}%'
+                like = sa.or_(Evaluation.q5.like(pattern), Evaluation.q6.like(pattern))
+
+                def scan():
+                    total = db.session.scalar(sa.select(sa.func.count()).select_from(Evaluation).where(like))
+                    db.session.scalars(sa.select(Evaluation.id).where(like)
+                                       .order_by(Evaluation.created_at.desc()).limit(20)).all()
+                    return total
+
+                like_ms, like_total = _median_ms(scan, repeat)
+                search_ms, found = _median_ms(lambda: search_feedback(query, per_page=20), repeat)
+                queries.append({'query': query, 'like_term': term, 'like_ms': like_ms, 'like_matches': like_total,
+                                'search_ms': search_ms, 'search_matches': found['total'],
+                                'speedup': round(like_ms / search_ms, 1) if search_ms else None})
+            results = {
+                'evaluations': evaluations, 'dialect': db.engine.dialect.name,
+                'index_seconds': round(index_seconds, 2),
+                'index_rows_per_second': int(evaluations / index_seconds) if index_seconds else evaluations,
+                'queries': queries,
+            }
+        finally:
+            db.session.remove()
+            db.engine.dispose()
+    if tmpdir is not None:
+        tmpdir.cleanup()
+    return results
+
+
+def print_report(report):
+    print(f"\n{report['evaluations']} avaliações ({report['dialect']}); indexação: {report['index_seconds']}s "
+          f"({report['index_rows_per_second']} linhas/s)\n")
+    header = f"{'busca':<22}{'LIKE ms':>9}{'achou':>9}{'índice ms':>11}{'achou':>9}{'ganho':>8}"
+    print(header)
+    print('-' * len(header))
+    for row in report['queries']:
+        print(f"{row['query']:<22}{row['like_ms']:>9}{row['like_matches']:>9}{row['search_ms']:>11}"
+              f"{row['search_matches']:>9}{str(row['speedup']) + 'x':>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Busca em q5/q6: LIKE vs. índice de texto.")
+    parser.add_argument('--evaluations', type=int, default=200_000)
+    parser.add_argument('--repeat', type=int, default=5, help="execuções de cada consulta (vale a mediana)")
+    parser.add_argument('--batch-size', type=int, default=2000, help="avaliações por lote de indexação")
+    parser.add_argument('--database-url', default=None, help="banco de rascunho vazio (padrão: SQLite descartável)")
+    parser.add_argument('--json', dest='json_path', default=None, help="grava o resultado em JSON")
+    args = parser.parse_args()
+
+    report = run(evaluations=args.evaluations, repeat=args.repeat, batch_size=args.batch_size,
+                 database_url=args.database_url)
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,105 +1,142 @@
 # /game_api.py
 
-from flask import Blueprint, jsonify, request, session
-from functools import wraps
-from .models import db, User, UserProgress, ChallengeAttempt
-from .challenges_data import challenges
+from flask import Blueprint, current_app, jsonify, request, session
+from .models import db
+from .auth import login_required
+from .game_engine import GameError, current_engine
+from .catalog import catalog
+from .wordsearch import WordsearchError, grid_for
 
-# --- CORREÇÃO APLICADA AQUI ---
-# A criação do Blueprint foi movida para o topo, ANTES de ser usada por qualquer rota.
 game_bp = Blueprint('game_api', __name__)
 
-# --- Decorator de Autenticação ---
-def login_required(f):
-    @wraps(f)
-    def decorated_function(*args, **kwargs):
-        if 'user_id' not in session:
-            return jsonify({"success": False, "error": "Authentication required"}), 401
-        return f(*args, **kwargs)
-    return decorated_function
-
-# --- Funções de Apoio ---
-def get_or_create_progress(user_id):
-    progress = UserProgress.query.filter_by(user_id=user_id).first()
-    if not progress:
-        progress = UserProgress(user_id=user_id)
-        db.session.add(progress)
-    return progress
+
+@game_bp.errorhandler(GameError)
+@game_bp.errorhandler(WordsearchError)
+def handle_game_error(e):
+    db.session.rollback()
+    return jsonify({"success": False, "error": e.message}), e.status
 
 # --- Endpoints da API ---
 
 @game_bp.route('/progress', methods=['GET'])
 @login_required
 def get_progress():
-    user_id = session['user_id']
-    progress = get_or_create_progress(user_id)
+    engine = current_engine()
+    data = engine.snapshot()
     db.session.commit()
-    return jsonify({
-        "success": True,
-        "current_challenge_id": progress.current_challenge_id,
-        "earned_keys": progress.get_keys(),
-        "total_score": progress.total_score,
-        "total_time_seconds": progress.total_time_seconds
-    })
+    return jsonify({"success": True, **data, "catalog_version": catalog.tag})
 
 @game_bp.route('/challenge/start', methods=['POST'])
 @login_required
 def start_challenge():
-    data = request.get_json()
+    data = request.get_json(silent=True)
     if not data:
         return jsonify({"success": False, "error": "Invalid request body. Expected JSON."}), 400
-        
-    challenge_id = data.get('challenge_id')
-    if not challenge_id or challenge_id not in challenges:
-        return jsonify({"success": False, "error": "Invalid challenge ID"}), 400
-
-    user_id = session['user_id']
-    progress = get_or_create_progress(user_id)
-    challenge_info = challenges[challenge_id]
-    required_key = challenge_info.get('requiredKey')
 
-    if required_key and required_key not in progress.get_keys():
-        return jsonify({"success": False, "error": "Required key not found"}), 403
-
-    attempt = ChallengeAttempt(user_id=user_id, challenge_id=challenge_id, status='started')
-    db.session.add(attempt)
+    challenge_id = data.get('challenge_id')
+    current_engine().start(challenge_id)
     db.session.commit()
     return jsonify({"success": True, "message": f"Challenge {challenge_id} started."})
 
 @game_bp.route('/challenge/complete', methods=['POST'])
 @login_required
 def complete_challenge():
-    data = request.get_json()
+    data = request.get_json(silent=True)
     if not data:
         return jsonify({"success": False, "error": "Invalid request"}), 400
 
     challenge_id = data.get('challenge_id')
     score = data.get('score', 0)
     time_spent = data.get('time_spent', 0)
-    key_earned = data.get('key_earned')
 
-    if not all([challenge_id, key_earned is not None]): # key_earned pode ser uma string vazia
+    # key_earned enviado pelo cliente é ignorado: a chave vem do catálogo (ver GameEngine.complete)
+    if not challenge_id:
         return jsonify({"success": False, "error": "Missing required data"}), 400
 
-    user_id = session['user_id']
-    progress = get_or_create_progress(user_id)
-    attempt = ChallengeAttempt.query.filter_by(user_id=user_id, challenge_id=challenge_id, status='started').order_by(ChallengeAttempt.started_at.desc()).first()
-    if attempt:
-        attempt.status = 'completed'
-        attempt.score = score
-        attempt.time_spent_seconds = time_spent
-    
-    progress.total_score += score
-    progress.total_time_seconds += time_spent
-    progress.add_key(key_earned)
-    
-    if progress.current_challenge_id == challenge_id:
-        progress.current_challenge_id += 1
-
+    progress = current_engine().complete(challenge_id, score=score, time_spent=time_spent)
     db.session.commit()
     return jsonify({
         "success": True,
         "message": "Challenge completed and progress saved.",
-        "new_key_earned": key_earned,
+        "new_key_earned": catalog.get(challenge_id).get('keyReward'),
         "next_challenge_id": progress.current_challenge_id
     })
+
+@game_bp.route('/challenge/<int:challenge_id>/answers', methods=['POST'])
+@login_required
+def submit_answers(challenge_id):
+    engine = current_engine()
+    if not engine.can_access(challenge_id):
+        return jsonify({"success": False, "error": "Desafio bloqueado"}), 403
+
+    data = request.get_json(silent=True) or {}
+    result = engine.verify_answers(challenge_id, data.get('answers', {}))
+    return jsonify({"success": True, **result})
+
+@game_bp.route('/challenge/<int:challenge_id>/state', methods=['GET'])
+@login_required
+def challenge_state(challenge_id):
+    return jsonify({"success": True, "challenge_id": challenge_id, "state": current_engine().state(challenge_id)})
+
+def _wordsearch_grid(challenge_id, seed):
+    """Grade do caça-palavras no idioma da sessão; sem semente, a da tentativa em andamento."""
+    engine = current_engine()
+    if not engine.can_access(challenge_id):
+        raise GameError("Desafio bloqueado", 403)
+    challenge = catalog.localized_challenge(challenge_id, session.get('lang'))
+    if challenge.get('type') != 'wordsearch':
+        raise GameError("Not a word search challenge", 404)
+    if seed is None:
+        seed = engine.open_attempt_id(challenge_id)
+    elif not isinstance(seed, int) or isinstance(seed, bool):
+        raise GameError("Invalid seed", 400)
+    return grid_for(challenge, engine.user_id, seed), seed
+
+@game_bp.route('/challenge/<int:challenge_id>/wordsearch', methods=['GET'])
+@login_required
+def wordsearch_grid(challenge_id):
+    grid, seed = _wordsearch_grid(challenge_id, request.args.get('seed', type=int))
+    return jsonify({"success": True, "challenge_id": challenge_id, "seed": seed, **grid.to_dict()})
+
+@game_bp.route('/challenge/<int:challenge_id>/wordsearch/claim', methods=['POST'])
+@login_required
+def wordsearch_claim(challenge_id):
+    """Confere uma palavra marcada: {"seed": n, "cells": [[linha, coluna], ...]} (da primeira à última letra)."""
+    data = request.get_json(silent=True) or {}
+    cells = data.get('cells')
+    if not isinstance(cells, list) or not all(
+            isinstance(cell, list) and len(cell) == 2 and all(type(v) is int for v in cell) for cell in cells):
+        return jsonify({"success": False, "error": "cells must be a list of [row, column]"}), 400
+    grid, _ = _wordsearch_grid(challenge_id, data.get('seed'))
+    word = grid.check(cells)
+    return jsonify({"success": True, "valid": word is not None, "word": word})
+
+@game_bp.route('/events', methods=['POST'])
+@login_required
+def sync_events():
+    """Recebe eventos em lote (fila offline do cliente) e aplica numa transação."""
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({"success": False, "error": "Invalid request body. Expected JSON."}), 400
+
+    client_id = data.get('client_id')
+    events = data.get('events')
+    if not isinstance(client_id, str) or not 0 < len(client_id) <= 36:
+        return jsonify({"success": False, "error": "Invalid client_id"}), 400
+    if not isinstance(events, list) or not events:
+        return jsonify({"success": False, "error": "Missing events"}), 400
+    if len(events) > current_app.config['MAX_EVENT_BATCH']:
+        return jsonify({"success": False, "error": "Too many events"}), 413
+    if not all(isinstance(e, dict) and isinstance(e.get('seq'), int) for e in events):
+        return jsonify({"success": False, "error": "Every event needs an integer seq"}), 400
+
+    engine = current_engine()
+    results = engine.apply_events(client_id, events)
+    progress = engine.snapshot()
+    db.session.commit()
+    return jsonify({
+        "success": True,
+        "results": results,
+        "last_seq": max(e['seq'] for e in events),
+        "progress": progress
+    })
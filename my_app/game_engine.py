@@ -0,0 +1,268 @@
+# /game_engine.py
+
+import json
+from datetime import datetime
+from flask import g, session
+from .models import db, UserProgress, ChallengeAttempt, StationResult, GameEvent
+from .catalog import catalog
+from .live import ALL, cohort_topic, queue_delta
+from .cohorts import cohort_ids_for, invalidate_after_commit
+
+# --- Estados de um desafio para o usuário ---
+LOCKED = 'locked'          # chave exigida ainda não conquistada
+AVAILABLE = 'available'    # liberado, nenhuma tentativa aberta
+STARTED = 'started'        # tentativa em andamento
+COMPLETED = 'completed'    # chave de recompensa já conquistada
+
+# Transições permitidas (o replay de um desafio concluído é permitido)
+TRANSITIONS = {
+    'start': {AVAILABLE, STARTED, COMPLETED},
+    'complete': {STARTED},
+}
+
+# Tipos aceitos em /api/game/events
+EVENT_TYPES = ('start', 'hint', 'answer', 'complete')
+
+
+class GameError(Exception):
+    """Erro de regra do jogo, já com o status HTTP correspondente."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+class GameEngine:
+    """
+    Camada única de regras do jogo, usada pelas rotas HTML e pela API /api/game.
+    O progresso é carregado no máximo uma vez por requisição (ver current_engine).
+    """
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self._progress = None
+        self._keys = None
+        self._open_attempts = {}
+        self._cohort_ids = None
+
+    # --- Progresso (carregado sob demanda e mantido em cache) ---
+    @property
+    def progress(self):
+        if self._progress is None:
+            progress = UserProgress.query.filter_by(user_id=self.user_id).first()
+            if not progress:
+                progress = UserProgress(user_id=self.user_id)
+                db.session.add(progress)
+                db.session.flush()  # aplica os defaults das colunas
+            self._progress = progress
+        return self._progress
+
+    @property
+    def keys(self):
+        if self._keys is None:
+            self._keys = set(self.progress.get_keys())
+        return self._keys
+
+    @property
+    def cohort_ids(self):
+        if self._cohort_ids is None:
+            self._cohort_ids = cohort_ids_for(self.user_id)
+        return self._cohort_ids
+
+    def _open_attempt(self, challenge_id):
+        if challenge_id not in self._open_attempts:
+            self._open_attempts[challenge_id] = ChallengeAttempt.query.filter_by(
+                user_id=self.user_id, challenge_id=challenge_id, status=STARTED
+            ).order_by(ChallengeAttempt.started_at.desc()).first()
+        return self._open_attempts[challenge_id]
+
+    # --- Máquina de estados ---
+    def can_access(self, challenge_id):
+        challenge = catalog.get(challenge_id)
+        if not challenge:
+            return False
+        required_key = challenge.get('requiredKey')
+        return not required_key or required_key in self.keys
+
+    def state(self, challenge_id):
+        if not self.can_access(challenge_id):
+            return LOCKED
+        if self._open_attempt(challenge_id):
+            return STARTED
+        if catalog.get(challenge_id).get('keyReward') in self.keys:
+            return COMPLETED
+        return AVAILABLE
+
+    def open_attempt_id(self, challenge_id):
+        """Id da tentativa em andamento (0 se não houver); serve de semente para grades por tentativa."""
+        attempt = self._open_attempt(challenge_id)
+        return attempt.id if attempt else 0
+
+    def _require(self, action, challenge_id):
+        if not isinstance(challenge_id, int) or challenge_id not in catalog:
+            raise GameError("Invalid challenge ID", 400)
+        state = self.state(challenge_id)
+        if state == LOCKED:
+            raise GameError("Required key not found", 403)
+        if state not in TRANSITIONS[action]:
+            raise GameError(f"Cannot {action} challenge in state '{state}'", 409)
+        return state
+
+    # --- Ações ---
+    def start(self, challenge_id):
+        self._require('start', challenge_id)
+        attempt = ChallengeAttempt(user_id=self.user_id, challenge_id=challenge_id, status=STARTED)
+        db.session.add(attempt)
+        self._open_attempts[challenge_id] = attempt
+        return attempt
+
+    def complete(self, challenge_id, score=0, time_spent=0):
+        """Conclui a tentativa aberta; a chave concedida é sempre a keyReward do catálogo."""
+        self._require('complete', challenge_id)
+        attempt = self._open_attempt(challenge_id)
+        attempt.status = COMPLETED
+        attempt.score = score
+        attempt.time_spent_seconds = time_spent
+        self._open_attempts[challenge_id] = None
+
+        invalidate_after_commit(self.cohort_ids)
+        progress = self.progress
+        progress.total_score += score
+        progress.total_time_seconds += time_spent
+        key_earned = catalog.get(challenge_id).get('keyReward')
+        if key_earned:
+            progress.add_key(key_earned)
+            self.keys.add(key_earned)
+        if progress.current_challenge_id == challenge_id:
+            progress.current_challenge_id += 1
+            queue_delta('advance', {"user_id": self.user_id, "from_station": challenge_id,
+                                    "to_station": progress.current_challenge_id}, self.live_topics())
+        return progress
+
+    def live_topics(self):
+        """Tópicos do console ao vivo que recebem os deltas deste jogador."""
+        return (ALL,) + tuple(cohort_topic(cid) for cid in self.cohort_ids)
+
+    def record_station_result(self, station_id, score, time_spent):
+        """Cria ou atualiza o resultado da estação (um por usuário/estação)."""
+        result = StationResult.query.filter_by(user_id=self.user_id, station_id=station_id).first()
+        first_completion = result is None
+        score_delta = score - (0 if first_completion else result.score)
+        if result:
+            result.score = score
+            result.time_spent = time_spent
+            result.completed_at = datetime.utcnow()
+        else:
+            result = StationResult(user_id=self.user_id, station_id=station_id, score=score, time_spent=time_spent)
+            db.session.add(result)
+
+        invalidate_after_commit(self.cohort_ids)
+        queue_delta('station_result', {"user_id": self.user_id, "station_id": station_id, "score": score,
+                                       "score_delta": score_delta, "time_spent": time_spent,
+                                       "first_completion": first_completion}, self.live_topics())
+        return result
+
+    # --- Eventos em lote (sincronização offline) ---
+    def apply_event(self, event):
+        """Aplica um único evento; hint/answer são apenas registrados no log."""
+        event_type = event.get('type')
+        challenge_id = event.get('challenge_id')
+        if event_type not in EVENT_TYPES:
+            raise GameError(f"Unknown event type '{event_type}'", 400)
+
+        if event_type == 'start':
+            self.start(challenge_id)
+        elif event_type == 'complete':
+            score = int(event.get('score', 0))
+            time_spent = int(event.get('time_spent', 0))
+            self.complete(challenge_id, score=score, time_spent=time_spent)
+            self.record_station_result(challenge_id, score, time_spent)
+        elif challenge_id not in catalog:
+            raise GameError("Invalid challenge ID", 400)
+
+    def apply_events(self, client_id, events):
+        """
+        Aplica uma lista ordenada de eventos numa única transação.
+        Cada evento roda num savepoint: um evento rejeitado não desfaz os demais.
+        Sequências já vistas para (usuário, client_id) são ignoradas (idempotência).
+        """
+        seqs = [e.get('seq') for e in events]
+        seen = {seq for (seq,) in db.session.query(GameEvent.seq).filter(
+            GameEvent.user_id == self.user_id,
+            GameEvent.client_id == client_id,
+            GameEvent.seq.in_(seqs)
+        )}
+
+        results = []
+        for event in sorted(events, key=lambda e: e['seq']):
+            seq = event['seq']
+            if seq in seen:
+                results.append({"seq": seq, "status": "duplicate"})
+                continue
+            seen.add(seq)
+
+            status, error = 'applied', None
+            savepoint = db.session.begin_nested()
+            try:
+                self.apply_event(event)
+                savepoint.commit()
+            except (GameError, TypeError, ValueError) as e:
+                savepoint.rollback()
+                self._open_attempts.clear()
+                self._progress = self._keys = None
+                status, error = 'rejected', getattr(e, 'message', str(e))
+
+            payload = {k: v for k, v in event.items() if k not in ('seq', 'type', 'challenge_id')}
+            db.session.add(GameEvent(
+                user_id=self.user_id, client_id=client_id, seq=seq,
+                event_type=str(event.get('type'))[:20],
+                challenge_id=event.get('challenge_id') if isinstance(event.get('challenge_id'), int) else None,
+                payload=json.dumps(payload) if payload else None, status=status
+            ))
+            result = {"seq": seq, "status": status}
+            if error:
+                result["error"] = error
+            results.append(result)
+        return results
+
+    def verify_answers(self, challenge_id, user_answers):
+        """Confere respostas de quiz/ordenação/quebra-cabeça no servidor e retorna a pontuação."""
+        challenge = catalog.get(challenge_id)
+        if not challenge:
+            raise GameError("Invalid challenge ID", 400)
+
+        if challenge.get('type') in ('ordering', 'puzzle'):
+            # Quebra-cabeça: ids das peças (puzzleData.tiles) na ordem do tabuleiro
+            correct_order = challenge[f"{challenge['type']}Data"].get('correctOrder', [])
+            submitted = user_answers.get('order', [])
+            correct = sum(1 for a, b in zip(submitted, correct_order) if a == b)
+            total = len(correct_order)
+        else:
+            questions = challenge.get('quizData', [])
+            correct = sum(1 for q in questions if user_answers.get(q['id']) == q['correctAnswer'])
+            total = len(questions)
+
+        return {
+            'score': round(challenge.get('points', 0) * correct / total) if total else 0,
+            'correct_answers': correct,
+            'total_questions': total,
+            'passed': total > 0 and correct >= total * 0.7  # 70% para passar
+        }
+
+    def snapshot(self):
+        progress = self.progress
+        return {
+            "current_challenge_id": progress.current_challenge_id,
+            "earned_keys": progress.get_keys(),
+            "total_score": progress.total_score,
+            "total_time_seconds": progress.total_time_seconds
+        }
+
+
+def current_engine():
+    """Engine do usuário logado, criado uma única vez por requisição."""
+    engine = g.get('game_engine')
+    if engine is None or engine.user_id != session.get('user_id'):
+        engine = g.game_engine = GameEngine(session['user_id'])
+    return engine
@@ -0,0 +1,196 @@
+# /http_cache.py
+
+import gzip
+import hashlib
+import json
+
+from flask import current_app, request, session
+
+try:
+    import brotli  # opcional: se não estiver instalado servimos só gzip
+except ImportError:
+    brotli = None
+
+
+class Payload:
+    """Corpo imutável com as versões comprimidas pré-calculadas."""
+
+    __slots__ = ('bodies', 'etag', 'mimetype', 'policy', 'guard', 'language')
+
+    def __init__(self, body, mimetype, policy=None, guard=None, language=None):
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        self.mimetype = mimetype
+        self.policy = policy
+        self.language = language
+        # guard(): devolve uma resposta de erro para barrar o acesso, ou None
+        self.guard = guard
+        self.bodies = {'identity': body}
+
+        # Só guarda a versão comprimida se ela for realmente menor
+        gz = gzip.compress(body, compresslevel=9, mtime=0)
+        if len(gz) < len(body):
+            self.bodies['gzip'] = gz
+        if brotli is not None:
+            br = brotli.compress(body, quality=11)
+            if len(br) < len(body):
+                self.bodies['br'] = br
+
+    def etag_for(self, encoding):
+        # ETag forte precisa mudar com a codificação do corpo
+        return self.etag if encoding == 'identity' else f"{self.etag}-{encoding}"
+
+    def etags(self):
+        return [self.etag_for(encoding) for encoding in self.bodies]
+
+
+class LocalizedPayload:
+    """Um Payload por idioma no mesmo path; vale o ?lang= da URL ou o idioma da sessão."""
+
+    __slots__ = ('variants', 'default', 'guard')
+
+    def __init__(self, variants, default, guard=None):
+        self.variants = variants
+        self.default = default
+        self.guard = guard
+
+    def select(self, lang):
+        return self.variants.get(lang) or self.variants[self.default]
+
+
+class ResponseCache:
+    """
+    Camada de cache HTTP/compressão.
+    - Payloads imutáveis (catálogo, storytelling) são servidos pré-comprimidos
+      num before_request, respondendo 304 sem executar a view.
+    - Respostas JSON dinâmicas recebem ETag, Cache-Control pela política da rota
+      e gzip acima de COMPRESS_MIN_SIZE.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('HTTP_CACHE_POLICIES', {})
+        app.config.setdefault('COMPRESS_MIN_SIZE', 1024)
+        app.config.setdefault('COMPRESS_LEVEL', 6)
+        app.extensions['http_cache'] = {}
+
+        # Registrado antes dos demais before_request para que o 304 saia sem
+        # tocar no banco (track_access incluso)
+        app.before_request(self._serve_precomputed)
+        app.after_request(self._finalize_response)
+
+    # --- Registro de payloads imutáveis ---
+    def register(self, app, path, body, mimetype='application/json', policy=None, guard=None):
+        payload = Payload(body, mimetype, policy=policy, guard=guard)
+        app.extensions['http_cache'][path] = payload
+        return payload
+
+    def register_json(self, app, path, data, **kwargs):
+        body = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        return self.register(app, path, body, mimetype='application/json', **kwargs)
+
+    def register_localized(self, app, path, bodies, default, mimetype='application/json',
+                           policy=None, guard=None):
+        """bodies: {idioma: bytes}. Cada variante é pré-comprimida como um Payload normal."""
+        variants = {lang: Payload(body, mimetype, policy=policy, language=lang) for lang, body in bodies.items()}
+        app.extensions['http_cache'][path] = entry = LocalizedPayload(variants, default, guard=guard)
+        return entry
+
+    def register_json_localized(self, app, path, data_by_language, default, **kwargs):
+        bodies = {lang: json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+                  for lang, data in data_by_language.items()}
+        return self.register_localized(app, path, bodies, default, **kwargs)
+
+    def register_file(self, app, path, file_path, mimetype='application/json', **kwargs):
+        with open(file_path, 'rb') as f:
+            body = f.read()
+        return self.register(app, path, body, mimetype=mimetype, **kwargs)
+
+    def get(self, path):
+        entry = current_app.extensions['http_cache'].get(path)
+        if isinstance(entry, LocalizedPayload):
+            return entry.select(request.args.get('lang') or session.get('lang'))
+        return entry
+
+    # --- Negociação ---
+    def _accepted_encoding(self, available):
+        accept = request.accept_encodings
+        for encoding in ('br', 'gzip'):
+            if encoding in available and accept[encoding]:
+                return encoding
+        return 'identity'
+
+    def _policy(self, name):
+        return current_app.config['HTTP_CACHE_POLICIES'].get(name)
+
+    # --- Hooks ---
+    def _serve_precomputed(self):
+        if request.method not in ('GET', 'HEAD'):
+            return None
+        entry = current_app.extensions['http_cache'].get(request.path)
+        if entry is None:
+            return None
+        if entry.guard is not None:
+            denied = entry.guard()
+            if denied is not None:
+                return denied
+        return self.serve(self.get(request.path))
+
+    def serve(self, payload):
+        encoding = self._accepted_encoding(payload.bodies)
+        response = current_app.response_class(mimetype=payload.mimetype)
+        response.set_etag(payload.etag_for(encoding))
+        response.vary.add('Accept-Encoding')
+        if payload.language:
+            # Sem ?lang= o idioma vem do cookie de sessão
+            response.headers['Content-Language'] = payload.language
+            response.vary.add('Cookie')
+        policy = self._policy(payload.policy)
+        if policy:
+            response.headers['Cache-Control'] = policy
+
+        if any(request.if_none_match.contains_weak(tag) for tag in payload.etags()):
+            response.status_code = 304
+            return response
+
+        response.set_data(payload.bodies[encoding])
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+        return response
+
+    def _finalize_response(self, response):
+        policy = self._policy(request.endpoint)
+        if policy and 'Cache-Control' not in response.headers:
+            response.headers['Cache-Control'] = policy
+
+        if (request.method not in ('GET', 'HEAD')
+                or response.status_code != 200
+                or response.mimetype != 'application/json'
+                or response.direct_passthrough
+                or 'Content-Encoding' in response.headers):
+            return response
+
+        if not response.get_etag()[0]:
+            response.add_etag()
+        etag, _ = response.get_etag()
+        body = response.get_data()
+        compress = len(body) >= current_app.config['COMPRESS_MIN_SIZE'] and request.accept_encodings['gzip']
+        if compress:
+            response.set_etag(f"{etag}-gzip")
+            response.vary.add('Accept-Encoding')
+
+        # Depois da ETag final; o cliente pode ecoar qualquer uma das formas (com ou sem -gzip),
+        # que identificam o mesmo conteúdo
+        if any(request.if_none_match.contains_weak(tag) for tag in (etag, f"{etag}-gzip")):
+            response.status_code = 304
+            response.set_data(b'')
+            return response
+
+        if compress:
+            response.set_data(gzip.compress(body, compresslevel=current_app.config['COMPRESS_LEVEL']))
+            response.headers['Content-Encoding'] = 'gzip'
+        return response
+
+http_cache = ResponseCache()
@@ -0,0 +1,160 @@
+# /instructor_api.py
+
+import json
+import threading
+from flask import Blueprint, Response, current_app, jsonify, redirect, render_template, request, session, url_for
+from .auth import current_user, instructor_required, is_instructor, login_required
+from .cohorts import can_manage, member_ids
+from .live import ALL, broker, cohort_topic, progress_summary
+from .replica import replica_reads
+
+instructor_bp = Blueprint('instructor', __name__)
+
+
+@instructor_bp.record_once
+def _init_stream_slots(state):
+    # Cada console aberto prende uma thread do gthread por até SSE_MAX_STREAM_SECONDS
+    state.app.extensions['sse_slots'] = threading.BoundedSemaphore(state.app.config['SSE_MAX_STREAMS'])
+
+
+def stream_scope():
+    """
+    (tópicos, ids de membros) que o usuário pode acompanhar, ou None se não puder.
+    Com ?cohort_id= o escopo é a turma; sem ele, tudo (só professores globais).
+    """
+    user = current_user()
+    if not user:
+        return None
+    cohort_id = request.args.get('cohort_id', type=int)
+    if cohort_id is None:
+        return ((ALL,), None) if is_instructor(user) else None
+    if not can_manage(user, cohort_id, global_instructor=is_instructor(user)):
+        return None
+    return (cohort_topic(cohort_id),), member_ids(cohort_id)
+
+
+@instructor_bp.route('/console')
+def console():
+    """Console ao vivo do professor (progresso da turma via SSE)."""
+    if 'user_id' not in session:
+        return redirect(url_for('login'))
+    if stream_scope() is None:
+        return redirect(url_for('dashboard'))
+    return render_template('instructor_console.html', text={'lang': session.get('lang', 'pt')},
+                           stream_url=url_for('instructor.stream', cohort_id=request.args.get('cohort_id', type=int)))
+
+
+@instructor_bp.route('/api/summary')
+@login_required
+@replica_reads
+def summary():
+    scope = stream_scope()
+    if scope is None:
+        return jsonify({"success": False, "error": "Instructor access required"}), 403
+    return jsonify({"success": True, **progress_summary(scope[1])})
+
+
+@instructor_bp.route('/api/engagement')
+@instructor_required
+@replica_reads
+def engagement():
+    """Sessões e permanência por página (agregados de python -m my_app.engagement); ?days=N limita o período."""
+    from datetime import datetime, timedelta
+    from .engagement import engagement_report
+    days = request.args.get('days', type=int)
+    start = datetime.utcnow().date() - timedelta(days=days) if days else None
+    return jsonify({"success": True, **engagement_report(start)})
+
+
+@instructor_bp.route('/api/feedback/search')
+@instructor_required
+def feedback_search():
+    """
+    Busca nas respostas abertas da avaliação (q5/q6), por relevância:
+    ?q=termos&participant_type=&since=AAAA-MM-DD&until=AAAA-MM-DD&language=pt,en&page=1&per_page=20
+    """
+    from datetime import datetime, timedelta
+    from .feedback_search import search_feedback
+    query = (request.args.get('q') or '').strip()
+    if not query:
+        return jsonify({"success": False, "error": "Missing query"}), 400
+    try:
+        since, until = (datetime.strptime(request.args[key], '%Y-%m-%d') if request.args.get(key) else None
+                        for key in ('since', 'until'))
+    except ValueError:
+        return jsonify({"success": False, "error": "Dates must be YYYY-MM-DD"}), 400
+    languages = [l for l in request.args.get('language', '').split(',') if l] or None
+    result = search_feedback(query, participant_type=request.args.get('participant_type') or None,
+                             start=since, end=until + timedelta(days=1) if until else None, languages=languages,
+                             page=request.args.get('page', 1, type=int), per_page=request.args.get('per_page', 20, type=int))
+    return jsonify({"success": True, **result})
+
+
+@instructor_bp.route('/api/profiling', methods=['GET', 'POST'])
+@instructor_required
+def profiling():
+    """
+    Endpoints com profiler ligado. POST {"endpoint": "generate_report", "minutes": 10} liga
+    (minutes 0 desliga) para as requisições autenticadas daquele endpoint, em todos os workers.
+    """
+    from .profiler import load_toggles, set_toggle
+    directory = current_app.config['PROFILE_DIR']
+    if request.method == 'GET':
+        return jsonify({"success": True, "enabled": load_toggles(directory)})
+    data = request.get_json(silent=True) or {}
+    endpoint, minutes = data.get('endpoint'), data.get('minutes', 10)
+    if endpoint not in current_app.view_functions or not isinstance(minutes, (int, float)) \
+            or not 0 <= minutes <= current_app.config['PROFILE_MAX_TOGGLE_MINUTES']:
+        return jsonify({"success": False, "error": "Invalid endpoint or minutes"}), 400
+    return jsonify({"success": True, "enabled": set_toggle(directory, endpoint, minutes)})
+
+
+@instructor_bp.route('/api/stream')
+@login_required
+def stream():
+    """
+    Server-Sent Events com os deltas de progresso.
+    Conexão nova recebe um snapshot; reconexão com Last-Event-ID recebe só o que perdeu.
+    """
+    scope = stream_scope()
+    if scope is None:
+        return jsonify({"success": False, "error": "Instructor access required"}), 403
+    topics, user_ids = scope
+    # Sem vaga, 503 na hora: o resto das threads fica para o jogo (o console tenta de novo)
+    slots = current_app.extensions['sse_slots']
+    if not slots.acquire(blocking=False):
+        response = jsonify({"success": False, "error": "Too many live consoles open, try again shortly"})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(current_app.config['SSE_RETRY_SECONDS'])
+        return response
+    try:
+        last_event_id = request.headers.get('Last-Event-ID', type=int)
+
+        head = b""
+        if last_event_id is None:
+            last_event_id = broker.last_id
+            snapshot = progress_summary(user_ids)
+            head = f"id: {last_event_id}\nevent: snapshot\ndata: {json.dumps(snapshot)}\n\n".encode()
+
+        frames = broker.stream(
+            topics, last_event_id=last_event_id,
+            heartbeat=current_app.config['SSE_HEARTBEAT_SECONDS'],
+            max_seconds=current_app.config['SSE_MAX_STREAM_SECONDS']
+        )
+
+        def generate():
+            if head:
+                yield head
+            yield from frames
+
+        response = Response(generate(), mimetype='text/event-stream', headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        })
+        # Fechado pelo servidor WSGI ao fim do stream ou quando o cliente desconecta
+        response.call_on_close(slots.release)
+    except BaseException:
+        # Falha antes de a resposta existir (snapshot, configuração): devolve a vaga
+        slots.release()
+        raise
+    return response
@@ -0,0 +1,206 @@
+# /jobs.py
+"""
+Fila de jobs persistente (tabela `jobs`) para trabalho pesado fora das requisições:
+relatórios em PDF e exportações. O web só enfileira; `python -m my_app.worker` executa.
+
+- Reserva: UPDATE condicional (SQLite serializa as escritas); no Postgres a linha é
+  escolhida com FOR UPDATE SKIP LOCKED e o limite por tipo é contado sob um advisory lock.
+- Limite de concorrência por tipo (JOB_CONCURRENCY), com retentativas e backoff.
+- Jobs presos em 'running' além de JOB_LOCK_TIMEOUT voltam para a fila.
+"""
+
+import json
+import traceback
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import func, select, text, update
+from sqlalchemy.orm import aliased
+
+from .models import db, Job
+from .replica import read_replica
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class JobError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+class JobFailed(Exception):
+    """Falha definitiva dentro de um handler: não adianta tentar de novo."""
+
+
+class JobResult:
+    __slots__ = ('body', 'mimetype', 'filename')
+
+    def __init__(self, body, mimetype, filename):
+        self.body = body
+        self.mimetype = mimetype
+        self.filename = filename
+
+
+class JobType:
+    def __init__(self, name, handler, concurrency, max_attempts):
+        self.name = name
+        self.handler = handler
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+
+
+HANDLERS = {}
+
+
+def job(name, concurrency=1, max_attempts=3):
+    """Registra um handler: fn(user_id, **payload) -> JobResult (ou None)."""
+    def decorator(fn):
+        HANDLERS[name] = JobType(name, fn, concurrency, max_attempts)
+        return fn
+    return decorator
+
+
+def concurrency_limit(job_type):
+    return current_app.config['JOB_CONCURRENCY'].get(job_type, HANDLERS[job_type].concurrency)
+
+
+# --- Enfileiramento ---
+def enqueue(job_type, user_id=None, payload=None, delay=0):
+    if job_type not in HANDLERS:
+        raise JobError(f"Unknown job type '{job_type}'")
+    queued = Job(job_type=job_type, user_id=user_id, payload=json.dumps(payload or {}),
+                 max_attempts=HANDLERS[job_type].max_attempts,
+                 run_after=datetime.utcnow() + timedelta(seconds=delay))
+    db.session.add(queued)
+    db.session.flush()
+    return queued
+
+
+def pending_for(user_id, job_type):
+    """Job do mesmo tipo ainda na fila ou rodando (evita enfileirar duplicado)."""
+    return Job.query.filter(Job.user_id == user_id, Job.job_type == job_type,
+                            Job.status.in_((QUEUED, RUNNING))).order_by(Job.id.desc()).first()
+
+
+# --- Reserva ---
+def requeue_stale(now=None):
+    """Devolve à fila (ou falha, se esgotou as tentativas) jobs cujo worker morreu."""
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(seconds=current_app.config['JOB_LOCK_TIMEOUT'])
+    stale = (Job.status == RUNNING, Job.locked_at < cutoff)
+    db.session.execute(update(Job).where(*stale, Job.attempts >= Job.max_attempts).values(
+        status=FAILED, error="Worker lock expired", locked_by=None, finished_at=now))
+    db.session.execute(update(Job).where(*stale).values(status=QUEUED, locked_by=None, locked_at=None))
+    db.session.commit()
+
+
+def _claim_one(job_type, worker_id, now):
+    postgres = db.engine.dialect.name == 'postgresql'
+    if postgres:
+        # Só a contagem do limite é serializada (por tipo); a escolha da linha pula as travadas
+        db.session.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {'key': f'jobs:{job_type}'})
+
+    candidate = select(Job.id).where(Job.status == QUEUED, Job.job_type == job_type, Job.run_after <= now) \
+        .order_by(Job.run_after, Job.id).limit(1)
+    if postgres:
+        candidate = candidate.with_for_update(skip_locked=True)
+    job_id = db.session.execute(candidate).scalar()
+    if job_id is None:
+        db.session.commit()
+        return None
+
+    # O limite entra no próprio UPDATE: no SQLite a instrução inteira é atômica
+    running = aliased(Job)
+    running_count = select(func.count(running.id)).where(
+        running.job_type == job_type, running.status == RUNNING).scalar_subquery()
+    claimed = db.session.execute(update(Job).where(
+        Job.id == job_id, Job.status == QUEUED, running_count < concurrency_limit(job_type)
+    ).values(status=RUNNING, locked_by=worker_id, locked_at=now, attempts=Job.attempts + 1)).rowcount
+    db.session.commit()
+    return db.session.get(Job, job_id) if claimed else None
+
+
+def claim(worker_id, job_types=None):
+    """Reserva o job pronto mais antigo entre os tipos com vaga; devolve Job ou None."""
+    now = datetime.utcnow()
+    types = [t for t in (job_types or HANDLERS) if t in HANDLERS]
+    ready = db.session.query(Job.job_type).filter(
+        Job.status == QUEUED, Job.run_after <= now, Job.job_type.in_(types)
+    ).group_by(Job.job_type).order_by(func.min(Job.run_after)).all()
+    db.session.commit()
+    for (job_type,) in ready:
+        claimed = _claim_one(job_type, worker_id, now)
+        if claimed:
+            return claimed
+    return None
+
+
+# --- Execução ---
+def run(claimed, logger=None):
+    """Executa um job já reservado e grava o resultado, reagendando em caso de erro."""
+    job_id = claimed.id
+    job_type = HANDLERS[claimed.job_type]
+    try:
+        result = job_type.handler(claimed.user_id, **json.loads(claimed.payload or '{}'))
+    except Exception as e:
+        db.session.rollback()
+        failed = db.session.get(Job, job_id)
+        retry = not isinstance(e, JobFailed) and failed.attempts < failed.max_attempts
+        failed.error = ''.join(traceback.format_exception_only(type(e), e)).strip()[:2000]
+        failed.locked_by = failed.locked_at = None
+        if retry:
+            backoff = current_app.config['JOB_RETRY_BACKOFF'] * 2 ** (failed.attempts - 1)
+            failed.status, failed.run_after = QUEUED, datetime.utcnow() + timedelta(seconds=backoff)
+        else:
+            failed.status, failed.finished_at = FAILED, datetime.utcnow()
+        db.session.commit()
+        if logger:
+            logger.warning(f"Job {job_id} ({job_type.name}) failed: {failed.error}")
+        return failed
+
+    done = db.session.get(Job, job_id)
+    done.status, done.finished_at = DONE, datetime.utcnow()
+    done.locked_by = done.locked_at = None
+    done.error = None
+    if result is not None:
+        done.result, done.result_mimetype, done.result_filename = result.body, result.mimetype, result.filename
+    db.session.commit()
+    return done
+
+
+def purge_finished(older_than_seconds):
+    """Remove jobs concluídos/falhos (e seus arquivos) mais antigos que o prazo."""
+    cutoff = datetime.utcnow() - timedelta(seconds=older_than_seconds)
+    removed = Job.query.filter(Job.status.in_((DONE, FAILED)), Job.finished_at < cutoff) \
+        .delete(synchronize_session=False)
+    db.session.commit()
+    return removed
+
+
+def job_to_dict(item):
+    data = {
+        "id": item.id, "type": item.job_type, "status": item.status, "attempts": item.attempts,
+        "created_at": item.created_at.isoformat() if item.created_at else None,
+        "finished_at": item.finished_at.isoformat() if item.finished_at else None,
+    }
+    if item.status == FAILED:
+        data["error"] = "Job failed"
+    return data
+
+
+# --- Tipos de job ---
+@job('report', concurrency=2)
+def report_job(user_id, lang=None, requested_at=None):
+    from .reports import render_user_report
+    # Lê da réplica desde que ela já tenha o que existia quando o relatório foi pedido
+    fresh_as_of = datetime.utcfromtimestamp(requested_at) if requested_at else None
+    with read_replica(fresh_as_of):
+        pdf = render_user_report(user_id, lang)
+    if pdf is None:
+        raise JobFailed("Usuário não encontrado")
+    return JobResult(pdf, 'application/pdf', 'relatorio.pdf')
@@ -0,0 +1,60 @@
+# /jobs_api.py
+
+import time
+
+from flask import Blueprint, jsonify, session, url_for
+from .models import db, Job
+from .auth import login_required
+from .jobs import DONE, JobError, enqueue, job_to_dict, pending_for
+
+jobs_bp = Blueprint('jobs_api', __name__)
+
+
+@jobs_bp.errorhandler(JobError)
+def handle_job_error(e):
+    db.session.rollback()
+    return jsonify({"success": False, "error": e.message}), e.status
+
+
+def _own_job(job_id):
+    item = db.session.get(Job, job_id)
+    if not item or item.user_id != session['user_id']:
+        raise JobError("Job not found", 404)
+    return item
+
+
+def _job_response(item, status=200):
+    data = job_to_dict(item)
+    data["status_url"] = url_for('jobs_api.job_status', job_id=item.id)
+    if item.status == DONE:
+        data["download_url"] = url_for('jobs_api.job_download', job_id=item.id)
+    return jsonify({"success": True, "job": data}), status
+
+
+@jobs_bp.route('/report', methods=['POST'])
+@login_required
+def request_report():
+    """Enfileira o PDF do usuário e responde na hora com o id do job."""
+    item = pending_for(session['user_id'], 'report') or \
+        enqueue('report', user_id=session['user_id'], payload={'lang': session.get('lang'), 'requested_at': time.time()})
+    db.session.commit()
+    return _job_response(item, 202)
+
+
+@jobs_bp.route('/<int:job_id>', methods=['GET'])
+@login_required
+def job_status(job_id):
+    return _job_response(_own_job(job_id))
+
+
+@jobs_bp.route('/<int:job_id>/download', methods=['GET'])
+@login_required
+def job_download(job_id):
+    item = _own_job(job_id)
+    if item.status != DONE or item.result is None:
+        return jsonify({"success": False, "error": "Job not finished", "status": item.status}), 409
+    return item.result, 200, {
+        "Content-Type": item.result_mimetype,
+        "Content-Disposition": f"attachment; filename={item.result_filename}",
+        "Cache-Control": "private, no-store",
+    }
@@ -0,0 +1,137 @@
+# /live.py
+
+import json
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+from .models import db, UserProgress, StationResult
+
+ALL = 'all'  # tópico com o progresso de todos os jogadores
+
+
+def cohort_topic(cohort_id):
+    return f'cohort:{cohort_id}'
+
+
+class ProgressBroker:
+    """
+    Pub/sub em processo para o console dos professores.
+    Cada publicação é serializada uma única vez num log circular compartilhado;
+    os assinantes só avançam um cursor sobre esse log (sem cópia por assinante).
+    """
+
+    def __init__(self, history=2000):
+        self._cond = threading.Condition()
+        self._log = deque(maxlen=history)  # (id, tópico, frame SSE já codificado)
+        # Ids crescem entre reinícios: um Last-Event-ID de outro processo nunca parece "futuro"
+        self._last_id = int(time.time() * 1000)
+
+    @property
+    def last_id(self):
+        return self._last_id
+
+    def publish(self, topic, event_type, data):
+        with self._cond:
+            self._last_id += 1
+            event_id = self._last_id
+            frame = f"id: {event_id}\nevent: {event_type}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+            self._log.append((event_id, topic, frame.encode('utf-8')))
+            self._cond.notify_all()
+        return event_id
+
+    def _frames_after(self, cursor, topics):
+        """Frames com id > cursor, ou None se o cursor já saiu do histórico."""
+        if not self._log or cursor >= self._last_id:
+            return []
+        first_id = self._log[0][0]
+        if cursor < first_id - 1:
+            return None
+        start = cursor - first_id + 1
+        return [frame for i in range(start, len(self._log))
+                for (_, topic, frame) in (self._log[i],) if topic in topics]
+
+    def stream(self, topics, last_event_id=None, heartbeat=15, max_seconds=None):
+        """Gerador de frames SSE; envia heartbeat e encerra após max_seconds."""
+        topics = set(topics)
+        cursor = self._last_id if last_event_id is None else last_event_id
+        deadline = time.monotonic() + max_seconds if max_seconds else None
+
+        yield b"retry: 3000\n\n"
+        while deadline is None or time.monotonic() < deadline:
+            with self._cond:
+                self._cond.wait_for(lambda: self._last_id > cursor, timeout=heartbeat)
+                frames = self._frames_after(cursor, topics)
+                cursor = self._last_id
+            if frames is None:
+                # Perdeu eventos: o cliente deve buscar o snapshot de novo
+                yield f"id: {cursor}\nevent: reset\ndata: {{}}\n\n".encode()
+            elif frames:
+                yield b"".join(frames)
+            else:
+                yield b": keep-alive\n\n"
+
+
+broker = ProgressBroker()
+
+
+# --- Publicação após o commit ---
+def queue_delta(event_type, data, topics=(ALL,)):
+    """Agenda um delta para ser publicado somente se a transação atual for confirmada."""
+    db.session.info.setdefault('live_deltas', []).append((tuple(topics), event_type, data))
+
+
+# Savepoints (begin_nested) também disparam after_commit/after_rollback: só a transação de fora
+# publica; o rollback de um savepoint descarta apenas os deltas agendados dentro dele.
+@event.listens_for(Session, 'after_transaction_create')
+def _mark_savepoint(session, transaction):
+    if transaction.nested:
+        session.info.setdefault('live_marks', {})[transaction] = len(session.info.get('live_deltas', ()))
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _forget_savepoint(session, transaction):
+    if transaction.nested:
+        session.info.get('live_marks', {}).pop(transaction, None)
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_deltas(session):
+    if session.in_nested_transaction():
+        return
+    for topics, event_type, data in session.info.pop('live_deltas', []):
+        for topic in topics:
+            broker.publish(topic, event_type, data)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_deltas(session):
+    if session.in_nested_transaction():
+        mark = session.info.get('live_marks', {}).get(session.get_nested_transaction())
+        if mark is not None:
+            del session.info.get('live_deltas', [])[mark:]
+        return
+    session.info.pop('live_deltas', None)
+
+
+# --- Snapshot agregado ---
+def progress_summary(user_ids=None):
+    """Conclusões e pontuação por estação + distribuição da estação atual."""
+    results = db.session.query(
+        StationResult.station_id, func.count(StationResult.id), func.sum(StationResult.score)
+    ).group_by(StationResult.station_id)
+    current = db.session.query(
+        UserProgress.current_challenge_id, func.count(UserProgress.id)
+    ).group_by(UserProgress.current_challenge_id)
+    if user_ids is not None:
+        results = results.filter(StationResult.user_id.in_(user_ids))
+        current = current.filter(UserProgress.user_id.in_(user_ids))
+
+    return {
+        "stations": {sid: {"completions": n, "score_sum": int(total or 0)} for sid, n, total in results},
+        "current_station": {sid: n for sid, n in current},
+        "last_event_id": broker.last_id
+    }
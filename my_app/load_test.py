@@ -0,0 +1,219 @@
+# /load_test.py
+"""
+Teste de carga de ponta a ponta: N jogadores simultâneos jogando as 15 estações.
+
+Sobe o create_app num banco descartável, atende via servidor HTTP real (werkzeug, em thread)
+e cada jogador: cadastra, faz login, consulta /api/game/progress, roda
+start -> complete -> station_result em todas as estações, envia a avaliação e baixa o PDF.
+
+Uso:
+    python -m my_app.load_test --players 20
+    python -m my_app.load_test --players 50 --json bench_output.json
+"""
+
+import argparse
+import http.cookiejar
+import json
+import os
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+
+
+def percentile(sorted_values, pct):
+    """Percentil por posto mais próximo (lista já ordenada)."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+class Recorder:
+    """Latências (lado do cliente) e consultas SQL (lado do servidor) por endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.queries = defaultdict(int)
+
+    def request(self, label, seconds, ok):
+        with self._lock:
+            self.latencies[label].append(seconds)
+            if not ok:
+                self.errors[label] += 1
+
+    def query(self, label):
+        with self._lock:
+            self.queries[label] += 1
+
+    def report(self, wall_seconds):
+        rows = []
+        for label in sorted(self.latencies):
+            values = sorted(self.latencies[label])
+            count = len(values)
+            rows.append({
+                "endpoint": label,
+                "requests": count,
+                "errors": self.errors[label],
+                "throughput_rps": round(count / wall_seconds, 2) if wall_seconds else 0,
+                "p50_ms": round(percentile(values, 50) * 1000, 2),
+                "p95_ms": round(percentile(values, 95) * 1000, 2),
+                "p99_ms": round(percentile(values, 99) * 1000, 2),
+                "queries_per_request": round(self.queries[label] / count, 2) if count else 0,
+            })
+        return rows
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    """Não segue redirects: cada chamada mede um único endpoint."""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+class Player:
+    """Um jogador com seu próprio cookie jar, falando HTTP com o servidor."""
+
+    def __init__(self, base_url, number, recorder):
+        self.base_url = base_url
+        self.number = number
+        self.recorder = recorder
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), _NoRedirect())
+
+    def call(self, method, path, label=None, json_body=None, form=None):
+        label = label or f"{method} {path}"
+        headers = {}
+        data = None
+        if json_body is not None:
+            data = json.dumps(json_body).encode()
+            headers['Content-Type'] = 'application/json'
+        elif form is not None:
+            data = urllib.parse.urlencode(form).encode()
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+
+        req = urllib.request.Request(self.base_url + path, data=data, method=method, headers=headers)
+        started = time.perf_counter()
+        try:
+            with self.opener.open(req) as resp:
+                body = resp.read()
+                ok = resp.status < 400
+        except urllib.error.HTTPError as e:
+            body, ok = e.read(), e.code < 400
+        self.recorder.request(label, time.perf_counter() - started, ok)
+        return body
+
+    def play(self, challenges, password='senha-de-carga'):
+        email = f"player{self.number}@load.test"
+        self.call('POST', '/register', form={
+            'username': f"player{self.number}", 'email': email, 'password': password,
+            'profession': 'Enfermeiro', 'country': 'Brasil'})
+        self.call('POST', '/login', form={'email': email, 'password': password})
+        self.call('GET', '/api/game/progress')
+
+        for challenge_id in sorted(challenges):
+            challenge = challenges[challenge_id]
+            self.call('POST', '/api/game/challenge/start', json_body={'challenge_id': challenge_id})
+            self.call('POST', '/api/game/challenge/complete', json_body={
+                'challenge_id': challenge_id, 'score': challenge.get('points', 0), 'time_spent': 30,
+                'key_earned': challenge.get('keyReward')})
+            self.call('POST', '/api/station_result', json_body={
+                'station_id': challenge_id, 'score': challenge.get('points', 0), 'time_spent': 30})
+
+        self.call('POST', '/api/save_evaluation', json_body={
+            'participantType': 'estudante', 'participationType': 'sozinho', 'team': [],
+            'q1': 5, 'q2': 4, 'q3': 5, 'q4': 4, 'q5': 'Dinâmica envolvente', 'q6': 'Mais estações'})
+        self.call('GET', '/api/generate_report')
+
+
+def run(players=10, database_url=None):
+    """Executa a sessão completa com `players` jogadores simultâneos e devolve o relatório."""
+    from flask import has_request_context, request
+    from sqlalchemy import event
+    from werkzeug.serving import WSGIRequestHandler, make_server
+    from . import create_app, db
+    from .catalog import catalog
+    from .feedback_search import create_search_table
+    challenges = catalog.challenges
+
+    tmpdir = None
+    if database_url is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        database_url = 'sqlite:///' + os.path.join(tmpdir.name, 'load.db')
+
+    engine_options = {'connect_args': {'timeout': 30}} if database_url.startswith('sqlite') else {}
+    # Todos os jogadores saem do mesmo IP: sem o limitador, mede-se o app e não o 429
+    app = create_app('production', SQLALCHEMY_DATABASE_URI=database_url,
+                     SQLALCHEMY_ENGINE_OPTIONS=engine_options, RATE_LIMIT_ENABLED=False)
+    recorder = Recorder()
+
+    with app.app_context():
+        db.create_all()
+        # O índice de busca é DDL à mão (fora dos modelos): /api/save_evaluation grava nele
+        with db.engine.begin() as connection:
+            create_search_table(connection)
+
+        @event.listens_for(db.engine, 'before_cursor_execute')
+        def count_query(conn, cursor, statement, parameters, context, executemany):
+            if has_request_context() and request.url_rule is not None:
+                recorder.query(f"{request.method} {request.url_rule.rule}")
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    try:
+        started = time.perf_counter()
+        workers = [threading.Thread(target=Player(base_url, n, recorder).play, args=(challenges,))
+                   for n in range(players)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        wall = time.perf_counter() - started
+    finally:
+        server.shutdown()
+        if tmpdir is not None:
+            with app.app_context():
+                db.engine.dispose()
+            tmpdir.cleanup()
+
+    return {"players": players, "wall_seconds": round(wall, 3), "endpoints": recorder.report(wall)}
+
+
+def print_report(report):
+    print(f"\n{report['players']} jogadores em {report['wall_seconds']}s\n")
+    header = f"{'endpoint':<42}{'req':>6}{'err':>5}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'q/req':>7}"
+    print(header)
+    print('-' * len(header))
+    for row in report['endpoints']:
+        print(f"{row['endpoint']:<42}{row['requests']:>6}{row['errors']:>5}{row['throughput_rps']:>9}"
+              f"{row['p50_ms']:>9}{row['p95_ms']:>9}{row['p99_ms']:>9}{row['queries_per_request']:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Teste de carga da sessão completa de 15 estações.")
+    parser.add_argument('--players', type=int, default=10)
+    parser.add_argument('--database-url', default=None, help="padrão: SQLite descartável")
+    parser.add_argument('--json', dest='json_path', default=None, help="grava o relatório em JSON")
+    args = parser.parse_args()
+
+    report = run(players=args.players, database_url=args.database_url)
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,329 @@
+# /metrics.py
+"""
+Métricas do app em texto do Prometheus, em GET /metrics.
+
+- Latência por endpoint, método e status (http_request_duration_seconds), medida do
+  primeiro before_request ao teardown; requisições em andamento por endpoint
+  (http_requests_in_flight); exceções não tratadas; erros que antes só iam para o log
+  (app_errors_total); duração da renderização dos PDFs (pdf_render_duration_seconds).
+- Histogramas no estilo HDR: faixas log-lineares em microssegundos (8 por potência de 2,
+  erro relativo <= 12,5%), guardadas esparsas. Na exposição viram as faixas cumulativas
+  de METRICS_BUCKETS.
+- Pouca disputa: cada thread grava no seu próprio fragmento (com uma trava que só a
+  coleta disputa); /metrics soma os fragmentos.
+- Vários processos (workers do gunicorn, python -m my_app.worker): com METRICS_DIR, cada
+  processo grava um retrato em METRICS_DIR/<pid>.json a cada METRICS_FLUSH_SECONDS e o
+  /metrics de qualquer worker soma todos. Contadores de processos que já saíram
+  continuam valendo; gauges só contam processos vivos. Limpe o diretório no deploy.
+- Acesso com METRICS_TOKEN ("Authorization: Bearer <token>"); sem ele /metrics responde
+  404, a não ser com METRICS_PUBLIC=1 (uso local, opt-in explícito).
+"""
+
+import atexit
+import glob
+import json
+import logging
+import os
+import threading
+import time
+
+from flask import current_app, g, request
+
+logger = logging.getLogger(__name__)
+
+REQUEST_DURATION = 'http_request_duration_seconds'
+IN_FLIGHT = 'http_requests_in_flight'
+EXCEPTIONS = 'http_request_exceptions_total'
+ERRORS = 'app_errors_total'
+PDF_RENDER = 'pdf_render_duration_seconds'
+
+# nome -> (tipo, ajuda, labels)
+DEFINITIONS = {
+    REQUEST_DURATION: ('histogram', "Request latency by endpoint, method and status.", ('endpoint', 'method', 'status')),
+    IN_FLIGHT: ('gauge', "Requests being handled right now.", ('endpoint',)),
+    EXCEPTIONS: ('counter', "Unhandled exceptions by endpoint.", ('endpoint', 'exception')),
+    ERRORS: ('counter', "Errors caught and logged by the app.", ('source',)),
+    PDF_RENDER: ('histogram', "PDF report render time.", ('language',)),
+}
+
+SUB_BITS = 3  # 2**3 faixas por potência de 2
+SUB_COUNT = 1 << SUB_BITS
+
+
+def bucket_index(micros):
+    """Faixa HDR de um valor em microssegundos (inteiro >= 0)."""
+    if micros < SUB_COUNT:
+        return micros
+    shift = micros.bit_length() - SUB_BITS - 1
+    return ((shift + 1) << SUB_BITS) + (micros >> shift) - SUB_COUNT
+
+
+def bucket_lower(index):
+    """Menor valor (µs) da faixa `index`; a faixa vai até bucket_lower(index + 1)."""
+    if index < SUB_COUNT:
+        return index
+    shift = (index >> SUB_BITS) - 1
+    return ((index & (SUB_COUNT - 1)) + SUB_COUNT) << shift
+
+
+class Shard:
+    """Métricas gravadas por uma thread."""
+    __slots__ = ('lock', 'histograms', 'counters', 'gauges')
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}  # (nome, labels) -> [{faixa: n}, soma, contagem]
+        self.counters = {}
+        self.gauges = {}
+
+
+class Metrics:
+    def __init__(self):
+        self.directory = None
+        self.flush_seconds = 5.0
+        self._local = threading.local()
+        self._shards = []
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._flusher = None
+
+    def init_app(self, app):
+        app.extensions['metrics'] = self
+        if not app.config['METRICS_ENABLED']:
+            return
+        self.directory = app.config['METRICS_DIR']
+        self.flush_seconds = app.config['METRICS_FLUSH_SECONDS']
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+        # Primeiro de todos, para medir também o que os outros before_request gastam (ou recusam)
+        app.before_request_funcs.setdefault(None, []).insert(0, self._start)
+        app.after_request(self._status)
+        app.teardown_request(self._finish)
+        app.add_url_rule('/metrics', 'metrics', self._view)
+
+    # --- Gravação ---
+    def _shard(self):
+        shard = getattr(self._local, 'shard', None)
+        if shard is None or self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    # Processo filho (fork do gunicorn): começa do zero, com arquivo próprio
+                    self._pid, self._shards, self._flusher = os.getpid(), [], None
+                    self._local = threading.local()
+                shard = self._local.shard = Shard()
+                self._shards.append(shard)
+                if self.directory and self._flusher is None:
+                    self._start_flusher()
+        return shard
+
+    def observe(self, name, labels, seconds):
+        index = bucket_index(int(seconds * 1e6))
+        shard = self._shard()
+        with shard.lock:
+            entry = shard.histograms.get((name, labels))
+            if entry is None:
+                entry = shard.histograms[(name, labels)] = [{}, 0.0, 0]
+            buckets = entry[0]
+            buckets[index] = buckets.get(index, 0) + 1
+            entry[1] += seconds
+            entry[2] += 1
+
+    def inc(self, name, labels, amount=1):
+        shard = self._shard()
+        with shard.lock:
+            shard.counters[(name, labels)] = shard.counters.get((name, labels), 0) + amount
+
+    def gauge_add(self, name, labels, amount):
+        shard = self._shard()
+        with shard.lock:
+            shard.gauges[(name, labels)] = shard.gauges.get((name, labels), 0) + amount
+
+    def count_error(self, source):
+        self.inc(ERRORS, (source,))
+
+    def reset(self):
+        with self._lock:
+            self._shards = []
+            self._local = threading.local()
+
+    # --- Hooks de requisição ---
+    def _start(self):
+        endpoint = request.endpoint or 'unmatched'
+        g.metrics_started = (time.perf_counter(), endpoint)
+        self.gauge_add(IN_FLIGHT, (endpoint,), 1)
+
+    def _status(self, response):
+        g.metrics_status = response.status_code
+        return response
+
+    def _finish(self, exc):
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return
+        start, endpoint = started
+        self.gauge_add(IN_FLIGHT, (endpoint,), -1)
+        status = 500 if exc is not None else g.pop('metrics_status', 500)
+        self.observe(REQUEST_DURATION, (endpoint, request.method, str(status)), time.perf_counter() - start)
+        if exc is not None:
+            self.inc(EXCEPTIONS, (endpoint, type(exc).__name__))
+
+    # --- Retratos e soma entre processos ---
+    def snapshot(self):
+        """Métricas deste processo: {'histograms': {...}, 'counters': {...}, 'gauges': {...}}."""
+        histograms, counters, gauges = {}, {}, {}
+        with self._lock:
+            shards = list(self._shards)
+        for shard in shards:
+            with shard.lock:
+                for key, (buckets, total, count) in shard.histograms.items():
+                    merged = histograms.setdefault(key, [{}, 0.0, 0])
+                    for index, n in buckets.items():
+                        merged[0][index] = merged[0].get(index, 0) + n
+                    merged[1] += total
+                    merged[2] += count
+                for key, value in shard.counters.items():
+                    counters[key] = counters.get(key, 0) + value
+                for key, value in shard.gauges.items():
+                    gauges[key] = gauges.get(key, 0) + value
+        return {'histograms': histograms, 'counters': counters, 'gauges': gauges}
+
+    def _path(self, pid):
+        return os.path.join(self.directory, f"{pid}.json")
+
+    def flush(self):
+        """Grava o retrato deste processo em METRICS_DIR (arquivo temporário + rename)."""
+        if not self.directory:
+            return
+        data = self.snapshot()
+        encoded = {
+            'histograms': [[name, list(labels), {str(i): n for i, n in buckets.items()}, total, count]
+                           for (name, labels), (buckets, total, count) in data['histograms'].items()],
+            'counters': [[name, list(labels), value] for (name, labels), value in data['counters'].items()],
+            'gauges': [[name, list(labels), value] for (name, labels), value in data['gauges'].items()],
+        }
+        path = self._path(os.getpid())
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(encoded, f)
+        os.replace(tmp, path)
+
+    def _start_flusher(self):
+        def loop():
+            while True:
+                time.sleep(self.flush_seconds)
+                try:
+                    self.flush()
+                except OSError as e:
+                    logger.warning("metrics flush failed: %s", e)
+        self._flusher = threading.Thread(target=loop, name='metrics-flush', daemon=True)
+        self._flusher.start()
+        atexit.register(self.flush)
+
+    def collect(self):
+        """Este processo (ao vivo) mais os retratos dos outros em METRICS_DIR."""
+        data = self.snapshot()
+        if not self.directory:
+            return data
+        own = self._path(os.getpid())
+        for path in glob.glob(os.path.join(self.directory, '*.json')):
+            if path == own:
+                continue
+            try:
+                with open(path, encoding='utf-8') as f:
+                    other = json.load(f)
+            except (OSError, ValueError):
+                continue
+            alive = _alive(os.path.basename(path)[:-len('.json')])
+            for name, labels, buckets, total, count in other['histograms']:
+                merged = data['histograms'].setdefault((name, tuple(labels)), [{}, 0.0, 0])
+                for index, n in buckets.items():
+                    merged[0][int(index)] = merged[0].get(int(index), 0) + n
+                merged[1] += total
+                merged[2] += count
+            for name, labels, value in other['counters']:
+                data['counters'][(name, tuple(labels))] = data['counters'].get((name, tuple(labels)), 0) + value
+            if alive:
+                for name, labels, value in other['gauges']:
+                    data['gauges'][(name, tuple(labels))] = data['gauges'].get((name, tuple(labels)), 0) + value
+        return data
+
+    # --- Exposição ---
+    def render(self, buckets=None):
+        """Texto no formato de exposição do Prometheus (0.0.4)."""
+        buckets = buckets or current_app.config['METRICS_BUCKETS']
+        data = self.collect()
+        series = {'histogram': data['histograms'], 'counter': data['counters'], 'gauge': data['gauges']}
+        lines = []
+        for name, (kind, help_text, label_names) in DEFINITIONS.items():
+            rows = sorted((labels, value) for (metric, labels), value in series[kind].items() if metric == name)
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in rows:
+                pairs = list(zip(label_names, labels))
+                if kind != 'histogram':
+                    lines.append(f"{name}{_labels(pairs)} {_number(value)}")
+                    continue
+                counts, total, count = value
+                for le, cumulative in _cumulative(counts, buckets):
+                    lines.append(f"{name}_bucket{_labels(pairs + [('le', le)])} {cumulative}")
+                lines.append(f"{name}_bucket{_labels(pairs + [('le', '+Inf')])} {count}")
+                lines.append(f"{name}_sum{_labels(pairs)} {_number(total)}")
+                lines.append(f"{name}_count{_labels(pairs)} {count}")
+        return '\n'.join(lines) + '\n'
+
+    def _view(self):
+        token = current_app.config['METRICS_TOKEN']
+        if not token and not current_app.config['METRICS_PUBLIC']:
+            # Sem token a rota nem existe, qualquer que seja o config (wsgi.py sobe com DEBUG)
+            return current_app.response_class("not found\n", status=404, mimetype='text/plain')
+        if token and request.headers.get('Authorization') != f"Bearer {token}":
+            return current_app.response_class("unauthorized\n", status=401, mimetype='text/plain')
+        return current_app.response_class(self.render(), mimetype='text/plain; version=0.0.4; charset=utf-8',
+                                          headers={'Cache-Control': 'no-store'})
+
+
+def _alive(pid):
+    try:
+        os.kill(int(pid), 0)
+    except (ValueError, ProcessLookupError):
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _cumulative(counts, buckets):
+    """Contagens HDR -> faixas cumulativas `le` (segundos); cada faixa HDR entra pelo seu ponto médio."""
+    ordered = sorted(counts.items())
+    result = []
+    running = 0
+    position = 0
+    for le in buckets:
+        limit = le * 1e6
+        while position < len(ordered):
+            index, n = ordered[position]
+            if (bucket_lower(index) + bucket_lower(index + 1)) / 2 > limit:
+                break
+            running += n
+            position += 1
+        result.append((_number(le), running))
+    return result
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(pairs):
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in pairs) + '}'
+
+
+def _number(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+metrics = Metrics()
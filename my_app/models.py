@@ -7,7 +7,10 @@ import hashlib
 import uuid
 import json  # Importação necessária para lidar com as chaves (keys)
 
-db = SQLAlchemy()
+from .replica import RoutingSession
+
+# RoutingSession manda as leituras de read_replica() para o bind 'replica' (my_app/replica.py)
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -53,18 +56,62 @@ class SiteAccess(db.Model):
     country = db.Column(db.String(50), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+class PageUrl(db.Model):
+    """Dimensão de page_views: cada URL distinta guardada uma vez."""
+    __tablename__ = 'page_urls'
+
+    id = db.Column(db.Integer, primary_key=True)
+    url = db.Column(db.String(200), unique=True, nullable=False)
+
+
+class PageEndpoint(db.Model):
+    __tablename__ = 'page_endpoints'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), unique=True, nullable=False)
+
+
+class UserAgent(db.Model):
+    __tablename__ = 'user_agents'
+
+    id = db.Column(db.Integer, primary_key=True)
+    value = db.Column(db.String(500), unique=True, nullable=False)
+
+
 class PageViews(db.Model):
     __tablename__ = 'page_views'
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
     visitor_id = db.Column(db.String(36), nullable=False)
-    page_url = db.Column(db.String(200), nullable=False)
-    page_title = db.Column(db.String(100), nullable=False)
+    # URL, endpoint e user-agent ficam nas dimensões (my_app/dimensions.py); aqui só os ids
+    url_id = db.Column(db.Integer, db.ForeignKey('page_urls.id'), nullable=False)
+    endpoint_id = db.Column(db.Integer, db.ForeignKey('page_endpoints.id'), nullable=False)
     language = db.Column(db.String(5), nullable=False)
     ip_address = db.Column(db.String(45), nullable=True)
-    user_agent = db.Column(db.Text, nullable=True)
-    accessed_at = db.Column(db.DateTime, default=datetime.utcnow)
+    user_agent_id = db.Column(db.Integer, db.ForeignKey('user_agents.id'), nullable=True)
+    accessed_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    url = db.relationship('PageUrl')
+    endpoint = db.relationship('PageEndpoint')
+    agent = db.relationship('UserAgent')
+
+    @property
+    def page_url(self):
+        return self.url.url
+
+    @property
+    def page_title(self):
+        return self.endpoint.name
+
+    @property
+    def user_agent(self):
+        return self.agent.value if self.agent else None
+
+def encode_keys(keys):
+    """earned_keys como é gravado: JSON compacto, sem repetições, na ordem em que foram ganhas."""
+    return json.dumps(list(dict.fromkeys(keys)), separators=(',', ':'))
+
 
 class UserProgress(db.Model):
     __tablename__ = 'user_progress'
@@ -85,7 +132,7 @@ class UserProgress(db.Model):
         keys = self.get_keys()
         if key not in keys:
             keys.append(key)
-            self._earned_keys = json.dumps(keys)
+            self._earned_keys = encode_keys(keys)
 
     def __repr__(self):
         return f'<UserProgress user_id={self.user_id} challenge={self.current_challenge_id}>'
@@ -94,7 +141,7 @@ class ChallengeAttempt(db.Model):
     __tablename__ = 'challenge_attempts'
     
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     challenge_id = db.Column(db.Integer, nullable=False)
     
     status = db.Column(db.String(20), nullable=False, default='started')
@@ -124,12 +171,160 @@ class StationResult(db.Model):
     def __repr__(self):
         return f'<StationResult user_id={self.user_id} station={self.station_id} score={self.score}>'
 
+class GameEvent(db.Model):
+    """Evento de jogo enviado em lote pelo cliente (deduplicado por client_id + seq)."""
+    __tablename__ = 'game_events'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    client_id = db.Column(db.String(36), nullable=False)
+    seq = db.Column(db.Integer, nullable=False)
+    event_type = db.Column(db.String(20), nullable=False)  # start/hint/answer/complete
+    challenge_id = db.Column(db.Integer, nullable=True)
+    payload = db.Column(db.Text, nullable=True)
+    status = db.Column(db.String(20), nullable=False)      # applied/rejected
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'client_id', 'seq', name='uq_event_client_seq'),
+    )
+
+    def __repr__(self):
+        return f'<GameEvent user_id={self.user_id} seq={self.seq} type={self.event_type}>'
+
+class Cohort(db.Model):
+    """Turma: agrupa jogadores para que vários professores usem a mesma instalação."""
+    __tablename__ = 'cohorts'
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    join_code = db.Column(db.String(12), nullable=False, unique=True, index=True)
+    owner_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    is_active = db.Column(db.Boolean, default=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    memberships = db.relationship('CohortMembership', backref='cohort', lazy='dynamic', cascade="all, delete-orphan")
+
+    def __repr__(self):
+        return f'<Cohort {self.name} code={self.join_code}>'
+
+class CohortMembership(db.Model):
+    __tablename__ = 'cohort_memberships'
+
+    id = db.Column(db.Integer, primary_key=True)
+    cohort_id = db.Column(db.Integer, db.ForeignKey('cohorts.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    role = db.Column(db.String(20), nullable=False, default='student')  # student/instructor
+    joined_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # (cohort_id, user_id) também serve de índice para varrer os membros de uma turma
+    __table_args__ = (
+        db.UniqueConstraint('cohort_id', 'user_id', name='uq_cohort_member'),
+    )
+
+    def __repr__(self):
+        return f'<CohortMembership cohort={self.cohort_id} user={self.user_id} role={self.role}>'
+
+class Job(db.Model):
+    """Tarefa em segundo plano (relatórios, exportações) executada por `python -m my_app.worker`."""
+    __tablename__ = 'jobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    job_type = db.Column(db.String(30), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True, index=True)
+    payload = db.Column(db.Text, nullable=True)  # argumentos em JSON
+    status = db.Column(db.String(20), nullable=False, default='queued')  # queued/running/done/failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=3)
+    run_after = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    locked_by = db.Column(db.String(64), nullable=True)
+    locked_at = db.Column(db.DateTime, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    result = db.Column(db.LargeBinary, nullable=True)
+    result_mimetype = db.Column(db.String(100), nullable=True)
+    result_filename = db.Column(db.String(200), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    # O worker busca por (status, run_after)
+    __table_args__ = (
+        db.Index('ix_jobs_status_run_after', 'status', 'run_after'),
+    )
+
+    def __repr__(self):
+        return f'<Job {self.id} type={self.job_type} status={self.status}>'
+
+class SessionStat(db.Model):
+    """Sessões fechadas por dia de início e idioma (my_app/engagement.py); somadas a cada execução."""
+    __tablename__ = 'session_stats'
+
+    day = db.Column(db.Date, primary_key=True)
+    language = db.Column(db.String(5), primary_key=True)
+    sessions = db.Column(db.Integer, nullable=False, default=0)
+    bounces = db.Column(db.Integer, nullable=False, default=0)  # sessões de uma página só
+    page_views = db.Column(db.Integer, nullable=False, default=0)
+    duration_seconds = db.Column(db.Float, nullable=False, default=0.0)
+    duration_histogram = db.Column(db.Text, nullable=False, default='[]')  # contagens por faixa (SESSION_BINS)
+
+
+class DwellStat(db.Model):
+    """Visitas e tempo até a próxima página, por dia, endpoint, estação e idioma (my_app/engagement.py)."""
+    __tablename__ = 'dwell_stats'
+
+    day = db.Column(db.Date, primary_key=True)
+    endpoint = db.Column(db.String(100), primary_key=True)
+    challenge_id = db.Column(db.Integer, primary_key=True, default=0)  # estação (/station/<id>); 0 nas demais
+    language = db.Column(db.String(5), primary_key=True)
+    views = db.Column(db.Integer, nullable=False, default=0)
+    dwell_count = db.Column(db.Integer, nullable=False, default=0)  # a última página da sessão não tem tempo
+    dwell_seconds = db.Column(db.Float, nullable=False, default=0.0)
+    dwell_histogram = db.Column(db.Text, nullable=False, default='[]')  # contagens por faixa (DWELL_BINS)
+
+
+class SessionizationState(db.Model):
+    """Linha única: até onde page_views já foi processada e as sessões ainda abertas."""
+    __tablename__ = 'sessionization_state'
+
+    id = db.Column(db.Integer, primary_key=True)
+    watermark_at = db.Column(db.DateTime, nullable=True)
+    watermark_id = db.Column(db.Integer, nullable=False, default=0)
+    open_sessions = db.Column(db.Text, nullable=False, default='[]')
+    updated_at = db.Column(db.DateTime, nullable=True)
+
+
+class DataMigration(db.Model):
+    """Checkpoint de uma migração de dados em lotes (my_app/backfills.py)."""
+    __tablename__ = 'data_migrations'
+
+    name = db.Column(db.String(100), primary_key=True)
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending/running/paused/done/failed
+    last_key = db.Column(db.Integer, nullable=False, default=0)  # maior chave já processada
+    rows_done = db.Column(db.Integer, nullable=False, default=0)
+    total_rows = db.Column(db.Integer, nullable=True)  # estimativa da última execução
+    locked_by = db.Column(db.String(64), nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    started_at = db.Column(db.DateTime, nullable=True)
+    updated_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<DataMigration {self.name} status={self.status} last_key={self.last_key}>'
+
+
+class ReplicaHeartbeat(db.Model):
+    """Linha única gravada no primário; a cópia vista na réplica mede a defasagem dela."""
+    __tablename__ = 'replica_heartbeat'
+
+    id = db.Column(db.Integer, primary_key=True)
+    beat_at = db.Column(db.DateTime, nullable=False)
+
+
 # --- NOVO MODELO DE AVALIAÇÃO ---
 class Evaluation(db.Model):
     __tablename__ = 'evaluations'
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
 
     participant_type = db.Column(db.String(50), nullable=False)   # estudante/profissional/professor
     participation_type = db.Column(db.String(20), nullable=False) # sozinho/equipe
@@ -0,0 +1,192 @@
+# /page_views_bench.py
+"""
+Antes/depois das dimensões de page_views: tamanho da tabela (com índices e dimensões) e
+vazão de inserção, comparando o formato antigo (URL, endpoint e user-agent como texto em
+cada linha) com o atual (ids para page_urls / page_endpoints / user_agents).
+
+Mede dois padrões de escrita:
+- por requisição: um INSERT + commit por visita, como em track_access;
+- em lote: executemany, como nas cargas e no arquivamento.
+
+Uso:
+    python -m my_app.page_views_bench
+    python -m my_app.page_views_bench --rows 200000 --requests 5000 --json page_views_bench.json
+    python -m my_app.page_views_bench --database-url postgresql+psycopg2://localhost/bench
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import sqlalchemy as sa
+
+from .synthetic_data import PAGES, USER_AGENTS
+
+WIDE_TABLE = 'page_views_wide'
+
+
+def wide_table(metadata):
+    """page_views como era antes das dimensões (mesmas colunas e índice de data)."""
+    return sa.Table(
+        WIDE_TABLE, metadata,
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('user_id', sa.Integer, nullable=True),
+        sa.Column('visitor_id', sa.String(36), nullable=False),
+        sa.Column('page_url', sa.String(200), nullable=False),
+        sa.Column('page_title', sa.String(100), nullable=False),
+        sa.Column('language', sa.String(5), nullable=False),
+        sa.Column('ip_address', sa.String(45), nullable=True),
+        sa.Column('user_agent', sa.Text, nullable=True),
+        sa.Column('accessed_at', sa.DateTime, index=True),
+    )
+
+
+def visits(count, seed=7):
+    """Visitas sintéticas com a mesma distribuição de páginas do synthetic_data."""
+    rng = random.Random(seed)
+    weights = [w for _, _, w in PAGES]
+    visitors = [f"{rng.getrandbits(128):032x}"[:36] for _ in range(max(1, count // 20))]
+    ips = [hashlib.sha256(f"ip-{i}".encode()).hexdigest()[:45] for i in range(1024)]
+    start = datetime(2026, 1, 1)
+    for n, (endpoint, rule, _) in enumerate(rng.choices(PAGES, weights=weights, k=count)):
+        yield {
+            'user_id': None, 'visitor_id': rng.choice(visitors), 'page_url': rule,
+            'page_title': endpoint, 'language': rng.choice(('pt', 'pt', 'en', 'es')),
+            'ip_address': rng.choice(ips), 'user_agent': rng.choice(USER_AGENTS),
+            'accessed_at': start + timedelta(seconds=n * 3),
+        }
+
+
+def table_bytes(connection, tables):
+    """Bytes ocupados pelas tabelas e seus índices."""
+    if connection.dialect.name == 'postgresql':
+        return sum(connection.execute(sa.text("SELECT pg_total_relation_size(:t)"), {'t': t}).scalar()
+                   for t in tables)
+    names = connection.execute(sa.text(
+        "SELECT name FROM sqlite_master WHERE tbl_name IN (%s)" % ', '.join(f"'{t}'" for t in tables))).scalars().all()
+    return connection.execute(sa.text(
+        "SELECT COALESCE(SUM(pgsize), 0) FROM dbstat WHERE name IN (%s)" % ', '.join(f"'{n}'" for n in names))).scalar()
+
+
+def _rate(rows, seconds):
+    return int(rows / seconds) if seconds else rows
+
+
+def run(rows=100_000, requests=2000, database_url=None):
+    from . import create_app, db
+    from .dimensions import clear_caches, new_page_view, page_endpoints, page_urls, user_agents
+    from .models import PageViews
+
+    tmpdir = None
+    if database_url is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        database_url = 'sqlite:///' + os.path.join(tmpdir.name, 'page_views_bench.db')
+    app = create_app('production', SQLALCHEMY_DATABASE_URI=database_url, INIT_MIGRATIONS=False,
+                     RATE_LIMIT_ENABLED=False)
+    metadata = sa.MetaData()
+    wide = wide_table(metadata)
+    dimensional_tables = ['page_views', 'page_urls', 'page_endpoints', 'user_agents']
+    results = {}
+
+    with app.app_context():
+        db.create_all()
+        if db.session.query(PageViews.id).first() is not None:
+            raise SystemExit("page_views is not empty: point --database-url at a scratch database")
+        metadata.create_all(db.engine)
+        clear_caches()
+        try:
+            # --- Por requisição (INSERT + commit) ---
+            sample = list(visits(requests, seed=1))
+            started = time.perf_counter()
+            for visit in sample:
+                db.session.execute(wide.insert().values(**visit))
+                db.session.commit()
+            wide_request = time.perf_counter() - started
+
+            started = time.perf_counter()
+            for visit in sample:
+                visit = dict(visit)
+                db.session.add(new_page_view(visit.pop('page_url'), visit.pop('page_title'),
+                                             visit.pop('user_agent'), **visit))
+                db.session.commit()
+            dimensional_request = time.perf_counter() - started
+
+            # --- Em lote ---
+            bulk = list(visits(rows, seed=2))
+            started = time.perf_counter()
+            with db.engine.begin() as connection:
+                connection.execute(wide.insert(), bulk)
+            wide_bulk = time.perf_counter() - started
+
+            started = time.perf_counter()
+            with db.engine.begin() as connection:
+                urls = page_urls.ids_for(connection, {v['page_url'] for v in bulk})
+                endpoints = page_endpoints.ids_for(connection, {v['page_title'] for v in bulk})
+                agents = user_agents.ids_for(connection, {v['user_agent'] for v in bulk})
+                connection.execute(PageViews.__table__.insert(), [{
+                    'user_id': v['user_id'], 'visitor_id': v['visitor_id'], 'url_id': urls[v['page_url']],
+                    'endpoint_id': endpoints[v['page_title']], 'language': v['language'],
+                    'ip_address': v['ip_address'], 'user_agent_id': agents[v['user_agent']],
+                    'accessed_at': v['accessed_at'],
+                } for v in bulk])
+            dimensional_bulk = time.perf_counter() - started
+
+            total = rows + requests
+            with db.engine.connect() as connection:
+                wide_bytes = table_bytes(connection, [WIDE_TABLE])
+                dimensional_bytes = table_bytes(connection, dimensional_tables)
+            results = {
+                "rows": total,
+                "wide": {"bytes": wide_bytes, "bytes_per_row": round(wide_bytes / total, 1),
+                         "request_rows_per_second": _rate(requests, wide_request),
+                         "bulk_rows_per_second": _rate(rows, wide_bulk)},
+                "dimensional": {"bytes": dimensional_bytes, "bytes_per_row": round(dimensional_bytes / total, 1),
+                                "request_rows_per_second": _rate(requests, dimensional_request),
+                                "bulk_rows_per_second": _rate(rows, dimensional_bulk)},
+                "size_reduction": round(1 - dimensional_bytes / wide_bytes, 3) if wide_bytes else None,
+            }
+        finally:
+            db.session.remove()
+            metadata.drop_all(db.engine)
+            with db.engine.begin() as connection:
+                connection.execute(PageViews.__table__.delete())
+            db.engine.dispose()
+    if tmpdir is not None:
+        tmpdir.cleanup()
+    return results
+
+
+def print_report(report):
+    print(f"\npage_views: {report['rows']} linhas por formato\n")
+    header = f"{'formato':<13}{'MiB':>9}{'bytes/linha':>13}{'req. linhas/s':>15}{'lote linhas/s':>15}"
+    print(header)
+    print('-' * len(header))
+    for name in ('wide', 'dimensional'):
+        row = report[name]
+        print(f"{name:<13}{row['bytes'] / 2 ** 20:>9.2f}{row['bytes_per_row']:>13}"
+              f"{row['request_rows_per_second']:>15}{row['bulk_rows_per_second']:>15}")
+    print(f"\nredução de tamanho: {report['size_reduction']:.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tamanho e vazão de page_views: texto vs. dimensões.")
+    parser.add_argument('--rows', type=int, default=100_000, help="linhas da carga em lote")
+    parser.add_argument('--requests', type=int, default=2000, help="inserções com commit individual")
+    parser.add_argument('--database-url', default=None, help="banco de rascunho com page_views vazia (padrão: SQLite descartável)")
+    parser.add_argument('--json', dest='json_path', default=None, help="grava o resultado em JSON")
+    args = parser.parse_args()
+
+    report = run(rows=args.rows, requests=args.requests, database_url=args.database_url)
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
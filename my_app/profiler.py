@@ -0,0 +1,393 @@
+# /profiler.py
+"""
+Profiler por amostragem, ligado sob demanda em requisições de produção.
+
+- Quem pode ser perfilado: só requisições autenticadas (user_id na sessão), e só quando
+  (a) trazem o cabeçalho PROFILE_HEADER com um token assinado para aquele usuário
+  (python -m my_app.profiler token --user-id N), ou (b) o endpoint foi ligado por um
+  professor (POST /instructor/api/profiling ou python -m my_app.profiler enable ENDPOINT),
+  por tempo limitado.
+- Como: uma única thread de amostragem por processo lê a pilha das threads perfiladas
+  (sys._current_frames) a cada PROFILE_INTERVAL segundos. O custo é fixo: no máximo
+  PROFILE_MAX_CONCURRENT requisições por processo, cada uma amostrada por até
+  PROFILE_MAX_SECONDS; as demais seguem sem profiler.
+- Saída: pilhas colapsadas (formato do flamegraph.pl / speedscope), uma por requisição, em
+  PROFILE_DIR/<endpoint>/<horário>-<pid>-<id>.folded; ficam as PROFILE_MAX_FILES mais novas
+  de cada endpoint. A resposta leva o nome do arquivo em X-Profile-Id.
+- python -m my_app.profiler aggregate soma os perfis por endpoint e mostra as funções
+  que mais aparecem.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+
+from flask import current_app, g, request, session
+from itsdangerous import BadSignature, URLSafeSerializer
+
+logger = logging.getLogger(__name__)
+
+TOKEN_SALT = 'request-profile'
+TOGGLES_FILE = 'enabled.json'
+SUFFIX = '.folded'
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# --- Amostragem ---
+def frame_label(code):
+    """'função (arquivo:linha)', com o caminho relativo ao projeto ou ao site-packages."""
+    path = code.co_filename
+    marker = path.rfind('site-packages' + os.sep)
+    if marker >= 0:
+        path = path[marker + len('site-packages') + 1:]
+    elif path.startswith(PACKAGE_ROOT):
+        path = path[len(PACKAGE_ROOT) + 1:]
+    return f"{code.co_name} ({path}:{code.co_firstlineno})".replace(';', ':')
+
+
+def collapse(frame):
+    """Pilha de `frame` no formato colapsado (raiz primeiro, separada por ';')."""
+    labels = []
+    while frame is not None:
+        labels.append(frame_label(frame.f_code))
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+
+class Profile:
+    """Amostras de uma thread: {pilha colapsada: n}."""
+
+    def __init__(self, thread_id, max_seconds):
+        self.thread_id = thread_id
+        self.deadline = time.monotonic() + max_seconds
+        self.stacks = Counter()
+
+    @property
+    def samples(self):
+        return sum(self.stacks.values())
+
+    def folded(self):
+        return ''.join(f"{stack} {n}\n" for stack, n in sorted(self.stacks.items()))
+
+
+class Sampler:
+    """Uma thread por processo que amostra todas as requisições perfiladas a cada `interval`."""
+
+    def __init__(self):
+        self.interval = 0.005
+        self._active = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def start(self, thread_id, max_seconds, limit):
+        """Passa a amostrar `thread_id`; None se já houver `limit` perfis em andamento."""
+        with self._lock:
+            if len(self._active) >= limit:
+                return None
+            profile = self._active[thread_id] = Profile(thread_id, max_seconds)
+            if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+                self._pid = os.getpid()
+                self._thread = threading.Thread(target=self._run, name='request-profiler', daemon=True)
+                self._thread.start()
+            self._wake.set()
+        return profile
+
+    def stop(self, profile):
+        with self._lock:
+            if self._active.get(profile.thread_id) is profile:
+                del self._active[profile.thread_id]
+        return profile
+
+    def sample(self):
+        """Uma rodada: uma amostra de cada perfil ativo."""
+        frames = sys._current_frames()
+        now = time.monotonic()
+        with self._lock:
+            profiles = list(self._active.values())
+        for profile in profiles:
+            if now > profile.deadline:
+                self.stop(profile)
+                continue
+            frame = frames.get(profile.thread_id)
+            if frame is not None:
+                stack = collapse(frame)
+                with self._lock:
+                    # stop() pode ter chegado no meio: o perfil entregue não muda mais
+                    if self._active.get(profile.thread_id) is profile:
+                        profile.stacks[stack] += 1
+
+    def _run(self):
+        while True:
+            with self._lock:
+                idle = not self._active
+                if idle:
+                    self._wake.clear()
+            if idle:
+                self._wake.wait()
+                continue
+            time.sleep(self.interval)
+            self.sample()
+
+
+sampler = Sampler()
+
+
+# --- Autorização ---
+def _serializer(secret_key):
+    return URLSafeSerializer(secret_key, salt=TOKEN_SALT)
+
+
+def make_token(secret_key, user_id, minutes, endpoint=None):
+    """Token do cabeçalho PROFILE_HEADER: vale para `user_id` (e `endpoint`, se dado) por `minutes`."""
+    expires = int(time.time() + minutes * 60)
+    return _serializer(secret_key).dumps({'user_id': user_id, 'endpoint': endpoint, 'expires': expires})
+
+
+def token_allows(token, user_id, endpoint):
+    try:
+        data = _serializer(current_app.secret_key).loads(token)
+    except BadSignature:
+        return False
+    return (data.get('user_id') == user_id and data.get('expires', 0) > time.time()
+            and data.get('endpoint') in (None, endpoint))
+
+
+def _toggles_path(directory):
+    return os.path.join(directory, TOGGLES_FILE)
+
+
+def load_toggles(directory):
+    """{endpoint: expira_em (epoch)} só com os que ainda valem."""
+    try:
+        with open(_toggles_path(directory), encoding='utf-8') as f:
+            toggles = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    now = time.time()
+    return {endpoint: expires for endpoint, expires in toggles.items() if expires > now}
+
+
+def set_toggle(directory, endpoint, minutes):
+    """Liga (minutes > 0) ou desliga (minutes = 0) o profiler de um endpoint, para todos os processos."""
+    toggles = load_toggles(directory)
+    if minutes > 0:
+        toggles[endpoint] = time.time() + minutes * 60
+    else:
+        toggles.pop(endpoint, None)
+    os.makedirs(directory, exist_ok=True)
+    path = _toggles_path(directory)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(toggles, f)
+    os.replace(tmp, path)
+    return toggles
+
+
+class RequestProfiler:
+    def __init__(self):
+        self._toggles = {}
+        self._toggles_mtime = None
+
+    def init_app(self, app):
+        app.extensions['profiler'] = self
+        if not app.config['PROFILE_ENABLED']:
+            return
+        sampler.interval = app.config['PROFILE_INTERVAL']
+        app.before_request(self._start)
+        app.after_request(self._tag)
+        app.teardown_request(self._finish)
+
+    def toggled(self, endpoint):
+        """Endpoint ligado? O arquivo só é relido quando muda (basta um stat por requisição)."""
+        directory = current_app.config['PROFILE_DIR']
+        try:
+            mtime = os.stat(_toggles_path(directory)).st_mtime_ns
+        except OSError:
+            mtime = None
+        if mtime != self._toggles_mtime:
+            self._toggles = load_toggles(directory) if mtime else {}
+            self._toggles_mtime = mtime
+        return self._toggles.get(endpoint, 0) > time.time()
+
+    def wanted(self):
+        endpoint = request.endpoint
+        user_id = session.get('user_id')
+        if not endpoint or endpoint == 'static' or user_id is None:
+            return False
+        token = request.headers.get(current_app.config['PROFILE_HEADER'])
+        if token:
+            return token_allows(token, user_id, endpoint)
+        return self.toggled(endpoint)
+
+    def _start(self):
+        if not self.wanted():
+            return
+        config = current_app.config
+        profile = sampler.start(threading.get_ident(), config['PROFILE_MAX_SECONDS'], config['PROFILE_MAX_CONCURRENT'])
+        if profile is not None:
+            profile.name = f"{datetime.utcnow():%Y%m%dT%H%M%S}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+            g.profile = profile
+
+    def _tag(self, response):
+        profile = g.get('profile')
+        if profile is not None:
+            response.headers['X-Profile-Id'] = profile.name
+        return response
+
+    def _finish(self, exc):
+        profile = g.pop('profile', None)
+        if profile is None:
+            return
+        sampler.stop(profile)
+        try:
+            save(profile, request.endpoint, current_app.config['PROFILE_DIR'], current_app.config['PROFILE_MAX_FILES'])
+        except OSError as e:
+            logger.warning("could not save profile: %s", e)
+
+
+def save(profile, endpoint, directory, max_files):
+    folder = os.path.join(directory, endpoint)
+    os.makedirs(folder, exist_ok=True)
+    with open(os.path.join(folder, profile.name + SUFFIX), 'w', encoding='utf-8') as f:
+        f.write(profile.folded())
+    names = sorted(n for n in os.listdir(folder) if n.endswith(SUFFIX))
+    for name in names[:max(0, len(names) - max_files)]:
+        os.remove(os.path.join(folder, name))
+
+
+profiler = RequestProfiler()
+
+
+# --- Agregação ---
+def read_folded(path):
+    stacks = Counter()
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            stack, _, count = line.rstrip('\n').rpartition(' ')
+            if stack and count.isdigit():
+                stacks[stack] += int(count)
+    return stacks
+
+
+def _started_at(name):
+    try:
+        return datetime.strptime(name.split('-', 1)[0], '%Y%m%dT%H%M%S')
+    except ValueError:
+        return None
+
+
+def aggregate(directory, endpoint=None, since=None, top=15):
+    """
+    Soma os perfis de cada endpoint (opcionalmente só `endpoint` e só a partir de `since`):
+    {endpoint: {'requests', 'samples', 'stacks', 'self', 'total'}}, com 'self' (a função estava
+    no topo da pilha) e 'total' (estava em algum ponto da pilha) nas `top` funções mais comuns.
+    """
+    result = {}
+    if endpoint:
+        endpoints = [endpoint]
+    else:
+        endpoints = sorted(os.listdir(directory)) if os.path.isdir(directory) else []
+    for name in endpoints:
+        folder = os.path.join(directory, name)
+        if not os.path.isdir(folder):
+            continue
+        stacks, requests = Counter(), 0
+        for filename in sorted(os.listdir(folder)):
+            started = _started_at(filename)
+            if not filename.endswith(SUFFIX) or started is None or (since and started < since):
+                continue
+            stacks.update(read_folded(os.path.join(folder, filename)))
+            requests += 1
+        if not requests:
+            continue
+        self_counts, total_counts = Counter(), Counter()
+        for stack, n in stacks.items():
+            frames = stack.split(';')
+            self_counts[frames[-1]] += n
+            for frame in set(frames):
+                total_counts[frame] += n
+        result[name] = {
+            'requests': requests,
+            'samples': sum(stacks.values()),
+            'stacks': dict(stacks),
+            'self': self_counts.most_common(top),
+            'total': total_counts.most_common(top),
+        }
+    return result
+
+
+def write_folded(stacks, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.writelines(f"{stack} {n}\n" for stack, n in sorted(stacks.items()))
+
+
+def print_report(report):
+    for endpoint, data in report.items():
+        samples = data['samples'] or 1
+        print(f"\n{endpoint}: {data['requests']} requisições, {data['samples']} amostras")
+        header = f"{'self':>7}{'total':>7}  função"
+        print(header)
+        print('-' * 60)
+        totals = dict(data['total'])
+        for frame, n in data['self']:
+            print(f"{n / samples:>7.1%}{totals.get(frame, n) / samples:>7.1%}  {frame}")
+    if not report:
+        print("nenhum perfil encontrado")
+
+
+def main():
+    from . import create_app
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--config', default='production')
+    parser = argparse.ArgumentParser(description="Profiler por amostragem das requisições.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    token = sub.add_parser('token', parents=[common], help="token do cabeçalho PROFILE_HEADER")
+    token.add_argument('--user-id', type=int, required=True)
+    token.add_argument('--minutes', type=float, default=30)
+    token.add_argument('--endpoint', default=None, help="só este endpoint (padrão: qualquer um)")
+    enable = sub.add_parser('enable', parents=[common], help="perfila todas as requisições autenticadas de um endpoint")
+    enable.add_argument('endpoint')
+    enable.add_argument('--minutes', type=float, default=10)
+    disable = sub.add_parser('disable', parents=[common])
+    disable.add_argument('endpoint')
+    report = sub.add_parser('aggregate', parents=[common], help="soma os perfis por endpoint")
+    report.add_argument('--endpoint', default=None)
+    report.add_argument('--hours', type=float, default=None, help="só as últimas N horas")
+    report.add_argument('--top', type=int, default=15)
+    report.add_argument('--out', default=None, help="grava <endpoint>.folded somado neste diretório")
+    report.add_argument('--json', dest='json_path', default=None, help="grava o resultado em JSON")
+    args = parser.parse_args()
+
+    app = create_app(args.config, INIT_MIGRATIONS=False)
+    directory = app.config['PROFILE_DIR']
+    if args.command == 'token':
+        print(f"{app.config['PROFILE_HEADER']}: {make_token(app.secret_key, args.user_id, args.minutes, args.endpoint)}")
+    elif args.command in ('enable', 'disable'):
+        toggles = set_toggle(directory, args.endpoint, args.minutes if args.command == 'enable' else 0)
+        for endpoint, expires in sorted(toggles.items()):
+            print(f"{endpoint}: até {datetime.fromtimestamp(expires):%H:%M:%S}")
+    else:
+        since = datetime.utcnow() - timedelta(hours=args.hours) if args.hours else None
+        result = aggregate(directory, args.endpoint, since, args.top)
+        print_report(result)
+        if args.out:
+            os.makedirs(args.out, exist_ok=True)
+            for endpoint, data in result.items():
+                write_folded(data['stacks'], os.path.join(args.out, endpoint + SUFFIX))
+        if args.json_path:
+            with open(args.json_path, 'w', encoding='utf-8') as f:
+                json.dump(result, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
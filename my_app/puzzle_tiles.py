@@ -0,0 +1,214 @@
+# /puzzle_tiles.py
+"""
+Peças pré-cortadas das estações de quebra-cabeça (puzzleData: image + pieces).
+
+- Cada imagem é cortada uma vez (Pillow), em TILE_WIDTHS larguras de peça, e as peças são
+  gravadas em WebP com nome pelo conteúdo (<sha256>.webp): o mesmo arquivo nunca muda e é
+  servido com cache imutável em /puzzle-tiles/<nome>.
+- O manifesto de cada imagem fica em manifest-<chave>.json, com a chave derivada do conteúdo
+  da imagem e dos parâmetros do corte: recarregar o catálogo ou reiniciar não corta de novo.
+- attach_tiles (chamado ao carregar o catálogo) põe no puzzleData o manifesto público, com as
+  peças numa ordem embaralhada e ids opacos, e a ordem certa em correctOrder (removido da API
+  como as demais respostas). O servidor confere a montagem em verify_answers.
+
+Pré-geração no build: python -m my_app.puzzle_tiles (buildCommand do .render.yaml e
+bin/post_compile nos deploys pelo Procfile). As peças ficam em my_app/build/puzzle_tiles e
+são publicadas junto com o código; o disco do serviço é efêmero, e cortar ao carregar o
+catálogo poria o Pillow em toda partida a frio.
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import math
+import os
+import random
+import time
+
+from .catalog import CHALLENGES_FILE, TILES_DIR, validate
+
+STATIC_DIR = os.path.join(os.path.dirname(__file__), 'static')
+TILE_URL = '/puzzle-tiles/'
+TILE_WIDTHS = (160, 320, 480)  # larguras de peça (px); nunca maiores que a peça original
+TILE_QUALITY = 80
+MANIFEST_VERSION = 1           # muda quando o formato do corte muda
+
+
+class TileError(Exception):
+    """Imagem de quebra-cabeça ausente, ilegível ou com número de peças inválido."""
+
+
+def grid_shape(pieces):
+    side = math.isqrt(pieces) if isinstance(pieces, int) and pieces > 0 else 0
+    if side < 2 or side * side != pieces:
+        raise TileError(f"pieces must be a square number >= 4, got {pieces!r}")
+    return side, side
+
+
+def _write_atomic(path, data):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class TileStore:
+    """Diretório de peças e manifestos, endereçados pelo conteúdo."""
+
+    def __init__(self, directory=TILES_DIR, widths=TILE_WIDTHS, static_dir=STATIC_DIR):
+        self.directory = directory
+        self.widths = tuple(widths)
+        self.static_dir = static_dir
+
+    def key(self, source, pieces):
+        digest = hashlib.sha256(source)
+        digest.update(f"{pieces}:{self.widths}:{TILE_QUALITY}:{MANIFEST_VERSION}".encode())
+        return digest.hexdigest()[:20]
+
+    def _cached(self, path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        files = [name for piece in manifest['pieces'] for name in piece['files']]
+        return manifest if all(os.path.exists(os.path.join(self.directory, name)) for name in files) else None
+
+    def manifest(self, image, pieces):
+        """Manifesto de `image` (caminho relativo a static/) com as peças na ordem certa."""
+        grid_shape(pieces)
+        try:
+            with open(os.path.join(self.static_dir, image), 'rb') as f:
+                source = f.read()
+        except OSError as e:
+            raise TileError(f"puzzle image {image}: {e}") from e
+        key = self.key(source, pieces)
+        path = os.path.join(self.directory, f'manifest-{key}.json')
+        manifest = self._cached(path)
+        if manifest is None:
+            manifest = self._build(source, image, pieces, key)
+            _write_atomic(path, json.dumps(manifest, separators=(',', ':')).encode())
+        return manifest
+
+    def _build(self, source, image, pieces, key):
+        # Pillow só é importado quando é preciso cortar (partida a frio)
+        from PIL import Image, UnidentifiedImageError
+
+        rows, columns = grid_shape(pieces)
+        try:
+            original = Image.open(io.BytesIO(source))
+            original.load()
+        except (OSError, UnidentifiedImageError) as e:
+            raise TileError(f"puzzle image {image}: {e}") from e
+        original = original.convert('RGB')
+        width, height = original.size
+        tile_width, tile_height = width / columns, height / rows
+        widths = sorted({w for w in self.widths if w < tile_width} | {min(max(self.widths), int(tile_width))})
+
+        os.makedirs(self.directory, exist_ok=True)
+        resolutions, files = [], [[] for _ in range(pieces)]
+        for w in widths:
+            h = max(1, round(w * tile_height / tile_width))
+            # Redimensiona a imagem inteira uma vez e corta em peças de tamanho idêntico
+            scaled = original.resize((w * columns, h * rows), Image.LANCZOS, reducing_gap=3.0)
+            for index in range(pieces):
+                r, c = divmod(index, columns)
+                buffer = io.BytesIO()
+                scaled.crop((c * w, r * h, (c + 1) * w, (r + 1) * h)).save(
+                    buffer, 'WEBP', quality=TILE_QUALITY, method=6)
+                data = buffer.getvalue()
+                name = hashlib.sha256(data).hexdigest()[:24] + '.webp'
+                target = os.path.join(self.directory, name)
+                if not os.path.exists(target):
+                    _write_atomic(target, data)
+                files[index].append(name)
+            resolutions.append([w, h])
+        return {
+            'key': key, 'image': image, 'rows': rows, 'columns': columns, 'resolutions': resolutions,
+            # id opaco de cada peça: o nome do arquivo maior, sem a extensão
+            'pieces': [{'id': names[-1][:12], 'files': names} for names in files],
+        }
+
+
+def public_tiles(manifest):
+    """(manifesto público com as peças embaralhadas, ids na ordem certa)."""
+    solved = [piece['id'] for piece in manifest['pieces']]
+    # Embaralha posições, não ids: peças iguais (imagem uniforme) têm o mesmo id, e comparar
+    # ids nunca sairia do laço
+    order = list(range(len(solved)))
+    rng = random.Random(manifest['key'])
+    while order == sorted(order):
+        rng.shuffle(order)
+    return {
+        'url': TILE_URL, 'rows': manifest['rows'], 'columns': manifest['columns'],
+        'resolutions': manifest['resolutions'], 'pieces': [manifest['pieces'][i] for i in order],
+    }, solved
+
+
+def attach_tiles(challenges, store, digest=None):
+    """
+    Cópia de {id: desafio} com puzzleData.tiles e puzzleData.correctOrder nas estações de
+    quebra-cabeça. `digest` (hashlib) recebe a chave de cada imagem, para o hash do catálogo
+    mudar junto com elas.
+    """
+    result = dict(challenges)
+    for challenge_id, challenge in challenges.items():
+        data = challenge.get('puzzleData')
+        if challenge.get('type') != 'puzzle' or not isinstance(data, dict) or not data.get('image'):
+            continue
+        manifest = store.manifest(data['image'], data.get('pieces'))
+        tiles, solved = public_tiles(manifest)
+        result[challenge_id] = dict(challenge, puzzleData=dict(data, tiles=tiles, correctOrder=solved))
+        if digest is not None:
+            digest.update(manifest['key'].encode())
+    return result
+
+
+def build_all(store, challenges):
+    """Corta as imagens de todas as estações de quebra-cabeça; estatísticas para o relatório."""
+    started = time.perf_counter()
+    stations = []
+    for challenge_id, challenge in sorted(challenges.items()):
+        data = challenge.get('puzzleData')
+        if challenge.get('type') != 'puzzle' or not isinstance(data, dict):
+            continue
+        manifest = store.manifest(data['image'], data.get('pieces'))
+        sizes = [sum(os.path.getsize(os.path.join(store.directory, piece['files'][i])) for piece in manifest['pieces'])
+                 for i in range(len(manifest['resolutions']))]
+        stations.append({
+            'station': challenge_id, 'image': data['image'], 'key': manifest['key'],
+            'image_bytes': os.path.getsize(os.path.join(store.static_dir, data['image'])),
+            'resolutions': [{'width': w, 'height': h, 'bytes': size}
+                            for (w, h), size in zip(manifest['resolutions'], sizes)],
+        })
+    return {'directory': store.directory, 'stations': stations,
+            'seconds': round(time.perf_counter() - started, 3)}
+
+
+def print_report(stats):
+    print(f"Peças em {stats['directory']} ({stats['seconds']}s)")
+    for station in stats['stations']:
+        print(f"  estação {station['station']}: {station['image']} ({station['image_bytes'] / 1024:.1f} KiB)")
+        for resolution in station['resolutions']:
+            print(f"    {resolution['width']}x{resolution['height']}: {resolution['bytes'] / 1024:.1f} KiB no total")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pré-corta as imagens das estações de quebra-cabeça.")
+    parser.add_argument('--dir', default=TILES_DIR, help="diretório das peças (padrão: my_app/build/puzzle_tiles)")
+    parser.add_argument('--challenges', default=CHALLENGES_FILE)
+    parser.add_argument('--json', dest='json_path', default=None, help="grava as estatísticas em JSON")
+    args = parser.parse_args()
+
+    with open(args.challenges, encoding='utf-8') as f:
+        challenges = validate(json.load(f))
+    stats = build_all(TileStore(args.dir), challenges)
+    print_report(stats)
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(stats, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
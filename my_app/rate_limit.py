@@ -0,0 +1,236 @@
+# /rate_limit.py
+"""
+Limite de requisições por cliente (token bucket) e controle de admissão.
+
+- Cada endpoint tem uma política (RATE_LIMITS: requisições por janela; o balde aceita
+  rajadas até esse número e reabastece continuamente). 'default' vale para o resto.
+- O cliente é o user_id da sessão, senão o visitor_id, senão o IP (já com hash, o mesmo
+  de track_access). Endpoints em RATE_LIMIT_BY_IP (login/cadastro) contam sempre por IP,
+  porque a sessão é descartável para quem tenta senhas em série. Atrás de proxy, o IP só é o
+  do cliente com PROXY_FIX_X_FOR configurado (ProxyFix no create_app).
+- Estado em memória por processo (MemoryStore) ou num arquivo SQLite compartilhado pelos
+  workers da mesma máquina (RATE_LIMIT_STORAGE=sqlite:////caminho/arquivo.db).
+- RATE_LIMIT_MAX_INFLIGHT limita quantas requisições de um endpoint pesado rodam ao mesmo
+  tempo no processo; o excedente recebe 503 na hora em vez de ocupar um worker.
+Estouros respondem 429 (ou 503) com Retry-After.
+"""
+
+import hashlib
+import math
+import sqlite3
+import threading
+import time
+
+from flask import current_app, g, jsonify, request, session
+
+
+def client_ip_hash():
+    """Hash do IP do cliente (calculado uma vez por requisição)."""
+    if 'ip_hash' not in g:
+        addr = request.remote_addr
+        g.ip_hash = hashlib.sha256(addr.encode()).hexdigest()[:45] if addr else None
+    return g.ip_hash
+
+
+class Policy:
+    __slots__ = ('name', 'capacity', 'rate')
+
+    def __init__(self, name, limit, period):
+        self.name = name
+        self.capacity = float(limit)
+        self.rate = limit / period  # fichas por segundo
+
+
+# --- Armazenamento dos baldes ---
+class MemoryStore:
+    """Baldes num dict do processo: [fichas, último acesso]. Só vale para um worker."""
+
+    def __init__(self, max_keys=100_000, idle_seconds=3600, clock=time.monotonic):
+        self.max_keys = max_keys
+        self.idle_seconds = idle_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._buckets = {}
+
+    def consume(self, key, rate, capacity, cost=1.0):
+        """Gasta `cost` fichas; devolve 0.0 se passou ou os segundos até haver fichas."""
+        now = self._clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.max_keys:
+                    self._prune(now)
+                self._buckets[key] = [capacity - cost, now]
+                return 0.0
+            tokens = bucket[0] + (now - bucket[1]) * rate
+            if tokens > capacity:
+                tokens = capacity
+            bucket[1] = now
+            if tokens >= cost:
+                bucket[0] = tokens - cost
+                return 0.0
+            bucket[0] = tokens
+            return (cost - tokens) / rate
+
+    def _prune(self, now):
+        # Balde parado há mais que a maior janela já está cheio: equivale a não existir
+        cutoff = now - self.idle_seconds
+        for key in [k for k, b in self._buckets.items() if b[1] < cutoff]:
+            del self._buckets[key]
+        if len(self._buckets) >= self.max_keys:
+            self._buckets.clear()
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class SqliteStore:
+    """
+    Baldes num arquivo SQLite (WAL) compartilhado pelos processos da máquina; cada consulta
+    é uma transação IMMEDIATE curta. Usa o relógio de parede, comum a todos os workers.
+    """
+
+    PRUNE_EVERY = 1000
+
+    def __init__(self, path, idle_seconds=3600, timeout=2.0):
+        self.path = path
+        self.idle_seconds = idle_seconds
+        self.timeout = timeout
+        self._local = threading.local()
+        self._calls = 0
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute("CREATE TABLE IF NOT EXISTS rate_buckets "
+                         "(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)")
+            self._local.conn = conn
+        return conn
+
+    def consume(self, key, rate, capacity, cost=1.0):
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            now = time.time()
+            row = conn.execute("SELECT tokens, updated FROM rate_buckets WHERE key = ?", (key,)).fetchone()
+            tokens = capacity if row is None else min(capacity, row[0] + (now - row[1]) * rate)
+            wait = 0.0 if tokens >= cost else (cost - tokens) / rate
+            if not wait:
+                tokens -= cost
+            conn.execute("INSERT INTO rate_buckets (key, tokens, updated) VALUES (?, ?, ?) "
+                         "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                         (key, tokens, now))
+            self._calls += 1
+            if self._calls % self.PRUNE_EVERY == 0:
+                conn.execute("DELETE FROM rate_buckets WHERE updated < ?", (now - self.idle_seconds,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return wait
+
+    def clear(self):
+        self._connection().execute("DELETE FROM rate_buckets")
+
+
+def make_store(url, idle_seconds=3600):
+    """'memory' ou 'sqlite:///caminho/relativo.db' / 'sqlite:////caminho/absoluto.db'."""
+    if url == 'memory':
+        return MemoryStore(idle_seconds=idle_seconds)
+    if url.startswith('sqlite:///'):
+        return SqliteStore(url[len('sqlite:///'):], idle_seconds=idle_seconds)
+    raise ValueError(f"Unknown RATE_LIMIT_STORAGE '{url}'")
+
+
+# --- Extensão ---
+class RateLimiter:
+    """Aplica as políticas num before_request; o estado fica em app.extensions['rate_limiter']."""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('RATE_LIMIT_ENABLED', True)
+        app.config.setdefault('RATE_LIMIT_STORAGE', 'memory')
+        app.config.setdefault('RATE_LIMITS', {'default': (300, 60)})
+        app.config.setdefault('RATE_LIMIT_BY_IP', set())
+        app.config.setdefault('RATE_LIMIT_MAX_INFLIGHT', {})
+
+        limits = app.config['RATE_LIMITS']
+        policies = {name: Policy(name, limit, period) for name, (limit, period) in limits.items()}
+        idle_seconds = max(period for _, period in limits.values())
+        inflight = {endpoint: threading.BoundedSemaphore(n)
+                    for endpoint, n in app.config['RATE_LIMIT_MAX_INFLIGHT'].items()}
+        app.extensions['rate_limiter'] = {
+            'store': make_store(app.config['RATE_LIMIT_STORAGE'], idle_seconds),
+            'policies': policies,
+            'inflight': inflight,
+        }
+        app.before_request(self._check)
+        app.teardown_request(self._release)
+
+    @staticmethod
+    def state():
+        return current_app.extensions['rate_limiter']
+
+    def reset(self, app):
+        app.extensions['rate_limiter']['store'].clear()
+
+    def client_key(self, endpoint):
+        if endpoint not in current_app.config['RATE_LIMIT_BY_IP']:
+            if 'user_id' in session:
+                return f"u:{session['user_id']}"
+            if 'visitor_id' in session:
+                return f"v:{session['visitor_id']}"
+        return f"ip:{client_ip_hash()}"
+
+    def policy_for(self, endpoint):
+        policies = self.state()['policies']
+        return policies.get(endpoint) or policies.get('default')
+
+    def _check(self):
+        endpoint = request.endpoint
+        if not endpoint or endpoint == 'static' or not current_app.config['RATE_LIMIT_ENABLED']:
+            return None
+        state = self.state()
+        policy = self.policy_for(endpoint)
+        if policy is not None:
+            key = f"{policy.name}:{self.client_key(endpoint)}"
+            try:
+                wait = state['store'].consume(key, policy.rate, policy.capacity)
+            except sqlite3.Error as e:
+                # Falha do armazenamento compartilhado não derruba o site: deixa passar
+                current_app.logger.warning(f"Rate limit store unavailable: {e}")
+                wait = 0.0
+            if wait:
+                return self._reject("Too many requests", 429, wait)
+
+        semaphore = state['inflight'].get(endpoint)
+        if semaphore is not None:
+            if not semaphore.acquire(blocking=False):
+                return self._reject("Server busy, try again shortly", 503, 1)
+            g.rate_limit_slot = semaphore
+        return None
+
+    @staticmethod
+    def _release(exc=None):
+        semaphore = g.pop('rate_limit_slot', None)
+        if semaphore is not None:
+            semaphore.release()
+
+    @staticmethod
+    def _reject(message, status, wait):
+        retry_after = max(1, math.ceil(wait))
+        response = jsonify({"success": False, "error": message, "retry_after": retry_after})
+        response.status_code = status
+        response.headers['Retry-After'] = str(retry_after)
+        return response
+
+
+rate_limiter = RateLimiter()
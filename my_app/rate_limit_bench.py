@@ -0,0 +1,77 @@
+# /rate_limit_bench.py
+"""
+Microbenchmark do limitador: custo de uma verificação de token bucket (consume) por
+armazenamento, com uma chave quente e com muitos clientes distintos.
+
+Uso:
+    python -m my_app.rate_limit_bench
+    python -m my_app.rate_limit_bench --checks 500000 --clients 10000 --sqlite
+    python -m my_app.rate_limit_bench --json rate_limit_bench.json
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from .rate_limit import MemoryStore, Policy, SqliteStore
+
+# Política generosa: a medição é do caminho de verificação, não do 429
+POLICY = Policy('bench', 10 ** 9, 1)
+
+
+def measure(store, checks, clients):
+    keys = [f"bench:u:{n}" for n in range(clients)]
+    consume, rate, capacity = store.consume, POLICY.rate, POLICY.capacity
+    for key in keys:  # baldes já criados: mede o caso comum
+        consume(key, rate, capacity)
+
+    started = time.perf_counter()
+    for n in range(checks):
+        consume(keys[n % clients], rate, capacity)
+    elapsed = time.perf_counter() - started
+    return {"checks": checks, "clients": clients, "ns_per_check": round(elapsed / checks * 1e9, 1),
+            "checks_per_second": int(checks / elapsed)}
+
+
+def run(checks=200_000, clients=(1, 10_000), sqlite=False):
+    cases = []
+    for n in clients:
+        cases.append(dict(store="memory", **measure(MemoryStore(), checks, n)))
+    if sqlite:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            store = SqliteStore(os.path.join(tmpdir, 'ratelimit.db'))
+            for n in clients:
+                # Cada verificação é uma transação em disco: bem menos iterações
+                cases.append(dict(store="sqlite", **measure(store, max(1, checks // 100), n)))
+    return {"cases": cases}
+
+
+def print_report(report):
+    header = f"{'store':<8}{'clientes':>10}{'verificações':>14}{'ns/verif.':>11}{'verif./s':>12}"
+    print()
+    print(header)
+    print('-' * len(header))
+    for row in report['cases']:
+        print(f"{row['store']:<8}{row['clients']:>10}{row['checks']:>14}{row['ns_per_check']:>11}"
+              f"{row['checks_per_second']:>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Custo por verificação do limitador (token bucket).")
+    parser.add_argument('--checks', type=int, default=200_000)
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 10_000])
+    parser.add_argument('--sqlite', action='store_true', help="mede também o armazenamento SQLite compartilhado")
+    parser.add_argument('--json', dest='json_path', default=None, help="grava o resultado em JSON")
+    args = parser.parse_args()
+
+    report = run(args.checks, args.clients, args.sqlite)
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+# /replica.py
+"""
+Leituras pesadas na réplica (bind 'replica' do Flask-SQLAlchemy).
+
+- `read_replica()` (contexto) e `@replica_reads` (views): dentro deles os SELECTs de
+  db.session vão para a réplica; flush, INSERT/UPDATE/DELETE e SQL textual continuam no
+  primário.
+- Defasagem: o primário grava um heartbeat (tabela replica_heartbeat) a cada
+  REPLICA_HEARTBEAT_SECONDS. A réplica só atende se a cópia dela estiver a no máximo
+  REPLICA_MAX_LAG_SECONDS do primário; se estiver atrasada, fora do ar ou sem a linha,
+  a leitura cai no primário.
+- Ler o que acabou de escrever: depois de uma requisição que gravou dados do usuário, o
+  horário fica na sessão (db_last_write) e a réplica só atende esse usuário quando o
+  heartbeat dela já passou desse horário. Jobs usam o horário do pedido (fresh_as_of).
+Sem REPLICA_DATABASE_URL nada disso é registrado e todas as leituras vão ao primário.
+"""
+
+import functools
+import logging
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from flask import current_app, g, has_app_context, has_request_context, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import Select, event, insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
+
+logger = logging.getLogger(__name__)
+
+REPLICA_BIND = 'replica'
+# Gravadas em toda requisição (ou pelo próprio heartbeat): não contam como escrita do usuário
+UNTRACKED_TABLES = frozenset({'page_views', 'page_urls', 'page_endpoints', 'user_agents', 'replica_heartbeat'})
+
+
+class RoutingSession(Session):
+    """Session do Flask-SQLAlchemy que manda SELECTs para a réplica quando g.db_replica está ligado."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and not self._flushing and isinstance(clause, Select)
+                and has_app_context() and g.get('db_replica')):
+            return self._db.engines[REPLICA_BIND]
+        return super().get_bind(mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ReplicaState:
+    def __init__(self, config):
+        self.enabled = REPLICA_BIND in (config.get('SQLALCHEMY_BINDS') or {})
+        self.heartbeat_seconds = config['REPLICA_HEARTBEAT_SECONDS']
+        self.max_lag = config['REPLICA_MAX_LAG_SECONDS']
+        self.check_seconds = config['REPLICA_LAG_CHECK_SECONDS']
+        self.next_beat = 0.0
+        self.checked_at = float('-inf')
+        self.primary_beat = None
+        self.replica_beat = None
+
+
+def _state():
+    return current_app.extensions['replica']
+
+
+def init_replica(app):
+    state = app.extensions['replica'] = ReplicaState(app.config)
+    if state.enabled:
+        if state.heartbeat_seconds > 0:
+            app.before_request(_beat_if_due)
+        app.after_request(_remember_write)
+
+
+# --- Heartbeat e defasagem ---
+def heartbeat(now=None):
+    """Grava o heartbeat no primário, numa transação própria (fora da db.session)."""
+    from .models import db, ReplicaHeartbeat
+    table = ReplicaHeartbeat.__table__
+    now = now or datetime.utcnow()
+    with db.engine.begin() as connection:
+        if not connection.execute(update(table).where(table.c.id == 1).values(beat_at=now)).rowcount:
+            connection.execute(insert(table).values(id=1, beat_at=now))
+
+
+def _beat_if_due():
+    state = _state()
+    now = time.monotonic()
+    if now < state.next_beat:
+        return
+    state.next_beat = now + state.heartbeat_seconds
+    try:
+        heartbeat()
+    except SQLAlchemyError as e:
+        logger.warning("replica heartbeat failed: %s", e)
+
+
+def replica_lag():
+    """(heartbeat no primário, heartbeat visto na réplica), consultados no máximo a cada REPLICA_LAG_CHECK_SECONDS."""
+    from .models import db, ReplicaHeartbeat
+    state = _state()
+    now = time.monotonic()
+    if now - state.checked_at >= state.check_seconds:
+        query = select(ReplicaHeartbeat.beat_at).where(ReplicaHeartbeat.id == 1)
+        try:
+            with db.engine.connect() as connection:
+                primary = connection.execute(query).scalar()
+            with db.engines[REPLICA_BIND].connect() as connection:
+                replica = connection.execute(query).scalar()
+        except SQLAlchemyError as e:
+            logger.warning("replica lag check failed: %s", e)
+            primary = replica = None
+        state.primary_beat, state.replica_beat, state.checked_at = primary, replica, now
+    return state.primary_beat, state.replica_beat
+
+
+def replica_available(fresh_as_of=None):
+    """A réplica pode atender? (configurada, em dia e, se pedido, já com os dados de `fresh_as_of`)."""
+    if not _state().enabled:
+        return False
+    primary, replica = replica_lag()
+    if replica is None:
+        return False
+    if primary is not None and (primary - replica).total_seconds() > _state().max_lag:
+        return False
+    return fresh_as_of is None or replica >= fresh_as_of
+
+
+# --- Roteamento ---
+def last_write():
+    """Horário (UTC) da última escrita do usuário da sessão, se houver."""
+    if has_request_context() and 'db_last_write' in session:
+        return datetime.utcfromtimestamp(session['db_last_write'])
+    return None
+
+
+@contextmanager
+def read_replica(fresh_as_of=None):
+    """
+    SELECTs do bloco vão para a réplica, se ela estiver disponível; produz True/False.
+    Em requisições, sem `fresh_as_of`, vale a última escrita do próprio usuário.
+    """
+    if fresh_as_of is None:
+        fresh_as_of = last_write()
+    previous = g.get('db_replica')
+    g.db_replica = use = replica_available(fresh_as_of)
+    try:
+        yield use
+    finally:
+        g.db_replica = previous
+
+
+def replica_reads(view):
+    """Decorador para views somente leitura."""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        with read_replica():
+            return view(*args, **kwargs)
+    return wrapper
+
+
+# --- Ler o que acabou de escrever ---
+def _mark_write(tables):
+    if has_request_context() and any(t not in UNTRACKED_TABLES for t in tables):
+        g.db_wrote = True
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _track_flush(db_session, flush_context):
+    _mark_write({obj.__table__.name for obj in (*db_session.new, *db_session.dirty, *db_session.deleted)
+                 if hasattr(obj, '__table__')})
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _track_execute(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _mark_write({orm_execute_state.statement.table.name})
+
+
+def _remember_write(response):
+    if g.pop('db_wrote', False) and 'user_id' in session:
+        session['db_last_write'] = time.time()
+    return response
@@ -0,0 +1,99 @@
+# /report_bench.py
+"""
+Benchmark do relatório em PDF: tempo de renderização e pico de memória (tracemalloc)
+para relatórios sintéticos de tamanhos crescentes, sem banco nem servidor.
+
+Uso:
+    python -m my_app.report_bench
+    python -m my_app.report_bench --stations 15 60 240 --feedback 500 20000 --repeat 5
+    python -m my_app.report_bench --json report_bench.json
+"""
+
+import argparse
+import json
+import statistics
+import time
+import tracemalloc
+
+from .reports import ReportData, layout_for, render
+
+FEEDBACK_SENTENCE = "A dinâmica da estação ajudou a fixar o protocolo de identificação do paciente. "
+
+
+def synthetic_report(stations, feedback_chars, team_size=4):
+    """Relatório com `stations` linhas (ids além do catálogo viram 'Estação N') e avaliação longa."""
+    feedback = (FEEDBACK_SENTENCE * (feedback_chars // len(FEEDBACK_SENTENCE) + 1))[:feedback_chars]
+    results = [(station_id, station_id % 9, 60 + station_id * 7) for station_id in range(1, stations + 1)]
+    evaluation = {
+        'participant_type': 'estudante', 'participation_type': 'equipe',
+        'team': [f'Integrante {n}' for n in range(1, team_size + 1)],
+        'q1': 5, 'q2': 4, 'q3': 5, 'q4': 4, 'q5': feedback, 'q6': feedback,
+    }
+    return ReportData('usuario_benchmark', results, evaluation)
+
+
+def measure(data, lang='pt', repeat=3):
+    """Mediana do tempo de render (ms), pico de memória (KiB), páginas e tamanho do PDF."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        sink = render(data, lang)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    # Medição de memória separada: o tracemalloc deixa o render bem mais lento
+    tracemalloc.start()
+    try:
+        render(data, lang)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "render_ms_p50": round(statistics.median(timings), 1),
+        "render_ms_max": round(max(timings), 1),
+        "peak_kib": round(peak / 1024, 1),
+        "pages": sink.pages,
+        "pdf_kib": round(sink.size / 1024, 1),
+    }
+
+
+def run(station_counts=(15, 60, 240), feedback_sizes=(500, 20000), lang='pt', repeat=3):
+    layout_for(lang)  # fontes e layout fora da medição (já ficam em cache num worker em uso)
+    rows = []
+    for stations in station_counts:
+        for feedback_chars in feedback_sizes:
+            row = {"stations": stations, "feedback_chars": feedback_chars}
+            row.update(measure(synthetic_report(stations, feedback_chars), lang, repeat))
+            rows.append(row)
+    return {"lang": lang, "repeat": repeat, "cases": rows}
+
+
+def print_report(report):
+    print(f"\nRelatório PDF ({report['lang']}, mediana de {report['repeat']} execuções)\n")
+    header = f"{'estações':>9}{'feedback':>10}{'páginas':>9}{'p50 ms':>9}{'max ms':>9}{'pico KiB':>10}{'PDF KiB':>9}"
+    print(header)
+    print('-' * len(header))
+    for row in report['cases']:
+        print(f"{row['stations']:>9}{row['feedback_chars']:>10}{row['pages']:>9}{row['render_ms_p50']:>9}"
+              f"{row['render_ms_max']:>9}{row['peak_kib']:>10}{row['pdf_kib']:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de tempo e memória do relatório em PDF.")
+    parser.add_argument('--stations', type=int, nargs='+', default=[15, 60, 240])
+    parser.add_argument('--feedback', type=int, nargs='+', default=[500, 20000],
+                        help="caracteres em cada resposta aberta (q5/q6)")
+    parser.add_argument('--lang', default='pt')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--json', dest='json_path', default=None, help="grava o resultado em JSON")
+    args = parser.parse_args()
+
+    report = run(args.stations, args.feedback, args.lang, args.repeat)
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
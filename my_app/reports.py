@@ -0,0 +1,390 @@
+# /reports.py
+"""
+Relatório de desempenho em PDF (reportlab platypus). Usado pela fila de jobs (job 'report')
+e pela rota /api/generate_report, que devolve o PDF em pedaços (streaming).
+
+- Os dados são lidos do banco uma vez (load_report_data) e o desenho é puro (render),
+  então o mesmo código serve ao job, à rota e ao benchmark (python -m my_app.report_bench).
+- Flowables: a tabela de estações e os textos longos da avaliação quebram de página sozinhos;
+  cabeçalho de continuação e rodapé (com número da página) são desenhados em cada folha.
+- O layout (estilos, rótulos traduzidos, estilo da tabela, logotipo) fica em cache por idioma.
+- ChunkSink recebe o PDF do reportlab sem BytesIO: nada de copiar o documento inteiro
+  para um buffer e depois para a resposta.
+"""
+
+import io
+import json as pyjson
+import os
+import threading
+import time
+from datetime import datetime
+from functools import lru_cache
+from xml.sax.saxutils import escape
+
+from .catalog import catalog, language
+from .metrics import PDF_RENDER, metrics
+from .models import db, StationResult, Evaluation, User
+
+STATIC_DIR = os.path.join(os.path.dirname(__file__), "static")
+FONTS_DIR = os.path.join(STATIC_DIR, "fonts")
+LOGO_PATH = os.path.join(STATIC_DIR, "img", "logotipo_wpsd_simweek.jpg")
+
+CHUNK_SIZE = 64 * 1024
+PRIMARY_COLOR = "#1F3C88"
+CONTACT_NAME = "Prof. Dr. Silvio Cesar da Conceição"
+CONTACT_EMAIL = "silvioenfermeiro73@gmail.com"
+
+# Conquista pela pontuação média (%)
+ACHIEVEMENTS = ((85, 'gold'), (65, 'silver'), (40, 'bronze'))
+
+LABELS = {
+    'pt': {
+        'title': "Escape Room da Segurança do Paciente",
+        'subtitle': "Relatório de Desempenho do Usuário",
+        'generated_at': "Data/Hora", 'user': "Usuário",
+        'progress': "Progresso do Usuário",
+        'station': "Estação", 'challenge': "Desafio", 'points': "Pontos", 'max_points': "Máx.",
+        'time': "Tempo (s)", 'no_results': "Nenhuma estação concluída.",
+        'total_score': "Pontuação Total", 'total_time': "Tempo Total",
+        'average': "Pontuação Média", 'achievement': "Conquista",
+        'gold': "Ouro", 'silver': "Prata", 'bronze': "Bronze",
+        'evaluation': "Avaliação da Plataforma",
+        'participant_type': "Tipo de participante", 'participation_type': "Tipo de participação",
+        'team': "Equipe",
+        'q1': "Q1 - Facilidade de uso", 'q2': "Q2 - Aprendizado",
+        'q3': "Q3 - Design/Interface", 'q4': "Q4 - Recomendação",
+        'q5': "Pontos fortes:", 'q6': "Melhorias sugeridas:",
+        'contact': "Comentários e sugestões", 'email': "E-mail", 'page': "Página",
+    },
+    'en': {
+        'title': "Patient Safety Escape Room",
+        'subtitle': "User Performance Report",
+        'generated_at': "Date/Time", 'user': "User",
+        'progress': "User Progress",
+        'station': "Station", 'challenge': "Challenge", 'points': "Points", 'max_points': "Max.",
+        'time': "Time (s)", 'no_results': "No stations completed.",
+        'total_score': "Total Score", 'total_time': "Total Time",
+        'average': "Average Score", 'achievement': "Achievement",
+        'gold': "Gold", 'silver': "Silver", 'bronze': "Bronze",
+        'evaluation': "Platform Evaluation",
+        'participant_type': "Participant type", 'participation_type': "Participation type",
+        'team': "Team",
+        'q1': "Q1 - Ease of use", 'q2': "Q2 - Learning",
+        'q3': "Q3 - Design/Interface", 'q4': "Q4 - Recommendation",
+        'q5': "Strengths:", 'q6': "Suggested improvements:",
+        'contact': "Comments and suggestions", 'email': "E-mail", 'page': "Page",
+    },
+    'es': {
+        'title': "Escape Room de la Seguridad del Paciente",
+        'subtitle': "Informe de Desempeño del Usuario",
+        'generated_at': "Fecha/Hora", 'user': "Usuario",
+        'progress': "Progreso del Usuario",
+        'station': "Estación", 'challenge': "Desafío", 'points': "Puntos", 'max_points': "Máx.",
+        'time': "Tiempo (s)", 'no_results': "Ninguna estación completada.",
+        'total_score': "Puntuación Total", 'total_time': "Tiempo Total",
+        'average': "Puntuación Media", 'achievement': "Logro",
+        'gold': "Oro", 'silver': "Plata", 'bronze': "Bronce",
+        'evaluation': "Evaluación de la Plataforma",
+        'participant_type': "Tipo de participante", 'participation_type': "Tipo de participación",
+        'team': "Equipo",
+        'q1': "P1 - Facilidad de uso", 'q2': "P2 - Aprendizaje",
+        'q3': "P3 - Diseño/Interfaz", 'q4': "P4 - Recomendación",
+        'q5': "Puntos fuertes:", 'q6': "Mejoras sugeridas:",
+        'contact': "Comentarios y sugerencias", 'email': "Correo", 'page': "Página",
+    },
+}
+
+_fonts_lock = threading.Lock()
+_fonts_registered = False
+
+
+def register_fonts():
+    """Registra as fontes Unicode (DejaVu) uma única vez por processo."""
+    global _fonts_registered
+    if _fonts_registered:
+        return
+    from reportlab.lib.fonts import addMapping
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+    with _fonts_lock:
+        if not _fonts_registered:
+            pdfmetrics.registerFont(TTFont("DejaVu",        os.path.join(FONTS_DIR, "DejaVuSans.ttf")))
+            pdfmetrics.registerFont(TTFont("DejaVu-Bold",   os.path.join(FONTS_DIR, "DejaVuSans-Bold.ttf")))
+            pdfmetrics.registerFont(TTFont("DejaVu-Italic", os.path.join(FONTS_DIR, "DejaVuSans-Oblique.ttf")))
+            # <b>/<i> dentro dos Paragraphs
+            addMapping("DejaVu", 0, 0, "DejaVu")
+            addMapping("DejaVu", 1, 0, "DejaVu-Bold")
+            addMapping("DejaVu", 0, 1, "DejaVu-Italic")
+            addMapping("DejaVu", 1, 1, "DejaVu-Bold")
+            _fonts_registered = True
+
+
+# --- Dados ---
+class ReportData:
+    """Tudo que o relatório precisa, já fora do banco (resultados: (estação, pontos, segundos))."""
+
+    __slots__ = ('username', 'language', 'results', 'evaluation', 'generated_at')
+
+    def __init__(self, username, results, evaluation=None, generated_at=None, language=None):
+        self.username = username
+        self.language = language
+        self.results = sorted(results)
+        self.evaluation = evaluation
+        self.generated_at = generated_at or datetime.now()
+
+
+def _team_list(team):
+    try:
+        return pyjson.loads(team) if team else []
+    except Exception:
+        return [team]
+
+
+def load_report_data(user_id):
+    user = db.session.get(User, user_id)
+    if not user:
+        return None
+    results = db.session.query(StationResult.station_id, StationResult.score, StationResult.time_spent) \
+        .filter_by(user_id=user_id).all()
+    evaluation = Evaluation.query.filter_by(user_id=user_id).order_by(Evaluation.created_at.desc()).first()
+    if evaluation:
+        evaluation = {
+            'participant_type': evaluation.participant_type,
+            'participation_type': evaluation.participation_type,
+            'team': _team_list(evaluation.team),
+            'q1': evaluation.q1, 'q2': evaluation.q2, 'q3': evaluation.q3, 'q4': evaluation.q4,
+            'q5': evaluation.q5, 'q6': evaluation.q6,
+        }
+    return ReportData(user.username, [tuple(r) for r in results], evaluation, language=user.language)
+
+
+# --- Layout (cache por idioma) ---
+class ReportLayout:
+    """Estilos, rótulos e modelos de página de um idioma; criado uma vez e reaproveitado."""
+
+    def __init__(self, lang):
+        from reportlab.lib import colors
+        from reportlab.lib.enums import TA_CENTER
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.styles import ParagraphStyle
+        from reportlab.platypus import TableStyle
+
+        register_fonts()
+        self.lang = lang
+        self.labels = LABELS[lang]
+        self.pagesize = A4
+        self.primary = colors.HexColor(PRIMARY_COLOR)
+
+        base = ParagraphStyle('body', fontName="DejaVu", fontSize=10, leading=14)
+        self.styles = {
+            'body': base,
+            'title': ParagraphStyle('title', base, fontName="DejaVu-Bold", fontSize=18, leading=22,
+                                    alignment=TA_CENTER, textColor=self.primary),
+            'subtitle': ParagraphStyle('subtitle', base, fontName="DejaVu-Italic", fontSize=12, leading=16,
+                                       alignment=TA_CENTER),
+            'centered': ParagraphStyle('centered', base, alignment=TA_CENTER),
+            'user': ParagraphStyle('user', base, fontName="DejaVu-Bold", fontSize=12, leading=16,
+                                   alignment=TA_CENTER),
+            'section': ParagraphStyle('section', base, fontName="DejaVu-Bold", fontSize=12, leading=16,
+                                      textColor=self.primary, spaceBefore=14, spaceAfter=8),
+            'cell': ParagraphStyle('cell', base, fontSize=9, leading=11),
+            # Caixa cinza que quebra entre páginas junto com o texto
+            'boxed': ParagraphStyle('boxed', base, backColor=colors.lightgrey, borderPadding=8,
+                                    leftIndent=8, rightIndent=8, spaceBefore=12, spaceAfter=12),
+        }
+        self.table_style = TableStyle([
+            ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+            ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+            ("FONTNAME", (0, 0), (-1, 0), "DejaVu-Bold"),
+            ("FONTNAME", (0, 1), (-1, -1), "DejaVu"),
+            ("FONTSIZE", (0, 0), (-1, -1), 9),
+            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+            ("ALIGN", (1, 1), (1, -1), "LEFT"),
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ])
+        self.col_widths = [50, 245, 50, 50, 60]
+        self.header = [self.labels[k] for k in ('station', 'challenge', 'points', 'max_points', 'time')]
+        self.logo = self._load_logo()
+
+    @staticmethod
+    def _load_logo():
+        try:
+            with open(LOGO_PATH, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def draw_page(self, canvas, doc):
+        """Rodapé de todas as páginas; da segunda em diante, título e usuário no topo."""
+        width, height = self.pagesize
+        canvas.saveState()
+        if doc.page > 1:
+            canvas.setFont("DejaVu", 8)
+            canvas.setFillColor(self.primary)
+            canvas.drawString(40, height - 30, self.labels['title'])
+            canvas.drawRightString(width - 40, height - 30, doc.report_username)
+            canvas.setStrokeColorRGB(0.5, 0.5, 0.5)
+            canvas.line(40, height - 36, width - 40, height - 36)
+
+        canvas.setStrokeColorRGB(0.5, 0.5, 0.5)
+        canvas.line(40, 50, width - 40, 50)
+        canvas.setFont("DejaVu", 9)
+        canvas.setFillColor(self.primary)
+        canvas.drawCentredString(width / 2, 35, f"{self.labels['contact']}: {CONTACT_NAME}")
+        canvas.linkURL(f"mailto:{CONTACT_EMAIL}", (width / 2 - 100, 20, width / 2 + 100, 40), relative=0)
+        canvas.setFillColorRGB(0, 0, 0)
+        canvas.drawCentredString(width / 2, 20, f"{self.labels['email']}: {CONTACT_EMAIL}")
+        canvas.setFont("DejaVu", 8)
+        canvas.drawRightString(width - 40, 20, f"{self.labels['page']} {doc.page}")
+        canvas.restoreState()
+
+
+@lru_cache(maxsize=None)
+def _layout(lang):
+    return ReportLayout(lang)
+
+
+def layout_for(lang):
+    # Normaliza antes do cache: a chave vem do ?lang= da URL, então no máximo um layout por idioma
+    return _layout(language(lang))
+
+
+def achievement(avg_pct):
+    for threshold, key in ACHIEVEMENTS:
+        if avg_pct >= threshold:
+            return key
+    return None
+
+
+def _text(value):
+    """Texto livre do usuário como markup seguro do Paragraph (quebras de linha mantidas)."""
+    return escape(str(value or "")).replace("\n", "<br/>")
+
+
+def build_story(data, layout):
+    from reportlab.platypus import Image, Paragraph, Spacer, Table
+
+    labels, styles = layout.labels, layout.styles
+    story = []
+
+    # --- Cabeçalho ---
+    if layout.logo is not None:
+        story.append(Image(io.BytesIO(layout.logo), width=180, height=60))
+    story += [
+        Spacer(1, 12),
+        Paragraph(escape(labels['title']), styles['title']),
+        Paragraph(escape(labels['subtitle']), styles['subtitle']),
+        Spacer(1, 4),
+        Paragraph(f"{labels['generated_at']}: {data.generated_at.strftime('%d/%m/%Y %H:%M:%S')}", styles['centered']),
+        Paragraph(f"{labels['user']}: {escape(data.username)}", styles['user']),
+    ]
+
+    # --- Progresso do usuário ---
+    story.append(Paragraph(labels['progress'], styles['section']))
+    total_score = total_time = total_max = 0
+    rows = [layout.header]
+    for station_id, score, time_spent in data.results:
+        challenge = catalog.localized_challenge(station_id, layout.lang)
+        max_points = challenge['points'] if challenge else 0
+        title = challenge['title'] if challenge else f"{labels['station']} {station_id}"
+        total_score += score
+        total_time += time_spent
+        total_max += max_points
+        rows.append([station_id, Paragraph(escape(title), styles['cell']), score, max_points or "—", time_spent])
+    if data.results:
+        # repeatRows: o cabeçalho da tabela volta em cada página
+        table = Table(rows, colWidths=layout.col_widths, repeatRows=1)
+        table.setStyle(layout.table_style)
+        story.append(table)
+    else:
+        story.append(Paragraph(labels['no_results'], styles['body']))
+
+    avg_pct = round((total_score / total_max) * 100, 2) if total_max else 0
+    medal = achievement(avg_pct)
+    story += [Spacer(1, 10)] + [Paragraph(line, styles['body']) for line in (
+        f"{labels['total_score']}: {total_score}",
+        f"{labels['total_time']}: {total_time // 3600}h {(total_time % 3600) // 60}m",
+        f"{labels['average']}: {avg_pct}%",
+        f"{labels['achievement']}: {labels[medal] if medal else '—'}",
+    )]
+
+    # --- Avaliação da Plataforma ---
+    evaluation = data.evaluation
+    if evaluation:
+        story.append(Paragraph(labels['evaluation'], styles['section']))
+        team = ", ".join(str(member) for member in evaluation['team']) or "—"
+        for line in (
+            f"{labels['participant_type']}: {_text(evaluation['participant_type'])}",
+            f"{labels['participation_type']}: {_text(evaluation['participation_type'])}",
+            f"{labels['team']}: {_text(team)}",
+            *(f"{labels[q]}: {_text(evaluation[q])}" for q in ('q1', 'q2', 'q3', 'q4')),
+        ):
+            story.append(Paragraph(line, styles['body']))
+        for q in ('q5', 'q6'):
+            if evaluation[q]:
+                story.append(Paragraph(f"<b>{labels[q]}</b><br/>{_text(evaluation[q])}", styles['boxed']))
+    return story
+
+
+# --- Saída ---
+class ChunkSink:
+    """
+    Destino de escrita para o reportlab: guarda as referências aos bytes recebidos
+    (o reportlab grava o documento num único write) em vez de copiá-los para um buffer.
+    """
+
+    def __init__(self):
+        self.parts = []
+        self.size = 0
+        self.pages = 0
+
+    def write(self, data):
+        self.parts.append(data)
+        self.size += len(data)
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def chunks(self, chunk_size=CHUNK_SIZE):
+        """Pedaços de até chunk_size bytes (fatias do original; só o pedaço entregue é copiado)."""
+        for part in self.parts:
+            view = memoryview(part)
+            for start in range(0, len(view), chunk_size):
+                yield bytes(view[start:start + chunk_size])
+
+    def getvalue(self):
+        return b"".join(self.parts)
+
+
+def render(data, lang=None, out=None):
+    """
+    Desenha o relatório de `data` em `out` (file-like; padrão: um novo ChunkSink) e o devolve.
+    Idioma: `lang`, senão o do usuário, senão português.
+    """
+    from reportlab.platypus import SimpleDocTemplate
+
+    started = time.perf_counter()
+    layout = layout_for(lang or data.language)
+    out = ChunkSink() if out is None else out
+    doc = SimpleDocTemplate(out, pagesize=layout.pagesize, leftMargin=45, rightMargin=45,
+                            topMargin=45, bottomMargin=65, title=layout.labels['subtitle'],
+                            author=CONTACT_NAME)
+    doc.report_username = data.username
+    doc.build(build_story(data, layout), onFirstPage=layout.draw_page, onLaterPages=layout.draw_page)
+    if isinstance(out, ChunkSink):
+        out.pages = doc.page
+    metrics.observe(PDF_RENDER, (layout.lang,), time.perf_counter() - started)
+    return out
+
+
+def render_user_report(user_id, lang=None):
+    """PDF (bytes) com o desempenho e a avaliação do usuário, ou None se ele não existir."""
+    sink = stream_user_report(user_id, lang)
+    return sink.getvalue() if sink is not None else None
+
+
+def stream_user_report(user_id, lang=None):
+    """Renderiza o relatório e devolve o ChunkSink (use .chunks() na resposta), ou None."""
+    data = load_report_data(user_id)
+    return render(data, lang) if data is not None else None
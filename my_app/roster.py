@@ -0,0 +1,333 @@
+# /roster.py
+"""
+Importação de turmas inteiras (lista de alunos em CSV ou XLSX) no lugar de cada aluno passar
+pelo /register.
+
+- Colunas: username e email obrigatórias; password, profession, country e language opcionais
+  (cabeçalhos em pt/en/es, sem diferenciar maiúsculas ou acentos).
+- Validação por linha; duplicatas no arquivo e no banco (uma consulta só para todos os
+  usernames/e-mails) viram erros daquela linha, e as demais linhas são importadas.
+- Senhas informadas na planilha: hash completo (werkzeug), em paralelo num pool de processos.
+  Linha sem senha: senha provisória aleatória, devolvida uma única vez no relatório; como ela
+  já tem ~72 bits de entropia, usa um hash barato (ROSTER_GENERATED_HASH_METHOD).
+- User, UserProgress e CohortMembership entram em INSERTs em lote (ROSTER_CHUNK linhas), numa
+  transação só.
+
+API: POST /api/cohorts/<id>/roster (multipart, campo 'file'; dry_run=1 só valida)
+CLI: python -m my_app.roster alunos.csv --cohort 3 [--dry-run]
+"""
+
+import argparse
+import csv
+import io
+import json
+import multiprocessing
+import os
+import re
+import secrets
+import time
+import unicodedata
+import uuid
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from xml.etree import ElementTree
+
+from flask import current_app
+from sqlalchemy import func, insert, or_, select
+from sqlalchemy.exc import IntegrityError
+from werkzeug.security import generate_password_hash
+
+from .catalog import DEFAULT_LANGUAGE, LANGUAGES
+from .cohorts import STUDENT, invalidate_after_commit
+from .models import db, Cohort, CohortMembership, User, UserProgress
+from .options import COUNTRIES, PROFESSIONS
+
+# Cabeçalho normalizado (minúsculas, sem acentos) -> campo
+HEADERS = {
+    'username': 'username', 'usuario': 'username', 'nome de usuario': 'username', 'user': 'username',
+    'email': 'email', 'e-mail': 'email', 'correo': 'email',
+    'password': 'password', 'senha': 'password', 'contrasena': 'password',
+    'profession': 'profession', 'profissao': 'profession', 'profesion': 'profession',
+    'country': 'country', 'pais': 'country',
+    'language': 'language', 'idioma': 'language', 'lang': 'language',
+}
+REQUIRED = ('username', 'email')
+EMAIL = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+MAX_LENGTHS = {'username': 50, 'email': 100, 'profession': 50, 'country': 50}
+MIN_PASSWORD_LENGTH = 6
+GENERATED_PASSWORD_BYTES = 9  # 12 caracteres url-safe
+MAX_SHEET_BYTES = 50 * 1024 * 1024  # planilha descompactada
+
+XLSX_NS = {'m': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main',
+           'r': 'http://schemas.openxmlformats.org/officeDocument/2006/relationships',
+           'rel': 'http://schemas.openxmlformats.org/package/2006/relationships'}
+
+
+class RosterError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+# --- Leitura ---
+def _plain(value):
+    return ''.join(c for c in unicodedata.normalize('NFD', value.strip().lower()) if unicodedata.category(c) != 'Mn')
+
+
+def read_csv(data):
+    try:
+        content = data.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        content = data.decode('cp1252', errors='replace')  # exportação do Excel em português
+    header = content.split('\n', 1)[0]
+    delimiter = max(',;\t', key=header.count)
+    return list(csv.reader(io.StringIO(content), delimiter=delimiter))
+
+
+def _column(reference):
+    index = 0
+    for letter in re.match(r'[A-Z]+', reference).group():
+        index = index * 26 + ord(letter) - 64
+    return index - 1
+
+
+def read_xlsx(data):
+    """Linhas da primeira planilha de um .xlsx (só valores; sem dependência além da stdlib)."""
+    try:
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            if sum(info.file_size for info in archive.infolist()) > MAX_SHEET_BYTES:
+                raise RosterError("Spreadsheet is too large", 413)
+            workbook = ElementTree.fromstring(archive.read('xl/workbook.xml'))
+            first = workbook.find('m:sheets/m:sheet', XLSX_NS).get(f"{{{XLSX_NS['r']}}}id")
+            rels = ElementTree.fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+            target = next(rel.get('Target') for rel in rels.findall('rel:Relationship', XLSX_NS)
+                          if rel.get('Id') == first)
+            path = target.lstrip('/') if target.startswith('/') else f'xl/{target}'
+            shared = []
+            if 'xl/sharedStrings.xml' in archive.namelist():
+                strings = ElementTree.fromstring(archive.read('xl/sharedStrings.xml'))
+                shared = [''.join(t.text or '' for t in item.iter(f"{{{XLSX_NS['m']}}}t"))
+                          for item in strings.findall('m:si', XLSX_NS)]
+            sheet = ElementTree.fromstring(archive.read(path))
+    except (zipfile.BadZipFile, KeyError, AttributeError, StopIteration, ElementTree.ParseError) as e:
+        raise RosterError(f"Invalid XLSX file: {e}") from e
+
+    rows = []
+    for row in sheet.iterfind('m:sheetData/m:row', XLSX_NS):
+        # Linhas vazias não aparecem no XML: mantém a numeração da planilha no relatório
+        while row.get('r') and len(rows) < int(row.get('r')) - 1:
+            rows.append([])
+        values = {}
+        for position, cell in enumerate(row.findall('m:c', XLSX_NS)):
+            kind, value = cell.get('t'), cell.find('m:v', XLSX_NS)
+            if kind == 'inlineStr':
+                text = ''.join(t.text or '' for t in cell.iter(f"{{{XLSX_NS['m']}}}t"))
+            elif value is None or value.text is None:
+                continue
+            elif kind == 's':
+                text = shared[int(value.text)]
+            elif kind in (None, 'n') and re.fullmatch(r'-?\d+\.0+', value.text):
+                text = value.text.split('.')[0]
+            else:
+                text = value.text
+            values[_column(cell.get('r')) if cell.get('r') else position] = text
+        rows.append([values.get(i, '') for i in range(max(values) + 1)] if values else [])
+    return rows
+
+
+def read_roster(filename, data):
+    """[(número da linha na planilha, {campo: valor})], com o cabeçalho já mapeado."""
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension == '.xlsx':
+        rows = read_xlsx(data)
+    elif extension in ('.csv', '.txt'):
+        rows = read_csv(data)
+    else:
+        raise RosterError("Roster must be a .csv or .xlsx file", 415)
+    if not rows:
+        raise RosterError("Roster is empty")
+    fields = [HEADERS.get(_plain(name)) for name in rows[0]]
+    missing = [name for name in REQUIRED if name not in fields]
+    if missing:
+        raise RosterError(f"Missing column(s): {', '.join(missing)}")
+    records = []
+    for number, row in enumerate(rows[1:], start=2):
+        if not any((value or '').strip() for value in row):
+            continue
+        records.append((number, {field: (value or '').strip() for field, value in zip(fields, row) if field}))
+    return records
+
+
+# --- Validação ---
+def validate_rows(records, default_language=DEFAULT_LANGUAGE):
+    """(linhas válidas, erros [{'row', 'field', 'error'}]); uma consulta ao banco para todas."""
+    errors, candidates = [], []
+    seen = {'username': {}, 'email': {}}
+    for number, record in records:
+        record['email'] = record.get('email', '').lower()
+        problems = []
+        for field in REQUIRED:
+            if not record.get(field):
+                problems.append((field, "required"))
+        for field, limit in MAX_LENGTHS.items():
+            if len(record.get(field) or '') > limit:
+                problems.append((field, f"longer than {limit} characters"))
+        if record['email'] and not EMAIL.match(record['email']):
+            problems.append(('email', "invalid email"))
+        if record.get('password') and len(record['password']) < MIN_PASSWORD_LENGTH:
+            problems.append(('password', f"shorter than {MIN_PASSWORD_LENGTH} characters"))
+        lang = record.get('language') or default_language
+        if lang not in LANGUAGES:
+            problems.append(('language', f"must be one of {', '.join(LANGUAGES)}"))
+        for field in ('username', 'email'):
+            value = record.get(field)
+            if value and value in seen[field]:
+                problems.append((field, f"duplicated in file (row {seen[field][value]})"))
+            elif value:
+                seen[field][value] = number
+        if problems:
+            errors.extend({'row': number, 'field': field, 'error': error} for field, error in problems)
+        else:
+            record['language'] = lang
+            candidates.append((number, record))
+
+    # Conflitos com o banco: uma consulta por todos os usernames e e-mails
+    taken_usernames, taken_emails = set(), set()
+    if candidates:
+        usernames = [record['username'] for _, record in candidates]
+        emails = [record['email'] for _, record in candidates]
+        for username, email in db.session.execute(
+                select(User.username, func.lower(User.email))
+                .where(or_(User.username.in_(usernames), func.lower(User.email).in_(emails)))):
+            taken_usernames.add(username)
+            taken_emails.add(email)
+
+    valid = []
+    for number, record in candidates:
+        conflicts = [field for field, taken in (('username', taken_usernames), ('email', taken_emails))
+                     if record[field] in taken]
+        if conflicts:
+            errors.extend({'row': number, 'field': field, 'error': "already registered"} for field in conflicts)
+        else:
+            valid.append((number, record))
+    errors.sort(key=lambda error: error['row'])
+    return valid, errors
+
+
+# --- Senhas ---
+def hash_passwords(passwords, workers, pool_min=32):
+    """Hash completo de cada senha; em processos separados quando compensa (o hash é CPU pura)."""
+    if workers <= 1 or len(passwords) < pool_min:
+        return [generate_password_hash(password) for password in passwords]
+    # spawn: os filhos não herdam threads/locks do worker web (métricas, profiler, pool do banco)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return list(pool.map(generate_password_hash, passwords, chunksize=max(1, len(passwords) // (workers * 4))))
+
+
+# --- Importação ---
+def import_roster(cohort_id, filename, data, default_language=DEFAULT_LANGUAGE, dry_run=False):
+    """
+    Lê, valida e importa a lista de alunos na turma `cohort_id` (com commit).
+    {'created', 'errors', 'users': [{'row', 'id', 'username', 'email', 'password'?}], 'seconds'}
+    """
+    config = current_app.config
+    if db.session.get(Cohort, cohort_id) is None:
+        raise RosterError("Cohort not found", 404)
+    timings = {}
+    started = time.perf_counter()
+    records = read_roster(filename, data)
+    if len(records) > config['ROSTER_MAX_ROWS']:
+        raise RosterError(f"Roster has more than {config['ROSTER_MAX_ROWS']} students", 413)
+    valid, errors = validate_rows(records, default_language)
+    timings['validate'] = time.perf_counter() - started
+    if dry_run or not valid:
+        return {'created': 0, 'errors': errors, 'users': [], 'valid': len(valid),
+                'seconds': {k: round(v, 3) for k, v in timings.items()}}
+
+    started = time.perf_counter()
+    given = [record['password'] for _, record in valid if record.get('password')]
+    hashes = iter(hash_passwords(given, config['ROSTER_HASH_WORKERS'], config['ROSTER_HASH_POOL_MIN']))
+    generated = {}
+    rows = []
+    for number, record in valid:
+        if record.get('password'):
+            password_hash = next(hashes)
+        else:
+            generated[number] = secrets.token_urlsafe(GENERATED_PASSWORD_BYTES)
+            password_hash = generate_password_hash(generated[number], method=config['ROSTER_GENERATED_HASH_METHOD'])
+        lang = record['language']
+        rows.append({
+            'username': record['username'], 'email': record['email'], 'password_hash': password_hash,
+            'profession': record.get('profession') or PROFESSIONS[lang][4],  # Estudante/Student/Estudiante
+            'country': record.get('country') or COUNTRIES[lang][-1],        # Outro/Other/Otro
+            'language': lang, 'visitor_id': str(uuid.uuid4()),
+        })
+    timings['hash'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    ids = []
+    chunk = config['ROSTER_CHUNK']
+    try:
+        for offset in range(0, len(rows), chunk):
+            part = rows[offset:offset + chunk]
+            created = db.session.execute(insert(User).returning(User.id, sort_by_parameter_order=True), part)
+            user_ids = created.scalars().all()
+            db.session.execute(insert(UserProgress), [{'user_id': user_id} for user_id in user_ids])
+            db.session.execute(insert(CohortMembership), [
+                {'cohort_id': cohort_id, 'user_id': user_id, 'role': STUDENT} for user_id in user_ids])
+            ids.extend(user_ids)
+        invalidate_after_commit([cohort_id])
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        raise RosterError("Some students were registered while importing; run the import again", 409) from e
+    timings['insert'] = time.perf_counter() - started
+
+    users = []
+    for (number, record), user_id in zip(valid, ids):
+        user = {'row': number, 'id': user_id, 'username': record['username'], 'email': record['email']}
+        if number in generated:
+            user['password'] = generated[number]
+        users.append(user)
+    return {'created': len(ids), 'errors': errors, 'users': users, 'valid': len(valid),
+            'seconds': {k: round(v, 3) for k, v in timings.items()}}
+
+
+def print_report(result):
+    seconds = ', '.join(f"{step} {value}s" for step, value in result['seconds'].items())
+    print(f"{result['created']} alunos criados, {result['valid']} linhas válidas, "
+          f"{len(result['errors'])} erros ({seconds})")
+    for error in result['errors']:
+        print(f"  linha {error['row']}: {error['field']}: {error['error']}")
+
+
+def main():
+    from . import create_app
+
+    parser = argparse.ArgumentParser(description="Importa uma lista de alunos (CSV/XLSX) numa turma.")
+    parser.add_argument('path')
+    parser.add_argument('--cohort', type=int, required=True, help="id da turma")
+    parser.add_argument('--language', default=DEFAULT_LANGUAGE, help="idioma das linhas sem a coluna language")
+    parser.add_argument('--dry-run', action='store_true', help="só valida")
+    parser.add_argument('--config', default='production')
+    parser.add_argument('--json', dest='json_path', default=None,
+                        help="grava o resultado em JSON (inclui as senhas provisórias)")
+    args = parser.parse_args()
+
+    with open(args.path, 'rb') as f:
+        data = f.read()
+    app = create_app(args.config, INIT_MIGRATIONS=False)
+    with app.app_context():
+        try:
+            result = import_roster(args.cohort, os.path.basename(args.path), data, args.language, args.dry_run)
+        except RosterError as e:
+            parser.exit(1, f"{e.message}\n")
+    print_report(result)
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+# /roster_bench.py
+"""
+Cadastro de uma turma: um aluno por vez pelo caminho do /register (set_password com o hash
+padrão + commit por linha) contra a importação em lote de my_app/roster.py.
+
+O caminho linha a linha é medido numa amostra (--baseline) e extrapolado para a turma toda;
+a importação roda inteira, com --with-password dos alunos trazendo senha na planilha (hash
+completo, no pool de processos) e o resto recebendo senha provisória.
+
+Uso:
+    python -m my_app.roster_bench
+    python -m my_app.roster_bench --students 2000 --with-password 0.1 --json roster_bench.json
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+
+def roster_csv(students, with_password):
+    every = round(1 / with_password) if with_password else 0
+    lines = ['username,email,password']
+    for i in range(students):
+        password = f'senha-{i:05d}' if every and i % every == 0 else ''
+        lines.append(f'aluno{i},aluno{i}@escola.test,{password}')
+    return '\n'.join(lines).encode()
+
+
+def run(students=2000, with_password=0.0, baseline=20, workers=None, database_url=None):
+    from . import create_app, db
+    from .cohorts import create_cohort
+    from .models import User
+    from .roster import import_roster
+
+    tmpdir = None
+    if database_url is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        database_url = 'sqlite:///' + os.path.join(tmpdir.name, 'roster_bench.db')
+    overrides = {'ROSTER_MAX_ROWS': max(students, 5000)}
+    if workers:
+        overrides['ROSTER_HASH_WORKERS'] = workers
+    app = create_app('production', SQLALCHEMY_DATABASE_URI=database_url, INIT_MIGRATIONS=False,
+                     RATE_LIMIT_ENABLED=False, **overrides)
+
+    with app.app_context():
+        db.create_all()
+        if db.session.query(User.id).first() is not None:
+            raise SystemExit("users is not empty: point --database-url at a scratch database")
+        try:
+            owner = User(username='professor', email='professor@escola.test', password_hash='-',
+                         profession='-', country='-')
+            db.session.add(owner)
+            db.session.flush()
+            cohort = create_cohort(owner, 'Bench')
+            db.session.commit()
+
+            # Como o /register: um aluno por vez
+            started = time.perf_counter()
+            for i in range(baseline):
+                user = User(username=f'avulso{i}', email=f'avulso{i}@escola.test', profession='Estudante',
+                            country='Brasil', language='pt')
+                user.set_password(f'senha-{i:05d}')
+                user.generate_visitor_id()
+                db.session.add(user)
+                db.session.commit()
+            per_row = (time.perf_counter() - started) / baseline if baseline else 0.0
+
+            started = time.perf_counter()
+            result = import_roster(cohort.id, 'alunos.csv', roster_csv(students, with_password))
+            seconds = time.perf_counter() - started
+            results = {
+                'students': students, 'with_password': sum('password' not in user for user in result['users']),
+                'dialect': db.engine.dialect.name, 'hash_workers': app.config['ROSTER_HASH_WORKERS'],
+                'one_by_one_ms_per_student': round(per_row * 1000, 2),
+                'one_by_one_seconds_estimated': round(per_row * students, 1),
+                'import_seconds': round(seconds, 2), 'import_steps': result['seconds'],
+                'created': result['created'], 'errors': len(result['errors']),
+                'speedup': round(per_row * students / seconds, 1) if seconds else None,
+            }
+        finally:
+            db.session.remove()
+            db.engine.dispose()
+    if tmpdir is not None:
+        tmpdir.cleanup()
+    return results
+
+
+def print_report(report):
+    print(f"\n{report['students']} alunos ({report['dialect']}), {report['with_password']} com senha na planilha, "
+          f"{report['hash_workers']} processo(s) de hash")
+    print(f"um por vez:  {report['one_by_one_ms_per_student']} ms/aluno -> ~{report['one_by_one_seconds_estimated']}s")
+    steps = ', '.join(f"{step} {value}s" for step, value in report['import_steps'].items())
+    print(f"importação:  {report['import_seconds']}s ({steps}); {report['created']} criados, "
+          f"{report['errors']} erros -> {report['speedup']}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cadastro um a um vs. importação da turma em lote.")
+    parser.add_argument('--students', type=int, default=2000)
+    parser.add_argument('--with-password', type=float, default=0.0,
+                        help="fração dos alunos com senha na planilha (hash completo)")
+    parser.add_argument('--baseline', type=int, default=20, help="alunos cadastrados um a um (amostra)")
+    parser.add_argument('--workers', type=int, default=None, help="padrão: ROSTER_HASH_WORKERS")
+    parser.add_argument('--database-url', default=None, help="banco de rascunho vazio (padrão: SQLite descartável)")
+    parser.add_argument('--json', dest='json_path', default=None, help="grava o resultado em JSON")
+    args = parser.parse_args()
+
+    report = run(students=args.students, with_password=args.with_password, baseline=args.baseline,
+                 workers=args.workers, database_url=args.database_url)
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
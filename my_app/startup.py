@@ -0,0 +1,66 @@
+# /startup.py
+# Partida a frio: o que é pesado ou raramente usado fica preguiçoso, e warmup() antecipa
+# o trabalho quando se prefere pagá-lo antes do worker começar a atender.
+
+import json
+import os
+import threading
+
+from sqlalchemy import text
+
+
+class Translations:
+    """Traduções carregadas sob demanda, um arquivo por idioma, na primeira consulta."""
+
+    LANGUAGES = ('pt', 'en', 'es')
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._data = {}
+
+    def _load(self, lang):
+        file_path = os.path.join(self.directory, f'{lang}.json')
+        if not os.path.exists(file_path):
+            return None
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"Error loading translation {lang}.json: {e}")
+            return {}
+
+    def get(self, lang, default=None):
+        if lang not in self._data:
+            with self._lock:
+                if lang not in self._data:
+                    self._data[lang] = self._load(lang) if lang in self.LANGUAGES else None
+        value = self._data[lang]
+        return default if value is None else value
+
+    def load_all(self):
+        for lang in self.LANGUAGES:
+            self.get(lang)
+
+
+def preload_reports():
+    """Importa o reportlab e monta os layouts do relatório (fontes, estilos) de cada idioma."""
+    from .reports import layout_for
+    for lang in Translations.LANGUAGES:
+        layout_for(lang)
+
+
+def warmup(app):
+    """
+    Aquece caches antes do worker atender: traduções, templates Jinja compilados,
+    conexão do pool com o banco e, se REPORT_WARMUP, o reportlab.
+    """
+    app.extensions['translations'].load_all()
+    for name in app.jinja_env.list_templates(filter_func=lambda n: n.endswith('.html')):
+        app.jinja_env.get_template(name)
+    with app.app_context():
+        db = app.extensions['sqlalchemy']
+        db.session.execute(text('SELECT 1'))
+        db.session.remove()
+    if app.config['REPORT_WARMUP']:
+        preload_reports()
@@ -18,32 +18,19 @@ window.BaseChallenge = class BaseChallenge {
     async startChallenge() {
         console.log("Iniciando desafio:", this.challengeId);
 
-        try {
-            const response = await fetch("/api/game/challenge/start", {
-                method: "POST",
-                headers: { "Content-Type": "application/json" },
-                body: JSON.stringify({
-                    challenge_id: this.challengeId
-                }),
-            });
-
-            const data = await response.json();
-
-            if (!response.ok || !data.success) {
-                alert(data.error || "Você não pode iniciar este desafio ainda. Complete os requisitos anteriores.");
-                window.location.href = "/station"; // Redireciona se não puder iniciar
-                return false;
-            }
+        // Vai pela fila offline: sem conexão o desafio começa assim mesmo e o início
+        // é sincronizado antes da conclusão (o servidor aplica os eventos na ordem de seq)
+        const result = await window.GameEvents.send("start", { challenge_id: this.challengeId });
 
-            console.log("Desafio iniciado com sucesso:", data);
-            this.startTime = Date.now(); // Marca o tempo de início somente após sucesso
-            return true;
-        } catch (error) {
-            console.error("Erro ao iniciar o desafio:", error);
-            alert("Erro de conexão com o servidor ao iniciar o desafio.");
-            window.location.href = "/station";
+        if (result && result.status === "rejected") {
+            alert(result.error || "Você não pode iniciar este desafio ainda. Complete os requisitos anteriores.");
+            window.location.href = "/station"; // Redireciona se não puder iniciar
             return false;
         }
+
+        console.log(result ? "Desafio iniciado com sucesso:" : "Desafio iniciado offline:", result);
+        this.startTime = Date.now(); // Marca o tempo de início somente após sucesso
+        return true;
     }
 
     async completeChallenge(success) {
@@ -57,73 +44,30 @@ window.BaseChallenge = class BaseChallenge {
             this.totalQuestions || 1
         );
 
-        try {
-            const response = await fetch("/api/game/challenge/complete", {
-                method: "POST",
-                headers: { "Content-Type": "application/json" },
-                body: JSON.stringify({
-                    challenge_id: results.challengeId,
-                    challenge_type: results.challengeType,
-                    score: results.finalScore,
-                    time_spent: results.timeSpent,
-                    wrong_answers: results.wrongAnswers,
-                    total_questions: results.totalQuestions,
-                    key_earned: results.keyReward,
-                    // extras úteis para relatórios e debug
-                    tempo_extra: results.tempoExtra,
-                    error_factor: results.errorPenaltyFactor,
-                    time_factor: results.timePenaltyFactor,
-                    alpha: results.alpha,
-                    beta: results.beta
-                }),
-            });
-
-            const data = await response.json();
-
-            if (response.ok && data.success) {
-                alert(
-                    `Desafio concluído!\n` +
-                    `Pontuação: ${results.finalScore}/${results.basePoints}\n` +
-                    `Erros: ${results.wrongAnswers}/${results.totalQuestions}\n` +
-                    `Tempo gasto: ${results.timeSpent}s`
-                );
-                console.log("Nova chave obtida:", data.new_key_earned);
-
-                // >>> NOVO BLOCO: salvar também no station_results <<<
-                try {
-                    console.log(">>> Enviando para /api/station_result:", {
-                        station_id: results.challengeId,
-                        score: results.finalScore,
-                        time_spent: results.timeSpent
-                    });
-
-                    const stationResp = await fetch("/api/station_result", {
-                        method: "POST",
-                        headers: { "Content-Type": "application/json" },
-                        body: JSON.stringify({
-                            station_id: results.challengeId,
-                            score: results.finalScore,
-                            time_spent: results.timeSpent
-                        })
-                    });
-
-                    const stationData = await stationResp.json();
-                    console.log(">>> Resposta do /api/station_result:", stationData);
-                } catch (err) {
-                    console.error("❌ Erro ao salvar no station_results:", err);
-                }
-                // <<< FIM DO NOVO BLOCO >>>
-
-            } else {
-                alert(data.message || "Falha ao salvar o progresso do desafio.");
-            }
-        } catch (error) {
-            console.error("Erro de conexão ao concluir o desafio:", error);
-            alert("Erro de conexão com o servidor. Seu progresso não pôde ser salvo.");
-        } finally {
-            // Sempre redireciona para a tela de estações
-            window.location.href = "/station";
+        // Conclusão + resultado da estação vão num único evento (fila offline)
+        const result = await window.GameEvents.send("complete", {
+            challenge_id: results.challengeId,
+            score: results.finalScore,
+            time_spent: results.timeSpent,
+            wrong_answers: results.wrongAnswers,
+            total_questions: results.totalQuestions
+        });
+
+        if (!result) {
+            alert("Sem conexão com o servidor. Seu progresso foi guardado neste dispositivo e será sincronizado automaticamente.");
+        } else if (result.status === "rejected") {
+            alert(result.error || "Falha ao salvar o progresso do desafio.");
+        } else {
+            alert(
+                `Desafio concluído!\n` +
+                `Pontuação: ${results.finalScore}/${results.basePoints}\n` +
+                `Erros: ${results.wrongAnswers}/${results.totalQuestions}\n` +
+                `Tempo gasto: ${results.timeSpent}s`
+            );
+            console.log("Nova chave obtida:", results.keyReward);
         }
+        // Sempre redireciona para a tela de estações
+        window.location.href = "/station";
     }
 
     formatTime(seconds) {
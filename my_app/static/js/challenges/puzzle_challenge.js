@@ -8,13 +8,15 @@ class PuzzleChallenge extends BaseChallenge {
         this.columns = this.rows;
         this.imageSrc = `${staticUrl}${challengeData.puzzleData.image}`;
         this.selectedPiece = null;
+        // Peças pré-cortadas pelo servidor (já embaralhadas); sem elas, recorta a imagem inteira
+        this.tiles = challengeData.puzzleData.tiles || null;
 
-        // matriz do tabuleiro (valores 0..N-1)
+        // matriz do tabuleiro (valores 0..N-1: índice da peça em tiles.pieces, ou posição certa na imagem)
         this.board = Array.from({ length: this.rows }, (_, r) =>
             Array.from({ length: this.columns }, (_, c) => r * this.columns + c)
         );
 
-        this.shuffleBoard();
+        if (!this.tiles) this.shuffleBoard();
 
         // Contadores para cálculo centralizado
         this.wrongAnswers = 0;
@@ -71,21 +73,7 @@ class PuzzleChallenge extends BaseChallenge {
 
         this.board.forEach((row, r) => {
             row.forEach((val, c) => {
-                const piece = document.createElement("div");
-                piece.className = "puzzle-piece border rounded shadow-sm";
-                piece.style.aspectRatio = "1 / 1";
-                piece.style.backgroundImage = `url(${this.imageSrc})`;
-                piece.style.backgroundRepeat = "no-repeat";
-                piece.style.backgroundSize = `${this.columns * 100}% ${this.rows * 100}%`;
-
-                const correctRow = Math.floor(val / this.columns);
-                const correctCol = val % this.columns;
-
-                const posX = (this.columns > 1) ? (correctCol / (this.columns - 1)) * 100 : 0;
-                const posY = (this.rows > 1) ? (correctRow / (this.rows - 1)) * 100 : 0;
-
-                piece.style.backgroundPosition = `${posX}% ${posY}%`;
-
+                const piece = this.tiles ? this.tileElement(val) : this.slicedElement(val);
                 piece.dataset.row = r;
                 piece.dataset.col = c;
 
@@ -95,7 +83,43 @@ class PuzzleChallenge extends BaseChallenge {
         });
     }
 
-    handlePieceClick(r, c) {
+    tileElement(val) {
+        // <img> com srcset: o navegador escolhe a resolução pela largura da célula
+        const { url, resolutions, pieces } = this.tiles;
+        const [width, height] = resolutions[resolutions.length - 1];
+        const piece = document.createElement("img");
+        piece.className = "puzzle-piece border rounded shadow-sm";
+        piece.src = url + pieces[val].files[0];
+        piece.srcset = pieces[val].files.map((file, i) => `${url}${file} ${resolutions[i][0]}w`).join(", ");
+        piece.sizes = `${Math.round(700 / this.columns)}px`;
+        piece.width = width;
+        piece.height = height;
+        piece.style.width = "100%";
+        piece.style.height = "auto";
+        piece.draggable = false;
+        piece.alt = "";
+        return piece;
+    }
+
+    slicedElement(val) {
+        const piece = document.createElement("div");
+        piece.className = "puzzle-piece border rounded shadow-sm";
+        piece.style.aspectRatio = "1 / 1";
+        piece.style.backgroundImage = `url(${this.imageSrc})`;
+        piece.style.backgroundRepeat = "no-repeat";
+        piece.style.backgroundSize = `${this.columns * 100}% ${this.rows * 100}%`;
+
+        const correctRow = Math.floor(val / this.columns);
+        const correctCol = val % this.columns;
+
+        const posX = (this.columns > 1) ? (correctCol / (this.columns - 1)) * 100 : 0;
+        const posY = (this.rows > 1) ? (correctRow / (this.rows - 1)) * 100 : 0;
+
+        piece.style.backgroundPosition = `${posX}% ${posY}%`;
+        return piece;
+    }
+
+    async handlePieceClick(r, c) {
         if (!this.selectedPiece) {
             this.selectedPiece = { r, c };
             this.highlightPiece(r, c, true);
@@ -110,7 +134,7 @@ class PuzzleChallenge extends BaseChallenge {
 
             this.renderPuzzle();
 
-            if (!this.checkIfSolved()) {
+            if (!(await this.checkIfSolved())) {
                 this.wrongAnswers++; // cada troca sem solução conta como erro
             }
         }
@@ -124,9 +148,9 @@ class PuzzleChallenge extends BaseChallenge {
         }
     }
 
-    checkIfSolved() {
-        let solved = true;
-        for (let r = 0; r < this.rows && solved; r++) {
+    async checkIfSolved() {
+        let solved = this.tiles ? await this.checkOnServer() : true;
+        for (let r = 0; r < this.rows && solved && !this.tiles; r++) {
             for (let c = 0; c < this.columns; c++) {
                 const expected = r * this.columns + c;
                 if (this.board[r][c] !== expected) {
@@ -145,6 +169,23 @@ class PuzzleChallenge extends BaseChallenge {
 
         return solved;
     }
+
+    async checkOnServer() {
+        // A ordem certa das peças só o servidor conhece: envia os ids na ordem do tabuleiro
+        const order = this.board.flat().map(val => this.tiles.pieces[val].id);
+        try {
+            const response = await fetch(`/api/game/challenge/${this.challengeId}/answers`, {
+                method: "POST",
+                headers: { "Content-Type": "application/json" },
+                body: JSON.stringify({ answers: { order } }),
+            });
+            const data = await response.json();
+            return data.success && data.correct_answers === data.total_questions;
+        } catch (error) {
+            console.warn("[Puzzle] não foi possível conferir a montagem:", error);
+            return false;
+        }
+    }
 }
 
 // entrada automática
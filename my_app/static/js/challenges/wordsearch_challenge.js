@@ -12,6 +12,7 @@ class WordSearchChallenge extends BaseChallenge {
         this.cellRefs = [];
         this.placedWords = [];            // [{word, positions:[{r,c}]}]
         this.foundWords = new Set();
+        this.seed = null;                 // semente da grade do servidor (null = grade local)
 
         // Contadores para fórmula centralizada
         this.wrongAnswers = 0;
@@ -20,7 +21,7 @@ class WordSearchChallenge extends BaseChallenge {
         // Seleção
         this.isSelecting = false;
         this.selectionPath = [];          // [td, td, ...]
-        this.selectionDir = null;         // "H" | "V" | null
+        this.selectionDir = null;         // {dr, dc} (uma das 8 direções) | null
 
         // DOM base
         this.gameScenario = document.getElementById("game-scenario");
@@ -36,7 +37,7 @@ class WordSearchChallenge extends BaseChallenge {
         this.startChallengeTimer(this.challengeData.timeLimit || 90);
 
         this.renderUI();
-        this.generateBoard();
+        if (!(await this.loadBoard())) this.generateBoard();
         this.renderGrid();
         this.renderWordList();
 
@@ -44,6 +45,46 @@ class WordSearchChallenge extends BaseChallenge {
     }
 
     // ---------- Board generation ----------
+    // A grade vem do servidor (determinística por tentativa, conferida em /wordsearch/claim);
+    // a geração local abaixo só é usada se a requisição falhar.
+    async loadBoard() {
+        try {
+            const response = await fetch(`/api/game/challenge/${this.challengeId}/wordsearch`);
+            const data = await response.json();
+            if (!response.ok || !data.success) return false;
+            this.gridSize = data.size;
+            this.words = data.words;
+            this.totalQuestions = this.words.length;
+            this.board = data.grid.map(row => row.split(""));
+            this.seed = data.seed;
+            return true;
+        } catch (error) {
+            console.warn("[WordSearch] grade do servidor indisponível, gerando localmente:", error);
+            return false;
+        }
+    }
+
+    async _claim(path) {
+        const cells = path.map(td => [parseInt(td.dataset.r, 10), parseInt(td.dataset.c, 10)]);
+        try {
+            const response = await fetch(`/api/game/challenge/${this.challengeId}/wordsearch/claim`, {
+                method: "POST",
+                headers: { "Content-Type": "application/json" },
+                body: JSON.stringify({ seed: this.seed, cells }),
+            });
+            const data = await response.json();
+            return data.success && data.valid ? data.word : null;
+        } catch (error) {
+            return this._localMatch(path);
+        }
+    }
+
+    _localMatch(path) {
+        const selected = path.map(td => td.textContent).join("");
+        const reversed = selected.split("").reverse().join("");
+        return this.words.find(w => w === selected || w === reversed) || null;
+    }
+
     _createEmptyBoard(n) {
         return Array.from({ length: n }, () => Array.from({ length: n }, () => ""));
     }
@@ -214,22 +255,17 @@ class WordSearchChallenge extends BaseChallenge {
         const r = parseInt(td.dataset.r, 10), c = parseInt(td.dataset.c, 10);
         const lr = parseInt(last.dataset.r, 10), lc = parseInt(last.dataset.c, 10);
 
-        if (!this.selectionDir) {
-            if (r === lr && c !== lc) this.selectionDir = "H";
-            else if (c === lc && r !== lr) this.selectionDir = "V";
-            else return;
-        }
+        const dr = r - lr, dc = c - lc;
+        if (Math.abs(dr) > 1 || Math.abs(dc) > 1) return;  // só células vizinhas
 
-        if (this.selectionDir === "H" && r === lr && Math.abs(c - lc) === 1) {
-            this.selectionPath.push(td);
-            this._paint(td, "select");
-        } else if (this.selectionDir === "V" && c === lc && Math.abs(r - lr) === 1) {
+        if (!this.selectionDir) this.selectionDir = { dr, dc };
+        if (dr === this.selectionDir.dr && dc === this.selectionDir.dc) {
             this.selectionPath.push(td);
             this._paint(td, "select");
         }
     }
 
-    _endSelection() {
+    async _endSelection() {
         if (!this.isSelecting) return;
         this.isSelecting = false;
 
@@ -240,13 +276,13 @@ class WordSearchChallenge extends BaseChallenge {
             return;
         }
 
-        const selected = this.selectionPath.map(td => td.textContent).join("");
-        const reversed = selected.split("").reverse().join("");
-
-        const match = this.words.find(w => w === selected || w === reversed);
+        const path = this.selectionPath;
+        this.selectionPath = [];
+        this.selectionDir = null;
+        const match = this.seed === null ? this._localMatch(path) : await this._claim(path);
 
         if (match && !this.foundWords.has(match)) {
-            this._markWordFound(match, this.selectionPath);
+            this._markWordFound(match, path);
 
             if (this.foundWords.size === this.words.length) {
                 clearInterval(this.timerInterval);
@@ -255,12 +291,9 @@ class WordSearchChallenge extends BaseChallenge {
             }
         } else {
             this.wrongAnswers++; // cada seleção inválida conta como erro
-            this.selectionPath.forEach(td => this._paint(td, "error"));
-            setTimeout(() => this._clearNonFoundSelection(), 180);
+            path.forEach(td => this._paint(td, "error"));
+            setTimeout(() => path.forEach(td => this._paint(td, "clear")), 180);
         }
-
-        this.selectionPath = [];
-        this.selectionDir = null;
     }
 
     _paint(td, mode) {
@@ -8,7 +8,8 @@
 
   async function loadStorytelling() {
     if (storytellingMap) return storytellingMap;
-    const res = await fetch('/static/data/storytelling.json', { cache: 'no-store' });
+    const lang = encodeURIComponent(document.documentElement.lang || 'pt');
+    const res = await fetch(`/static/data/storytelling.json?lang=${lang}`, { cache: 'no-cache' });
     const json = await res.json();
     storytellingMap = {};
     if (Array.isArray(json.stations)) {
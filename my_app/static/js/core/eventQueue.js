@@ -0,0 +1,103 @@
+// static/js/core/eventQueue.js
+// Fila offline de eventos de jogo: grava no localStorage e envia em lote para /api/game/events.
+// O servidor deduplica por (client_id, seq), então reenviar a fila é sempre seguro.
+// As chaves levam o id do usuário (data-user-id da tag <script>): num computador compartilhado,
+// a fila de um aluno nunca é enviada na sessão do próximo. O logout apaga tudo (clearAll).
+
+window.GameEvents = (function () {
+    const PREFIX = "game_event_";
+    const LEGACY_KEYS = ["game_event_queue", "game_event_seq", "game_client_id"];
+    const script = document.currentScript;
+    const userId = script && script.dataset.userId;
+    const QUEUE_KEY = `${PREFIX}queue:${userId}`;
+    const SEQ_KEY = `${PREFIX}seq:${userId}`;
+    const CLIENT_KEY = `${PREFIX}client:${userId}`;
+    let flushing = null;
+
+    // Apaga as filas de todos os usuários deste navegador (chamado no logout)
+    function clearAll() {
+        Object.keys(localStorage)
+            .filter(key => key.startsWith(PREFIX))
+            .forEach(key => localStorage.removeItem(key));
+    }
+
+    // Filas antigas, sem dono conhecido: não dá para saber de quem são, então não são enviadas
+    LEGACY_KEYS.forEach(key => localStorage.removeItem(key));
+
+    function clientId() {
+        let id = localStorage.getItem(CLIENT_KEY);
+        if (!id) {
+            id = (window.crypto && crypto.randomUUID) ? crypto.randomUUID() : String(Date.now()) + Math.random().toString(16).slice(2);
+            localStorage.setItem(CLIENT_KEY, id.slice(0, 36));
+        }
+        return localStorage.getItem(CLIENT_KEY);
+    }
+
+    function readQueue() {
+        try {
+            return JSON.parse(localStorage.getItem(QUEUE_KEY)) || [];
+        } catch (e) {
+            return [];
+        }
+    }
+
+    function writeQueue(queue) {
+        localStorage.setItem(QUEUE_KEY, JSON.stringify(queue));
+    }
+
+    function enqueue(type, data) {
+        const seq = parseInt(localStorage.getItem(SEQ_KEY) || "0", 10) + 1;
+        localStorage.setItem(SEQ_KEY, String(seq));
+        const queue = readQueue();
+        queue.push(Object.assign({ seq, type }, data));
+        writeQueue(queue);
+        return seq;
+    }
+
+    async function sendQueue() {
+        const queue = readQueue();
+        if (!queue.length) return { success: true, results: [] };
+
+        const response = await fetch("/api/game/events", {
+            method: "POST",
+            headers: { "Content-Type": "application/json" },
+            body: JSON.stringify({ client_id: clientId(), events: queue.slice(0, 200) }),
+        });
+        const data = await response.json();
+        if (!response.ok || !data.success) throw new Error(data.error || "Falha ao sincronizar eventos");
+
+        // Remove da fila tudo que o servidor já processou (aplicado, rejeitado ou duplicado)
+        const done = new Set(data.results.map(r => r.seq));
+        writeQueue(readQueue().filter(e => !done.has(e.seq)));
+        return data;
+    }
+
+    // Envia a fila; chamadas concorrentes compartilham o mesmo envio
+    function flush() {
+        if (!flushing) {
+            flushing = sendQueue().finally(() => { flushing = null; });
+        }
+        return flushing;
+    }
+
+    // Enfileira e tenta enviar; devolve o resultado do evento ou null se ficou na fila (offline)
+    async function send(type, data) {
+        const seq = enqueue(type, data);
+        try {
+            // Um envio já em andamento pode não conter este evento: tenta de novo
+            let result = await flush();
+            if (!result.results.some(r => r.seq === seq)) result = await flush();
+            return result.results.find(r => r.seq === seq) || { seq, status: "applied" };
+        } catch (error) {
+            console.warn("Evento guardado para sincronizar depois:", error);
+            return null;
+        }
+    }
+
+    if (userId) {
+        window.addEventListener("online", () => flush().catch(() => {}));
+        if (readQueue().length) flush().catch(() => {});
+    }
+
+    return { enqueue, flush, send, clearAll, pending: () => readQueue().length };
+})();
@@ -104,7 +104,8 @@ class StationCore {
 
         // Se não encontrar, tenta buscar da API
         try {
-            const response = await fetch(`/api/challenge/${challengeId}`);
+            const lang = encodeURIComponent(document.documentElement.lang || 'pt');
+            const response = await fetch(`/api/challenge/${challengeId}?lang=${lang}`);
             if (response.ok) {
                 return await response.json();
             }
@@ -0,0 +1,334 @@
+# /synthetic_data.py
+"""
+Gerador de dados sintéticos para testes de escala (users, user_progress, station_results,
+challenge_attempts, evaluations e page_views).
+
+Determinístico pela semente. Carrega em lote direto pelo driver: COPY no PostgreSQL e
+executemany em lotes no SQLite (com journal desligado durante a carga).
+
+Cargas adicionais no mesmo banco precisam de outra semente (visitor_id é único).
+
+Uso:
+    python -m my_app.synthetic_data --database-url sqlite:////tmp/escala.db --users 100000 --page-views 50000000
+"""
+
+import argparse
+import csv
+import hashlib
+import io
+import json
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from .catalog import catalog
+from .dimensions import page_endpoints, page_urls, user_agents
+from .options import PROFESSIONS, COUNTRIES
+
+challenges = catalog.challenges
+
+LANGUAGES = ['pt', 'en', 'es']
+LANGUAGE_WEIGHTS = [0.7, 0.15, 0.15]
+
+# (endpoint, URL gravada, peso) — aproxima a navegação real do jogo; como em track_access,
+# o caminho das páginas e a regra da rota nas APIs (dimensions.tracked_url)
+PAGES = [
+    ('home_pt', '/pt', 8), ('home_en', '/en', 1), ('home_es', '/es', 1),
+    ('login', '/login', 6), ('register', '/register', 4), ('dashboard', '/dashboard', 12),
+    ('station', '/station', 14), ('game_api.get_progress', '/api/game/progress', 16),
+    ('game_api.start_challenge', '/api/game/challenge/start', 8),
+    ('game_api.complete_challenge', '/api/game/challenge/complete', 7),
+    ('save_station_result', '/api/station_result', 7), ('get_station_results', '/api/get_station_results', 6),
+    ('instructions_students', '/instructions_students', 2), ('terms', '/terms', 1),
+    ('save_evaluation', '/api/save_evaluation', 1), ('generate_report', '/api/generate_report', 1),
+] + [('play_challenge', f'/station/{cid}', 3) for cid in sorted(challenges)]
+
+USER_AGENTS = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/128.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (iPhone; CPU iPhone OS 17_5 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.5 Mobile/15E148 Safari/604.1',
+    'Mozilla/5.0 (Linux; Android 14; SM-A546E) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/127.0.0.0 Mobile Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 14_5) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.5 Safari/605.1.15',
+    'Mozilla/5.0 (X11; Linux x86_64; rv:129.0) Gecko/20100101 Firefox/129.0',
+]
+
+STRENGTHS = ['Dinâmica envolvente', 'Conteúdo relevante para a prática', 'Boa integração com a equipe',
+             'Cenários realistas', 'Feedback imediato', 'Interface intuitiva']
+IMPROVEMENTS = ['Mais tempo por estação', 'Mais estações', 'Versão para celular', 'Mais dicas',
+                'Explicação após cada erro', '']
+
+STATION_IDS = sorted(challenges)
+# Mesmo formato que o SQLAlchemy grava no SQLite: sem os microssegundos, '... 00:00:00' fica
+# antes de '... 00:00:00.000000' na comparação de texto e os filtros por intervalo erram na virada
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+
+
+def completed_stations_distribution():
+    """Probabilidade de parar após k estações (k = 0..15): muitos abandonam cedo, boa parte termina."""
+    weights = np.array([6, 9, 8, 7, 6, 5, 5, 4, 4, 3, 3, 3, 2, 2, 2, 30], dtype=float)
+    return weights / weights.sum()
+
+
+class Loader:
+    """Carga em lote para SQLite (executemany) ou PostgreSQL (COPY)."""
+
+    def __init__(self, engine, batch_size=50_000):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.is_postgres = engine.dialect.name == 'postgresql'
+        self.raw = engine.raw_connection()
+        self.stats = {}
+        if not self.is_postgres:
+            cursor = self.raw.cursor()
+            cursor.execute('PRAGMA journal_mode=OFF')
+            cursor.execute('PRAGMA synchronous=OFF')
+            cursor.close()
+
+    def max_id(self, table):
+        cursor = self.raw.cursor()
+        cursor.execute(f'SELECT COALESCE(MAX(id), 0) FROM {table}')
+        value = cursor.fetchone()[0]
+        cursor.close()
+        return value
+
+    def load(self, table, columns, rows):
+        """Consome um iterável de lotes (listas de tuplas)."""
+        started = time.perf_counter()
+        count = 0
+        cursor = self.raw.cursor()
+        for batch in rows:
+            if not batch:
+                continue
+            if self.is_postgres:
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(batch)
+                buffer.seek(0)
+                cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+            else:
+                placeholders = ', '.join('?' for _ in columns)
+                cursor.executemany(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})", batch)
+            count += len(batch)
+        if self.is_postgres and 'id' in columns:
+            # ids explícitos não avançam a sequence do SERIAL
+            cursor.execute(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT MAX(id) FROM {table}))")
+        self.raw.commit()
+        cursor.close()
+        elapsed = time.perf_counter() - started
+        self.stats[table] = {"rows": count, "seconds": round(elapsed, 2),
+                             "rows_per_minute": int(count / elapsed * 60) if elapsed else count}
+        return count
+
+    def close(self):
+        if not self.is_postgres:
+            cursor = self.raw.cursor()
+            cursor.execute('PRAGMA journal_mode=DELETE')
+            cursor.close()
+        self.raw.close()
+
+
+def chunked(iterable, size):
+    batch = []
+    for row in iterable:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class SyntheticDataset:
+    """Gera as linhas de cada tabela de forma determinística a partir da semente."""
+
+    def __init__(self, seed, users, page_views, first_user_id=1, days=365, now=None):
+        self.seed = seed
+        self.users = users
+        self.page_views = page_views
+        self.first_user_id = first_user_id
+        self.days = days
+        # "Agora" fixo por semente: a mesma semente sempre gera as mesmas datas
+        self.now = now or datetime(2026, 1, 1)
+        self.start = self.now - timedelta(days=days)
+        self.rng = np.random.default_rng(seed)
+
+        # Sorteios por usuário, feitos de uma vez (vetorizados)
+        n = users
+        self.languages = self.rng.choice(len(LANGUAGES), size=n, p=LANGUAGE_WEIGHTS)
+        self.professions = self.rng.integers(0, len(PROFESSIONS['pt']), size=n)
+        self.countries = self.rng.integers(0, len(COUNTRIES['pt']), size=n)
+        self.created_offsets = self.rng.integers(0, days * 86400, size=n)
+        self.completed = self.rng.choice(len(STATION_IDS) + 1, size=n, p=completed_stations_distribution())
+        self.visitor_ids = [str(uuid.UUID(bytes=bytes(b), version=4))
+                            for b in self.rng.integers(0, 256, size=(n, 16), dtype=np.uint8)]
+
+    def _date(self, offset_seconds):
+        return (self.start + timedelta(seconds=int(offset_seconds))).strftime(DATE_FORMAT)
+
+    def user_rows(self, password_hash, is_postgres):
+        active = 't' if is_postgres else 1
+        for i in range(self.users):
+            uid = self.first_user_id + i
+            lang = LANGUAGES[self.languages[i]]
+            yield (uid, f"synthetic_{self.seed}_{uid}", f"synthetic_{self.seed}_{uid}@example.test", password_hash,
+                   PROFESSIONS[lang][self.professions[i]], COUNTRIES[lang][self.countries[i]],
+                   self.visitor_ids[i], self._date(self.created_offsets[i]), active, lang)
+
+    def progress_rows(self):
+        rng = np.random.default_rng([self.seed, 1])
+        for i in range(self.users):
+            uid = self.first_user_id + i
+            k = int(self.completed[i])
+            stations = STATION_IDS[:k]
+            scores = [self._score(rng, sid) for sid in stations]
+            times = [self._time(rng, sid) for sid in stations]
+            keys = [challenges[sid]['keyReward'] for sid in stations]
+            yield (uid, k + 1, sum(scores), sum(times), json.dumps(keys)), list(zip(stations, scores, times))
+
+    def _score(self, rng, station_id):
+        points = challenges[station_id].get('points', 0)
+        return int(round(points * rng.beta(5, 2)))
+
+    def _time(self, rng, station_id):
+        limit = challenges[station_id].get('timeLimit', 90)
+        return max(5, int(rng.normal(limit * 0.8, limit * 0.3)))
+
+    def gameplay_rows(self):
+        """(progress, station_results, challenge_attempts) por usuário."""
+        for i, (progress, done) in enumerate(self.progress_rows()):
+            uid = progress[0]
+            clock = int(self.created_offsets[i])
+            results, attempts = [], []
+            for station_id, score, spent in done:
+                started = self._date(clock)
+                clock += spent
+                finished = self._date(clock)
+                results.append((uid, station_id, score, spent, finished))
+                attempts.append((uid, station_id, 'completed', score, spent, started, finished))
+                clock += 30
+            if len(done) < len(STATION_IDS):
+                attempts.append((uid, STATION_IDS[len(done)], 'started', 0, 0, self._date(clock), None))
+            yield progress, results, attempts
+
+    def evaluation_rows(self):
+        rng = np.random.default_rng([self.seed, 2])
+        finished = np.flatnonzero(self.completed == len(STATION_IDS))
+        for i in finished:
+            if rng.random() > 0.6:
+                continue
+            uid = self.first_user_id + int(i)
+            likert = np.clip(np.round(rng.normal(4.3, 0.7, size=4)), 1, 5).astype(int).tolist()
+            team = rng.random() < 0.4
+            members = [f"Colega {j}" for j in range(1, int(rng.integers(2, 5)))] if team else []
+            yield (uid, str(rng.choice(['estudante', 'profissional', 'professor'], p=[0.6, 0.3, 0.1])),
+                   'equipe' if team else 'sozinho', json.dumps(members, ensure_ascii=False), *likert,
+                   str(rng.choice(STRENGTHS)), str(rng.choice(IMPROVEMENTS)),
+                   self._date(int(self.created_offsets[i]) + 3600))
+
+    def page_view_batches(self, batch_size, url_ids, endpoint_ids, agent_ids):
+        """Lotes de page_views gerados com numpy (visitantes logados + anônimos); *_ids: valor -> id da dimensão."""
+        rng = np.random.default_rng([self.seed, 3])
+        anonymous = max(1, self.users * 2)
+        anonymous_ids = [str(uuid.UUID(bytes=bytes(b), version=4))
+                         for b in rng.integers(0, 256, size=(anonymous, 16), dtype=np.uint8)]
+        weights = np.array([w for _, _, w in PAGES], dtype=float)
+        weights /= weights.sum()
+        start = np.datetime64(self.start.replace(microsecond=0), 's')
+        ip_hashes = [hashlib.sha256(f"{self.seed}-ip-{i}".encode()).hexdigest()[:45] for i in range(4096)]
+        page_ids = [(url_ids[rule], endpoint_ids[endpoint]) for endpoint, rule, _ in PAGES]
+        agents = [agent_ids[agent] for agent in USER_AGENTS]
+
+        remaining = self.page_views
+        while remaining > 0:
+            n = min(batch_size, remaining)
+            remaining -= n
+            visitor = rng.integers(0, self.users + anonymous, size=n)
+            page = rng.choice(len(PAGES), size=n, p=weights)
+            agent = rng.integers(0, len(USER_AGENTS), size=n)
+            ip = rng.integers(0, len(ip_hashes), size=n)
+            offsets = np.sort(rng.integers(0, self.days * 86400, size=n))
+            dates = np.char.replace(np.datetime_as_string(start + offsets.astype('timedelta64[s]'), unit='us'), 'T', ' ')  # DATE_FORMAT
+
+            batch = []
+            for v, p, a, addr, when in zip(visitor.tolist(), page.tolist(), agent.tolist(), ip.tolist(), dates.tolist()):
+                url_id, endpoint_id = page_ids[p]
+                if v < self.users:
+                    user_id, visitor_id, lang = self.first_user_id + v, self.visitor_ids[v], LANGUAGES[self.languages[v]]
+                else:
+                    user_id, visitor_id, lang = None, anonymous_ids[v - self.users], 'pt'
+                batch.append((user_id, visitor_id, url_id, endpoint_id, lang, ip_hashes[addr], agents[a], when))
+            yield batch
+
+
+def synthetic_password_hash(seed, password='synthetic'):
+    """Hash no formato do werkzeug com sal derivado da semente (mantém a carga determinística)."""
+    salt = hashlib.sha256(f"salt-{seed}".encode()).hexdigest()[:16]
+    iterations = 1000
+    digest = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), iterations).hex()
+    return f"pbkdf2:sha256:{iterations}${salt}${digest}"
+
+
+def generate(engine, users=1000, page_views=10000, seed=42, batch_size=50_000):
+    """Carrega o conjunto sintético no banco do `engine` e devolve as estatísticas por tabela."""
+    loader = Loader(engine, batch_size=batch_size)
+    try:
+        dataset = SyntheticDataset(seed, users, page_views, first_user_id=loader.max_id('users') + 1)
+        # Um único hash (senha "synthetic") para todos: calcular 100k hashes levaria horas
+        password_hash = synthetic_password_hash(seed)
+
+        loader.load('users', ['id', 'username', 'email', 'password_hash', 'profession', 'country',
+                              'visitor_id', 'created_at', 'is_active', 'language'],
+                    chunked(dataset.user_rows(password_hash, loader.is_postgres), batch_size))
+
+        progress, results, attempts = [], [], []
+        for p, r, a in dataset.gameplay_rows():
+            progress.append(p)
+            results.extend(r)
+            attempts.extend(a)
+        loader.load('user_progress', ['user_id', 'current_challenge_id', 'total_score', 'total_time_seconds', 'earned_keys'],
+                    chunked(progress, batch_size))
+        loader.load('station_results', ['user_id', 'station_id', 'score', 'time_spent', 'completed_at'],
+                    chunked(results, batch_size))
+        loader.load('challenge_attempts', ['user_id', 'challenge_id', 'status', 'score', 'time_spent_seconds',
+                                           'started_at', 'completed_at'],
+                    chunked(attempts, batch_size))
+        loader.load('evaluations', ['user_id', 'participant_type', 'participation_type', 'team',
+                                    'q1', 'q2', 'q3', 'q4', 'q5', 'q6', 'created_at'],
+                    chunked(dataset.evaluation_rows(), batch_size))
+        with engine.begin() as connection:
+            url_ids = page_urls.ids_for(connection, [rule for _, rule, _ in PAGES])
+            endpoint_ids = page_endpoints.ids_for(connection, [endpoint for endpoint, _, _ in PAGES])
+            agent_ids = user_agents.ids_for(connection, USER_AGENTS)
+        loader.load('page_views', ['user_id', 'visitor_id', 'url_id', 'endpoint_id', 'language',
+                                   'ip_address', 'user_agent_id', 'accessed_at'],
+                    dataset.page_view_batches(batch_size, url_ids, endpoint_ids, agent_ids))
+    finally:
+        loader.close()
+    return loader.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga de dados sintéticos para testes de escala.")
+    parser.add_argument('--database-url', required=True)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--page-views', type=int, default=10000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--batch-size', type=int, default=50_000)
+    args = parser.parse_args()
+
+    from . import create_app, db
+    from .feedback_search import create_search_table
+    app = create_app('production', SQLALCHEMY_DATABASE_URI=args.database_url)
+    with app.app_context():
+        db.create_all()
+        with db.engine.begin() as connection:
+            create_search_table(connection)
+        stats = generate(db.engine, users=args.users, page_views=args.page_views,
+                         seed=args.seed, batch_size=args.batch_size)
+
+    for table, info in stats.items():
+        print(f"{table:<20}{info['rows']:>12} linhas {info['seconds']:>8}s {info['rows_per_minute']:>14} linhas/min")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+# /wordsearch.py
+"""
+Caça-palavras gerado no servidor (estações do tipo 'wordsearch').
+
+- A grade é determinística por (usuário, estação, semente): a mesma tentativa sempre vê a
+  mesma grade, e o servidor consegue conferir uma palavra marcada sem guardar nada.
+- Palavras nas 8 direções, com cruzamentos quando a letra coincide. Posicionamento com
+  backtracking (as maiores primeiro); cada palavra percorre as posições possíveis numa ordem
+  pseudoaleatória (início e passo sorteados), sem embaralhar a lista inteira.
+- O resto é preenchido com letras ao acaso; se o preenchimento formar uma segunda ocorrência
+  de alguma palavra, preenche de novo.
+- Grades ficam num LRU por processo (build_grid), chaveado por (palavras, tamanho, semente).
+- Conferência em O(tamanho da palavra): as pontas marcadas apontam para a palavra
+  posicionada e as células do caminho são comparadas uma a uma.
+"""
+
+import hashlib
+import random
+import unicodedata
+from functools import lru_cache
+from math import gcd
+
+ALPHABET = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (-1, 1), (0, -1), (-1, 0), (-1, -1), (1, -1))
+DEFAULT_SIZE = 14
+CACHE_SIZE = 4096
+MAX_STEPS = 50_000   # posições testadas antes de desistir de uma grade
+MAX_REFILLS = 20
+
+
+class WordsearchError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def normalize_word(word):
+    """Maiúsculas, sem acentos nem nada fora de A-Z ('Gemência' -> 'GEMENCIA')."""
+    decomposed = unicodedata.normalize('NFD', word.upper())
+    return ''.join(c for c in decomposed if c in ALPHABET)
+
+
+class Grid:
+    __slots__ = ('size', 'rows', 'words', 'placements', '_ends')
+
+    def __init__(self, size, cells, placements):
+        self.size = size
+        self.rows = tuple(''.join(cells[r * size:(r + 1) * size]) for r in range(size))
+        self.words = tuple(placements)
+        self.placements = placements  # palavra -> (linha, coluna, dr, dc)
+        self._ends = {}
+        for word, (r, c, dr, dc) in placements.items():
+            end = (r + dr * (len(word) - 1), c + dc * (len(word) - 1))
+            self._ends[((r, c), end)] = word
+            self._ends[(end, (r, c))] = word  # marcada de trás para frente
+
+    def check(self, cells):
+        """Palavra ocupada exatamente pelas células [(linha, coluna), ...], ou None."""
+        if len(cells) < 2:
+            return None
+        word = self._ends.get((tuple(cells[0]), tuple(cells[-1])))
+        if word is None or len(cells) != len(word):
+            return None
+        (r0, c0), (r1, c1) = cells[0], cells[1]
+        dr, dc = r1 - r0, c1 - c0
+        for i, (r, c) in enumerate(cells):
+            if (r, c) != (r0 + i * dr, c0 + i * dc):
+                return None
+        return word
+
+    def to_dict(self):
+        return {'size': self.size, 'grid': list(self.rows), 'words': list(self.words)}
+
+
+@lru_cache(maxsize=64)
+def _placements(size, length):
+    """Todas as posições (índices da grade achatada) de uma palavra de `length` letras."""
+    result = []
+    for r in range(size):
+        for c in range(size):
+            for dr, dc in DIRECTIONS:
+                r1, c1 = r + dr * (length - 1), c + dc * (length - 1)
+                if 0 <= r1 < size and 0 <= c1 < size:
+                    result.append((r, c, dr, dc, tuple((r + dr * i) * size + c + dc * i for i in range(length))))
+    return tuple(result)
+
+
+@lru_cache(maxsize=16)
+def _lines(size):
+    """Índices de cada linha, coluna e diagonal (com 2+ células), para procurar ocorrências extras."""
+    lines = [[r * size + c for c in range(size)] for r in range(size)]
+    lines += [[r * size + c for r in range(size)] for c in range(size)]
+    for start in range(-(size - 2), size - 1):
+        lines.append([r * size + r - start for r in range(size) if 0 <= r - start < size])
+        lines.append([r * size + start + size - 1 - r for r in range(size) if 0 <= start + size - 1 - r < size])
+    return tuple(tuple(line) for line in lines)
+
+
+def _visit_order(rng, count):
+    """Todos os índices 0..count-1 numa ordem pseudoaleatória (início e passo coprimo sorteados)."""
+    start = rng.randrange(count)
+    step = rng.randrange(1, count) if count > 1 else 1
+    while gcd(step, count) != 1:
+        step += 1
+    return ((start + i * step) % count for i in range(count))
+
+
+def _place(words, size, rng):
+    cells = [''] * (size * size)
+    placements = {}
+    steps = 0
+
+    def solve(position):
+        nonlocal steps
+        if position == len(words):
+            return True
+        word = words[position]
+        options = _placements(size, len(word))
+        for index in _visit_order(rng, len(options)):
+            steps += 1
+            if steps > MAX_STEPS:
+                return False
+            r, c, dr, dc, spots = options[index]
+            if any(cells[spot] not in ('', letter) for spot, letter in zip(spots, word)):
+                continue
+            written = [spot for spot in spots if not cells[spot]]
+            for spot, letter in zip(spots, word):
+                cells[spot] = letter
+            placements[word] = (r, c, dr, dc)
+            if solve(position + 1):
+                return True
+            del placements[word]
+            for spot in written:
+                cells[spot] = ''
+        return False
+
+    if not solve(0):
+        raise WordsearchError(f"words do not fit a {size}x{size} grid", 500)
+    return cells, placements
+
+
+def _occurrences(cells, size, word):
+    reverse = word[::-1]
+    total = 0
+    for line in _lines(size):
+        text = ''.join(cells[i] for i in line)
+        total += text.count(word) + (text.count(reverse) if reverse != word else 0)
+    return total
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def build_grid(words, size, seed):
+    """Grade para `words` (tupla já normalizada, sem repetições) com a semente inteira `seed`."""
+    if not words or max(map(len, words)) > size:
+        raise WordsearchError(f"words do not fit a {size}x{size} grid", 500)
+    rng = random.Random(seed)
+    ordered = sorted(words, key=len, reverse=True)
+    cells, placements = _place(ordered, size, rng)
+    empty = [i for i, letter in enumerate(cells) if not letter]
+    for _ in range(MAX_REFILLS):
+        for i, letter in zip(empty, rng.choices(ALPHABET, k=len(empty))):
+            cells[i] = letter
+        if all(_occurrences(cells, size, word) == 1 for word in words):
+            break
+    # Na ordem do catálogo (é a lista mostrada ao jogador)
+    return Grid(size, cells, {word: placements[word] for word in words})
+
+
+def grid_seed(user_id, station_id, seed):
+    digest = hashlib.blake2b(f"{user_id}:{station_id}:{seed}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+
+def grid_for(challenge, user_id, seed):
+    """Grade do desafio (já localizado) para o usuário e a semente."""
+    data = challenge.get('wordsearchData') or {}
+    words = tuple(dict.fromkeys(w for w in map(normalize_word, data.get('words', [])) if w))
+    return build_grid(words, int(data.get('gridSize') or DEFAULT_SIZE), grid_seed(user_id, challenge['id'], seed))
@@ -0,0 +1,68 @@
+# /worker.py
+"""
+Worker da fila de jobs.
+
+Uso:
+    python -m my_app.worker                   # roda para sempre
+    python -m my_app.worker --types report    # só alguns tipos
+    python -m my_app.worker --burst           # esvazia a fila e sai
+"""
+
+import argparse
+import os
+import signal
+import socket
+import threading
+import time
+
+
+def work(app, worker_id=None, job_types=None, burst=False, poll=None, stop=None):
+    """Reserva e executa jobs até `stop` ser sinalizado (ou a fila esvaziar, com burst)."""
+    from .jobs import claim, purge_finished, requeue_stale, run
+
+    worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    stop = stop or threading.Event()
+    poll = app.config['JOB_POLL_SECONDS'] if poll is None else poll
+    processed = 0
+    next_maintenance = 0.0
+
+    with app.app_context():
+        while not stop.is_set():
+            if time.monotonic() >= next_maintenance:
+                requeue_stale()
+                purge_finished(app.config['JOB_RESULT_TTL'])
+                next_maintenance = time.monotonic() + 60
+
+            claimed = claim(worker_id, job_types)
+            if claimed is None:
+                if burst:
+                    break
+                stop.wait(poll)
+                continue
+            run(claimed, app.logger)
+            processed += 1
+    return processed
+
+
+def main():
+    from . import create_app
+
+    parser = argparse.ArgumentParser(description="Executa os jobs em segundo plano (relatórios, exportações).")
+    parser.add_argument('--types', default=None, help="tipos separados por vírgula (padrão: todos)")
+    parser.add_argument('--burst', action='store_true', help="esvazia a fila e sai")
+    parser.add_argument('--config', default='development')
+    args = parser.parse_args()
+
+    app = create_app(args.config, INIT_MIGRATIONS=False)
+    stop = threading.Event()
+    # Termina o job em andamento antes de sair (deploys mandam SIGTERM)
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+    job_types = args.types.split(',') if args.types else None
+    processed = work(app, job_types=job_types, burst=args.burst, stop=stop)
+    app.logger.info(f"Worker finished after {processed} jobs")
+
+
+if __name__ == '__main__':
+    main()
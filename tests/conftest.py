@@ -0,0 +1,140 @@
+# conftest.py
+# Camada de fixtures da suíte: create_app('testing'), migrações aplicadas uma única vez num
+# banco-modelo e uma cópia barata desse banco para cada teste.
+#   - SQLite (padrão): o modelo fica em memória e cada teste recebe um backup em memória dele.
+#   - Postgres (TEST_DATABASE_URL=postgresql://...): CREATE DATABASE ... TEMPLATE por teste.
+# Nomes e diretórios levam o PYTEST_XDIST_WORKER, então `pytest -n auto` é seguro.
+import itertools
+import os
+import sqlite3
+
+import pytest
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import StaticPool
+
+from my_app import create_app, db
+from my_app.cohorts import stats_cache
+from my_app.dimensions import clear_caches
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MIGRATIONS = os.path.join(ROOT, 'migrations')
+WORKER = os.environ.get('PYTEST_XDIST_WORKER', 'main')
+
+
+class SqliteCopies:
+    """Modelo migrado em memória; cada teste recebe um backup dele (microssegundos)."""
+    poolclass = StaticPool
+
+    def __init__(self, tmp_dir):
+        self.template_path = str(tmp_dir / 'template.db')
+        self._template = None
+        self.connect = lambda: sqlite3.connect(self.template_path, check_same_thread=False)
+
+    def freeze(self):
+        # O pool fecha a conexão das migrações no dispose(); guardamos uma cópia fora dele
+        source = sqlite3.connect(self.template_path)
+        self._template = sqlite3.connect(':memory:', check_same_thread=False)
+        source.backup(self._template)
+        source.close()
+
+    def checkout(self):
+        conn = sqlite3.connect(':memory:', check_same_thread=False)
+        self._template.backup(conn)
+        self.connect = lambda: conn
+        return conn.close
+
+    def close(self):
+        if self._template is not None:
+            self._template.close()
+
+
+class PostgresCopies:
+    """Banco-modelo migrado uma vez; cada teste ganha CREATE DATABASE ... TEMPLATE."""
+    poolclass = None
+
+    def __init__(self, url):
+        import psycopg2
+        self._psycopg2 = psycopg2
+        self.url = make_url(url)
+        self.template_name = f"{self.url.database}_tpl_{WORKER}"
+        self._counter = itertools.count()
+        self._admin = psycopg2.connect(**self._params(self.url.database))
+        self._admin.autocommit = True
+        self._execute(f'DROP DATABASE IF EXISTS "{self.template_name}"')
+        self._execute(f'CREATE DATABASE "{self.template_name}"')
+        self.connect = lambda: psycopg2.connect(**self._params(self.template_name))
+
+    def _params(self, database):
+        return {'host': self.url.host, 'port': self.url.port, 'user': self.url.username,
+                'password': self.url.password, 'dbname': database}
+
+    def _execute(self, sql):
+        with self._admin.cursor() as cur:
+            cur.execute(sql)
+
+    def freeze(self):
+        pass
+
+    def checkout(self):
+        name = f"{self.url.database}_{WORKER}_{next(self._counter)}"
+        self._execute(f'DROP DATABASE IF EXISTS "{name}"')
+        self._execute(f'CREATE DATABASE "{name}" TEMPLATE "{self.template_name}"')
+        params = self._params(name)
+        self.connect = lambda: self._psycopg2.connect(**params)
+        return lambda: self._execute(f'DROP DATABASE IF EXISTS "{name}"')
+
+    def close(self):
+        self._execute(f'DROP DATABASE IF EXISTS "{self.template_name}"')
+        self._admin.close()
+
+
+@pytest.fixture(scope='session')
+def copies(tmp_path_factory):
+    url = os.environ.get('TEST_DATABASE_URL')
+    provider = PostgresCopies(url) if url else SqliteCopies(tmp_path_factory.mktemp(f'db-{WORKER}'))
+    yield provider
+    provider.close()
+
+
+@pytest.fixture(scope='session')
+def app(copies):
+    from flask_migrate import upgrade
+
+    engine_options = {'creator': lambda: copies.connect()}
+    if copies.poolclass:
+        engine_options['poolclass'] = copies.poolclass
+    app = create_app('testing', SQLALCHEMY_ENGINE_OPTIONS=engine_options)
+
+    with app.app_context():
+        upgrade(directory=MIGRATIONS)
+        db.engine.dispose()
+    copies.freeze()
+    return app
+
+
+@pytest.fixture
+def database(app, copies):
+    """Banco limpo (recém-migrado) para o teste; use dentro de `with app.app_context()`."""
+    release = copies.checkout()
+    stats_cache.clear()
+    clear_caches()
+    yield db
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+    release()
+
+
+@pytest.fixture
+def client(app, database):
+    return app.test_client()
+
+
+@pytest.fixture
+def login():
+    """login(client, user_id): abre a sessão sem passar pelo hash de senha."""
+    def _login(client, user_id):
+        with client.session_transaction() as session:
+            session['user_id'] = user_id
+        return client
+    return _login
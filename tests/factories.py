@@ -0,0 +1,68 @@
+# factories.py
+# Fábricas de dados para os testes: cada uma adiciona o objeto à sessão e faz flush
+# (o id já fica disponível); o commit fica por conta do teste.
+import itertools
+import json
+
+from werkzeug.security import generate_password_hash
+
+from my_app.dimensions import new_page_view
+from my_app.models import db, User, UserProgress, StationResult, Evaluation
+
+PASSWORD = 'senha-de-teste'
+# Hash com uma única iteração: o pbkdf2 padrão custaria ~0,5s por usuário
+PASSWORD_HASH = generate_password_hash(PASSWORD, method='pbkdf2:sha256:1')
+
+_sequence = itertools.count(1)
+
+
+def _save(obj):
+    db.session.add(obj)
+    db.session.flush()
+    return obj
+
+
+def make_user(**fields):
+    n = next(_sequence)
+    fields.setdefault('username', f'user{n}')
+    fields.setdefault('email', f'user{n}@example.test')
+    fields.setdefault('profession', 'Enfermeiro')
+    fields.setdefault('country', 'Brasil')
+    fields.setdefault('password_hash', PASSWORD_HASH)
+    user = User(**fields)
+    user.generate_visitor_id()
+    return _save(user)
+
+
+def make_progress(user=None, keys=(), **fields):
+    user = user or make_user()
+    fields.setdefault('current_challenge_id', 1)
+    progress = UserProgress(user_id=user.id, **fields)
+    progress._earned_keys = json.dumps(list(keys))
+    return _save(progress)
+
+
+def make_station_result(user=None, station_id=1, **fields):
+    user = user or make_user()
+    fields.setdefault('score', 100)
+    fields.setdefault('time_spent', 60)
+    return _save(StationResult(user_id=user.id, station_id=station_id, **fields))
+
+
+def make_evaluation(user=None, team=(), **fields):
+    user = user or make_user()
+    fields.setdefault('participant_type', 'estudante')
+    fields.setdefault('participation_type', 'equipe' if team else 'sozinho')
+    for question, answer in (('q1', 5), ('q2', 4), ('q3', 5), ('q4', 4)):
+        fields.setdefault(question, answer)
+    fields.setdefault('q5', 'Dinâmica envolvente')
+    fields.setdefault('q6', 'Mais estações')
+    return _save(Evaluation(user_id=user.id, team=json.dumps(list(team)), **fields))
+
+
+def make_page_view(user=None, page_url='/dashboard', page_title='dashboard',
+                   user_agent='Mozilla/5.0 (X11; Linux x86_64) Firefox/128.0', **fields):
+    fields.setdefault('visitor_id', user.visitor_id if user else f'visitor-{next(_sequence)}')
+    fields.setdefault('language', 'pt')
+    fields.setdefault('ip_address', 'a' * 45)
+    return _save(new_page_view(page_url, page_title, user_agent, user_id=user.id if user else None, **fields))
@@ -0,0 +1,65 @@
+# test_archive.py
+from datetime import datetime, timedelta
+
+import pytest
+
+from my_app.models import db, PageViews
+from factories import make_page_view, make_user
+
+pytest.importorskip('pyarrow')
+
+from my_app.archive import ArchiveError, archive_page_views, page_views_frame, partitions  # noqa: E402
+
+NOW = datetime(2026, 6, 1, 12, 0)
+
+
+def seed_views():
+    user = make_user()
+    for days in (200, 200, 150, 120, 10, 1):
+        make_page_view(user, accessed_at=NOW - timedelta(days=days), page_title=f'page{days}')
+    db.session.commit()
+
+
+def test_archive_moves_old_rows_into_daily_partitions(app, database, tmp_path):
+    with app.app_context():
+        seed_views()
+        stats = archive_page_views(older_than_days=90, batch_size=1, root=str(tmp_path), now=NOW)
+
+        assert stats['rows'] == 4 and stats['batches'] == 4
+        assert stats['compression_ratio'] and stats['rows_per_second'] > 0
+        assert PageViews.query.count() == 2
+        days = [day for day, _ in partitions(str(tmp_path))]
+        assert days == sorted({(NOW - timedelta(days=d)).date() for d in (200, 150, 120)})
+        # As duas partes do mesmo dia foram compactadas
+        assert stats['files'] == 3
+        assert all(len(files) == 1 for _, files in partitions(str(tmp_path)))
+
+        # Nada mais a arquivar: segunda rodada não faz nada
+        assert archive_page_views(older_than_days=90, root=str(tmp_path), now=NOW)['rows'] == 0
+
+
+def test_frame_reads_hot_and_cold_together(app, database, tmp_path):
+    with app.app_context():
+        seed_views()
+        before = page_views_frame(root=str(tmp_path))
+        archive_page_views(older_than_days=90, root=str(tmp_path), now=NOW)
+        after = page_views_frame(root=str(tmp_path))
+
+        assert list(after['id']) == list(before['id'])
+        assert list(after['page_title']) == list(before['page_title'])
+
+        recent = page_views_frame(start=NOW - timedelta(days=160), end=NOW - timedelta(days=5),
+                                  root=str(tmp_path))
+        assert list(recent['page_title']) == ['page150', 'page120', 'page10']
+
+
+def test_refuses_to_archive_without_a_configured_directory(app, database, monkeypatch):
+    monkeypatch.setitem(app.config, 'PAGE_VIEWS_ARCHIVE_DIR', None)
+    with app.app_context():
+        seed_views()
+        with pytest.raises(ArchiveError, match='PAGE_VIEWS_ARCHIVE_DIR'):
+            archive_page_views(older_than_days=90, now=NOW)
+        # Nada apagado; a leitura segue só com a tabela quente
+        assert PageViews.query.count() == 6
+        assert len(page_views_frame()) == 6
+
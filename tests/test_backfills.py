@@ -0,0 +1,93 @@
+# test_backfills.py
+from datetime import datetime, timedelta
+
+import pytest
+
+from my_app.backfills import BACKFILLS, Backfill, BackfillError, pending, run_backfill
+from my_app.models import db, DataMigration, SiteAccess, UserProgress
+from factories import make_page_view, make_progress, make_user
+
+LEGACY = '["key-a", "key-b", "key-a"]'
+
+
+def seed_legacy_progress(count):
+    for _ in range(count):
+        progress = make_progress()
+        progress._earned_keys = LEGACY
+    db.session.commit()
+
+
+def test_migration_schedules_backfills(app, database):
+    with app.app_context():
+        assert pending() == ['user_progress_earned_keys', 'site_access_daily', 'evaluation_search']
+
+
+def test_interrupted_run_resumes_from_checkpoint(app, database):
+    with app.app_context():
+        seed_legacy_progress(5)
+        seen = []
+        first = run_backfill('user_progress_earned_keys', batch_size=2, max_chunks=2, on_progress=seen.append)
+        assert (first['rows_done'], first['total_rows'], first['chunks']) == (4, 5, 2)
+        assert seen[-1].eta_seconds is not None
+        state = db.session.get(DataMigration, 'user_progress_earned_keys')
+        assert (state.status, state.rows_done, state.locked_by) == ('paused', 4, None)
+
+        second = run_backfill('user_progress_earned_keys', batch_size=2)
+        assert (second['rows_done'], second['chunks']) == (5, 1)
+        assert db.session.get(DataMigration, 'user_progress_earned_keys').status == 'done'
+        assert {p._earned_keys for p in UserProgress.query} == {'["key-a","key-b"]'}
+
+
+def test_failed_chunk_keeps_the_last_checkpoint(app, database, monkeypatch):
+    calls = []
+
+    def process(keys):
+        calls.append(keys)
+        db.session.get(UserProgress, keys[0]).total_score = 99
+        if len(calls) == 2:
+            raise RuntimeError("boom")
+    monkeypatch.setitem(BACKFILLS, 'flaky', Backfill('flaky', UserProgress.id, process, (), ''))
+
+    with app.app_context():
+        seed_legacy_progress(3)
+        ids = [p.id for p in UserProgress.query.order_by(UserProgress.id)]
+        with pytest.raises(RuntimeError):
+            run_backfill('flaky', batch_size=1)
+        state = db.session.get(DataMigration, 'flaky')
+        assert (state.status, state.rows_done) == ('failed', 1) and 'boom' in state.error
+        # O lote que falhou foi desfeito junto com o checkpoint
+        assert UserProgress.query.filter_by(total_score=99).count() == 1
+
+        assert run_backfill('flaky', batch_size=1)['rows_done'] == 3
+        assert calls == [[ids[0]], [ids[1]], [ids[1]], [ids[2]]]
+
+
+def test_running_backfill_cannot_be_claimed_twice(app, database):
+    with app.app_context():
+        state = db.session.get(DataMigration, 'site_access_daily')
+        state.status, state.updated_at = 'running', datetime.utcnow()
+        db.session.commit()
+        with pytest.raises(BackfillError) as error:
+            run_backfill('site_access_daily')
+        assert error.value.status == 409
+
+        # Reserva abandonada (sem checkpoint além do timeout) pode ser assumida
+        state.updated_at = datetime.utcnow() - timedelta(hours=1)
+        db.session.commit()
+        assert run_backfill('site_access_daily')['rows_done'] == 0
+        assert db.session.get(DataMigration, 'site_access_daily').status == 'done'
+
+
+def test_site_access_counts_views_and_visitors_per_day(app, database):
+    day = datetime(2026, 3, 10, 9, 0)
+    with app.app_context():
+        db.session.query(DataMigration).delete()
+        user = make_user()
+        for hours, visitor in ((0, 'a'), (1, 'a'), (2, 'b'), (25, 'a'), (26, 'c')):
+            make_page_view(user, visitor_id=visitor, accessed_at=day + timedelta(hours=hours))
+        db.session.commit()
+
+        run_backfill('site_access_daily', batch_size=2)
+        counts = {s.access_date: (s.page_views, s.unique_visitors) for s in SiteAccess.query}
+        assert counts[day.date()] == (3, 2)
+        assert counts[(day + timedelta(days=1)).date()] == (2, 2)
@@ -0,0 +1,121 @@
+# test_catalog.py
+import json
+import os
+
+import pytest
+
+from my_app.catalog import CHALLENGES_FILE, CatalogError, CatalogStore, catalog, localize, validate
+from factories import make_user, make_progress
+from my_app.models import db
+
+
+def _document():
+    with open(CHALLENGES_FILE, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _write(path, document, bump=0):
+    path.write_text(json.dumps(document, ensure_ascii=False), encoding='utf-8')
+    if bump:
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + bump))
+
+
+def test_shipped_catalog_is_valid():
+    challenges = validate(_document())
+    assert sorted(challenges) == list(range(1, 16))
+
+
+@pytest.mark.parametrize('mutate, message', [
+    (lambda c: c.update(type='trivia'), 'unknown'),
+    (lambda c: c.pop('quizData'), 'quizData'),
+    (lambda c: c.update(requiredKey='chave_inexistente'), 'unknown key'),
+    (lambda c: c.update(points='5'), 'points'),
+])
+def test_invalid_catalog_is_rejected(mutate, message):
+    document = _document()
+    mutate(document['challenges'][0])
+    with pytest.raises(CatalogError, match=message):
+        validate(document)
+
+
+def test_store_swaps_snapshot_and_keeps_old_one_on_error(tmp_path):
+    path = tmp_path / 'challenges.json'
+    document = _document()
+    _write(path, document)
+    store = CatalogStore(str(path), storytelling_file=None)
+    first = store.current
+
+    document['challenges'][0]['title'] = 'Nova pergunta'
+    _write(path, document, bump=10**9)
+    second = store.refresh()
+    assert second is not first and second.hash != first.hash
+    assert second.get(1)['title'] == 'Nova pergunta'
+    assert first.get(1)['title'] != 'Nova pergunta'  # snapshots antigos não mudam
+
+    path.write_text('{"version": 2, "challenges": []}', encoding='utf-8')
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 2 * 10**9))
+    assert store.refresh() is second
+
+
+@pytest.fixture
+def editable_catalog(tmp_path, monkeypatch):
+    path = tmp_path / 'challenges.json'
+    _write(path, _document())
+    monkeypatch.setattr(catalog, 'challenges_file', str(path))
+    catalog.load()
+    yield path
+    monkeypatch.undo()
+    catalog.load()
+
+
+def test_app_serves_new_catalog_without_restart(app, client, login, editable_catalog, monkeypatch):
+    with app.app_context():
+        user = make_user()
+        make_progress(user)
+        db.session.commit()
+        login(client, user.id)
+    old_version = client.get('/api/game/progress').get_json()['catalog_version']
+
+    document = _document()
+    document['version'] += 1
+    document['challenges'][0]['title'] = 'Pergunta revisada'
+    _write(editable_catalog, document, bump=10**9)
+    monkeypatch.setattr(catalog, '_next_check', 0.0)
+
+    assert client.get('/api/challenge/1').get_json()['title'] == 'Pergunta revisada'
+    new_version = client.get('/api/game/progress').get_json()['catalog_version']
+    assert new_version != old_version and new_version.startswith(f"v{document['version']}-")
+
+
+def test_translation_overrides_text_only_and_falls_back_per_field():
+    base = {'id': 1, 'title': 'Título', 'quizData': [
+        {'id': 'q1', 'text': 'Pergunta', 'correctAnswer': 'b'},
+        {'id': 'q2', 'text': 'Outra', 'correctAnswer': 'a'}]}
+    overlay = {'title': 'Title', 'quizData': [{'id': 'q2', 'text': 'Other', 'correctAnswer': 'c'}]}
+
+    result = localize(base, overlay)
+    assert result['title'] == 'Title'
+    assert [q['text'] for q in result['quizData']] == ['Pergunta', 'Other']
+    assert result['quizData'][1]['correctAnswer'] == 'a'
+
+
+def test_challenge_payload_follows_session_language(app, client, login):
+    with app.app_context():
+        user = make_user()
+        make_progress(user, current_challenge_id=2, keys=['chave_estacao_1'])
+        db.session.commit()
+        login(client, user.id)
+    with client.session_transaction() as session:
+        session['lang'] = 'en'
+
+    response = client.get('/api/challenge/1')
+    body = response.get_json()
+    assert response.headers['Content-Language'] == 'en'
+    assert body['title'] == 'Safe newborn identification'
+    assert body['intro_message'].startswith('You have just entered')
+    assert 'correctAnswer' not in response.get_data(as_text=True)
+
+    spanish = client.get('/api/challenge/2?lang=es').get_json()
+    assert spanish['title'] == 'Administración de medicamentos pediátricos'
+    assert spanish['orderingData']['instructions'].startswith('Ordene os passos')  # sem tradução: pt
@@ -0,0 +1,169 @@
+# test_cohorts.py
+import pytest
+
+from my_app.cohorts import (JOIN_CODE_ALPHABET, JOIN_CODE_LENGTH, CohortError, CohortStatsCache, can_manage,
+                            cohort_results, create_cohort, invalidate_after_commit, join_cohort, stats_cache)
+from my_app.models import db, Cohort, User
+from factories import make_station_result, make_user
+
+
+def _classroom():
+    """Professor dono, dois alunos e um jogador de fora; devolve (turma, professor, alunos, de fora)."""
+    teacher = make_user()
+    cohort = create_cohort(teacher, '  Enfermagem 2026  ')
+    students = [make_user(), make_user()]
+    for student in students:
+        join_cohort(student, cohort.join_code)
+    outsider = make_user()
+    db.session.commit()
+    return cohort, teacher, students, outsider
+
+
+def test_join_code_is_unambiguous_and_normalized(app, database):
+    with app.app_context():
+        cohort, teacher, students, _ = _classroom()
+        assert cohort.name == 'Enfermagem 2026'
+        assert len(cohort.join_code) == JOIN_CODE_LENGTH
+        assert set(cohort.join_code) <= set(JOIN_CODE_ALPHABET)
+        assert not set(cohort.join_code) & set('01OIL')
+
+        # Código digitado em minúsculas e com espaços; entrar de novo não duplica
+        again = join_cohort(students[0], f'  {cohort.join_code.lower()} ')
+        assert again.id == cohort.id
+        db.session.commit()
+        assert cohort.memberships.count() == 3
+
+        with pytest.raises(CohortError) as error:
+            join_cohort(students[0], 'NAOEXISTE')
+        assert error.value.status == 404
+
+        cohort.is_active = False
+        db.session.commit()
+        with pytest.raises(CohortError):
+            join_cohort(make_user(), cohort.join_code)
+
+
+def test_create_cohort_requires_a_name(app, database):
+    with app.app_context():
+        with pytest.raises(CohortError, match='name'):
+            create_cohort(make_user(), '   ')
+
+
+def test_cohort_queries_only_see_students_of_the_cohort(app, database):
+    with app.app_context():
+        cohort, teacher, students, outsider = _classroom()
+        other = create_cohort(make_user(), 'Outra turma')
+        join_cohort(outsider, other.join_code)
+        for user in (teacher, *students, outsider):
+            make_station_result(user, station_id=1)
+        db.session.commit()
+
+        assert sorted(r.user_id for r in cohort_results(cohort.id)) == sorted(s.id for s in students)
+        assert [r.user_id for r in cohort_results(other.id)] == [outsider.id]
+
+
+def test_can_manage(app, database):
+    with app.app_context():
+        cohort, teacher, students, outsider = _classroom()
+        assert can_manage(teacher, cohort.id)
+        assert not can_manage(students[0], cohort.id)
+        assert not can_manage(outsider, cohort.id)
+        assert can_manage(outsider, cohort.id, global_instructor=True)
+
+
+def test_api_restricts_cohort_queries_to_instructors(app, client, login, monkeypatch):
+    monkeypatch.setitem(app.config, 'INSTRUCTOR_EMAILS', {'coord@example.test'})
+    with app.app_context():
+        cohort, teacher, students, outsider = _classroom()
+        coordinator = make_user(email='coord@example.test')
+        db.session.commit()
+        cohort_id, teacher_id, student_id, coordinator_id = cohort.id, teacher.id, students[0].id, coordinator.id
+
+    for user_id, status in ((student_id, 403), (teacher_id, 200), (coordinator_id, 200)):
+        login(client, user_id)
+        for view in ('stats', 'results', 'attempts', 'evaluations'):
+            assert client.get(f'/api/cohorts/{cohort_id}/{view}').status_code == status
+
+    assert client.get('/api/cohorts/999999/stats').status_code == 404
+
+    login(client, student_id)
+    cohorts = client.get('/api/cohorts').get_json()['cohorts']
+    assert [(c['id'], c['role']) for c in cohorts] == [(cohort_id, 'student')]
+
+
+def test_join_and_create_through_the_api(app, client, login):
+    with app.app_context():
+        teacher, student = make_user(), make_user()
+        db.session.commit()
+        teacher_id, student_id = teacher.id, student.id
+
+    login(client, teacher_id)
+    created = client.post('/api/cohorts', json={'name': 'Turma A'})
+    assert created.status_code == 201
+    code = created.get_json()['cohort']['join_code']
+
+    login(client, student_id)
+    assert client.post('/api/cohorts/join', json={'join_code': 'XXXXXXXX'}).status_code == 404
+    joined = client.post('/api/cohorts/join', json={'join_code': code}).get_json()
+    assert joined['cohort']['name'] == 'Turma A'
+    with app.app_context():
+        assert db.session.get(Cohort, joined['cohort']['id']).memberships.count() == 2
+
+
+def test_stats_cache_ttl():
+    calls = []
+
+    def loader(cohort_id):
+        calls.append(cohort_id)
+        return {'n': len(calls)}
+
+    cache = CohortStatsCache(ttl=60)
+    assert cache.get(1, loader) == cache.get(1, loader) == {'n': 1}
+    assert cache.get(2, loader) == {'n': 2}
+    cache.invalidate([1])
+    assert cache.get(1, loader) == {'n': 3}
+
+    expired = CohortStatsCache(ttl=0)
+    expired.get(1, loader)
+    expired.get(1, loader)
+    assert len(calls) == 5
+
+
+def test_stats_are_invalidated_only_after_commit(app, client, login):
+    with app.app_context():
+        cohort, teacher, students, _ = _classroom()
+        cohort_id, teacher_id, student_id = cohort.id, teacher.id, students[0].id
+    login(client, teacher_id)
+    assert client.get(f'/api/cohorts/{cohort_id}/stats').get_json()['stations'] == {}
+
+    with app.app_context():
+        student = db.session.get(User, student_id)
+        make_station_result(student, station_id=3, score=80)
+        invalidate_after_commit([cohort_id])
+        db.session.rollback()  # rollback descarta a invalidação: o cache continua valendo
+        assert cohort_id in stats_cache._data
+
+        make_station_result(student, station_id=3, score=80)
+        db.session.commit()  # sem invalidate_after_commit: ainda o valor em cache
+        assert client.get(f'/api/cohorts/{cohort_id}/stats').get_json()['stations'] == {}
+
+        invalidate_after_commit([cohort_id])
+        db.session.commit()
+    stats = client.get(f'/api/cohorts/{cohort_id}/stats').get_json()
+    assert stats['stations'] == {'3': {'completions': 1, 'score_sum': 80}}
+    assert stats['players'] == 2
+
+
+def test_station_result_from_the_game_invalidates_member_cohorts(app, client, login):
+    with app.app_context():
+        cohort, teacher, students, _ = _classroom()
+        cohort_id, teacher_id, student_id = cohort.id, teacher.id, students[0].id
+    login(client, teacher_id)
+    assert client.get(f'/api/cohorts/{cohort_id}/stats').get_json()['stations'] == {}
+
+    login(client, student_id)
+    assert client.post('/api/station_result', json={'station_id': 1, 'score': 90, 'time_spent': 20}).status_code == 200
+
+    login(client, teacher_id)
+    assert client.get(f'/api/cohorts/{cohort_id}/stats').get_json()['stations'] == {
+        '1': {'completions': 1, 'score_sum': 90}}
@@ -1,74 +1,34 @@
 # test_database.py
-from app import app, db
-from models import User, PageViews, SiteAccess
-from datetime import datetime, date
-import inspect
+# Esquema migrado e fábricas: cada teste parte de uma cópia limpa do banco-modelo.
+from sqlalchemy import inspect
 
-def test_database():
-    print("=== TESTE DO BANCO DE DADOS ===")
-    
+from my_app.models import db, User, UserProgress, StationResult, Evaluation
+from factories import make_user, make_progress, make_station_result, make_evaluation, PASSWORD
+
+
+def test_migrations_create_every_model_table(app, database):
+    with app.app_context():
+        tables = set(inspect(db.engine).get_table_names())
+    assert {table.name for table in db.metadata.sorted_tables} <= tables
+    assert 'alembic_version' in tables
+
+
+def test_factories_persist_related_rows(app, database):
     with app.app_context():
-        try:
-            # 1. Testar conexão com o banco
-            connection = db.engine.connect()
-            print("✅ Conexão com banco de dados bem-sucedida!")
-            connection.close()
-            
-            # 2. Verificar se tabelas foram criadas (método moderno)
-            inspector = db.inspect(db.engine)
-            tables = inspector.get_table_names()
-            print(f"✅ Tabelas criadas: {len(tables)}")
-            for table in tables:
-                print(f"   - {table}")
-            
-            # 3. Contar registros em cada tabela principal
-            print("\n📊 Contagem de registros:")
-            print(f"   Usuários: {User.query.count()}")
-            print(f"   PageViews: {PageViews.query.count()}")
-            print(f"   SiteAccess: {SiteAccess.query.count()}")
-            
-            # 4. Verificar estatísticas de hoje
-            today = date.today()
-            stats = SiteAccess.query.filter_by(access_date=today).first()
-            if stats:
-                print(f"   Estatísticas hoje: {stats.page_views} pageviews, {stats.unique_visitors} visitantes")
-            else:
-                print("   ℹ️  Nenhuma estatística registrada hoje ainda")
-            
-            # 5. Tentar criar um usuário de teste
-            if User.query.count() == 0:
-                try:
-                    test_user = User(
-                        username="test_user",
-                        email="test@example.com", 
-                        profession="Tester",
-                        country="Brasil"
-                    )
-                    test_user.set_password("teste123")
-                    test_user.generate_visitor_id()
-                    
-                    db.session.add(test_user)
-                    db.session.commit()
-                    print("✅ Usuário de teste criado com sucesso!")
-                except Exception as e:
-                    print(f"⚠️  Não foi possível criar usuário de teste: {e}")
-                    db.session.rollback()
-            
-            # 6. Listar usuários existentes
-            users = User.query.all()
-            print(f"\n👥 Usuários no sistema ({len(users)}):")
-            for user in users:
-                print(f"   - {user.username} ({user.email})")
-            
-            print("\n🎉 Banco de dados está funcionando perfeitamente!")
-            
-        except Exception as e:
-            print(f"❌ Erro no banco de dados: {e}")
-            import traceback
-            traceback.print_exc()
-            return False
-    
-    return True
+        user = make_user()
+        make_progress(user, keys=['A'], current_challenge_id=2, total_score=100)
+        make_station_result(user, station_id=1, score=100)
+        make_evaluation(user, team=['Ana', 'Bia'])
+        db.session.commit()
+
+        assert User.query.count() == 1
+        assert user.check_password(PASSWORD)
+        assert user.progress.get_keys() == ['A']
+        assert StationResult.query.filter_by(user_id=user.id).one().score == 100
+        assert Evaluation.query.one().participation_type == 'equipe'
 
-if __name__ == "__main__":
-    test_database()
\ No newline at end of file
+
+def test_each_test_gets_a_clean_copy(app, database):
+    with app.app_context():
+        assert User.query.count() == 0
+        assert UserProgress.query.count() == 0
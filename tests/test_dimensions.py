@@ -0,0 +1,76 @@
+# test_dimensions.py
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from my_app.dimensions import page_endpoints, page_urls, user_agents
+from my_app.models import db, PageUrl, PageViews
+from factories import make_page_view, make_user
+
+
+@contextmanager
+def recorded_queries(engine):
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+
+def test_interned_values_share_one_row(app, database):
+    with app.app_context():
+        first = make_page_view(page_url='/station', page_title='station')
+        second = make_page_view(page_url='/station', page_title='station', user_agent=None)
+        db.session.commit()
+        assert first.url_id == second.url_id and first.endpoint_id == second.endpoint_id
+        assert PageUrl.query.count() == 1
+        assert (second.page_url, second.page_title, second.user_agent) == ('/station', 'station', None)
+
+
+def test_cached_lookup_skips_the_database(app, database):
+    with app.app_context():
+        url_id = page_urls.id_for('/dashboard')
+        db.session.commit()
+        assert page_urls.id_for('/dashboard') == url_id  # lida do banco, entra no LRU
+
+        with recorded_queries(db.engine) as statements:
+            assert page_urls.id_for('/dashboard') == url_id
+        assert statements == []
+
+
+def test_rolled_back_insert_is_not_cached(app, database):
+    with app.app_context():
+        page_endpoints.id_for('ghost')
+        db.session.rollback()
+        assert 'ghost' not in page_endpoints._cache
+        assert page_endpoints.id_for('ghost') is not None
+
+
+def test_track_access_records_dimension_ids(app, client):
+    with app.app_context():
+        db.session.query(PageViews).delete()
+        db.session.commit()
+    client.get('/terms', headers={'User-Agent': 'x' * 600})
+    with app.app_context():
+        view = PageViews.query.one()
+        assert view.page_title == 'terms' and view.page_url == '/terms'
+        assert view.user_agent == 'x' * 500
+        assert user_agents.id_for('x' * 600) == view.user_agent_id
+
+
+def test_track_access_keeps_the_page_but_not_query_strings_or_api_ids(app, client, login):
+    with app.app_context():
+        user = make_user()
+        db.session.commit()
+        login(client, user.id)
+    for path in ('/terms?lang=en', '/terms?q=abc', '/api/jobs/1', '/api/jobs/2?seed=7',
+                 '/station/3', '/station/4?x=1', '/station/99999', '/api/game/challenge/3/state'):
+        client.get(path)
+    with app.app_context():
+        assert sorted(url for (url,) in db.session.query(PageUrl.url)) == [
+            '/api/game/challenge/<int:challenge_id>/state', '/api/jobs/<int:job_id>',
+            '/station/3', '/station/4', '/station/<int:challenge_id>', '/terms']
@@ -0,0 +1,143 @@
+# test_engagement.py
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from my_app.engagement import empty_open_sessions, engagement_report, sessionize, sessionize_page_views
+from my_app.models import db, DwellStat, SessionStat
+from factories import make_page_view, make_user
+
+T0 = datetime(2026, 5, 4, 10, 0)
+GAP = 1800
+# (visitante, segundos desde T0, endpoint, idioma)
+VISITS = [
+    ('a', 0, 'dashboard', 'pt'), ('a', 60, 'station', 'pt'), ('a', 360, 'station', 'pt'),
+    ('a', 5000, 'dashboard', 'pt'),                      # depois do intervalo: nova sessão (bounce)
+    ('b', 30, 'home_en', 'en'), ('b', 40, 'dashboard', 'en'),
+    ('c', 100, 'terms', 'es'),
+]
+
+
+def hits(visits):
+    return pd.DataFrame([{'visitor_id': v, 'accessed_at': pd.Timestamp(T0 + timedelta(seconds=s)),
+                          'page_title': p, 'language': lang} for v, s, p, lang in visits])
+
+
+def seed(visits, urls=None):
+    """urls: endpoint -> regra da rota (padrão: /<endpoint>, uma página)."""
+    user = make_user()
+    for visitor, seconds, page, language in visits:
+        make_page_view(user, visitor_id=visitor, page_title=page, language=language,
+                       page_url=(urls or {}).get(page, f'/{page}'), accessed_at=T0 + timedelta(seconds=seconds))
+    db.session.commit()
+
+
+def stats():
+    sessions = {s.language: (s.sessions, s.bounces, s.page_views, s.duration_seconds) for s in SessionStat.query}
+    dwell = {(d.endpoint, d.language): (d.views, d.dwell_count, d.dwell_seconds) for d in DwellStat.query}
+    return sessions, dwell
+
+
+def test_sessionize_splits_on_gap_and_measures_dwell():
+    done, dwell, still_open = sessionize(hits(VISITS), empty_open_sessions(), GAP,
+                                         T0 + timedelta(seconds=5000 + GAP + 1))
+    assert still_open.empty
+    by_visitor = done.sort_values(['language', 'duration']).values.tolist()
+    day = pd.Timestamp(T0.date())
+    assert by_visitor == [[day, 'en', 2, 10.0], [day, 'es', 1, 0.0], [day, 'pt', 1, 0.0], [day, 'pt', 3, 360.0]]
+    assert sorted(dwell['dwell']) == [10.0, 60.0, 300.0]
+
+
+def test_recent_sessions_stay_open_and_continue():
+    first, _, still_open = sessionize(hits(VISITS[:2]), empty_open_sessions(), GAP, T0)
+    assert first.empty and still_open['hits'].tolist() == [2]
+
+    done, dwell, still_open = sessionize(hits(VISITS[2:3]), still_open, GAP, T0 + timedelta(hours=2))
+    assert done[['hits', 'duration']].values.tolist() == [[3, 360.0]] and still_open.empty
+    assert dwell['dwell'].tolist() == [300.0]  # a visita carregada ganha a permanência
+
+
+def test_chunked_and_incremental_runs_match_a_single_pass(app, database):
+    now = T0 + timedelta(hours=3)
+    with app.app_context():
+        seed(VISITS)
+        single = sessionize_page_views(now=now)
+        expected = stats()
+        assert single['sessions_closed'] == 4 and single['open_sessions'] == 0
+
+        result = sessionize_page_views(chunk_size=2, now=now, rebuild=True)
+        assert result['chunks'] == 4 and stats() == expected
+        assert expected[0]['pt'] == (2, 1, 4, 360.0)
+        assert expected[1][('station', 'pt')] == (2, 1, 300.0)
+
+        # Nada novo: a marca d'água não deixa contar de novo
+        assert sessionize_page_views(now=now)['rows'] == 0 and stats() == expected
+
+
+def test_api_calls_do_not_split_page_dwell_or_sessions(app, database):
+    api = {'game_api.get_progress': '/api/game/progress', 'jobs_api.job_status': '/api/jobs/<int:job_id>',
+           'instructor.stream': '/instructor/api/stream',
+           'save_evaluation': 'https://escape-room.onrender.com/api/save_evaluation'}  # URL antiga, completa
+    with app.app_context():
+        seed([
+            ('a', 0, 'station', 'pt'), ('a', 1, 'game_api.get_progress', 'pt'),
+            ('a', 2, 'jobs_api.job_status', 'pt'), ('a', 3, 'jobs_api.job_status', 'pt'),
+            ('a', 90, 'dashboard', 'pt'), ('a', 91, 'save_evaluation', 'pt'),
+            ('b', 10, 'instructor.console', 'en'), ('b', 11, 'instructor.stream', 'en'),  # uma página só: bounce
+        ], urls={**api, 'instructor.console': '/instructor/console'})
+        result = sessionize_page_views(now=T0 + timedelta(hours=3))
+        sessions, dwell = stats()
+
+        assert result['rows'] == 3
+        assert sessions == {'pt': (1, 0, 2, 90.0), 'en': (1, 1, 1, 0.0)}
+        assert dwell[('station', 'pt')] == (1, 1, 90.0)
+        assert not [endpoint for endpoint, _ in dwell if endpoint in api]
+
+
+def test_dwell_is_measured_per_station(app, database):
+    with app.app_context():
+        user = make_user()
+        for visitor, seconds, url in (('a', 0, '/station/3'), ('a', 40, '/station/7'), ('a', 160, '/dashboard'),
+                                      ('b', 0, '/station/3'), ('b', 20, '/station/3?lang=en'),
+                                      ('b', 30, 'https://escape-room.onrender.com/station/7')):
+            make_page_view(user, visitor_id=visitor, page_url=url, language='pt',
+                           page_title='dashboard' if url == '/dashboard' else 'play_challenge',
+                           accessed_at=T0 + timedelta(seconds=seconds))
+        db.session.commit()
+        sessionize_page_views(now=T0 + timedelta(hours=3))
+        dwell = {(d.endpoint, d.challenge_id): (d.views, d.dwell_count, d.dwell_seconds) for d in DwellStat.query}
+        report = {(row['endpoint'], row['station']): row['avg_dwell_seconds']
+                  for row in engagement_report()['endpoints']}
+
+    assert dwell == {('play_challenge', 3): (3, 3, 70.0), ('play_challenge', 7): (2, 1, 120.0),
+                     ('dashboard', 0): (1, 0, 0.0)}
+    assert report == {('dashboard', None): None, ('play_challenge', 3): 23.3, ('play_challenge', 7): 120.0}
+
+
+def test_session_spanning_two_runs(app, database):
+    with app.app_context():
+        seed(VISITS[:2])
+        first = sessionize_page_views(now=T0 + timedelta(seconds=200))
+        assert (first['sessions_closed'], first['open_sessions']) == (0, 1)
+
+        seed(VISITS[2:3])
+        second = sessionize_page_views(now=T0 + timedelta(hours=2))
+        assert (second['rows'], second['sessions_closed']) == (1, 1)
+        assert stats()[0] == {'pt': (1, 0, 3, 360.0)}
+
+
+def test_engagement_endpoint_is_for_instructors(app, client, login, monkeypatch):
+    with app.app_context():
+        seed(VISITS)
+        sessionize_page_views(now=T0 + timedelta(hours=3))
+        teacher, student = make_user(), make_user()
+        db.session.commit()
+        teacher_id, teacher_email, student_id = teacher.id, teacher.email, student.id
+    monkeypatch.setitem(app.config, 'INSTRUCTOR_EMAILS', {teacher_email})
+
+    assert login(client, student_id).get('/instructor/api/engagement').status_code == 403
+    data = login(client, teacher_id).get('/instructor/api/engagement').get_json()
+    pt = next(row for row in data['languages'] if row['language'] == 'pt')
+    assert (pt['sessions'], pt['bounce_rate'], pt['pages_per_session']) == (2, 0.5, 2.0)
+    station = next(row for row in data['endpoints'] if row['endpoint'] == 'station')
+    assert station['views'] == 2 and station['avg_dwell_seconds'] == 300.0
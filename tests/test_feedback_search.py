@@ -0,0 +1,83 @@
+# test_feedback_search.py
+from datetime import datetime
+
+from my_app.backfills import run_backfill
+from my_app.feedback_search import search_feedback, stems
+from my_app.models import db
+from factories import make_evaluation, make_user
+
+
+def evaluation_payload(**answers):
+    return {'participantType': 'profissional', 'participationType': 'sozinho', 'team': [],
+            'q1': 5, 'q2': 4, 'q3': 5, 'q4': 4, **answers}
+
+
+def test_inflections_share_a_stem():
+    assert stems('Melhorias nas estações', 'pt')[::2] == stems('melhorar estação', 'pt')
+    assert stems('improvements', 'en') == stems('improved', 'en')
+    assert stems('explicaciones', 'es') == stems('explicación', 'es')
+
+
+def test_save_evaluation_is_searchable_right_away(app, client, login):
+    with app.app_context():
+        user = make_user(language='pt')
+        db.session.commit()
+        user_id = user.id
+    login(client, user_id)
+    response = client.post('/api/save_evaluation', json=evaluation_payload(
+        q5='Cenários realistas', q6='Explicações melhores depois de cada erro'))
+    assert response.get_json()['success']
+
+    with app.app_context():
+        found = search_feedback('explicação erros')
+        assert found['total'] == 1
+        assert found['results'][0]['user_id'] == user_id
+        assert search_feedback('explicação', participant_type='estudante')['total'] == 0
+        assert search_feedback('tabuleiro')['total'] == 0
+
+
+def test_backfill_ranks_filters_and_pages(app, database):
+    with app.app_context():
+        english = make_user(language='en')
+        make_evaluation(english, q5='Realistic scenarios', q6='More stations, more hints',
+                        created_at=datetime(2026, 3, 1))
+        for day in range(1, 5):
+            make_evaluation(make_user(language='pt'), q5='Cenário realista', q6='Mais estações' * (day == 4),
+                            created_at=datetime(2026, 2, day))
+        make_evaluation(make_user(language='es'), q5='Escenarios realistas', q6='Más estaciones')
+        db.session.commit()
+        assert search_feedback('estação')['total'] == 0  # ainda fora do índice
+
+        assert run_backfill('evaluation_search', batch_size=2)['rows_done'] == 6
+        assert search_feedback('estação')['total'] == 1  # cada idioma com o próprio stemmer
+        assert search_feedback('estación')['total'] == 1
+        assert search_feedback('station')['total'] == 1
+        assert search_feedback('realista', languages=['pt'])['total'] == 4
+
+        ranked = search_feedback('realistas estações', languages=['pt'])
+        assert ranked['total'] == 1 and ranked['results'][0]['created_at'].startswith('2026-02-04')
+        first, second = (search_feedback('realista', page=n, per_page=3) for n in (1, 2))
+        assert (first['total'], len(first['results']), len(second['results'])) == (5, 3, 2)
+        assert not {r['evaluation_id'] for r in first['results']} & {r['evaluation_id'] for r in second['results']}
+        feb = search_feedback('realista', start=datetime(2026, 2, 2), end=datetime(2026, 2, 4), languages=['pt'])
+        assert [r['created_at'][:10] for r in feb['results']] == ['2026-02-03', '2026-02-02']
+
+        # Reindexar não duplica
+        run_backfill('evaluation_search', batch_size=10, restart=True)
+        assert search_feedback('realista', languages=['pt'])['total'] == 4
+
+
+def test_search_api_requires_instructor(app, client, login, monkeypatch):
+    with app.app_context():
+        teacher = make_user()
+        make_evaluation(teacher, q6='Mais dicas')
+        db.session.commit()
+        run_backfill('evaluation_search')
+        teacher_id, email = teacher.id, teacher.email
+    login(client, teacher_id)
+    assert client.get('/instructor/api/feedback/search?q=dica').status_code == 403
+
+    monkeypatch.setitem(app.config, 'INSTRUCTOR_EMAILS', {email})
+    data = client.get('/instructor/api/feedback/search?q=dica&until=2099-01-01').get_json()
+    assert data['success'] and data['total'] == 1 and data['results'][0]['q6'] == 'Mais dicas'
+    assert client.get('/instructor/api/feedback/search?q=dica&since=ontem').status_code == 400
@@ -0,0 +1,111 @@
+# test_game_api.py
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from my_app.live import broker, queue_delta
+from my_app.models import db, UserProgress
+from factories import make_user, make_progress
+
+
+def _player(app, **progress):
+    with app.app_context():
+        user = make_user()
+        make_progress(user, **progress)
+        db.session.commit()
+        return user.id
+
+
+def test_progress_requires_login(client):
+    response = client.get('/api/game/progress')
+    assert response.status_code == 401
+    assert response.get_json()['success'] is False
+
+
+def test_start_and_complete_advances_progress(app, client, login):
+    login(client, _player(app))
+
+    assert client.post('/api/game/challenge/start', json={'challenge_id': 1}).status_code == 200
+    response = client.post('/api/game/challenge/complete', json={
+        'challenge_id': 1, 'score': 100, 'time_spent': 30, 'key_earned': 'chave_estacao_5'})
+    assert response.get_json()['next_challenge_id'] == 2
+    assert response.get_json()['new_key_earned'] == 'chave_estacao_1'
+
+    # A chave enviada pelo cliente é ignorada: só a recompensa do catálogo é concedida
+    progress = client.get('/api/game/progress').get_json()
+    assert progress['earned_keys'] == ['chave_estacao_1']
+    assert progress['total_score'] == 100
+    assert client.get('/api/game/challenge/6/state').get_json()['state'] == 'locked'
+
+
+def test_locked_challenge_is_rejected(app, client, login):
+    login(client, _player(app))
+
+    response = client.post('/api/game/challenge/start', json={'challenge_id': 5})
+    assert response.status_code == 403
+    assert client.get('/api/game/challenge/5/state').get_json()['state'] == 'locked'
+
+
+def test_event_batch_is_idempotent(app, client, login):
+    user_id = _player(app)
+    login(client, user_id)
+    batch = {'client_id': 'device-1', 'events': [
+        {'seq': 1, 'type': 'start', 'challenge_id': 1},
+        {'seq': 2, 'type': 'complete', 'challenge_id': 1, 'score': 50, 'time_spent': 10, 'key_earned': 'A'}]}
+
+    first = client.post('/api/game/events', json=batch).get_json()
+    replay = client.post('/api/game/events', json=batch).get_json()
+
+    assert [r['status'] for r in first['results']] == ['applied', 'applied']
+    assert [r['status'] for r in replay['results']] == ['duplicate', 'duplicate']
+    with app.app_context():
+        assert db.session.query(UserProgress).filter_by(user_id=user_id).one().total_score == 50
+
+
+def test_offline_queue_is_scoped_to_the_user_and_cleared_on_logout(app, client, login):
+    user_id = _player(app)
+    login(client, user_id)
+    page = client.get('/station/1').get_data(as_text=True)
+    assert 'eventQueue.js' in page and f'data-user-id="{user_id}"' in page
+
+    for method in (client.get, client.post):
+        response = method('/logout')
+        assert response.status_code == 302
+        assert response.headers['Clear-Site-Data'] == '"storage"'
+
+
+def test_event_batch_publishes_only_after_the_request_commits(app, client, login, monkeypatch):
+    login(client, _player(app))
+    published, at_commit = [], []
+    monkeypatch.setattr(broker, 'publish', lambda topic, event_type, data: published.append((topic, event_type)))
+
+    def before_commit(session):
+        if not session.in_nested_transaction():
+            at_commit.append(len(published))
+    event.listen(Session, 'before_commit', before_commit)
+    try:
+        client.post('/api/game/events', json={'client_id': 'device-1', 'events': [
+            {'seq': 1, 'type': 'start', 'challenge_id': 1},
+            {'seq': 2, 'type': 'complete', 'challenge_id': 1, 'score': 50, 'time_spent': 10},
+            {'seq': 3, 'type': 'complete', 'challenge_id': 2}]})  # rejeitado
+    finally:
+        event.remove(Session, 'before_commit', before_commit)
+
+    # Savepoints (um por evento) não publicam nada: tudo sai no commit da requisição
+    assert at_commit[-1] == 0
+    assert sorted(event_type for topic, event_type in published if topic == 'all') == ['advance', 'station_result']
+
+
+def test_rolled_back_savepoint_drops_only_its_own_deltas(app, database, monkeypatch):
+    published = []
+    monkeypatch.setattr(broker, 'publish', lambda topic, event_type, data: published.append(data['n']))
+    with app.app_context():
+        queue_delta('advance', {'n': 1})
+        savepoint = db.session.begin_nested()
+        queue_delta('advance', {'n': 2})
+        savepoint.rollback()
+        savepoint = db.session.begin_nested()
+        queue_delta('advance', {'n': 3})
+        savepoint.commit()
+        assert published == []
+        db.session.commit()
+    assert published == [1, 3]
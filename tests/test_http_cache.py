@@ -0,0 +1,116 @@
+# test_http_cache.py
+import gzip
+import json
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from my_app.http_cache import Payload, http_cache
+from my_app.models import db
+from factories import make_station_result, make_user
+
+GZIP = {'Accept-Encoding': 'gzip'}
+
+
+@pytest.fixture
+def player(app, client, login):
+    with app.app_context():
+        user = make_user()
+        for station_id in range(1, 16):
+            make_station_result(user, station_id=station_id)
+        db.session.commit()
+        login(client, user.id)
+    return client
+
+
+def test_dynamic_json_is_gzipped_above_threshold(app, player, monkeypatch):
+    monkeypatch.setitem(app.config, 'COMPRESS_MIN_SIZE', 64)
+    response = player.get('/api/get_station_results', headers=GZIP)
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['ETag'].endswith('-gzip"')
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert json.loads(gzip.decompress(response.get_data()))['success'] is True
+
+    # Sem Accept-Encoding o corpo vai sem compressão
+    plain = player.get('/api/get_station_results')
+    assert 'Content-Encoding' not in plain.headers
+    assert plain.get_json()['success'] is True
+
+
+def test_dynamic_json_below_threshold_is_not_compressed(app, player, monkeypatch):
+    monkeypatch.setitem(app.config, 'COMPRESS_MIN_SIZE', 1 << 20)
+    response = player.get('/api/get_station_results', headers=GZIP)
+    assert 'Content-Encoding' not in response.headers
+    assert not response.headers['ETag'].endswith('-gzip"')
+
+
+@pytest.mark.parametrize('min_size', [64, 1 << 20])
+def test_echoed_etag_returns_304(app, player, monkeypatch, min_size):
+    monkeypatch.setitem(app.config, 'COMPRESS_MIN_SIZE', min_size)
+    first = player.get('/api/get_station_results', headers=GZIP)
+    etag = first.headers['ETag']
+
+    again = player.get('/api/get_station_results', headers={**GZIP, 'If-None-Match': etag})
+    assert again.status_code == 304 and again.get_data() == b''
+    assert again.headers['ETag'] == etag
+
+    # A forma sem compressão identifica o mesmo conteúdo
+    base = etag.strip('"').removesuffix('-gzip')
+    other = player.get('/api/get_station_results', headers={**GZIP, 'If-None-Match': f'"{base}"'})
+    assert other.status_code == 304
+    assert player.get('/api/get_station_results', headers={**GZIP, 'If-None-Match': '"outra"'}).status_code == 200
+
+
+@pytest.fixture
+def precomputed(app, monkeypatch):
+    """Registra um payload imutável em /api/test-payload (removido no fim do teste)."""
+    def register(body):
+        payload = Payload(body, 'application/json')
+        monkeypatch.setitem(app.extensions['http_cache'], '/api/test-payload', payload)
+        return payload
+    return register
+
+
+def test_precomputed_payload_negotiates_gzip_and_304(app, client, precomputed):
+    body = json.dumps({'items': ['x' * 40] * 50}).encode()
+    payload = precomputed(body)
+
+    response = client.get('/api/test-payload', headers=GZIP)
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert response.headers['ETag'] == f'"{payload.etag}-gzip"'
+    assert gzip.decompress(response.get_data()) == body
+
+    plain = client.get('/api/test-payload')
+    assert plain.get_data() == body and plain.headers['ETag'] == f'"{payload.etag}"'
+
+    for etag in (response.headers['ETag'], plain.headers['ETag']):
+        assert client.get('/api/test-payload', headers={**GZIP, 'If-None-Match': etag}).status_code == 304
+
+
+def test_precomputed_payload_prefers_brotli(app, client, precomputed, monkeypatch):
+    fake_brotli = SimpleNamespace(compress=lambda body, quality: b'br:' + gzip.compress(body))
+    # my_app.http_cache (o atributo do pacote) é a instância; o módulo vem de sys.modules
+    monkeypatch.setattr(sys.modules['my_app.http_cache'], 'brotli', fake_brotli)
+    body = json.dumps({'items': ['x' * 40] * 50}).encode()
+    payload = precomputed(body)
+    assert set(payload.bodies) == {'identity', 'gzip', 'br'}
+
+    response = client.get('/api/test-payload', headers={'Accept-Encoding': 'gzip, br'})
+    assert response.headers['Content-Encoding'] == 'br'
+    assert response.headers['ETag'] == f'"{payload.etag}-br"'
+    # Quem não aceita br continua recebendo gzip
+    assert client.get('/api/test-payload', headers=GZIP).headers['Content-Encoding'] == 'gzip'
+
+
+def test_precomputed_payload_skips_compression_that_does_not_shrink(app, client, precomputed):
+    payload = precomputed(b'{}')
+    assert set(payload.bodies) == {'identity'}
+    response = client.get('/api/test-payload', headers=GZIP)
+    assert 'Content-Encoding' not in response.headers and response.get_data() == b'{}'
+
+
+def test_register_json_uses_compact_encoding(app, monkeypatch):
+    monkeypatch.setattr(app, 'extensions', {**app.extensions, 'http_cache': {}})
+    payload = http_cache.register_json(app, '/x', {'nome': 'estação', 'n': [1, 2]})
+    assert payload.bodies['identity'] == '{"nome":"estação","n":[1,2]}'.encode()
@@ -0,0 +1,95 @@
+# test_jobs.py
+from datetime import datetime, timedelta
+
+import pytest
+
+from my_app.jobs import HANDLERS, JobType, claim, enqueue, requeue_stale, run
+from my_app.models import db, Job
+from my_app.worker import work
+from factories import make_user, make_progress, make_station_result
+
+
+@pytest.fixture
+def flaky(monkeypatch):
+    calls = []
+
+    def handler(user_id, fail_times=0):
+        calls.append(user_id)
+        if len(calls) <= fail_times:
+            raise RuntimeError("boom")
+    monkeypatch.setitem(HANDLERS, 'flaky', JobType('flaky', handler, concurrency=1, max_attempts=2))
+    return calls
+
+
+def test_report_job_round_trip(app, client, login):
+    with app.app_context():
+        user = make_user()
+        make_progress(user)
+        make_station_result(user, station_id=1, score=5)
+        db.session.commit()
+        login(client, user.id)
+
+    response = client.post('/api/jobs/report')
+    assert response.status_code == 202
+    job = response.get_json()['job']
+    assert job['status'] == 'queued'
+    # Clique repetido enquanto está na fila devolve o mesmo job
+    assert client.post('/api/jobs/report').get_json()['job']['id'] == job['id']
+    assert client.get(f"/api/jobs/{job['id']}/download").status_code == 409
+
+    assert work(app, burst=True) == 1
+
+    status = client.get(job['status_url']).get_json()['job']
+    assert status['status'] == 'done'
+    pdf = client.get(status['download_url'])
+    assert pdf.mimetype == 'application/pdf' and pdf.data.startswith(b'%PDF')
+
+
+def test_jobs_are_private(app, client, login):
+    with app.app_context():
+        owner, other = make_user(), make_user()
+        job_id = enqueue('report', user_id=owner.id).id
+        db.session.commit()
+        login(client, other.id)
+    assert client.get(f'/api/jobs/{job_id}').status_code == 404
+
+
+def test_concurrency_limit_per_type(app, database, monkeypatch):
+    monkeypatch.setitem(app.config['JOB_CONCURRENCY'], 'report', 2)
+    with app.app_context():
+        user = make_user()
+        for _ in range(3):
+            enqueue('report', user_id=user.id)
+        db.session.commit()
+
+        assert claim('w1') is not None
+        assert claim('w2') is not None
+        assert claim('w3') is None
+        assert Job.query.filter_by(status='running').count() == 2
+
+
+def test_failed_job_is_retried_then_marked_failed(app, database, flaky, monkeypatch):
+    monkeypatch.setitem(app.config, 'JOB_RETRY_BACKOFF', 0)
+    with app.app_context():
+        enqueue('flaky', payload={'fail_times': 5})
+        db.session.commit()
+
+        assert run(claim('w1')).status == 'queued'
+        failed = run(claim('w1'))
+        assert (failed.status, failed.attempts) == ('failed', 2)
+        assert 'boom' in failed.error
+        assert claim('w1') is None
+    assert len(flaky) == 2
+
+
+def test_stale_running_job_goes_back_to_queue(app, database, flaky):
+    with app.app_context():
+        job_id = enqueue('flaky').id
+        db.session.commit()
+        claimed = claim('dead-worker')
+        claimed.locked_at = datetime.utcnow() - timedelta(hours=1)
+        db.session.commit()
+
+        requeue_stale()
+        assert db.session.get(Job, job_id).status == 'queued'
+        assert run(claim('w2')).status == 'done'
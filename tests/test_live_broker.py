@@ -0,0 +1,114 @@
+# test_live_broker.py
+# Teste de carga do pub/sub do console ao vivo (centenas de ouvintes no broker em processo)
+# e limite de streams servidos ao mesmo tempo pelo endpoint SSE.
+import threading
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from my_app import instructor_api
+from my_app.live import ALL, ProgressBroker
+from my_app.models import db
+from factories import make_user
+
+LISTENERS = 300
+EVENTS = 50
+
+
+def _listen(broker, start_id, received, ready):
+    stream = broker.stream([ALL], last_event_id=start_id, heartbeat=0.05, max_seconds=10)
+    next(stream)  # "retry:"
+    ready.release()
+    count = 0
+    for chunk in stream:
+        count += chunk.count(b"event: station_result")
+        if count >= EVENTS:
+            break
+    received.append(count)
+
+
+def test_fan_out_reaches_every_listener():
+    broker = ProgressBroker(history=EVENTS * 2)
+    start_id = broker.last_id
+    received = []
+    ready = threading.Semaphore(0)
+    threads = [threading.Thread(target=_listen, args=(broker, start_id, received, ready)) for _ in range(LISTENERS)]
+    for t in threads:
+        t.start()
+    for _ in threads:
+        ready.acquire()
+
+    for i in range(EVENTS):
+        broker.publish(ALL, 'station_result', {"station_id": i % 15 + 1, "score": 1})
+    for t in threads:
+        t.join(timeout=20)
+
+    assert received == [EVENTS] * LISTENERS
+
+
+def test_reconnect_replays_missed_events_and_resets_when_too_old():
+    broker = ProgressBroker(history=5)
+    first = broker.publish(ALL, 'advance', {"n": 1})
+    for n in range(2, 5):
+        broker.publish(ALL, 'advance', {"n": n})
+
+    stream = broker.stream([ALL], last_event_id=first, heartbeat=0.01, max_seconds=1)
+    next(stream)
+    assert next(stream).count(b"event: advance") == 3
+
+    for n in range(5, 15):
+        broker.publish(ALL, 'advance', {"n": n})
+    stream = broker.stream([ALL], last_event_id=first, heartbeat=0.01, max_seconds=1)
+    next(stream)
+    assert b"event: reset" in next(stream)
+
+
+def test_topics_are_filtered():
+    broker = ProgressBroker()
+    start_id = broker.last_id
+    broker.publish('cohort:1', 'advance', {})
+    broker.publish(ALL, 'advance', {})
+    stream = broker.stream(['cohort:1'], last_event_id=start_id, heartbeat=0.01, max_seconds=1)
+    next(stream)
+    assert next(stream).count(b"event: advance") == 1
+
+
+def test_served_streams_are_capped_per_process(app, client, login, monkeypatch):
+    monkeypatch.setitem(app.config, 'INSTRUCTOR_EMAILS', {'prof@example.test'})
+    monkeypatch.setitem(app.extensions, 'sse_slots', threading.BoundedSemaphore(1))
+    with app.app_context():
+        login(client, make_user(email='prof@example.test').id)
+        db.session.commit()
+
+    first = client.get('/instructor/api/stream', buffered=False)
+    assert first.status_code == 200 and first.mimetype == 'text/event-stream'
+    busy = client.get('/instructor/api/stream', buffered=False)
+    assert busy.status_code == 503 and busy.headers['Retry-After'] == str(app.config['SSE_RETRY_SECONDS'])
+
+    # Fechar o stream (fim ou desconexão do cliente) devolve a vaga
+    first.close()
+    second = client.get('/instructor/api/stream', buffered=False)
+    assert second.status_code == 200
+    second.close()
+
+
+def test_failed_snapshot_gives_the_slot_back(app, client, login, monkeypatch):
+    monkeypatch.setitem(app.config, 'INSTRUCTOR_EMAILS', {'prof@example.test'})
+    monkeypatch.setitem(app.extensions, 'sse_slots', threading.BoundedSemaphore(1))
+    with app.app_context():
+        login(client, make_user(email='prof@example.test').id)
+        db.session.commit()
+
+    summary = instructor_api.progress_summary
+
+    def broken_summary(user_ids):
+        raise OperationalError("SELECT ...", {}, Exception("database is locked"))
+    monkeypatch.setattr(instructor_api, 'progress_summary', broken_summary)
+    for _ in range(2):
+        with pytest.raises(OperationalError):
+            client.get('/instructor/api/stream', buffered=False)
+
+    monkeypatch.setattr(instructor_api, 'progress_summary', summary)
+    response = client.get('/instructor/api/stream', buffered=False)
+    assert response.status_code == 200
+    response.close()
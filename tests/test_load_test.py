@@ -0,0 +1,15 @@
+# test_load_test.py
+# Fumaça do teste de carga: um jogador percorre a sessão inteira contra o servidor HTTP real.
+from my_app.load_test import run
+
+
+def test_full_session_runs_without_errors():
+    report = run(players=1)
+    rows = {row['endpoint']: row for row in report['endpoints']}
+
+    assert {row['endpoint']: row['errors'] for row in report['endpoints'] if row['errors']} == {}
+    assert rows['POST /api/game/challenge/complete']['requests'] == 15
+    for endpoint in ('POST /register', 'POST /login', 'GET /api/game/progress',
+                     'POST /api/save_evaluation', 'GET /api/generate_report'):
+        assert rows[endpoint]['requests'] == 1
+    assert rows['POST /api/station_result']['queries_per_request'] > 0
@@ -0,0 +1,113 @@
+# test_metrics.py
+import json
+import os
+import re
+
+import pytest
+
+from my_app.metrics import (IN_FLIGHT, PDF_RENDER, REQUEST_DURATION, Metrics, bucket_index, bucket_lower,
+                            metrics)
+from my_app.reports import ReportData, render
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+@pytest.fixture
+def scrape(app, client, monkeypatch):
+    """GET /metrics com o token configurado."""
+    monkeypatch.setitem(app.config, 'METRICS_TOKEN', 'secret')
+    return lambda: client.get('/metrics', headers={'Authorization': 'Bearer secret'}).get_data(as_text=True)
+
+
+def sample(text, name, **labels):
+    """Valor da série `name{labels}` no texto exposto (labels em qualquer ordem, só as pedidas)."""
+    for line in text.splitlines():
+        if not line.startswith(name + '{') and not line.startswith(name + ' '):
+            continue
+        found = dict(re.findall(r'(\w+)="([^"]*)"', line.split('}')[0]))
+        if all(found.get(k) == v for k, v in labels.items()):
+            return float(line.rsplit(' ', 1)[1])
+    return None
+
+
+def test_buckets_cover_values_with_bounded_error():
+    assert [bucket_index(v) for v in range(8)] == list(range(8))
+    for value in (8, 9, 15, 16, 17, 1000, 123_456, 10_000_000, 2**40 + 5):
+        index = bucket_index(value)
+        assert bucket_lower(index) <= value < bucket_lower(index + 1)
+        assert bucket_lower(index + 1) - bucket_lower(index) <= max(1, bucket_lower(index) / 8)
+
+
+def test_requests_are_timed_by_endpoint_and_status(app, client, scrape):
+    client.get('/terms')
+    client.get('/terms')
+    client.get('/does-not-exist')
+    text = scrape()
+
+    assert sample(text, f'{REQUEST_DURATION}_count', endpoint='terms', method='GET', status='200') == 2
+    assert sample(text, f'{REQUEST_DURATION}_bucket', endpoint='terms', le='+Inf') == 2
+    assert sample(text, f'{REQUEST_DURATION}_count', endpoint='unmatched', status='404') == 1
+    assert sample(text, f'{REQUEST_DURATION}_sum', endpoint='terms') > 0
+    assert sample(text, IN_FLIGHT, endpoint='terms') == 0
+    assert sample(text, IN_FLIGHT, endpoint='metrics') == 1  # a própria coleta
+    assert '# TYPE http_request_duration_seconds histogram' in text
+
+
+def test_cumulative_buckets_follow_configured_bounds(app):
+    for seconds in (0.001, 0.02, 0.02, 0.3, 20):
+        metrics.observe(REQUEST_DURATION, ('terms', 'GET', '200'), seconds)
+    with app.app_context():
+        text = metrics.render(buckets=(0.01, 0.1, 1.0))
+    assert [sample(text, f'{REQUEST_DURATION}_bucket', le=le) for le in ('0.01', '0.1', '1', '+Inf')] == [1, 3, 4, 5]
+
+
+def test_metrics_token(app, client, monkeypatch):
+    # Sem token /metrics não é exposto, nem com DEBUG (wsgi.py sobe em development)
+    assert client.get('/metrics').status_code == 404
+    monkeypatch.setattr(app, 'debug', True)
+    assert client.get('/metrics').status_code == 404
+    monkeypatch.setitem(app.config, 'METRICS_PUBLIC', True)
+    assert client.get('/metrics').status_code == 200
+    monkeypatch.setitem(app.config, 'METRICS_PUBLIC', False)
+
+    monkeypatch.setitem(app.config, 'METRICS_TOKEN', 'secret')
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer secret'}).status_code == 200
+
+
+def test_processes_are_merged_from_the_directory(app, tmp_path):
+    metrics.observe(REQUEST_DURATION, ('terms', 'GET', '200'), 0.02)
+    metrics.gauge_add(IN_FLIGHT, ('terms',), 1)
+    # Retratos de outros dois workers: um vivo (este pid de teste, pai) e um que já saiu
+    other = {'histograms': [[REQUEST_DURATION, ['terms', 'GET', '200'], {str(bucket_index(20_000)): 3}, 0.06, 3]],
+             'counters': [['app_errors_total', ['track_access'], 2]],
+             'gauges': [[IN_FLIGHT, ['terms'], 4]]}
+    for pid in (os.getppid(), 2**22 + 1):
+        (tmp_path / f'{pid}.json').write_text(json.dumps(other))
+
+    collector = Metrics()
+    collector._shards = metrics._shards
+    collector.directory = str(tmp_path)
+    with app.app_context():
+        text = collector.render()
+    assert sample(text, f'{REQUEST_DURATION}_count', endpoint='terms') == 7
+    assert sample(text, f'{REQUEST_DURATION}_bucket', endpoint='terms', le='0.025') == 7
+    assert sample(text, 'app_errors_total', source='track_access') == 4  # contadores de quem saiu continuam
+    assert sample(text, IN_FLIGHT, endpoint='terms') == 5  # gauge só de processos vivos
+
+    collector.flush()
+    written = json.loads((tmp_path / f'{os.getpid()}.json').read_text())
+    assert written['histograms'][0][4] == 1
+
+
+def test_pdf_render_is_timed(app):
+    render(ReportData(username='ana', language='en', results=[], evaluation=None))
+    with app.app_context():
+        text = metrics.render()
+    assert sample(text, f'{PDF_RENDER}_count', language='en') == 1
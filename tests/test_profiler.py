@@ -0,0 +1,84 @@
+# test_profiler.py
+import os
+import threading
+import time
+
+import pytest
+
+from my_app.models import db, User
+from my_app.profiler import Sampler, aggregate, make_token, read_folded, set_toggle
+from factories import make_user
+
+
+@pytest.fixture
+def profile_dir(app, tmp_path, monkeypatch):
+    monkeypatch.setitem(app.config, 'PROFILE_DIR', str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def user_id(app, database):
+    with app.app_context():
+        user = make_user()
+        db.session.commit()
+        return user.id
+
+
+def busy_until(deadline):
+    while time.monotonic() < deadline:
+        pass
+
+
+def test_sampler_records_the_target_thread_stack():
+    sampler = Sampler()
+    sampler.interval = 0.001
+    worker = threading.Thread(target=busy_until, args=(time.monotonic() + 0.2,))
+    worker.start()
+    profile = sampler.start(worker.ident, max_seconds=5, limit=1)
+    assert sampler.start(threading.get_ident(), max_seconds=5, limit=1) is None  # limite por processo
+    worker.join()
+    sampler.stop(profile)
+
+    assert profile.samples > 10
+    stack = profile.stacks.most_common(1)[0][0]
+    assert stack.split(';')[-1].startswith('busy_until (tests/test_profiler.py:')
+
+
+def test_signed_header_profiles_only_its_user(app, client, login, profile_dir, user_id):
+    token = make_token(app.secret_key, user_id, minutes=5)
+    header = {app.config['PROFILE_HEADER']: token}
+
+    assert 'X-Profile-Id' not in client.get('/api/generate_report', headers=header).headers  # sem login
+    login(client, user_id)
+    response = client.get('/api/generate_report', headers=header)
+    assert response.status_code == 200
+    path = profile_dir / 'generate_report' / (response.headers['X-Profile-Id'] + '.folded')
+    assert any('generate_report' in stack for stack in read_folded(path))
+
+    other = make_token(app.secret_key, user_id + 1, minutes=5)
+    assert 'X-Profile-Id' not in client.get('/api/generate_report', headers={app.config['PROFILE_HEADER']: other}).headers
+    forged = token[:-2] + ('AA' if not token.endswith('AA') else 'BB')
+    assert 'X-Profile-Id' not in client.get('/api/generate_report', headers={app.config['PROFILE_HEADER']: forged}).headers
+
+
+def test_instructor_toggle_and_aggregate(app, client, login, profile_dir, user_id, monkeypatch):
+    with app.app_context():
+        email = db.session.get(User, user_id).email
+    monkeypatch.setitem(app.config, 'INSTRUCTOR_EMAILS', {email})
+    login(client, user_id)
+    response = client.post('/instructor/api/profiling', json={'endpoint': 'generate_report', 'minutes': 5})
+    assert response.get_json()['enabled'].keys() == {'generate_report'}
+    assert client.post('/instructor/api/profiling', json={'endpoint': 'nope'}).status_code == 400
+
+    for _ in range(2):
+        assert 'X-Profile-Id' in client.get('/api/generate_report').headers
+    assert 'X-Profile-Id' not in client.get('/terms').headers
+
+    report = aggregate(str(profile_dir))
+    assert list(report) == ['generate_report']
+    assert report['generate_report']['requests'] == 2
+    assert report['generate_report']['samples'] == sum(report['generate_report']['stacks'].values())
+
+    set_toggle(str(profile_dir), 'generate_report', 0)
+    assert 'X-Profile-Id' not in client.get('/api/generate_report').headers
+    assert len(os.listdir(profile_dir / 'generate_report')) == 2
@@ -0,0 +1,87 @@
+# test_puzzle_tiles.py
+import hashlib
+
+import pytest
+from PIL import Image
+
+from my_app.catalog import catalog
+from my_app.models import db
+from my_app.puzzle_tiles import TileError, TileStore, attach_tiles
+from factories import make_progress, make_user
+
+STATION = 6  # quebra-cabeça; exige chave_estacao_5
+
+
+@pytest.fixture
+def store(tmp_path):
+    static = tmp_path / 'static'
+    static.mkdir()
+    image = Image.new('RGB', (600, 300))
+    for i in range(9):
+        r, c = divmod(i, 3)
+        image.paste((i * 25, 255 - i * 25, 90), (c * 200, r * 100, (c + 1) * 200, (r + 1) * 100))
+    image.save(static / 'puzzle.png')
+    return TileStore(str(tmp_path / 'tiles'), widths=(64, 128, 480), static_dir=str(static))
+
+
+def test_tiles_are_content_addressed_and_built_once(store, monkeypatch):
+    manifest = store.manifest('puzzle.png', 9)
+    assert (manifest['rows'], manifest['columns']) == (3, 3)
+    assert manifest['resolutions'] == [[64, 32], [128, 64], [200, 100]]  # sem ampliar a peça original
+    for piece in manifest['pieces']:
+        for name, (width, height) in zip(piece['files'], manifest['resolutions']):
+            with open(f"{store.directory}/{name}", 'rb') as f:
+                data = f.read()
+            assert name == hashlib.sha256(data).hexdigest()[:24] + '.webp'
+            with Image.open(f"{store.directory}/{name}") as tile:
+                assert tile.size == (width, height)
+    assert len({piece['id'] for piece in manifest['pieces']}) == 9
+
+    monkeypatch.setattr(TileStore, '_build', lambda *args: pytest.fail("rebuilt a cached manifest"))
+    assert store.manifest('puzzle.png', 9) == manifest
+
+    with pytest.raises(TileError):
+        store.manifest('puzzle.png', 8)
+    with pytest.raises(TileError):
+        store.manifest('missing.png', 9)
+
+
+def test_catalog_ships_shuffled_tiles_without_the_answer(store):
+    challenges = attach_tiles({1: {'id': 1, 'type': 'puzzle', 'puzzleData': {'image': 'puzzle.png', 'pieces': 9}}},
+                              store)
+    data = challenges[1]['puzzleData']
+    assert [piece['id'] for piece in data['tiles']['pieces']] != data['correctOrder']
+    assert sorted(piece['id'] for piece in data['tiles']['pieces']) == sorted(data['correctOrder'])
+
+    public = catalog.bundles['en'][STATION]['puzzleData']
+    assert 'correctOrder' not in public and len(public['tiles']['pieces']) == 9
+
+
+def test_uniform_image_does_not_hang_the_shuffle(store):
+    Image.new('RGB', (300, 300), (40, 40, 40)).save(f"{store.static_dir}/blank.png")
+    challenges = attach_tiles({1: {'id': 1, 'type': 'puzzle', 'puzzleData': {'image': 'blank.png', 'pieces': 4}}},
+                              store)
+    data = challenges[1]['puzzleData']
+    assert len(set(data['correctOrder'])) == 1 and len(data['tiles']['pieces']) == 4
+
+
+def test_tiles_are_served_immutable_and_order_is_checked(app, client, login):
+    with app.app_context():
+        user = make_user()
+        make_progress(user, keys=['chave_estacao_5'])
+        db.session.commit()
+        user_id = user.id
+    login(client, user_id)
+    tiles = client.get(f'/api/challenge/{STATION}').get_json()['puzzleData']['tiles']
+
+    response = client.get(tiles['url'] + tiles['pieces'][0]['files'][0])
+    assert response.status_code == 200 and response.mimetype == 'image/webp'
+    assert 'immutable' in response.headers['Cache-Control']
+    assert client.get(tiles['url'] + 'nope.webp').status_code == 404
+
+    shuffled = [piece['id'] for piece in tiles['pieces']]
+    solved = catalog.get(STATION)['puzzleData']['correctOrder']
+    result = client.post(f'/api/game/challenge/{STATION}/answers', json={'answers': {'order': solved}}).get_json()
+    assert (result['correct_answers'], result['total_questions'], result['passed']) == (9, 9, True)
+    result = client.post(f'/api/game/challenge/{STATION}/answers', json={'answers': {'order': shuffled}}).get_json()
+    assert result['correct_answers'] < 9
@@ -0,0 +1,113 @@
+# test_rate_limit.py
+import pytest
+from flask import request
+
+from my_app import create_app
+from my_app.models import db
+from my_app.rate_limit import MemoryStore, Policy, SqliteStore, rate_limiter
+from factories import make_user
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def limited(app, database, monkeypatch):
+    """Liga o limitador no app da suíte com o estado zerado; devolve set_policy(endpoint, n)."""
+    monkeypatch.setitem(app.config, 'RATE_LIMIT_ENABLED', True)
+    rate_limiter.reset(app)
+    policies = app.extensions['rate_limiter']['policies']
+
+    def set_policy(endpoint, limit, period=60):
+        monkeypatch.setitem(policies, endpoint, Policy(endpoint, limit, period))
+    yield set_policy
+    rate_limiter.reset(app)
+
+
+def test_bucket_allows_burst_then_refills():
+    clock = FakeClock()
+    store = MemoryStore(clock=clock)
+    rate, capacity = 1 / 6, 3  # 10 por minuto, rajada de 3
+    assert [store.consume('k', rate, capacity) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert store.consume('k', rate, capacity) == pytest.approx(6.0)
+    clock.now += 6
+    assert store.consume('k', rate, capacity) == 0.0
+    assert store.consume('other', rate, capacity) == 0.0
+
+
+def test_sqlite_store_is_shared_between_workers(tmp_path):
+    path = str(tmp_path / 'ratelimit.db')
+    first, second = SqliteStore(path), SqliteStore(path)
+    assert first.consume('k', 0.01, 2) == 0.0
+    assert second.consume('k', 0.01, 2) == 0.0
+    assert first.consume('k', 0.01, 2) > 0
+
+
+def test_over_limit_returns_429_with_retry_after(app, client, login, limited):
+    limited('get_station_results', 2)
+    with app.app_context():
+        user, other = make_user(), make_user()
+        db.session.commit()
+        user_id, other_id = user.id, other.id
+    login(client, user_id)
+
+    assert [client.get('/api/get_station_results').status_code for _ in range(2)] == [200, 200]
+    response = client.get('/api/get_station_results')
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) == 30
+    assert response.get_json()['success'] is False
+
+    # Outro usuário tem o próprio balde
+    login(client, other_id)
+    assert client.get('/api/get_station_results').status_code == 200
+
+
+def test_login_counts_per_ip(app, limited):
+    limited('login', 1)
+    assert app.test_client().get('/login').status_code == 200
+    # Sessão nova, mesmo IP
+    assert app.test_client().get('/login').status_code == 429
+
+
+def test_inflight_limit_rejects_with_503(app, client, login, limited):
+    with app.app_context():
+        user = make_user()
+        db.session.commit()
+        login(client, user.id)
+    slot = app.extensions['rate_limiter']['inflight']['generate_report']
+    taken = 0
+    while slot.acquire(blocking=False):
+        taken += 1
+    try:
+        response = client.get('/api/generate_report')
+        assert response.status_code == 503 and response.headers['Retry-After'] == '1'
+    finally:
+        for _ in range(taken):
+            slot.release()
+    assert client.get('/api/generate_report').status_code == 200
+
+
+def test_ip_limits_use_forwarded_address_behind_proxy(app, database):
+    # Mesmo banco da suíte; só o app muda (ProxyFix é aplicado no create_app)
+    proxied = create_app('testing', SQLALCHEMY_ENGINE_OPTIONS=app.config['SQLALCHEMY_ENGINE_OPTIONS'],
+                         PROXY_FIX_X_FOR=1, RATE_LIMIT_ENABLED=True,
+                         RATE_LIMITS={'default': (300, 60), 'login': (1, 60)})
+
+    def login_page(client_ip):
+        return proxied.test_client().get('/login', headers={'X-Forwarded-For': client_ip},
+                                         environ_base={'REMOTE_ADDR': '10.0.0.1'})
+
+    # Todos chegam pelo mesmo proxy (10.0.0.1), mas cada aluno tem o seu balde
+    assert login_page('203.0.113.5').status_code == 200
+    assert login_page('203.0.113.6').status_code == 200
+    assert login_page('203.0.113.5').status_code == 429
+
+    # Sem ProxyFix o cabeçalho é ignorado: o endereço é o do proxy para todos
+    with app.test_request_context('/', headers={'X-Forwarded-For': '203.0.113.5'},
+                                  environ_base={'REMOTE_ADDR': '10.0.0.1'}):
+        assert request.remote_addr == '10.0.0.1'
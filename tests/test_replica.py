@@ -0,0 +1,99 @@
+# test_replica.py
+# Primário e réplica são dois arquivos SQLite; "replicar" é copiar o primário com backup().
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from my_app import create_app
+from my_app.models import db, StationResult
+from my_app.replica import heartbeat, read_replica
+from factories import make_user
+
+
+@pytest.fixture
+def replicated(tmp_path):
+    primary, replica = tmp_path / 'primary.db', tmp_path / 'replica.db'
+    app = create_app('testing', SQLALCHEMY_DATABASE_URI=f'sqlite:///{primary}',
+                     SQLALCHEMY_BINDS={'replica': f'sqlite:///{replica}'}, INIT_MIGRATIONS=False,
+                     REPLICA_HEARTBEAT_SECONDS=0, REPLICA_LAG_CHECK_SECONDS=0, REPLICA_MAX_LAG_SECONDS=10)
+
+    def replicate():
+        with app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+            db.engines['replica'].dispose()
+        source, target = sqlite3.connect(primary), sqlite3.connect(replica)
+        source.backup(target)
+        source.close()
+        target.close()
+
+    with app.app_context():
+        db.create_all(bind_key=None)
+        heartbeat()
+        user = make_user()
+        db.session.commit()
+        user_id = user.id
+    replicate()
+    yield app, user_id, replicate
+    with app.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+def scores(client):
+    return {k: v['score'] for k, v in client.get('/api/get_station_results').get_json()['stations'].items()}
+
+
+def add_result(app, user_id, score):
+    with app.app_context():
+        db.session.add(StationResult(user_id=user_id, station_id='station1', score=score, time_spent=30))
+        db.session.commit()
+
+
+def test_heavy_reads_go_to_the_replica(replicated, login):
+    app, user_id, _ = replicated
+    add_result(app, user_id, 7)
+    with app.app_context():
+        assert StationResult.query.count() == 1
+        with read_replica() as used:
+            assert used and StationResult.query.count() == 0
+        # Escritas dentro do bloco continuam no primário
+        with read_replica():
+            db.session.add(StationResult(user_id=user_id, station_id='station2', score=1, time_spent=1))
+            db.session.commit()
+        assert StationResult.query.count() == 2
+
+    # Ainda não replicado: a view lê da réplica e não vê os resultados
+    assert scores(login(app.test_client(), user_id)) == {}
+
+
+def test_lagging_replica_falls_back_to_primary(replicated, login):
+    app, user_id, _ = replicated
+    add_result(app, user_id, 7)
+    with app.app_context():
+        heartbeat(datetime.utcnow() + timedelta(seconds=30))
+        with read_replica() as used:
+            assert not used
+
+    assert scores(login(app.test_client(), user_id)) == {'station1': 7}
+
+
+def test_user_reads_their_own_write(replicated, login):
+    app, user_id, replicate = replicated
+    client = login(app.test_client(), user_id)
+    assert client.post('/api/station_result',
+                       json={'station_id': 'station1', 'score': 5, 'time_spent': 30}).status_code == 200
+    # A réplica ainda não tem a escrita: a leitura seguinte vai ao primário
+    assert scores(client) == {'station1': 5}
+    assert scores(login(app.test_client(), user_id)) == {}  # outra sessão, sem escrita recente
+
+    # Heartbeat posterior à escrita já replicado: volta a ler da réplica
+    with app.app_context():
+        heartbeat()
+    replicate()
+    with app.app_context():
+        db.session.execute(db.delete(StationResult))
+        db.session.commit()
+    assert scores(client) == {'station1': 5}
@@ -0,0 +1,45 @@
+# test_reports.py
+from my_app.models import db
+from my_app.reports import ReportData, _layout, layout_for, render
+from factories import make_evaluation, make_progress, make_station_result, make_user
+
+
+def test_long_feedback_paginates():
+    feedback = "Texto longo de avaliação com <marcação> & acentuação. " * 600
+    data = ReportData('Ana', [(sid, 5, 90) for sid in range(1, 16)],
+                      {'participant_type': 'estudante', 'participation_type': 'sozinho', 'team': [],
+                       'q1': 5, 'q2': 4, 'q3': 5, 'q4': 4, 'q5': feedback, 'q6': feedback})
+    sink = render(data, 'pt')
+    assert sink.getvalue().startswith(b'%PDF') and sink.pages > 3
+
+
+def test_sink_chunks_cover_document():
+    sink = render(ReportData('Ana', [(1, 5, 30)]), 'en')
+    chunks = list(sink.chunks(1024))
+    assert max(len(c) for c in chunks) == 1024
+    assert b''.join(chunks) == sink.getvalue() and sink.size == len(sink.getvalue())
+
+
+def test_layout_cached_per_language():
+    assert layout_for('es') is layout_for('es')
+    assert layout_for('xx') is not layout_for('en')
+    assert layout_for('xx').lang == 'pt'
+    for n in range(200):
+        layout_for(f'bogus-{n}')
+    assert _layout.cache_info().currsize <= 3
+
+
+def test_generate_report_streams_pdf(app, client, login):
+    with app.app_context():
+        user = make_user()
+        make_progress(user)
+        make_station_result(user, station_id=1, score=5)
+        make_evaluation(user, team=('Bia', 'Caio'))
+        db.session.commit()
+        login(client, user.id)
+
+    response = client.get('/api/generate_report?lang=es')
+    assert response.status_code == 200 and response.is_streamed
+    assert response.mimetype == 'application/pdf'
+    assert response.data.startswith(b'%PDF')
+    assert int(response.headers['Content-Length']) == len(response.data)
@@ -0,0 +1,135 @@
+# test_roster.py
+import io
+import zipfile
+
+from werkzeug.security import check_password_hash
+
+from my_app.cohorts import create_cohort
+from my_app.models import db, CohortMembership, User, UserProgress
+from my_app.roster import hash_passwords, read_xlsx
+from factories import make_user
+
+ROSTER = """Usuário;E-mail;Senha;Idioma
+ana;Ana@Escola.test;segredo-1;pt
+bruno;bruno@escola.test;;en
+carla;nao-e-email;;pt
+ana;outra@escola.test;;pt
+diego;existente@escola.test;;pt
+;;;
+elisa;elisa@escola.test;;fr
+"""
+
+
+def _cohort(app, monkeypatch, instructor=True):
+    with app.app_context():
+        owner = make_user()
+        make_user(email='Existente@Escola.test')
+        cohort = create_cohort(owner, 'Turma A')
+        db.session.commit()
+        if instructor:
+            monkeypatch.setitem(app.config, 'INSTRUCTOR_EMAILS', {owner.email.lower()})
+        return owner.id, cohort.id
+
+
+def _upload(client, cohort_id, body, name='alunos.csv', **form):
+    return client.post(f'/api/cohorts/{cohort_id}/roster', content_type='multipart/form-data',
+                       data={'file': (io.BytesIO(body.encode()), name), **form})
+
+
+def test_csv_import_reports_errors_per_row(app, client, login, monkeypatch):
+    owner_id, cohort_id = _cohort(app, monkeypatch)
+    login(client, owner_id)
+
+    dry = _upload(client, cohort_id, ROSTER, dry_run='1').get_json()
+    assert (dry['created'], dry['valid']) == (0, 2)
+
+    response = _upload(client, cohort_id, ROSTER)
+    assert response.status_code == 201
+    result = response.get_json()
+    assert result['created'] == 2
+    assert [(e['row'], e['field']) for e in result['errors']] == [
+        (4, 'email'), (5, 'username'), (6, 'email'), (8, 'language')]
+    assert result['errors'][2]['error'] == 'already registered'
+    ana, bruno = result['users']
+    assert (ana['row'], ana['email']) == (2, 'ana@escola.test') and 'password' not in ana
+    assert len(bruno['password']) == 12  # provisória, devolvida uma única vez
+
+    with app.app_context():
+        users = {u.username: u for u in User.query.filter(User.id.in_([ana['id'], bruno['id']]))}
+        assert users['ana'].check_password('segredo-1') and users['ana'].language == 'pt'
+        assert users['bruno'].check_password(bruno['password'])
+        assert (users['bruno'].profession, users['bruno'].country, users['bruno'].language) == ('Student', 'Other', 'en')
+        assert UserProgress.query.filter(UserProgress.user_id.in_([ana['id'], bruno['id']])).count() == 2
+        assert CohortMembership.query.filter_by(cohort_id=cohort_id, role='student').count() == 2
+
+    again = _upload(client, cohort_id, ROSTER).get_json()
+    assert again['created'] == 0
+    assert {e['row'] for e in again['errors'] if e['error'] == 'already registered'} == {2, 3, 6}
+
+
+def test_only_instructors_managing_the_cohort_can_import(app, client, login, monkeypatch):
+    owner_id, cohort_id = _cohort(app, monkeypatch)
+    with app.app_context():
+        outsider = make_user()
+        db.session.commit()
+        outsider_id, outsider_email = outsider.id, outsider.email.lower()
+    login(client, outsider_id)
+    assert _upload(client, cohort_id, ROSTER).status_code == 403
+    assert _upload(client, 10**6, ROSTER).status_code == 403
+
+    # Dono da turma, mas jogador comum: turmas qualquer um cria, contas em massa não
+    monkeypatch.setitem(app.config, 'INSTRUCTOR_EMAILS', {outsider_email})
+    login(client, owner_id)
+    assert _upload(client, cohort_id, ROSTER).status_code == 403
+    login(client, outsider_id)
+    assert _upload(client, 10**6, ROSTER).status_code == 404
+    with app.app_context():
+        assert User.query.count() == 3
+
+
+def test_bad_files_are_rejected(app, client, login, monkeypatch):
+    owner_id, cohort_id = _cohort(app, monkeypatch)
+    login(client, owner_id)
+    assert _upload(client, cohort_id, 'nome,telefone\nana,123\n').get_json()['error'] == 'Missing column(s): username, email'
+    assert _upload(client, cohort_id, ROSTER, name='alunos.pdf').status_code == 415
+    assert _upload(client, cohort_id, 'not a zip', name='alunos.xlsx').status_code == 400
+
+
+def test_xlsx_reader():
+    sheet = ('<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+             '<row r="1"><c r="A1" t="s"><v>0</v></c><c r="B1" t="s"><v>1</v></c></row>'
+             '<row r="3"><c r="A3" t="inlineStr"><is><t>ana</t></is></c><c r="C3"><v>42.0</v></c></row>'
+             '</sheetData></worksheet>')
+    files = {
+        'xl/workbook.xml': '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+                           'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+                           '<sheets><sheet name="Alunos" sheetId="1" r:id="rId1"/></sheets></workbook>',
+        'xl/_rels/workbook.xml.rels': '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+                                      '<Relationship Id="rId1" Target="worksheets/sheet1.xml"/></Relationships>',
+        'xl/sharedStrings.xml': '<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                                '<si><t>username</t></si><si><r><t>e-</t></r><r><t>mail</t></r></si></sst>',
+        'xl/worksheets/sheet1.xml': sheet,
+    }
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        for name, content in files.items():
+            archive.writestr(name, content)
+    assert read_xlsx(buffer.getvalue()) == [['username', 'e-mail'], [], ['ana', '', '42']]
+
+
+def test_passwords_are_hashed_in_a_process_pool():
+    hashes = hash_passwords(['um-segredo', 'outro-segredo'], workers=2, pool_min=1)
+    assert check_password_hash(hashes[0], 'um-segredo') and check_password_hash(hashes[1], 'outro-segredo')
+
+
+def test_one_import_at_a_time_per_process(app, client, login, monkeypatch):
+    owner_id, cohort_id = _cohort(app, monkeypatch)
+    login(client, owner_id)
+    monkeypatch.setitem(app.config, 'RATE_LIMIT_ENABLED', True)
+    slot = app.extensions['rate_limiter']['inflight']['cohort_api.import_roster']
+    assert slot.acquire(blocking=False)
+    try:
+        assert _upload(client, cohort_id, ROSTER, dry_run='1').status_code == 503
+    finally:
+        slot.release()
+    assert _upload(client, cohort_id, ROSTER, dry_run='1').status_code == 200
@@ -0,0 +1,46 @@
+# test_startup.py
+# Orçamento de importação (medido com -X importtime) e aquecimento opcional.
+import os
+import subprocess
+import sys
+
+from my_app.startup import warmup
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_BUDGET_MS = int(os.environ.get('IMPORT_TIME_BUDGET_MS', '1500'))
+LAZY_MODULES = ('alembic', 'flask_migrate', 'reportlab', 'numpy', 'pandas', 'PIL', 'pyarrow')
+
+
+def _import_times(module):
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_import_stays_within_budget():
+    times = _import_times('my_app')
+    assert times['my_app'] / 1000 <= IMPORT_BUDGET_MS
+    assert not [name for name in times if name.split('.')[0] in LAZY_MODULES]
+
+
+def test_prebuilt_tiles_keep_pillow_out_of_catalog_load(tmp_path):
+    tiles = str(tmp_path / 'tiles')
+    subprocess.run([sys.executable, '-m', 'my_app.puzzle_tiles', '--dir', tiles],
+                   cwd=ROOT, capture_output=True, check=True)
+    # Como no deploy: peças do build, só os manifestos são lidos
+    check = ("import sys; from my_app.catalog import Catalog; "
+             f"Catalog.from_files(tiles_dir={tiles!r}); assert 'PIL' not in sys.modules")
+    subprocess.run([sys.executable, '-c', check], cwd=ROOT, capture_output=True, check=True)
+
+
+def test_warmup_primes_translations_and_templates(app, database):
+    warmup(app)
+    assert app.extensions['translations']._data.keys() >= {'pt', 'en', 'es'}
+    assert any(name == 'index.html' for _, name in app.jinja_env.cache)
@@ -0,0 +1,68 @@
+# test_synthetic_data.py
+# Carga sintética em pequena escala no banco migrado: contagens e integridade referencial.
+from sqlalchemy import text
+
+from my_app.models import db
+from my_app.synthetic_data import STATION_IDS, SyntheticDataset, generate
+
+USERS = 60
+PAGE_VIEWS = 3000
+
+# (tabela, coluna, tabela referenciada): nenhuma linha pode apontar para fora
+REFERENCES = [
+    ('user_progress', 'user_id', 'users'),
+    ('station_results', 'user_id', 'users'),
+    ('challenge_attempts', 'user_id', 'users'),
+    ('evaluations', 'user_id', 'users'),
+    ('page_views', 'user_id', 'users'),
+    ('page_views', 'url_id', 'page_urls'),
+    ('page_views', 'endpoint_id', 'page_endpoints'),
+    ('page_views', 'user_agent_id', 'user_agents'),
+]
+
+
+def _count(sql):
+    return db.session.execute(text(sql)).scalar()
+
+
+def test_generate_loads_consistent_rows(app, database):
+    with app.app_context():
+        stats = generate(db.engine, users=USERS, page_views=PAGE_VIEWS, seed=7, batch_size=500)
+        dataset = SyntheticDataset(7, USERS, PAGE_VIEWS)
+        completed = int(dataset.completed.sum())
+
+        assert _count("SELECT COUNT(*) FROM users") == stats['users']['rows'] == USERS
+        assert _count("SELECT COUNT(*) FROM user_progress") == USERS
+        assert _count("SELECT COUNT(*) FROM station_results") == completed
+        # Uma tentativa concluída por estação + a que ficou aberta de quem não terminou
+        unfinished = int((dataset.completed < len(STATION_IDS)).sum())
+        assert _count("SELECT COUNT(*) FROM challenge_attempts") == completed + unfinished
+        assert _count("SELECT COUNT(*) FROM page_views") == PAGE_VIEWS
+        finishers = int((dataset.completed == len(STATION_IDS)).sum())
+        assert 0 <= _count("SELECT COUNT(*) FROM evaluations") <= finishers
+
+        for table, column, target in REFERENCES:
+            orphans = _count(f"SELECT COUNT(*) FROM {table} WHERE {column} IS NOT NULL "
+                             f"AND {column} NOT IN (SELECT id FROM {target})")
+            assert orphans == 0, f"{table}.{column}"
+
+        # Progresso coerente com os resultados: próxima estação e pontuação total
+        mismatched = _count(
+            "SELECT COUNT(*) FROM user_progress p WHERE p.current_challenge_id != "
+            "1 + (SELECT COUNT(*) FROM station_results r WHERE r.user_id = p.user_id) "
+            "OR p.total_score != (SELECT COALESCE(SUM(score), 0) FROM station_results r WHERE r.user_id = p.user_id)")
+        assert mismatched == 0
+        assert _count("SELECT COUNT(*) FROM evaluations e JOIN user_progress p ON p.user_id = e.user_id "
+                      f"WHERE p.current_challenge_id != {len(STATION_IDS) + 1}") == 0
+
+
+def test_second_load_continues_ids_and_is_deterministic(app, database):
+    with app.app_context():
+        generate(db.engine, users=10, page_views=100, seed=1, batch_size=50)
+        generate(db.engine, users=10, page_views=100, seed=2, batch_size=50)
+        assert _count("SELECT COUNT(DISTINCT id) FROM users") == 20
+        assert _count("SELECT COUNT(DISTINCT visitor_id) FROM users") == 20
+
+    first, again = SyntheticDataset(3, 20, 0), SyntheticDataset(3, 20, 0)
+    assert list(first.user_rows('hash', False)) == list(again.user_rows('hash', False))
+    assert list(first.evaluation_rows()) == list(again.evaluation_rows())
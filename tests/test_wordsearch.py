@@ -0,0 +1,73 @@
+# test_wordsearch.py
+from my_app import catalog
+from my_app.models import db
+from my_app.wordsearch import DIRECTIONS, _occurrences, build_grid, grid_for, normalize_word
+from factories import make_progress, make_user
+
+WORDS = ('TAQUICARDIA', 'HIPOTERMIA', 'LETARGIA', 'GEMENCIA', 'FEBRE')
+STATION = 9  # caça-palavras; exige chave_estacao_8
+
+
+def _player(app, keys=('chave_estacao_8',)):
+    with app.app_context():
+        user = make_user()
+        make_progress(user, keys=keys)
+        db.session.commit()
+        return user.id
+
+
+def _cells(grid, word):
+    r, c, dr, dc = grid.placements[word]
+    return [[r + i * dr, c + i * dc] for i in range(len(word))]
+
+
+def test_grid_is_deterministic_and_every_word_appears_once():
+    directions = set()
+    for seed in range(50):
+        grid = build_grid.__wrapped__(WORDS, 14, seed)
+        assert grid.rows == build_grid.__wrapped__(WORDS, 14, seed).rows
+        assert len(grid.rows) == 14 and all(len(row) == 14 for row in grid.rows)
+        cells = ''.join(grid.rows)
+        for word in WORDS:
+            assert ''.join(grid.rows[r][c] for r, c in _cells(grid, word)) == word
+            assert _occurrences(cells, 14, word) == 1
+        directions.update(placement[2:] for placement in grid.placements.values())
+    assert directions == set(DIRECTIONS)
+    assert build_grid(WORDS, 14, 1) is build_grid(WORDS, 14, 1)  # LRU
+
+
+def test_check_accepts_only_the_placed_path():
+    grid = build_grid(WORDS, 14, 3)
+    path = _cells(grid, 'LETARGIA')
+    assert grid.check(path) == 'LETARGIA'
+    assert grid.check(path[::-1]) == 'LETARGIA'
+    assert grid.check(path[:-1]) is None
+    assert grid.check([path[0], path[2], path[1]] + path[3:]) is None
+    assert normalize_word('Gemência') == 'GEMENCIA'
+
+
+def test_grid_endpoint_and_claim(app, client, login):
+    user_id = _player(app)
+    login(client, user_id)
+    client.post('/api/game/challenge/start', json={'challenge_id': STATION})
+
+    data = client.get(f'/api/game/challenge/{STATION}/wordsearch').get_json()
+    assert data['success'] and data['size'] == 14 and data['seed'] > 0  # semente = tentativa aberta
+    assert client.get(f'/api/game/challenge/{STATION}/wordsearch').get_json()['grid'] == data['grid']
+
+    with app.app_context():
+        grid = grid_for(catalog.localized_challenge(STATION, None), user_id, data['seed'])
+    assert list(grid.rows) == data['grid']
+    claim = client.post(f'/api/game/challenge/{STATION}/wordsearch/claim',
+                        json={'seed': data['seed'], 'cells': _cells(grid, 'FEBRE')[::-1]}).get_json()
+    assert claim == {'success': True, 'valid': True, 'word': 'FEBRE'}
+    wrong = client.post(f'/api/game/challenge/{STATION}/wordsearch/claim',
+                        json={'seed': data['seed'], 'cells': [[0, 0], [0, 1]]}).get_json()
+    assert wrong['valid'] is False
+    assert client.post(f'/api/game/challenge/{STATION}/wordsearch/claim', json={'cells': 'x'}).status_code == 400
+
+
+def test_locked_or_wrong_station(app, client, login):
+    login(client, _player(app, keys=()))
+    assert client.get(f'/api/game/challenge/{STATION}/wordsearch').status_code == 403
+    assert client.get('/api/game/challenge/1/wordsearch').status_code == 404
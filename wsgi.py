@@ -1,4 +1,9 @@
 from my_app import create_app
+from my_app.startup import warmup
 
 # cria a instância da aplicação
 app = create_app()
+
+# Aquece caches antes do worker do gunicorn começar a aceitar conexões
+if app.config['WARMUP_ON_STARTUP']:
+    warmup(app)